@@ -1,5 +1,51 @@
-from src.data_pipline import *
-from src.feature_engineering import *
-from src.pair_selection import *
-from src.risk_and_positioning import *
-from src.signal_generation import *
+"""
+Mean-reversion pair-trading strategy.
+
+Public classes are resolved lazily (PEP 562): importing the package loads nothing beyond the
+standard library, and each submodule (with its pandas / scipy / statsmodels / sklearn imports) is
+only loaded when one of its names is first accessed, e.g. ``mean_reversion.ZScoreStrategy``.
+"""
+import os
+import sys
+import importlib
+
+_STRATEGY_DIR = os.path.dirname(os.path.abspath(__file__))
+_REPO_ROOT = os.path.abspath(os.path.join(_STRATEGY_DIR, '..', '..'))
+for _path in (_REPO_ROOT, _STRATEGY_DIR):
+    if _path not in sys.path:
+        sys.path.insert(0, _path)
+
+_LAZY = {
+    'RollingHedgeRatio': 'src.data_pipline.spread_calculator',
+    'KalmanHedgeRatio': 'src.data_pipline.spread_calculator',
+    'PricePanel': 'src.data_pipline.price_transformer',
+    'CorrelationFeatures': 'src.feature_engineering.correlation_features',
+    'RollingCorrelation': 'src.feature_engineering.correlation_features',
+    'VolatilityCache': 'src.feature_engineering.volatility_features',
+    'VolatilityFeatures': 'src.feature_engineering.volatility_features',
+    'CointegrationScreener': 'src.pair_selection.traditional_cointegration',
+    'BasketCointegration': 'src.pair_selection.basket_cointegration',
+    'PairFeatureStore': 'src.pair_selection.ml_classifier',
+    'PairSelectorModel': 'src.pair_selection.ml_classifier',
+    'PairClassifier': 'src.pair_selection.ml_classifier',
+    'pair_features': 'src.pair_selection.ml_classifier',
+    'DynamicVolSizer': 'src.risk_and_positioning.dynamic_vol_sizer',
+    'AdaptiveThresholds': 'src.signal_generation.adaptive_thresholds',
+    'StreamingZScore': 'src.signal_generation.zscore_strategy',
+    'ZScoreStrategy': 'src.signal_generation.zscore_strategy',
+}
+
+__all__ = sorted(_LAZY)
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
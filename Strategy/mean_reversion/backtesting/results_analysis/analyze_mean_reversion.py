@@ -0,0 +1,45 @@
+import os
+import sys
+import argparse
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if STRATEGY_DIR not in sys.path:
+    sys.path.insert(0, STRATEGY_DIR)
+
+from main_strategy import load_config
+from src.backtesting_framework.report_generator import ReportGenerator
+from src.logging_config import configure_logging
+
+DEFAULT_BACKTEST_CONFIG = os.path.join(STRATEGY_DIR, 'backtesting', 'configs', 'config_backtest_prod.yaml')
+
+
+def build_report(results_dir, output, fmt='html', periods_per_year=252, batch_size=65536, n_jobs=None):
+    """
+    Aggregate the walk-forward results in `results_dir` and write the report.
+    output: directory for the HTML report, or path of the PDF
+    Returns: path of the report (None on failure)
+    """
+    generator = ReportGenerator(results_dir, periods_per_year=periods_per_year, batch_size=batch_size, n_jobs=n_jobs)
+    if fmt == 'pdf':
+        return generator.render_pdf(output if output.endswith('.pdf') else os.path.join(output, 'MR_Report.pdf'))
+    return generator.render_html(output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Report on walk-forward results of the mean-reversion strategy.')
+    parser.add_argument('results_dir', nargs='?', help='defaults to execution.output_dir of the backtest config')
+    parser.add_argument('--config', default=DEFAULT_BACKTEST_CONFIG)
+    parser.add_argument('--output', default='reports')
+    parser.add_argument('--format', choices=('html', 'pdf'), default='html')
+    parser.add_argument('--batch-size', type=int, default=65536)
+    parser.add_argument('--n-jobs', type=int, default=None)
+    args = parser.parse_args()
+
+    configure_logging()
+    config = load_config(args.config)
+    results_dir = args.results_dir or (config.get('execution') or {}).get('output_dir')
+    path = build_report(results_dir, args.output, args.format, config.get('periods_per_year', 252), args.batch_size,
+                        args.n_jobs)
+    if path is None:
+        sys.exit(1)
+    print(path)
@@ -0,0 +1,306 @@
+import os
+import sys
+import pickle
+import hashlib
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+if STRATEGY_DIR not in sys.path:
+    sys.path.insert(0, STRATEGY_DIR)
+
+from main_strategy import DEFAULT_CONFIG, MeanReversionStrategy, load_config
+from src.backtesting_framework.engine import BacktestEngine
+from src.data_pipline.price_transformer import PricePanel
+from src.logging_config import configure_logging, instrumentation, timed
+
+DEFAULT_BACKTEST_CONFIG = os.path.join(STRATEGY_DIR, 'backtesting', 'configs', 'config_backtest_prod.yaml')
+
+# Rows per parquet row group in the fold result files; bounds the memory of streaming readers.
+RESULT_ROW_GROUP = 65536
+
+_worker = {}
+
+
+def content_key(*parts):
+    """
+    Stable hash of arrays, DataFrames and plain values (dicts are hashed with sorted keys).
+    Used to chain stage keys: a stage's key includes its inputs' keys, so changing one
+    parameter invalidates that stage and everything downstream of it, nothing upstream.
+    """
+    digest = hashlib.sha1()
+
+    def feed(part):
+        if isinstance(part, pd.DataFrame):
+            feed(part.to_numpy())
+            feed(list(map(str, part.columns)))
+            feed(part.index.to_numpy().astype('datetime64[ns]') if isinstance(part.index, pd.DatetimeIndex)
+                 else list(map(str, part.index)))
+        elif isinstance(part, np.ndarray):
+            array = np.ascontiguousarray(part)
+            digest.update(str((array.shape, array.dtype.str)).encode())
+            digest.update(array.tobytes())
+        elif isinstance(part, dict):
+            for key in sorted(part):
+                feed(key)
+                feed(part[key])
+        elif isinstance(part, (list, tuple)):
+            digest.update(b'[')
+            for item in part:
+                feed(item)
+            digest.update(b']')
+        else:
+            digest.update(repr(part).encode())
+
+    for part in parts:
+        feed(part)
+    return digest.hexdigest()
+
+
+class ArtifactCache:
+    def __init__(self, root=None):
+        """
+        Pickle store for intermediate artifacts keyed by content hash, one directory per stage.
+        root: cache directory; None disables caching
+        """
+        self.root = root
+        self.hits = 0
+        self.misses = 0
+        if root is not None:
+            os.makedirs(root, exist_ok=True)
+
+    def memo(self, stage, key, compute):
+        """Return the cached artifact for (stage, key), computing and storing it on a miss."""
+        if self.root is None:
+            self.misses += 1
+            return compute()
+        path = os.path.join(self.root, stage, f"{key}.pkl")
+        if os.path.exists(path):
+            try:
+                with open(path, 'rb') as f:
+                    value = pickle.load(f)
+                self.hits += 1
+                return value
+            except Exception as e:
+                logging.warning(f"Discarding unreadable {stage} artifact {key}: {e}")
+        self.misses += 1
+        value = compute()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        return value
+
+
+def _init_worker(spec, strategy_config, backtest_config):
+    # Workers map the parent's PricePanel; only its shared-memory name and labels are pickled.
+    _worker['panel'] = PricePanel.attach(spec)
+    _worker['prices'] = _worker['panel'].frame()
+    _worker['strategy_config'] = strategy_config
+    _worker['backtest_config'] = backtest_config
+
+
+def _fold_task(fold):
+    return WalkForwardRunner(_worker['backtest_config'], _worker['strategy_config']).run_fold(_worker['prices'], fold)
+
+
+class WalkForwardRunner:
+    def __init__(self, backtest_config=None, strategy_config=None):
+        """
+        Walk-forward optimization: every fold re-selects pairs and searches signal parameters on
+        its training window, then trades the best set on the following test window.
+        Folds run on a process pool; selected pairs, spreads and search results are memoized by
+        content hash in execution.cache_dir.
+        backtest_config: dict shaped like configs/config_backtest_prod.yaml
+        strategy_config: dict shaped like config/strategy_config.yaml
+        """
+        self.config = backtest_config or {}
+        self.strategy_config = strategy_config or {}
+        walk = self.config.get('walk_forward') or {}
+        self.train_bars = int(walk.get('train_bars', 504))
+        self.test_bars = int(walk.get('test_bars', 126))
+        self.step_bars = int(walk.get('step_bars') or self.test_bars)
+        self.anchored = bool(walk.get('anchored', False))
+        self.grid = self.config.get('parameter_grid') or {}
+        self.objective = self.config.get('objective', 'sharpe_ratio')
+        costs = self.config.get('costs') or {}
+        self.commission = costs.get('commission', 0.0)
+        self.slippage = costs.get('slippage', 0.0)
+        self.periods_per_year = self.config.get('periods_per_year', 252)
+        execution = self.config.get('execution') or {}
+        self.n_jobs = execution.get('n_jobs')
+        self.output_dir = execution.get('output_dir')
+        self.cache = ArtifactCache(execution.get('cache_dir'))
+        if self.objective not in BacktestEngine.BATCH_RESULT_DTYPE.names:
+            raise ValueError(f"Unknown objective '{self.objective}'.")
+
+    @classmethod
+    def from_yaml(cls, path=DEFAULT_BACKTEST_CONFIG, strategy_path=DEFAULT_CONFIG):
+        return cls(load_config(path), load_config(strategy_path))
+
+    def load_prices(self):
+        """Read the close-price panel named in data.prices, trimmed to data.start / data.end."""
+        data = self.config.get('data') or {}
+        path = data['prices']
+        if path.endswith('.parquet'):
+            prices = pd.read_parquet(path)
+        else:
+            prices = pd.read_csv(path, index_col=0, parse_dates=True)
+        prices = prices.sort_index()
+        return prices.loc[data.get('start'):data.get('end')]
+
+    def folds(self, n_bars):
+        """List of (fold, train_start, train_end, test_end) bar offsets; the test window is [train_end, test_end)."""
+        folds = []
+        start = 0
+        while start + self.train_bars < n_bars:
+            train_start = 0 if self.anchored else start
+            train_end = start + self.train_bars
+            folds.append((len(folds), train_start, train_end, min(train_end + self.test_bars, n_bars)))
+            start += self.step_bars
+        return folds
+
+    def run(self, prices=None):
+        """
+        Run every fold and write fold summaries (folds.csv) and out-of-sample pair returns
+        (fold_NNN.parquet) to execution.output_dir when set.
+        Returns: (summary DataFrame, list of per-fold out-of-sample return DataFrames)
+        """
+        try:
+            prices = self.load_prices() if prices is None else prices
+            folds = self.folds(len(prices))
+            if not folds:
+                raise ValueError("History is shorter than one training window.")
+            n_jobs = self.n_jobs or os.cpu_count() or 1
+            logging.info(f"Walk-forward: {len(folds)} folds over {len(prices)} bars on {min(n_jobs, len(folds))} workers.")
+
+            if n_jobs == 1 or len(folds) == 1:
+                results = [self.run_fold(prices, fold) for fold in folds]
+            else:
+                with PricePanel.from_frame(prices) as panel:
+                    with ProcessPoolExecutor(max_workers=min(n_jobs, len(folds)), initializer=_init_worker,
+                                             initargs=(panel.spec(), self.strategy_config, self.config)) as pool:
+                        results = list(pool.map(_fold_task, folds))
+
+            summary = pd.DataFrame([r['summary'] for r in results])
+            returns = [r['returns'] for r in results]
+            if self.output_dir:
+                os.makedirs(self.output_dir, exist_ok=True)
+                summary.to_csv(os.path.join(self.output_dir, 'folds.csv'), index=False)
+                for r in results:
+                    path = os.path.join(self.output_dir, f"fold_{r['summary']['fold']:03d}.parquet")
+                    r['returns'].to_parquet(path, row_group_size=RESULT_ROW_GROUP)
+            return summary, returns
+        except Exception as e:
+            logging.error(f"Walk-forward run error: {e}")
+            return None
+
+    @timed('WalkForwardRunner.run_fold')
+    def run_fold(self, prices, fold):
+        """
+        One fold: pair selection and parameter search on the training window, then the
+        out-of-sample test. Each stage goes through the artifact cache.
+        Returns: dict with a 'summary' record and the test 'returns' DataFrame (dates x pairs)
+        """
+        fold_id, train_start, train_end, test_end = fold
+        strategy = MeanReversionStrategy(self.strategy_config, n_jobs=1)
+        hits = self.cache.hits
+        cfg = strategy.config
+        train = prices.iloc[train_start:train_end]
+        window = prices.iloc[train_start:test_end]
+
+        pairs_key = content_key('pairs', train, cfg['pair_selection'])
+        pairs = self.cache.memo('pairs', pairs_key, lambda: strategy.select_pairs(train))
+        summary = {'fold': fold_id, 'train_start': prices.index[train_start], 'test_start': prices.index[train_end],
+                   'test_end': prices.index[test_end - 1], 'n_pairs': 0 if pairs is None else len(pairs)}
+        if pairs is None or len(pairs) == 0:
+            logging.info(f"Fold {fold_id}: no cointegrated pairs selected.")
+            summary['cache_hits'] = self.cache.hits - hits
+            return {'summary': summary, 'returns': pd.DataFrame(index=prices.index[train_end:test_end])}
+
+        spreads_key = content_key('spreads', pairs_key, window, cfg['spread'], cfg['pair_selection']['use_log_prices'])
+        spread, beta = self.cache.memo('spreads', spreads_key, lambda: strategy.spreads(window, pairs))
+        pair_returns = strategy.pair_returns(window, pairs, beta)
+        n_train = train_end - train_start
+
+        param_sets = strategy.param_sets(self.grid) if self.grid else [dict(
+            (name, cfg['signals'][name]) for name in ('zscore_window', 'entry_z', 'exit_z'))]
+        search_key = content_key('search', spreads_key, param_sets, cfg['signals']['stop_z'], self.objective,
+                                 self.commission, self.slippage, self.periods_per_year, n_train)
+        search = self.cache.memo('search', search_key, lambda: self._search(
+            strategy, spread[:n_train], pair_returns[:n_train], param_sets))
+        best = param_sets[search['best']]
+
+        # Trade the chosen set through the whole window so the z-score is warm at the test start;
+        # the last training bar's target carries into the first test bar.
+        positions = strategy.signal_grid(spread, [best])
+        test = self._backtest(pair_returns[n_train - 1:], positions[n_train - 1:])
+        columns = [f"{a}/{b}" for a, b in zip(pairs['asset1'], pairs['asset2'])]
+        returns = pd.DataFrame(test['returns'][1:], index=prices.index[train_end:test_end], columns=columns)
+
+        portfolio = returns.mean(axis=1)
+        equity = (1 + portfolio).cumprod()
+        vol = portfolio.std() * np.sqrt(self.periods_per_year)
+        summary.update({f"param_{k}": v for k, v in best.items()})
+        summary.update({
+            f"train_{self.objective}": search['scores'][search['best']],
+            'test_total_return': equity.iloc[-1] - 1,
+            'test_sharpe_ratio': portfolio.mean() * self.periods_per_year / vol if vol > 0 else np.nan,
+            'test_max_drawdown': BacktestEngine._max_drawdown(equity),
+            'test_trades': int(test['results']['n_trades'].sum()),
+            'cache_hits': self.cache.hits - hits,
+        })
+        logging.info(f"Fold {fold_id}: {len(pairs)} pairs, best {best}, "
+                     f"test return {summary['test_total_return']:.4f}")
+        return {'summary': summary, 'returns': returns}
+
+    @timed('WalkForwardRunner.search')
+    def _search(self, strategy, spread, pair_returns, param_sets):
+        positions = strategy.signal_grid(spread, param_sets)
+        results = self._backtest(pair_returns, positions, return_equity=False)['results']
+        values = results[self.objective].astype(np.float64)
+        values[~np.isfinite(values)] = np.nan
+        with np.errstate(all='ignore'):
+            scores = np.nan_to_num(np.nanmean(values, axis=0), nan=-np.inf)
+        return {'scores': scores, 'best': int(np.argmax(scores))}
+
+    def _backtest(self, pair_returns, positions, return_equity=True):
+        """Run BacktestEngine.run_batch on the synthetic price index of each spread."""
+        index = np.cumprod(1 + pair_returns, axis=0)
+        output = BacktestEngine.run_batch(index, positions, initial_capital=1.0, commission=self.commission,
+                                          slippage=self.slippage, periods_per_year=self.periods_per_year,
+                                          return_equity=return_equity)
+        if not return_equity:
+            return {'results': output}
+        results, equity = output
+        strategy_returns = np.zeros(equity.shape[:2])
+        strategy_returns[0] = equity[0, :, 0] - 1
+        strategy_returns[1:] = equity[1:, :, 0] / equity[:-1, :, 0] - 1
+        return {'results': results, 'returns': strategy_returns}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Walk-forward backtest of the mean-reversion strategy.')
+    parser.add_argument('--config', default=DEFAULT_BACKTEST_CONFIG)
+    parser.add_argument('--strategy-config', default=DEFAULT_CONFIG)
+    parser.add_argument('--metrics-out', help='write per-stage metrics here in Prometheus text format')
+    parser.add_argument('--profile-out', help='sample the run and write collapsed stacks (flame-graph input) here')
+    args = parser.parse_args()
+
+    configure_logging()
+    if args.metrics_out or args.profile_out:
+        instrumentation.enable(track_memory=instrumentation.track_memory, profile=bool(args.profile_out))
+    runner = WalkForwardRunner.from_yaml(args.config, args.strategy_config)
+    output = runner.run()
+    if output is not None:
+        print(output[0].to_string(index=False))
+        logging.info(f"Artifact cache hits: {int(output[0]['cache_hits'].fillna(0).sum())}")
+    if instrumentation.enabled:
+        instrumentation.log_summary()
+        for path in instrumentation.export(args.metrics_out, args.profile_out):
+            logging.info(f"Wrote {path}.")
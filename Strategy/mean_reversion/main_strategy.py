@@ -0,0 +1,510 @@
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import itertools
+import inspect
+
+import numpy as np
+import pandas as pd
+import yaml
+
+STRATEGY_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..'))
+for path in (REPO_ROOT, STRATEGY_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from src.logging_config import Instrumentation, configure_logging, instrument_class, instrumentation
+from src.data_pipline.spread_calculator import RollingHedgeRatio
+from src.pair_selection.basket_cointegration import BasketCointegration
+from src.pair_selection.traditional_cointegration import CointegrationScreener
+from src.risk_and_positioning.dynamic_vol_sizer import DynamicVolSizer
+from src.signal_generation.zscore_strategy import ZScoreStrategy
+
+DEFAULT_CONFIG = os.path.join(STRATEGY_DIR, 'config', 'strategy_config.yaml')
+
+DEFAULTS = {
+    'pair_selection': {'min_correlation': 0.7, 'significance': 0.05, 'adf_lags': 1,
+                       'use_log_prices': True, 'max_pairs': 50},
+    'basket_selection': {'min_correlation': 0.7, 'min_legs': 3, 'max_legs': 5, 'max_cluster_size': 8,
+                         'significance': 0.05, 'max_baskets': 20},
+    'spread': {'hedge_window': None},
+    'signals': {'zscore_window': 60, 'entry_z': 2.0, 'exit_z': 0.5, 'stop_z': None},
+    'sizing': {'target_vol': 0.10, 'base_leverage': 1.0, 'max_leverage': 3.0, 'max_weight': None},
+    'live': {'capital': 100000, 'queue_size': 1024, 'coalesce': True, 'cov_window': 250, 'cov_decay': 0.97,
+             'cov_shrinkage': 0.1, 'resize_every': None},
+}
+
+
+def load_config(path=DEFAULT_CONFIG):
+    """Read a YAML config file (an empty file yields an empty dict)."""
+    with open(path) as f:
+        return yaml.safe_load(f) or {}
+
+
+def _merge(defaults, overrides):
+    merged = {}
+    for key, value in defaults.items():
+        override = (overrides or {}).get(key)
+        merged[key] = _merge(value, override) if isinstance(value, dict) else (value if override is None else override)
+    for key, value in (overrides or {}).items():
+        merged.setdefault(key, value)
+    return merged
+
+
+@instrument_class
+class MeanReversionStrategy:
+    def __init__(self, config=None, n_jobs=None):
+        """
+        The pair-trading pipeline as separate stages (pair selection, spreads, signals, pair returns),
+        so callers such as the walk-forward runner can cache and recompute them independently.
+        config: dict shaped like config/strategy_config.yaml; missing keys fall back to DEFAULTS
+        n_jobs: worker processes for the cointegration screener
+        """
+        self.config = _merge(DEFAULTS, config)
+        self.n_jobs = n_jobs
+
+    @classmethod
+    def from_yaml(cls, path=DEFAULT_CONFIG, **kwargs):
+        return cls(load_config(path), **kwargs)
+
+    def select_pairs(self, prices):
+        """
+        Screen every pair of columns for cointegration and keep the most significant ones.
+        prices: pd.DataFrame of aligned close prices, or a PricePanel shared with the screener's workers
+        Returns: DataFrame with asset1, asset2, hedge_ratio, intercept and p_value columns
+        """
+        cfg = self.config['pair_selection']
+        screener = CointegrationScreener(min_correlation=cfg['min_correlation'], adf_lags=cfg['adf_lags'],
+                                         significance=cfg['significance'], use_log_prices=cfg['use_log_prices'],
+                                         n_jobs=self.n_jobs)
+        result = screener.screen(prices)
+        if result is None:
+            return None
+        selected = result[result['cointegrated']].head(cfg['max_pairs'])
+        return selected[['asset1', 'asset2', 'hedge_ratio', 'intercept', 'p_value']].reset_index(drop=True)
+
+    def select_baskets(self, prices):
+        """
+        Johansen-test 3-5 leg baskets drawn from clusters of correlated assets and keep the strongest.
+        prices: pd.DataFrame of aligned close prices
+        Returns: DataFrame with assets, n_legs, weights (leading cointegrating vector, first leg = 1),
+                 rank and trace statistics
+        """
+        cfg = self.config['basket_selection']
+        engine = BasketCointegration(min_correlation=cfg['min_correlation'], min_legs=cfg['min_legs'],
+                                     max_legs=cfg['max_legs'], max_cluster_size=cfg['max_cluster_size'],
+                                     significance=cfg['significance'],
+                                     use_log_prices=self.config['pair_selection']['use_log_prices'], n_jobs=self.n_jobs)
+        result = engine.screen(prices)
+        if result is None or result.empty:
+            return result
+        selected = result[result['cointegrated']].head(cfg['max_baskets'])
+        return selected[['assets', 'n_legs', 'weights', 'rank', 'trace_stat', 'trace_crit']].reset_index(drop=True)
+
+    def spreads(self, prices, pairs):
+        """
+        Spread y - beta * x - alpha of every selected pair, with the static hedge ratio from
+        selection or a RollingHedgeRatio when spread.hedge_window is set.
+        Returns: (spread, beta) arrays of shape (T, n_pairs)
+        """
+        y, x = self._legs(prices, pairs)
+        if self.config['pair_selection']['use_log_prices']:
+            y, x = np.log(y), np.log(x)
+        window = self.config['spread']['hedge_window']
+        if window is None:
+            beta = np.broadcast_to(pairs['hedge_ratio'].to_numpy(dtype=np.float64), y.shape)
+            spread = y - beta * x - pairs['intercept'].to_numpy(dtype=np.float64)
+            return spread, np.array(beta)
+        spread, beta, _ = RollingHedgeRatio(len(pairs), window=window).fit(y, x)
+        return spread, beta
+
+    def signals(self, spread, zscore_window=None, entry_z=None, exit_z=None, stop_z=None):
+        """Target positions (-1/0/+1 per spread) for one parameter set; unset values come from the config."""
+        cfg = self.config['signals']
+        params = {'zscore_window': zscore_window or cfg['zscore_window'],
+                  'entry_z': cfg['entry_z'] if entry_z is None else entry_z,
+                  'exit_z': cfg['exit_z'] if exit_z is None else exit_z}
+        return self.signal_grid(spread, [params], stop_z=stop_z)[:, :, 0]
+
+    def signal_grid(self, spread, param_sets, stop_z=None):
+        """
+        Target positions for many parameter sets at once. Sets sharing a z-score window are run
+        through a single ZScoreStrategy over the tiled spreads, with per-column entry/exit levels.
+        param_sets: list of dicts with zscore_window, entry_z and exit_z
+        Returns: array of shape (T, n_pairs, len(param_sets))
+        """
+        spread = np.asarray(spread, dtype=np.float64)
+        n_bars, n_pairs = spread.shape
+        stop_z = self.config['signals']['stop_z'] if stop_z is None else stop_z
+        out = np.zeros((n_bars, n_pairs, len(param_sets)))
+        by_window = {}
+        for i, params in enumerate(param_sets):
+            by_window.setdefault(int(params['zscore_window']), []).append(i)
+
+        for window, members in by_window.items():
+            entry = np.repeat([param_sets[i]['entry_z'] for i in members], n_pairs)
+            exit_ = np.repeat([param_sets[i]['exit_z'] for i in members], n_pairs)
+            strategy = ZScoreStrategy(n_pairs * len(members), window=window, entry_z=entry, exit_z=exit_,
+                                      stop_z=stop_z)
+            _, positions = strategy.run(np.tile(spread, (1, len(members))))
+            out[:, :, members] = positions.reshape(n_bars, len(members), n_pairs).transpose(0, 2, 1)
+        return out
+
+    @staticmethod
+    def param_sets(grid):
+        """Expand a dict of parameter lists into the list of all combinations."""
+        names = list(grid)
+        return [dict(zip(names, values)) for values in itertools.product(*(np.atleast_1d(grid[n]) for n in names))]
+
+    @staticmethod
+    def pair_returns(prices, pairs, beta):
+        """
+        Per-bar return of one long unit of each spread: (r_y - beta * r_x) / (1 + |beta|), using
+        the previous bar's hedge ratio. Row 0 is zero.
+        Returns: array of shape (T, n_pairs)
+        """
+        y, x = MeanReversionStrategy._legs(prices, pairs)
+        beta = np.asarray(beta, dtype=np.float64)
+        returns = np.zeros(y.shape)
+        r_y = y[1:] / y[:-1] - 1
+        r_x = x[1:] / x[:-1] - 1
+        returns[1:] = (r_y - beta[:-1] * r_x) / (1 + np.abs(beta[:-1]))
+        returns[~np.isfinite(returns)] = 0.0
+        return returns
+
+    @staticmethod
+    def _legs(prices, pairs):
+        columns = prices.columns
+        values = prices.to_numpy(dtype=np.float64)
+        return (values[:, columns.get_indexer(pairs['asset1'])],
+                values[:, columns.get_indexer(pairs['asset2'])])
+
+class ReplayFeed:
+    def __init__(self, prices, rate=None):
+        """
+        Feed that replays a price panel bar by bar, standing in for a live market-data source.
+        prices: pd.DataFrame of close prices (index = bar timestamps, columns = assets)
+        rate: bars per second to pace the replay (None = as fast as the consumer accepts them)
+        """
+        self.columns = list(prices.columns)
+        self.index = prices.index
+        self.values = prices.to_numpy(dtype=np.float64)
+        self.rate = rate
+
+    @classmethod
+    def from_file(cls, path, rate=None):
+        """Replay a CSV (first column = timestamps) or parquet price file."""
+        if path.endswith('.parquet'):
+            prices = pd.read_parquet(path)
+        else:
+            prices = pd.read_csv(path, index_col=0, parse_dates=True)
+        return cls(prices.sort_index(), rate=rate)
+
+    async def __aiter__(self):
+        interval = 1.0 / self.rate if self.rate else 0.0
+        for timestamp, row in zip(self.index, self.values):
+            yield timestamp, row
+            await asyncio.sleep(interval)
+
+
+class SocketFeed:
+    def __init__(self, host, port, columns):
+        """
+        Feed reading newline-delimited JSON bars from a TCP socket, e.g.
+        {"timestamp": "2024-01-02T09:30:00", "prices": {"AAA": 10.5, "BBB": 20.1}}
+        or {"timestamp": ..., "prices": [10.5, 20.1, ...]} (one value per column).
+        A dict carries only the assets that ticked; the others keep their last price. Malformed
+        messages, including price lists of the wrong length, are logged and skipped.
+        Reading stops while the service's queue is full, so TCP flow control pushes back on the sender.
+        columns: asset order of the price vectors handed to the service
+        """
+        self.host = host
+        self.port = port
+        self.columns = list(columns)
+        self._position = {name: i for i, name in enumerate(self.columns)}
+
+    async def __aiter__(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        last = np.full(len(self.columns), np.nan)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    prices = message['prices']
+                    if isinstance(prices, dict):
+                        for name, value in prices.items():
+                            i = self._position.get(name)
+                            if i is not None:
+                                last[i] = value
+                    else:
+                        values = np.asarray(prices, dtype=np.float64)
+                        if values.shape != last.shape:
+                            raise ValueError(f"expected {len(self.columns)} prices, got {values.size}")
+                        last = values
+                except Exception as e:
+                    logging.error(f"Socket feed error: {e}")
+                    continue
+                yield message.get('timestamp'), last.copy()
+        finally:
+            writer.close()
+
+
+class LiveSignalService:
+    STAGES = ('queue_wait', 'spread', 'signal', 'sizing', 'publish', 'bar_to_signal')
+
+    def __init__(self, strategy, pairs, columns, publish=None, capital=None, queue_size=None, coalesce=None,
+                 cov_window=None, cov_decay=None, cov_shrinkage=None, resize_every=None):
+        """
+        Asyncio runtime that turns streaming bars into target positions for every active pair.
+        Each bar updates all pairs at once as array operations: spread (static or rolling hedge
+        ratio), z-score and entry/exit state (ZScoreStrategy), and, when any target signal changes,
+        ERC / vol-target sizing (DynamicVolSizer) on an EWMA covariance of recent pair returns.
+        The feed and the signal loop are decoupled by a bounded queue: a full queue stalls the feed
+        (backpressure). With coalescing, a loop that falls behind still runs every queued bar through
+        the spread, z-score and return state, but only sizes and publishes the latest one.
+        Latency of every stage is recorded in `self.metrics`; see report().
+        strategy: MeanReversionStrategy providing the spread, signals, sizing and live config
+        pairs: DataFrame from MeanReversionStrategy.select_pairs (asset1, asset2, hedge_ratio, intercept)
+        columns: asset order of the price vectors the feed yields
+        publish: optional callable (or coroutine function) receiving each targets dict
+        Remaining arguments override the config's live section.
+        """
+        cfg = dict(strategy.config['live'])
+        overrides = {'capital': capital, 'queue_size': queue_size, 'coalesce': coalesce, 'cov_window': cov_window,
+                     'cov_decay': cov_decay, 'cov_shrinkage': cov_shrinkage, 'resize_every': resize_every}
+        cfg.update({key: value for key, value in overrides.items() if value is not None})
+        self.config = cfg
+        self.strategy = strategy
+        self.pairs = pairs.reset_index(drop=True)
+        self.publish = publish
+
+        columns = pd.Index(columns)
+        self.idx_y = columns.get_indexer(self.pairs['asset1'])
+        self.idx_x = columns.get_indexer(self.pairs['asset2'])
+        if (self.idx_y < 0).any() or (self.idx_x < 0).any():
+            raise ValueError("Every pair asset must be one of the feed's columns.")
+        n_pairs = len(self.pairs)
+        self.use_log = strategy.config['pair_selection']['use_log_prices']
+
+        window = strategy.config['spread']['hedge_window']
+        self.hedge = RollingHedgeRatio(n_pairs, window=window) if window else None
+        self.beta = self.pairs['hedge_ratio'].to_numpy(dtype=np.float64)
+        self.alpha = self.pairs['intercept'].to_numpy(dtype=np.float64)
+        signals = strategy.config['signals']
+        self.signals = ZScoreStrategy(n_pairs, window=signals['zscore_window'], entry_z=signals['entry_z'],
+                                      exit_z=signals['exit_z'], stop_z=signals['stop_z'])
+        self.sizer = DynamicVolSizer(**strategy.config['sizing'])
+
+        self.returns = np.zeros((cfg['cov_window'], n_pairs))
+        self.n_returns = 0
+        self.prev_y = None
+        self.prev_x = None
+        self.position = np.zeros(n_pairs)
+        self.allocation = np.zeros(n_pairs)
+        self.latest = None
+        self.bars = 0
+        self.updates = 0
+        self.coalesced = 0
+        self.metrics = Instrumentation()
+        self._since_resize = 0
+
+    def process(self, timestamp, prices, received=None):
+        """
+        Run one bar through the pipeline synchronously.
+        prices: array of asset prices in feed column order
+        received: perf_counter() timestamp of the bar's arrival (default: now)
+        Returns: targets dict with timestamp, position, allocation, zscore, spread, beta, leverage
+        """
+        spread, zscore, position = self._update(prices, received)
+        return self._targets(timestamp, spread, zscore, position)
+
+    def _update(self, prices, received=None):
+        """Advance the return buffer, spread and z-score state by one bar. Returns: (spread, zscore, position)."""
+        clock = time.perf_counter
+        start = clock()
+        received = start if received is None else received
+        record = self.metrics.record
+        record('queue_wait', start - received)
+
+        y = prices[self.idx_y]
+        x = prices[self.idx_x]
+        if self.prev_y is not None:
+            beta = self.beta
+            with np.errstate(divide='ignore', invalid='ignore'):
+                r = (y / self.prev_y - 1 - beta * (x / self.prev_x - 1)) / (1 + np.abs(beta))
+            self.returns[self.n_returns % len(self.returns)] = np.where(np.isfinite(r), r, 0.0)
+            self.n_returns += 1
+        self.prev_y, self.prev_x = y, x
+        if self.use_log:
+            y, x = np.log(y), np.log(x)
+        if self.hedge is None:
+            spread = y - self.beta * x - self.alpha
+        else:
+            spread, beta, alpha = self.hedge.update(y, x)
+            self.beta = np.where(np.isfinite(beta), beta, self.beta)
+        t1 = clock()
+        record('spread', t1 - start)
+
+        zscore, position = self.signals.push(spread)
+        record('signal', clock() - t1)
+        self._since_resize += 1
+        self.bars += 1
+        return spread, zscore, position
+
+    def _targets(self, timestamp, spread, zscore, position):
+        """Resize on a signal change (or every `resize_every` bars) and build the targets dict."""
+        start = time.perf_counter()
+        every = self.config['resize_every']
+        changed = not np.array_equal(position, self.position)
+        leverage = None
+        if changed or (every and self._since_resize >= every):
+            leverage = self._size(position)
+            self._since_resize = 0
+        self.position = position
+        self.metrics.record('sizing', time.perf_counter() - start)
+
+        self.latest = {'timestamp': timestamp, 'position': position, 'allocation': self.allocation.copy(),
+                       'zscore': zscore, 'spread': spread, 'beta': self.beta, 'leverage': leverage,
+                       'resized': leverage is not None}
+        return self.latest
+
+    def _size(self, position):
+        """Signed notional per pair for the new target signals; only the active pairs enter the covariance."""
+        allocation = np.zeros(len(position))
+        active = np.flatnonzero(position)
+        leverage = 0.0
+        n = min(self.n_returns, len(self.returns))
+        if len(active) and n > 1:
+            order = np.arange(self.n_returns - n, self.n_returns) % len(self.returns)
+            cov = DynamicVolSizer.ewma_covariance(self.returns[order][:, active], lam=self.config['cov_decay'],
+                                                  shrinkage=self.config['cov_shrinkage'])
+            sized = self.sizer.size(cov, self.config['capital'], signals=position[active])
+            if sized is not None:
+                allocation[active] = sized['allocation']
+                leverage = sized['leverage']
+        self.allocation = allocation
+        return leverage
+
+    async def _publish(self, targets):
+        if self.publish is None:
+            return
+        result = self.publish(targets)
+        if inspect.isawaitable(result):
+            await result
+
+    def warm_up(self, prices):
+        """Replay a history (DataFrame or (T, n_assets) array in feed column order) to fill the rolling state."""
+        for timestamp, row in zip(getattr(prices, 'index', range(len(prices))), np.asarray(prices, dtype=np.float64)):
+            self.process(timestamp, row)
+        self.metrics.reset()
+        self.bars = 0
+
+    async def _produce(self, feed, queue):
+        try:
+            async for timestamp, prices in feed:
+                await queue.put((timestamp, prices, time.perf_counter()))
+        finally:
+            await queue.put(None)
+
+    async def run(self, feed):
+        """
+        Consume `feed` (an async iterable of (timestamp, prices)) until it ends, publishing the
+        targets after every processed bar.
+        """
+        queue = asyncio.Queue(maxsize=self.config['queue_size'])
+        producer = asyncio.create_task(self._produce(feed, queue))
+        coalesce = self.config['coalesce']
+        try:
+            while True:
+                item = await queue.get()
+                done = item is None
+                if coalesce and not done:
+                    # Bars behind the latest still advance the rolling state; only sizing and publishing skip them.
+                    while not queue.empty():
+                        newer = queue.get_nowait()
+                        if newer is None:
+                            done = True
+                            break
+                        self._update(item[1], item[2])
+                        item = newer
+                        self.coalesced += 1
+                if item is not None:
+                    timestamp, prices, received = item
+                    targets = self.process(timestamp, prices, received)
+                    start = time.perf_counter()
+                    await self._publish(targets)
+                    end = time.perf_counter()
+                    self.metrics.record('publish', end - start)
+                    self.metrics.record('bar_to_signal', end - received)
+                    self.updates += 1
+                if done:
+                    break
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
+        return self.latest
+
+    def report(self):
+        """
+        Per-stage latency (mean / p50 / p99 / max seconds) plus counts of bars, coalesced bars (updated
+        but not sized or published) and published updates.
+        """
+        snapshot = self.metrics.snapshot()
+        return {'bars': self.bars, 'coalesced': self.coalesced, 'published': self.updates,
+                'latency': {stage: snapshot[stage] for stage in self.STAGES if stage in snapshot}}
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the mean-reversion strategy on live (or replayed) bars.")
+    parser.add_argument('--config', default=DEFAULT_CONFIG)
+    parser.add_argument('--history', help="price file used for pair selection and warm-up")
+    parser.add_argument('--replay', help="price file replayed as the live feed")
+    parser.add_argument('--rate', type=float, help="replay pace in bars per second")
+    parser.add_argument('--socket', help="host:port of a newline-delimited JSON bar feed")
+    parser.add_argument('--metrics-out', help="write library and live-stage metrics here in Prometheus text format")
+    parser.add_argument('--profile-out', help="sample the service and write collapsed stacks (flame-graph input) here")
+    return parser.parse_args(argv)
+
+
+async def _serve(args, strategy):
+    history = ReplayFeed.from_file(args.history)
+    prices = pd.DataFrame(history.values, index=history.index, columns=history.columns)
+    pairs = strategy.select_pairs(prices)
+    if pairs is None or pairs.empty:
+        logging.error("No cointegrated pairs in the history; nothing to trade.")
+        return
+    if args.socket:
+        host, port = args.socket.rsplit(':', 1)
+        feed = SocketFeed(host, int(port), history.columns)
+    else:
+        feed = ReplayFeed.from_file(args.replay, rate=args.rate)
+    service = LiveSignalService(strategy, pairs, history.columns,
+                                publish=lambda targets: logging.debug(f"Targets at {targets['timestamp']}"))
+    service.warm_up(prices)
+    try:
+        await service.run(feed)
+    finally:
+        logging.info(f"Live service report: {json.dumps(service.report(), default=float)}")
+        if instrumentation.enabled:
+            instrumentation.log_summary()
+        for path in instrumentation.export(args.metrics_out, args.profile_out, extra={'mr_live': service.metrics}):
+            logging.info(f"Wrote {path}.")
+
+
+if __name__ == '__main__':
+    configure_logging()
+    args = _parse_args()
+    if args.metrics_out or args.profile_out:
+        instrumentation.enable(track_memory=instrumentation.track_memory, profile=bool(args.profile_out))
+    strategy = MeanReversionStrategy.from_yaml(args.config)
+    logging.info(f"Loaded strategy config: {strategy.config}")
+    if args.history and (args.replay or args.socket):
+        asyncio.run(_serve(args, strategy))
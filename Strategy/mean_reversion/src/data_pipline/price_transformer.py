@@ -0,0 +1,167 @@
+import logging
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+class PricePanel:
+    FIELDS = ('prices', 'log_prices', 'returns')
+
+    def __init__(self, data, index, columns, rows=None, handle=None, owner=False, borrowed=False):
+        """
+        Aligned prices, log prices and simple returns of a (dates x symbols) panel, held once in a
+        single (3, T, N) float64 block in shared memory or a memory-mapped file. Every accessor
+        returns read-only NumPy views (or DataFrames wrapping them), and process-pool workers
+        attach to the same block from spec(), so fanning out costs a name and a shape per worker
+        rather than a pickled copy of the panel per task.
+        Use from_frame() / open() / attach() rather than calling this directly.
+        data: (3, T, N) array over the whole block
+        index / columns: dates and symbols of the whole block
+        rows: slice of the block's rows this panel covers (see window())
+        handle: SharedMemory or np.memmap backing `data`, kept alive with the panel
+        owner: whether close() also unlinks the shared memory segment
+        borrowed: the storage belongs to another panel (a window()), so close() leaves it open
+        """
+        self._data = data
+        self._index = pd.Index(index)
+        self._columns = pd.Index(columns)
+        self._rows = rows if rows is not None else slice(0, data.shape[1])
+        self._handle = handle
+        self._owner = owner
+        self._borrowed = borrowed
+
+    @classmethod
+    def from_frame(cls, prices, path=None):
+        """
+        Copy a price DataFrame into a new panel, deriving log prices and returns in place.
+        prices: pd.DataFrame of aligned prices (rows = dates, columns = tickers)
+        path: memory-map the block to this file instead of a shared memory segment
+        Returns: PricePanel owning the storage (close it, or use it as a context manager)
+        """
+        shape = (len(PricePanel.FIELDS),) + prices.shape
+        if path is None:
+            handle = shared_memory.SharedMemory(create=True, size=max(int(np.prod(shape)) * 8, 1))
+            data = np.ndarray(shape, dtype=np.float64, buffer=handle.buf)
+        else:
+            handle = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=shape)
+            data = handle
+        level, log_level, returns = data
+        level[:] = prices.to_numpy(dtype=np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            np.log(level, out=log_level)
+            np.divide(level[1:], level[:-1], out=returns[1:])
+        returns[1:] -= 1
+        returns[:1] = np.nan
+        if path is not None:
+            handle.flush()
+        return cls(data, prices.index, prices.columns, handle=handle, owner=path is None)
+
+    @classmethod
+    def open(cls, path, index, columns):
+        """Read-only panel over a block written by from_frame(prices, path=...)."""
+        data = np.load(path, mmap_mode='r')
+        return cls(data, index, columns, handle=data)
+
+    @classmethod
+    def attach(cls, spec):
+        """Panel over the storage described by spec() of another process' panel (no copy)."""
+        kind, location, shape, index, columns, rows = spec
+        if kind == 'memmap':
+            return cls.open(location, index, columns).window(*rows)
+        handle = shared_memory.SharedMemory(name=location)
+        data = np.ndarray(shape, dtype=np.float64, buffer=handle.buf)
+        return cls(data, index, columns, rows=slice(*rows), handle=handle)
+
+    def spec(self):
+        """Picklable description of the storage, for PricePanel.attach() in pool initializers."""
+        if isinstance(self._handle, shared_memory.SharedMemory):
+            kind, location = 'shm', self._handle.name
+        else:
+            kind, location = 'memmap', self._handle.filename
+        return kind, location, self._data.shape, self._index, self._columns, (self._rows.start, self._rows.stop)
+
+    @property
+    def index(self):
+        return self._index[self._rows]
+
+    @property
+    def columns(self):
+        return self._columns
+
+    @property
+    def shape(self):
+        return self._rows.stop - self._rows.start, len(self._columns)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def window(self, start=None, stop=None):
+        """Panel over rows [start, stop) of this one (positional, like iloc), sharing its storage."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        offset = self._rows.start
+        return PricePanel(self._data, self._index, self._columns, rows=slice(offset + start, offset + max(start, stop)),
+                          handle=self._handle, borrowed=True)
+
+    def dates(self, start=None, end=None):
+        """Panel over the dates from start to end inclusive (labels, like .loc), sharing its storage."""
+        rows = self.index.slice_indexer(start, end)
+        return self.window(rows.start, rows.stop)
+
+    def values(self, field='prices', symbols=None):
+        """
+        Read-only (T, N) view of one field. A single symbol gives a (T,) view; a list of symbols is
+        a view when it names adjacent columns in order and a copy otherwise.
+        """
+        if field not in self.FIELDS:
+            raise ValueError(f"Unknown field '{field}'; expected one of {self.FIELDS}.")
+        view = self._data[self.FIELDS.index(field), self._rows]
+        if symbols is not None:
+            view = view[:, self._column_indexer(symbols)]
+        view = view.view()
+        view.flags.writeable = False
+        return view
+
+    def frame(self, field='prices', symbols=None):
+        """DataFrame wrapping values(field, symbols) without copying it."""
+        columns = self._columns if symbols is None else self._columns[self._column_indexer(symbols)]
+        values = self.values(field, symbols)
+        if values.ndim == 1:
+            return pd.Series(values, index=self.index, name=columns, copy=False)
+        return pd.DataFrame(values, index=self.index, columns=columns, copy=False)
+
+    def _column_indexer(self, symbols):
+        if isinstance(symbols, str):
+            return self._columns.get_loc(symbols)
+        positions = self._columns.get_indexer(symbols)
+        if (positions < 0).any():
+            raise KeyError(f"Unknown symbols: {list(np.asarray(symbols)[positions < 0])}")
+        if len(positions) and (np.diff(positions) == 1).all():
+            return slice(positions[0], positions[-1] + 1)
+        return positions
+
+    def close(self):
+        """Release this process' mapping; the owner of a shared memory panel also frees the segment."""
+        if self._handle is None:
+            return
+        self._data = None
+        if self._borrowed:
+            self._handle = None
+            return
+        if isinstance(self._handle, shared_memory.SharedMemory):
+            try:
+                self._handle.close()
+            except BufferError:
+                logging.warning("Price panel views are still referenced; the mapping is released with them.")
+            if self._owner:
+                self._handle.unlink()
+        self._handle = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        raise TypeError("PricePanel is not picklable; pass panel.spec() and PricePanel.attach() it in the worker.")
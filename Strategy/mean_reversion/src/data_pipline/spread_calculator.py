@@ -0,0 +1,242 @@
+import logging
+
+import numpy as np
+
+
+class RollingHedgeRatio:
+    def __init__(self, n_pairs, window=None, min_periods=None, recompute_every=10000):
+        """
+        Rolling (or expanding) OLS hedge ratio y = alpha + beta * x for many pairs at once,
+        updated in O(1) per bar from running sufficient statistics.
+        n_pairs: number of pairs tracked in parallel
+        window: rolling window length in bars (None = expanding window)
+        min_periods: observations required before a hedge ratio is emitted
+                     (default: window, or 2 for an expanding window)
+        recompute_every: re-sum the window from the ring buffer every this many updates to
+                         stop floating-point drift in the running sums (rolling mode only)
+        """
+        self.n_pairs = n_pairs
+        self.window = window
+        self.min_periods = min_periods if min_periods is not None else (window or 2)
+        self.recompute_every = recompute_every
+
+        self.count = np.zeros(n_pairs, dtype=np.int64)
+        self.sum_x = np.zeros(n_pairs)
+        self.sum_y = np.zeros(n_pairs)
+        self.sum_xx = np.zeros(n_pairs)
+        self.sum_xy = np.zeros(n_pairs)
+        self.n_updates = 0
+        if window is not None:
+            self.head = np.zeros(n_pairs, dtype=np.int64)
+            self.buf_x = np.zeros((window, n_pairs))
+            self.buf_y = np.zeros((window, n_pairs))
+
+    def update(self, y, x):
+        """
+        Add one bar per pair. NaN observations leave that pair's state untouched.
+        y, x: arrays of shape (n_pairs,) with the latest prices of each leg
+        Returns: (spread, beta, alpha) arrays; spread is the in-window residual of the bar
+        """
+        y = np.asarray(y, dtype=np.float64)
+        x = np.asarray(x, dtype=np.float64)
+        valid = np.isfinite(y) & np.isfinite(x)
+        yv = np.where(valid, y, 0.0)
+        xv = np.where(valid, x, 0.0)
+
+        if self.window is not None:
+            cols = np.arange(self.n_pairs)
+            full = valid & (self.count >= self.window)
+            old_x = np.where(full, self.buf_x[self.head, cols], 0.0)
+            old_y = np.where(full, self.buf_y[self.head, cols], 0.0)
+            self.buf_x[self.head[valid], cols[valid]] = xv[valid]
+            self.buf_y[self.head[valid], cols[valid]] = yv[valid]
+            self.head[valid] = (self.head[valid] + 1) % self.window
+            self.count += valid & ~full
+        else:
+            old_x = old_y = 0.0
+            self.count += valid
+
+        self.sum_x += xv - old_x
+        self.sum_y += yv - old_y
+        self.sum_xx += xv * xv - old_x * old_x
+        self.sum_xy += xv * yv - old_x * old_y
+
+        self.n_updates += 1
+        if self.window is not None and self.recompute_every and self.n_updates % self.recompute_every == 0:
+            self._recompute()
+
+        beta, alpha = self.hedge_ratio()
+        spread = np.where(valid, y - alpha - beta * x, np.nan)
+        return spread, beta, alpha
+
+    def hedge_ratio(self):
+        """Current (beta, alpha) per pair; NaN until min_periods observations are seen."""
+        n = self.count.astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var_x = n * self.sum_xx - self.sum_x * self.sum_x
+            beta = (n * self.sum_xy - self.sum_x * self.sum_y) / var_x
+            alpha = (self.sum_y - beta * self.sum_x) / n
+        ready = (self.count >= self.min_periods) & (var_x > 0)
+        return np.where(ready, beta, np.nan), np.where(ready, alpha, np.nan)
+
+    def _recompute(self):
+        """Rebuild the running sums exactly from the ring buffer."""
+        filled = np.arange(self.window)[:, None] < self.count[None, :]
+        bx = np.where(filled, self.buf_x, 0.0)
+        by = np.where(filled, self.buf_y, 0.0)
+        self.sum_x = bx.sum(axis=0)
+        self.sum_y = by.sum(axis=0)
+        self.sum_xx = (bx * bx).sum(axis=0)
+        self.sum_xy = (bx * by).sum(axis=0)
+
+    def fit(self, Y, X):
+        """
+        Replay a history through update().
+        Y, X: arrays of shape (T, n_pairs)
+        Returns: (spread, beta, alpha) arrays of shape (T, n_pairs)
+        """
+        return _replay(self, Y, X)
+
+    def get_state(self):
+        """Return the full estimator state as a dict of NumPy arrays."""
+        state = {
+            'window': np.array(-1 if self.window is None else self.window),
+            'min_periods': np.array(self.min_periods),
+            'recompute_every': np.array(self.recompute_every or 0),
+            'n_updates': np.array(self.n_updates),
+            'count': self.count,
+            'sum_x': self.sum_x,
+            'sum_y': self.sum_y,
+            'sum_xx': self.sum_xx,
+            'sum_xy': self.sum_xy,
+        }
+        if self.window is not None:
+            state.update(head=self.head, buf_x=self.buf_x, buf_y=self.buf_y)
+        return state
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild an estimator from get_state() output so it resumes exactly where it stopped."""
+        window = int(state['window'])
+        obj = cls(len(state['count']), window=None if window < 0 else window,
+                  min_periods=int(state['min_periods']),
+                  recompute_every=int(state['recompute_every']))
+        obj.n_updates = int(state['n_updates'])
+        for name in ('count', 'sum_x', 'sum_y', 'sum_xx', 'sum_xy', 'head', 'buf_x', 'buf_y'):
+            if name in state:
+                setattr(obj, name, np.array(state[name]))
+        return obj
+
+    def save(self, path):
+        _save_state(self.get_state(), path)
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_state(_load_state(path))
+
+
+class KalmanHedgeRatio:
+    def __init__(self, n_pairs, delta=1e-4, observation_var=1e-3, initial_var=1.0):
+        """
+        Kalman-filter hedge ratio: [beta, alpha] follows a random walk and y = beta * x + alpha
+        is observed with noise. All pairs are filtered together with (n_pairs, 2, 2) covariances.
+        delta: random-walk step size; the state noise covariance is delta / (1 - delta) * I
+        observation_var: measurement noise variance
+        initial_var: prior variance of beta and alpha
+        """
+        self.n_pairs = n_pairs
+        self.delta = delta
+        self.observation_var = observation_var
+        self.state_noise = delta / (1 - delta)
+        self.theta = np.zeros((n_pairs, 2))
+        self.cov = np.tile(np.eye(2) * initial_var, (n_pairs, 1, 1))
+
+    def update(self, y, x):
+        """
+        Filter one bar per pair. NaN observations only propagate the covariance.
+        y, x: arrays of shape (n_pairs,)
+        Returns: (spread, beta, alpha); spread is the one-step forecast error, i.e. the
+                 spread under the hedge ratio known before this bar
+        """
+        y = np.asarray(y, dtype=np.float64)
+        x = np.asarray(x, dtype=np.float64)
+        valid = np.isfinite(y) & np.isfinite(x)
+
+        self.cov[:, 0, 0] += self.state_noise
+        self.cov[:, 1, 1] += self.state_noise
+
+        xv = np.where(valid, x, 0.0)
+        h = np.stack([xv, np.ones(self.n_pairs)], axis=1)
+        spread = np.where(valid, y - (self.theta * h).sum(axis=1), np.nan)
+
+        ph = np.einsum('pab,pb->pa', self.cov, h)
+        s = (h * ph).sum(axis=1) + self.observation_var
+        gain = ph / s[:, None]
+        gain[~valid] = 0.0
+        self.theta += gain * np.nan_to_num(spread)[:, None]
+        self.cov -= gain[:, :, None] * ph[:, None, :]
+
+        return spread, self.theta[:, 0].copy(), self.theta[:, 1].copy()
+
+    def fit(self, Y, X):
+        """
+        Replay a history through update().
+        Y, X: arrays of shape (T, n_pairs)
+        Returns: (spread, beta, alpha) arrays of shape (T, n_pairs)
+        """
+        return _replay(self, Y, X)
+
+    def get_state(self):
+        """Return the full filter state as a dict of NumPy arrays."""
+        return {
+            'delta': np.array(self.delta),
+            'observation_var': np.array(self.observation_var),
+            'theta': self.theta,
+            'cov': self.cov,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        """Rebuild a filter from get_state() output so it resumes exactly where it stopped."""
+        theta = np.array(state['theta'])
+        obj = cls(theta.shape[0], delta=float(state['delta']),
+                  observation_var=float(state['observation_var']))
+        obj.theta = theta
+        obj.cov = np.array(state['cov'])
+        return obj
+
+    def save(self, path):
+        _save_state(self.get_state(), path)
+
+    @classmethod
+    def load(cls, path):
+        return cls.from_state(_load_state(path))
+
+
+def _replay(estimator, Y, X):
+    Y = np.asarray(Y, dtype=np.float64)
+    X = np.asarray(X, dtype=np.float64)
+    if Y.ndim == 1:
+        Y, X = Y[:, None], X[:, None]
+    if Y.shape != X.shape or Y.shape[1] != estimator.n_pairs:
+        raise ValueError("Y and X must both have shape (T, n_pairs).")
+    spread = np.empty_like(Y)
+    beta = np.empty_like(Y)
+    alpha = np.empty_like(Y)
+    for t in range(Y.shape[0]):
+        spread[t], beta[t], alpha[t] = estimator.update(Y[t], X[t])
+    return spread, beta, alpha
+
+
+def _save_state(state, path):
+    try:
+        with open(path, 'wb') as f:
+            np.savez(f, **state)
+    except Exception as e:
+        logging.error(f"Error saving spread state to {path}: {e}")
+        raise
+
+
+def _load_state(path):
+    with np.load(path) as data:
+        return {key: data[key] for key in data.files}
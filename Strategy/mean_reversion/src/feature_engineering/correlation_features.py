@@ -0,0 +1,184 @@
+import numpy as np
+
+
+class CorrelationFeatures:
+    @staticmethod
+    def pair_correlation(a, b):
+        """
+        Pearson correlation of matching columns of two (T, n_pairs) arrays, computed
+        column-wise in one pass.
+        Returns: array of shape (n_pairs,)
+        """
+        a = a - a.mean(axis=0)
+        b = b - b.mean(axis=0)
+        num = np.einsum('ij,ij->j', a, b)
+        den = np.sqrt(np.einsum('ij,ij->j', a, a) * np.einsum('ij,ij->j', b, b))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(den > 0, num / den, 0.0)
+
+    @staticmethod
+    def lag1_autocorrelation(x):
+        """Lag-1 autocorrelation of every column of a (T, n) array."""
+        return CorrelationFeatures.pair_correlation(x[1:], x[:-1])
+
+
+class RollingCorrelation:
+    def __init__(self, n_assets, window, lags=(0,), dtype=np.float64, block_size=512, recompute_every=5000):
+        """
+        Rolling N x N correlation (and lagged cross-correlation) matrices for a whole universe,
+        updated incrementally as the window slides.
+        Each lag L keeps running sums of x_t, x_{t-L}, their squares and the product matrix
+        sum(x_t x_{t-L}^T) over the last `window` bars; a bar costs one rank-2 update per lag.
+        Lagged correlation follows TimeSeriesAnalysis.cross_correlation: entry (i, j) at lag L
+        is corr(x_i[t], x_j[t - L]).
+        n_assets: number of series (e.g. return columns); inputs must not contain NaNs
+        window: number of bars in the rolling window
+        lags: non-negative lags to track
+        dtype: np.float64, or np.float32 to halve memory
+        block_size: rows per tile for matrix updates and rebuilds, bounding temporaries to
+                    block_size x n_assets
+        recompute_every: rebuild the sums from the ring buffer every this many updates to
+                         stop drift (0 disables)
+        """
+        self.n_assets = n_assets
+        self.window = window
+        self.lags = tuple(sorted(set(int(lag) for lag in lags)))
+        if self.lags[0] < 0:
+            raise ValueError("Lags must be non-negative.")
+        self.dtype = np.dtype(dtype)
+        self.block_size = block_size
+        self.recompute_every = recompute_every
+
+        self.capacity = window + self.lags[-1] + 1
+        self.buffer = np.zeros((self.capacity, n_assets), dtype=self.dtype)
+        self.head = 0
+        self.count = 0
+        self.n_updates = 0
+        n_lags = len(self.lags)
+        self.sum_lead = np.zeros((n_lags, n_assets), dtype=self.dtype)
+        self.sum_lag = np.zeros((n_lags, n_assets), dtype=self.dtype)
+        self.sq_lead = np.zeros((n_lags, n_assets), dtype=self.dtype)
+        self.sq_lag = np.zeros((n_lags, n_assets), dtype=self.dtype)
+        self.products = np.zeros((n_lags, n_assets, n_assets), dtype=self.dtype)
+
+    def _row(self, k):
+        """Bar k steps back from the most recent one."""
+        return self.buffer[(self.head - 1 - k) % self.capacity]
+
+    def update(self, x):
+        """Add one bar of observations (shape (n_assets,))."""
+        x = np.asarray(x, dtype=self.dtype)
+        if not np.isfinite(x).all():
+            raise ValueError("RollingCorrelation inputs must be finite.")
+        self.buffer[self.head] = x
+        self.head = (self.head + 1) % self.capacity
+        self.count += 1
+        self.n_updates += 1
+
+        for k, lag in enumerate(self.lags):
+            if self.count <= lag:
+                continue
+            lead_new, lag_new = x, self._row(lag)
+            if self.count > self.window + lag:
+                lead_old, lag_old = self._row(self.window), self._row(self.window + lag)
+            else:
+                lead_old = lag_old = np.zeros(self.n_assets, dtype=self.dtype)
+            self.sum_lead[k] += lead_new - lead_old
+            self.sum_lag[k] += lag_new - lag_old
+            self.sq_lead[k] += lead_new * lead_new - lead_old * lead_old
+            self.sq_lag[k] += lag_new * lag_new - lag_old * lag_old
+            left = np.stack([lead_new, -lead_old], axis=1)
+            right = np.stack([lag_new, lag_old], axis=0)
+            for i0 in range(0, self.n_assets, self.block_size):
+                i1 = min(i0 + self.block_size, self.n_assets)
+                self.products[k, i0:i1] += left[i0:i1] @ right
+
+        if self.recompute_every and self.n_updates % self.recompute_every == 0:
+            self.recompute()
+
+    def update_many(self, X):
+        """Add several bars (shape (T, n_assets)) in order."""
+        for row in np.asarray(X, dtype=self.dtype):
+            self.update(row)
+
+    @classmethod
+    def from_history(cls, X, window, **kwargs):
+        """Initialise from the last window (+ max lag) rows of X with tiled matrix products."""
+        X = np.asarray(X)
+        obj = cls(X.shape[1], window, **kwargs)
+        tail = X[-obj.capacity:].astype(obj.dtype)
+        obj.buffer[:len(tail)] = tail
+        obj.head = len(tail) % obj.capacity
+        obj.count = len(X)
+        obj.recompute()
+        return obj
+
+    def _window_rows(self, lag):
+        """(lead, lagged) arrays of the bars currently inside the window for `lag`."""
+        n = min(self.window, max(self.count - lag, 0))
+        order = (self.head - 1 - np.arange(n + lag)[::-1]) % self.capacity
+        ordered = self.buffer[order]
+        return ordered[lag:], ordered[:n]
+
+    def recompute(self):
+        """Rebuild all running sums exactly from the ring buffer."""
+        for k, lag in enumerate(self.lags):
+            lead, lagged = self._window_rows(lag)
+            self.sum_lead[k] = lead.sum(axis=0)
+            self.sum_lag[k] = lagged.sum(axis=0)
+            self.sq_lead[k] = (lead * lead).sum(axis=0)
+            self.sq_lag[k] = (lagged * lagged).sum(axis=0)
+            for i0 in range(0, self.n_assets, self.block_size):
+                i1 = min(i0 + self.block_size, self.n_assets)
+                self.products[k, i0:i1] = lead[:, i0:i1].T @ lagged
+
+    def ready(self, lag=0):
+        return self.count >= self.window + lag
+
+    def _moments(self, lag):
+        k = self.lags.index(lag)
+        n = min(self.window, max(self.count - lag, 0))
+        if n < 2:
+            raise ValueError("Not enough observations in the window.")
+        var_lead = np.maximum(self.sq_lead[k] - self.sum_lead[k] ** 2 / n, 0)
+        var_lag = np.maximum(self.sq_lag[k] - self.sum_lag[k] ** 2 / n, 0)
+        return k, n, np.sqrt(var_lead), np.sqrt(var_lag)
+
+    def matrix(self, lag=0, out=None):
+        """
+        Full correlation matrix at `lag`, assembled tile by tile.
+        out: optional preallocated (n_assets, n_assets) array to write into
+        """
+        k, n, sd_lead, sd_lag = self._moments(lag)
+        if out is None:
+            out = np.empty((self.n_assets, self.n_assets), dtype=self.dtype)
+        for i0 in range(0, self.n_assets, self.block_size):
+            i1 = min(i0 + self.block_size, self.n_assets)
+            tile = out[i0:i1]
+            np.subtract(self.products[k, i0:i1], np.outer(self.sum_lead[k, i0:i1], self.sum_lag[k]) / n, out=tile)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                tile /= np.outer(sd_lead[i0:i1], sd_lag)
+            tile[~np.isfinite(tile)] = 0.0
+        return out
+
+    def pairs(self, idx_a, idx_b, lag=0):
+        """Correlation of selected pairs only: corr(x_a[t], x_b[t - lag])."""
+        k, n, sd_lead, sd_lag = self._moments(lag)
+        cov = self.products[k, idx_a, idx_b] - self.sum_lead[k, idx_a] * self.sum_lag[k, idx_b] / n
+        den = sd_lead[idx_a] * sd_lag[idx_b]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(den > 0, cov / den, 0.0)
+
+    @staticmethod
+    def rolling(X, window, step=1, lags=(0,), **kwargs):
+        """
+        Slide over a (T, n_assets) history and yield (row, {lag: matrix}) every `step` bars
+        once the window is full.
+        """
+        X = np.asarray(X)
+        engine = RollingCorrelation(X.shape[1], window, lags=lags, **kwargs)
+        first = window + engine.lags[-1] - 1
+        for t, row in enumerate(X):
+            engine.update(row)
+            if t >= first and (t - first) % step == 0:
+                yield t, {lag: engine.matrix(lag) for lag in engine.lags}
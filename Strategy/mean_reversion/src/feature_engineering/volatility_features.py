@@ -0,0 +1,279 @@
+import os
+import hashlib
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Coarse (alpha, beta) starting grid for GARCH(1,1): persistence x ARCH share.
+_GARCH_PERSISTENCE = (0.80, 0.90, 0.95, 0.98, 0.99, 0.995)
+_GARCH_ALPHAS = (0.02, 0.05, 0.08, 0.12, 0.20)
+
+
+class VolatilityCache:
+    def __init__(self, root=None):
+        """
+        Cache of volatility results keyed by a hash of the input data and parameters.
+        root: directory for .npz files; None keeps results in memory only
+        """
+        self.root = root
+        self._memory = {}
+        if root is not None:
+            os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def key(name, arrays, **params):
+        digest = hashlib.sha1(name.encode())
+        for array in arrays:
+            array = np.ascontiguousarray(array)
+            digest.update(str((array.shape, array.dtype.str)).encode())
+            digest.update(array.tobytes())
+        digest.update(repr(sorted(params.items())).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        if key in self._memory:
+            return self._memory[key]
+        if self.root is not None:
+            path = os.path.join(self.root, f"{key}.npz")
+            if os.path.exists(path):
+                with np.load(path) as data:
+                    result = {name: data[name] for name in data.files}
+                self._memory[key] = result
+                return result
+        return None
+
+    def put(self, key, result):
+        self._memory[key] = result
+        if self.root is not None:
+            np.savez(os.path.join(self.root, f"{key}.npz"), **result)
+
+
+def _garch_nll(returns, variance, alpha, beta):
+    """
+    GARCH(1,1) negative log-likelihood with variance targeting for a batch of candidates.
+    returns: (T, N) demeaned returns; variance: (N,) sample variances
+    alpha, beta: (G, N) candidate parameters
+    Returns: (G, N) negative log-likelihoods
+    """
+    omega = variance * (1 - alpha - beta)
+    h = np.broadcast_to(variance, alpha.shape).copy()
+    nll = np.zeros(alpha.shape)
+    sq = returns * returns
+    for t in range(returns.shape[0]):
+        nll += np.log(h) + sq[t] / h
+        h = omega + alpha * sq[t] + beta * h
+    return 0.5 * nll
+
+
+def _fit_garch_block(returns, refine_steps=6):
+    """Grid search followed by a shrinking pattern search, vectorized over columns."""
+    n_obs, n_series = returns.shape
+    variance = returns.var(axis=0)
+    variance[variance <= 0] = np.finfo(float).tiny
+
+    grid = [(a, p - a) for p in _GARCH_PERSISTENCE for a in _GARCH_ALPHAS if p - a > 0]
+    alpha = np.array([g[0] for g in grid])[:, None].repeat(n_series, axis=1)
+    beta = np.array([g[1] for g in grid])[:, None].repeat(n_series, axis=1)
+    nll = _garch_nll(returns, variance, alpha, beta)
+    best = np.argmin(nll, axis=0)
+    cols = np.arange(n_series)
+    best_a, best_b, best_nll = alpha[best, cols], beta[best, cols], nll[best, cols]
+
+    moves = np.array([(da, db) for da in (-1, 0, 1) for db in (-1, 0, 1) if da or db], dtype=float)
+    step = np.full(n_series, 0.02)
+    for _ in range(refine_steps):
+        cand_a = np.clip(best_a + moves[:, :1] * step, 1e-6, 0.999)
+        cand_b = np.clip(best_b + moves[:, 1:] * step, 0.0, 0.999)
+        over = cand_a + cand_b >= 0.9999
+        cand_b = np.where(over, 0.9999 - cand_a, cand_b)
+        cand_nll = _garch_nll(returns, variance, cand_a, cand_b)
+        i = np.argmin(cand_nll, axis=0)
+        improved = cand_nll[i, cols] < best_nll
+        best_a = np.where(improved, cand_a[i, cols], best_a)
+        best_b = np.where(improved, cand_b[i, cols], best_b)
+        best_nll = np.where(improved, cand_nll[i, cols], best_nll)
+        step = np.where(improved, step, step / 2)
+
+    omega = variance * (1 - best_a - best_b)
+    h = np.empty_like(returns)
+    h[0] = variance
+    sq = returns * returns
+    for t in range(1, n_obs):
+        h[t] = omega + best_a * sq[t - 1] + best_b * h[t - 1]
+    return {'omega': omega, 'alpha': best_a, 'beta': best_b, 'nll': best_nll, 'variance': h}
+
+
+class VolatilityFeatures:
+    @staticmethod
+    def realized_volatility(returns, annualize=True, periods_per_year=252):
+        """
+        Sample standard deviation (ddof=1) of every column of a (T, n) return array.
+        Returns: array of shape (n,)
+        """
+        vol = returns.std(axis=0, ddof=1)
+        if annualize:
+            vol = vol * np.sqrt(periods_per_year)
+        return vol
+
+    @staticmethod
+    def volatility_ratio(vol_a, vol_b):
+        """Ratio of the smaller to the larger volatility, in [0, 1]."""
+        hi = np.maximum(vol_a, vol_b)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(hi > 0, np.minimum(vol_a, vol_b) / hi, 0.0)
+
+    @staticmethod
+    def _rolling_sums(x, window):
+        """Rolling sums of the finite values down the rows of a 2-D array, and how many there were."""
+        valid = np.isfinite(x)
+        csum = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+        np.cumsum(np.where(valid, x, 0.0), axis=0, out=csum[1:])
+        ccount = np.zeros(csum.shape, dtype=np.int64)
+        np.cumsum(valid, axis=0, out=ccount[1:])
+        lo = np.maximum(np.arange(1, x.shape[0] + 1) - window, 0)
+        return csum[1:] - csum[lo], ccount[1:] - ccount[lo]
+
+    @staticmethod
+    def _rolling_mean(x, window, min_periods=None):
+        """
+        Rolling mean down the rows of a 2-D array via cumulative sums. NaNs are skipped, so a
+        missing value only affects the windows containing it; windows with fewer than
+        `min_periods` (default: window) values are NaN, as in pandas rolling().mean().
+        """
+        sums, counts = VolatilityFeatures._rolling_sums(x, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(counts >= max(min_periods or window, 1), sums / counts, np.nan)
+
+    @staticmethod
+    def rolling_volatility(returns, window=20, annualize=True, periods_per_year=252, min_periods=None):
+        """
+        Rolling standard deviation (ddof=1) of every column, like TimeSeriesAnalysis.volatility
+        but for a whole (T, n) array at once. NaN returns are skipped as in pandas rolling().std().
+        min_periods: values required in a window (default: window)
+        """
+        returns = np.asarray(returns, dtype=np.float64)
+        with np.errstate(invalid='ignore'):
+            centered = returns - np.nanmean(returns, axis=0)
+        sums, counts = VolatilityFeatures._rolling_sums(centered, window)
+        sq_sums, _ = VolatilityFeatures._rolling_sums(centered * centered, window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            var = np.maximum(sq_sums - sums * sums / counts, 0) / (counts - 1)
+        var[counts < max(min_periods or window, 2)] = np.nan
+        vol = np.sqrt(var)
+        return vol * np.sqrt(periods_per_year) if annualize else vol
+
+    @staticmethod
+    def ewma_volatility(returns, lam=0.94, annualize=True, periods_per_year=252):
+        """
+        RiskMetrics EWMA volatility: var_t = lam * var_{t-1} + (1 - lam) * r_t^2, seeded with
+        r_0^2 (the adjust=False convention of TimeSeriesAnalysis.exponential_smoothing).
+        NaN returns are skipped: the variance carries over them and the recursion resumes with
+        the next value (pandas ewm(adjust=False, ignore_na=True)); leading NaNs stay NaN.
+        """
+        from scipy.signal import lfilter
+        sq = np.asarray(returns, dtype=np.float64) ** 2
+        squeeze = sq.ndim == 1
+        if squeeze:
+            sq = sq[:, None]
+        valid = np.isfinite(sq)
+        if valid.all():
+            var, _ = lfilter([1 - lam], [1, -lam], sq, axis=0, zi=lam * sq[:1])
+        else:
+            var = np.full(sq.shape, np.nan)
+            for j in range(sq.shape[1]):
+                rows = np.flatnonzero(valid[:, j])
+                if len(rows):
+                    var[rows, j], _ = lfilter([1 - lam], [1, -lam], sq[rows, j], zi=lam * sq[rows[:1], j])
+            last = np.where(valid, np.arange(len(sq))[:, None], -1)
+            np.maximum.accumulate(last, axis=0, out=last)
+            var = np.where(last >= 0, var[np.maximum(last, 0), np.arange(sq.shape[1])], np.nan)
+        vol = np.sqrt(var[:, 0] if squeeze else var)
+        return vol * np.sqrt(periods_per_year) if annualize else vol
+
+    @staticmethod
+    def parkinson_volatility(high, low, window=20, annualize=True, periods_per_year=252):
+        """Parkinson range volatility from (T, n) high/low arrays."""
+        hl = np.log(np.asarray(high, dtype=np.float64) / np.asarray(low, dtype=np.float64)) ** 2
+        var = VolatilityFeatures._rolling_mean(hl, window) / (4 * np.log(2))
+        vol = np.sqrt(var)
+        return vol * np.sqrt(periods_per_year) if annualize else vol
+
+    @staticmethod
+    def garman_klass_volatility(open_, high, low, close, window=20, annualize=True, periods_per_year=252):
+        """Garman-Klass OHLC volatility from (T, n) arrays."""
+        hl = np.log(np.asarray(high, dtype=np.float64) / np.asarray(low, dtype=np.float64)) ** 2
+        co = np.log(np.asarray(close, dtype=np.float64) / np.asarray(open_, dtype=np.float64)) ** 2
+        var = VolatilityFeatures._rolling_mean(0.5 * hl - (2 * np.log(2) - 1) * co, window)
+        vol = np.sqrt(np.maximum(var, 0))
+        return vol * np.sqrt(periods_per_year) if annualize else vol
+
+    @staticmethod
+    def garch11(returns, n_jobs=1, block_size=500, cache=None, annualize=True, periods_per_year=252):
+        """
+        Fit GARCH(1,1) with variance targeting to every column of a (T, n) return array.
+        Likelihoods are evaluated for all columns and candidate parameters at once: a coarse
+        grid, then a shrinking pattern search. Column blocks can be fitted on a process pool.
+        n_jobs: worker processes (1 = in-process)
+        block_size: columns per task
+        cache: optional VolatilityCache; results are keyed by a hash of the data and settings
+        Returns: dict with omega, alpha, beta, nll arrays of shape (n,) and the (T, n)
+                 conditional volatility under 'volatility'
+        """
+        returns = np.asarray(returns, dtype=np.float64)
+        if returns.ndim == 1:
+            returns = returns[:, None]
+        key = None
+        if cache is not None:
+            key = VolatilityCache.key('garch11', [returns], annualize=annualize, periods_per_year=periods_per_year)
+            hit = cache.get(key)
+            if hit is not None:
+                return hit
+
+        demeaned = returns - returns.mean(axis=0)
+        blocks = [demeaned[:, s:s + block_size] for s in range(0, returns.shape[1], block_size)]
+        if n_jobs == 1 or len(blocks) == 1:
+            fitted = [_fit_garch_block(b) for b in blocks]
+        else:
+            with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+                fitted = list(pool.map(_fit_garch_block, blocks))
+
+        result = {name: np.concatenate([f[name] for f in fitted], axis=-1)
+                  for name in ('omega', 'alpha', 'beta', 'nll')}
+        vol = np.sqrt(np.concatenate([f['variance'] for f in fitted], axis=1))
+        result['volatility'] = vol * np.sqrt(periods_per_year) if annualize else vol
+        if cache is not None:
+            cache.put(key, result)
+        return result
+
+    @staticmethod
+    def compute(close, open_=None, high=None, low=None, window=20, lam=0.94, garch=True,
+                n_jobs=1, cache=None, annualize=True, periods_per_year=252):
+        """
+        Compute every volatility feature available for the given (T, n) price arrays in one call.
+        Range estimators are included when high/low (and open for Garman-Klass) are given.
+        Returns: dict of feature name -> (T, n) array aligned with `close` (row 0 is NaN for
+                 return-based features)
+        """
+        try:
+            close = np.asarray(close, dtype=np.float64)
+            returns = np.diff(np.log(close), axis=0)
+            pad = np.full((1, close.shape[1]), np.nan)
+            kwargs = dict(annualize=annualize, periods_per_year=periods_per_year)
+
+            features = {
+                'realized': np.vstack([pad, VolatilityFeatures.rolling_volatility(returns, window, **kwargs)]),
+                'ewma': np.vstack([pad, VolatilityFeatures.ewma_volatility(returns, lam, **kwargs)]),
+            }
+            if high is not None and low is not None:
+                features['parkinson'] = VolatilityFeatures.parkinson_volatility(high, low, window, **kwargs)
+                if open_ is not None:
+                    features['garman_klass'] = VolatilityFeatures.garman_klass_volatility(
+                        open_, high, low, close, window, **kwargs)
+            if garch:
+                fit = VolatilityFeatures.garch11(returns, n_jobs=n_jobs, cache=cache, **kwargs)
+                features['garch'] = np.vstack([pad, fit['volatility']])
+            return features
+        except Exception as e:
+            logging.error(f"Volatility feature error: {e}")
+            return None
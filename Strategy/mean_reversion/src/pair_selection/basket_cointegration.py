@@ -0,0 +1,296 @@
+import os
+import logging
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Column of the Osterwald-Lenum / MacKinnon-Haug-Michelis tables (statsmodels.tsa.coint_tables) per level.
+CRIT_COLUMNS = {0.10: 0, 0.05: 1, 0.01: 2}
+
+_WORKER_VALUES = None
+_WORKER_SHM = None
+
+
+def _attach_shared_values(name, shape, dtype):
+    """Process pool initializer: map the shared (log) price matrix into the worker."""
+    global _WORKER_VALUES, _WORKER_SHM
+    _WORKER_SHM = shared_memory.SharedMemory(name=name)
+    _WORKER_VALUES = np.ndarray(shape, dtype=dtype, buffer=_WORKER_SHM.buf)
+
+
+def _johansen_task(args):
+    baskets, window, step, recompute_every, width = args
+    return BasketCointegration.rolling_johansen(_WORKER_VALUES, baskets, window, step, recompute_every, width)
+
+
+class BasketCointegration:
+    def __init__(self, min_correlation=0.7, min_legs=3, max_legs=5, max_cluster_size=8, significance=0.05,
+                 use_log_prices=True, n_jobs=None, block_size=500, recompute_every=500):
+        """
+        Johansen cointegration search over multi-leg baskets (det_order=0, k_ar_diff=1, as in
+        Econometrics.johansen_test defaults).
+        Candidate baskets are the 3-5 asset combinations inside clusters of return-correlated assets,
+        so the search grows with cluster sizes rather than with N choose k. Baskets are tested in
+        batches: the moment matrix of [dx_t, dx_{t-1}, x_{t-1}] is built once for all assets of a task,
+        every basket's Johansen statistics come from its sub-block with batched linear algebra, and
+        in rolling mode the moments are updated incrementally as the window moves.
+        min_correlation: return correlation that links two assets in the clustering
+        min_legs / max_legs: basket sizes to test
+        max_cluster_size: clusters larger than this are split further down the dendrogram
+        significance: 0.10, 0.05 or 0.01; level of the trace test used to pick the cointegration rank
+        use_log_prices: run the tests on log prices instead of raw prices
+        n_jobs: number of worker processes (None = os.cpu_count(), 1 = run in-process)
+        block_size: approximate number of baskets handed to a worker per task
+        recompute_every: rebuild the rolling moments from scratch every this many window steps
+        """
+        if significance not in CRIT_COLUMNS:
+            raise ValueError("significance must be one of 0.10, 0.05 or 0.01.")
+        self.min_correlation = min_correlation
+        self.min_legs = min_legs
+        self.max_legs = max_legs
+        self.max_cluster_size = max_cluster_size
+        self.significance = significance
+        self.use_log_prices = use_log_prices
+        self.n_jobs = n_jobs
+        self.block_size = block_size
+        self.recompute_every = recompute_every
+
+    def screen(self, prices, window=None, step=1, baskets=None):
+        """
+        Johansen test of every candidate basket, over the whole sample or on a rolling window.
+        prices: pd.DataFrame of aligned prices (rows = dates, columns = tickers), no NaNs
+        window: rolling window length in bars (None = one test over the full sample)
+        step: bars between consecutive rolling windows
+        baskets: optional list of column-index tuples to test instead of the correlation clusters
+        Returns: pd.DataFrame with one row per basket (and window end), with the legs, rank,
+                 trace / max-eigenvalue statistics for r=0 and their critical values, the largest
+                 eigenvalue and the leading cointegrating vector normalized to the first leg;
+                 sorted by trace statistic margin over its critical value (full-sample mode)
+        """
+        try:
+            if not isinstance(prices, pd.DataFrame):
+                raise ValueError("Input must be a pandas DataFrame.")
+            values = np.ascontiguousarray(prices.to_numpy(dtype=np.float64))
+            if np.isnan(values).any():
+                raise ValueError("Prices must not contain NaNs; clean them first.")
+            if self.use_log_prices:
+                values = np.log(values)
+            window = window or values.shape[0]
+            if window < 4 or window > values.shape[0]:
+                raise ValueError("window must be between 4 bars and the sample length.")
+
+            if baskets is None:
+                baskets = self.candidate_baskets(values)
+            logging.info(f"Testing {len(baskets)} candidate baskets.")
+            if not baskets:
+                return pd.DataFrame()
+            stats = self._run_tasks(values, baskets, window, step)
+            return self._frame(prices, baskets, stats, window, step)
+        except Exception as e:
+            logging.error(f"Basket cointegration screen error: {e}")
+            return None
+
+    def candidate_baskets(self, values):
+        """
+        Baskets of min_legs..max_legs columns drawn from clusters of correlated assets.
+        Clusters come from average-linkage clustering on 1 - return correlation: the largest
+        dendrogram nodes whose members are at most max_cluster_size and merged at a correlation
+        of at least min_correlation.
+        values: (T, N) array of (log) prices
+        Returns: list of sorted column-index tuples, grouped by cluster
+        """
+        from scipy.cluster.hierarchy import linkage, to_tree
+        from scipy.spatial.distance import squareform
+
+        diffs = np.diff(values, axis=0)
+        corr = np.corrcoef(diffs, rowvar=False)
+        corr = np.nan_to_num(corr, nan=0.0)
+        distance = np.clip(1.0 - corr, 0.0, 2.0)
+        np.fill_diagonal(distance, 0.0)
+        root = to_tree(linkage(squareform(distance, checks=False), method='average'))
+
+        max_distance = 1.0 - self.min_correlation
+        clusters = []
+        stack = [root]
+        while stack:
+            node = stack.pop()
+            if node.is_leaf():
+                continue
+            if node.count <= self.max_cluster_size and node.dist <= max_distance:
+                clusters.append(sorted(node.pre_order()))
+            else:
+                stack.extend([node.get_left(), node.get_right()])
+
+        baskets = []
+        for members in sorted(clusters):
+            for legs in range(self.min_legs, min(self.max_legs, len(members)) + 1):
+                baskets.extend(itertools.combinations(members, legs))
+        return baskets
+
+    def _run_tasks(self, values, baskets, window, step):
+        """Split the baskets (clusters kept together) into tasks and run them, in worker processes if n_jobs > 1."""
+        tasks = []
+        current = []
+        for basket in baskets:
+            if len(current) >= self.block_size and not set(basket) & set(current[-1]):
+                tasks.append(current)
+                current = []
+            current.append(basket)
+        tasks.append(current)
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+        # Every task pads its weights to the widest basket overall, so the results concatenate.
+        width = max(len(b) for b in baskets)
+
+        if n_jobs == 1 or len(tasks) == 1:
+            results = [self.rolling_johansen(values, task, window, step, self.recompute_every, width)
+                       for task in tasks]
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=values.nbytes)
+            try:
+                shared = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)
+                shared[:] = values
+                args = [(task, window, step, self.recompute_every, width) for task in tasks]
+                with ProcessPoolExecutor(max_workers=n_jobs, initializer=_attach_shared_values,
+                                         initargs=(shm.name, values.shape, values.dtype)) as pool:
+                    results = list(pool.map(_johansen_task, args))
+                del shared
+            finally:
+                shm.close()
+                shm.unlink()
+        return {key: np.concatenate([r[key] for r in results], axis=1) for key in results[0]}
+
+    @staticmethod
+    def rolling_johansen(values, baskets, window, step=1, recompute_every=500, width=None):
+        """
+        Johansen statistics of many baskets on every rolling window of `values`.
+        The (3u, 3u) moment matrix of w_t = [dx_t, dx_{t-1}, x_{t-1}] over the u assets the baskets
+        use is built once and then moved along with one rank-`step` update per window.
+        values: (T, N) array of (log) prices
+        baskets: list of column-index tuples (any mix of sizes)
+        width: number of weight columns (default: the largest basket in `baskets`)
+        Returns: dict of arrays with leading shape (n_windows, n_baskets): 'eigenvalue' (largest),
+                 'trace', 'max_eig' (r=0 statistics), 'rank' (from the trace test at every level, (.., 3)),
+                 and 'weights' (n_windows, n_baskets, width) with the leading vector, NaN-padded
+        """
+        assets = np.unique(np.concatenate([np.asarray(b) for b in baskets]))
+        position = {asset: i for i, asset in enumerate(assets)}
+        u = len(assets)
+        x = values[:, assets] - values[0, assets]
+        dx = np.diff(x, axis=0)
+        W = np.hstack([dx[1:], dx[:-1], x[1:-1]])
+        n = window - 2
+        ends = np.arange(n, len(W) + 1, step)
+
+        by_size = {}
+        for j, basket in enumerate(baskets):
+            by_size.setdefault(len(basket), []).append(j)
+        width = width or max(by_size)
+        n_windows, n_baskets = len(ends), len(baskets)
+        out = {
+            'eigenvalue': np.full((n_windows, n_baskets), np.nan),
+            'trace': np.full((n_windows, n_baskets), np.nan),
+            'max_eig': np.full((n_windows, n_baskets), np.nan),
+            'rank': np.zeros((n_windows, n_baskets, 3), dtype=np.int64),
+            'weights': np.full((n_windows, n_baskets, width), np.nan),
+        }
+        blocks = {}
+        for k, members in by_size.items():
+            local = np.array([[position[a] for a in baskets[j]] for j in members])
+            idx = np.hstack([local, local + u, local + 2 * u])
+            blocks[k] = (np.array(members), idx, BasketCointegration.critical_values(k))
+
+        moments = sums = None
+        for w, end in enumerate(ends):
+            start = end - n
+            if moments is None or step >= n or w % recompute_every == 0:
+                rows = W[start:end]
+                moments = rows.T @ rows
+                sums = rows.sum(axis=0)
+            else:
+                new = W[end - step:end]
+                old = W[start - step:start]
+                moments += new.T @ new - old.T @ old
+                sums += new.sum(axis=0) - old.sum(axis=0)
+            cov = moments / n - np.outer(sums, sums) / (n * n)
+
+            for k, (members, idx, crit) in blocks.items():
+                C = cov[idx[:, :, None], idx[:, None, :]]
+                eig, vectors = BasketCointegration.johansen_batch(C, k)
+                with np.errstate(divide='ignore'):
+                    log_1m = np.log1p(-eig)
+                trace = -n * np.cumsum(log_1m[:, ::-1], axis=1)[:, ::-1]
+                out['eigenvalue'][w, members] = eig[:, 0]
+                out['trace'][w, members] = trace[:, 0]
+                out['max_eig'][w, members] = -n * log_1m[:, 0]
+                # Rank = number of leading hypotheses r = 0, 1, ... rejected in sequence by the trace test.
+                rejected = trace[:, :, None] > crit['trace'][None, :, :]
+                out['rank'][w, members] = np.cumprod(rejected, axis=1).sum(axis=1)
+                lead = vectors[:, :, 0]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    out['weights'][w, members, :k] = lead / lead[:, :1]
+        return out
+
+    @staticmethod
+    def johansen_batch(C, k):
+        """
+        Johansen eigenvalue problem for a batch of baskets with k legs, from the covariance of
+        [dx_t, dx_{t-1}, x_{t-1}] (det_order=0, k_ar_diff=1). Partialling out dx_{t-1} gives the
+        residual moment matrices S00, S0k, Skk, and the eigenvalues solve
+        S_k0 S00^-1 S_0k v = lambda S_kk v, symmetrized through the Cholesky factor of S_kk.
+        C: (B, 3k, 3k) covariance matrices
+        Returns: (eigenvalues (B, k) descending, eigenvectors (B, k, k) with v' S_kk v = I,
+                 each column signed so its first element is positive)
+        """
+        d0, z, lv = slice(0, k), slice(k, 2 * k), slice(2 * k, 3 * k)
+        partial = np.linalg.solve(C[:, z, z], np.concatenate([C[:, z, d0], C[:, z, lv]], axis=2))
+        s00 = C[:, d0, d0] - C[:, d0, z] @ partial[:, :, :k]
+        skk = C[:, lv, lv] - C[:, lv, z] @ partial[:, :, k:]
+        sk0 = C[:, lv, d0] - C[:, lv, z] @ partial[:, :, :k]
+        sig = sk0 @ np.linalg.solve(s00, sk0.transpose(0, 2, 1))
+        l_inv = np.linalg.inv(np.linalg.cholesky(skk))
+        sym = l_inv @ sig @ l_inv.transpose(0, 2, 1)
+        eig, vectors = np.linalg.eigh(0.5 * (sym + sym.transpose(0, 2, 1)))
+        eig = np.clip(eig[:, ::-1], 0.0, 1.0 - 1e-15)
+        vectors = l_inv.transpose(0, 2, 1) @ vectors[:, :, ::-1]
+        vectors *= np.where(vectors[:, :1, :] < 0, -1.0, 1.0)
+        return eig, vectors
+
+    @staticmethod
+    def critical_values(k):
+        """Trace and max-eigenvalue critical values (90/95/99%) for r = 0..k-1, det_order=0: dict of (k, 3) arrays."""
+        from statsmodels.tsa.coint_tables import c_sja, c_sjt
+        return {'trace': np.array([c_sjt(k - r, 0) for r in range(k)]),
+                'max_eig': np.array([c_sja(k - r, 0) for r in range(k)])}
+
+    def _frame(self, prices, baskets, stats, window, step):
+        column = CRIT_COLUMNS[self.significance]
+        names = np.asarray(prices.columns)
+        n_windows, n_baskets = stats['trace'].shape
+        legs = np.array([len(b) for b in baskets])
+        crit = {k: self.critical_values(k) for k in np.unique(legs)}
+        trace_crit = np.array([crit[k]['trace'][0, column] for k in legs])
+        max_eig_crit = np.array([crit[k]['max_eig'][0, column] for k in legs])
+        rank = stats['rank'][:, :, column]
+
+        result = pd.DataFrame({
+            'assets': [tuple(names[list(b)]) for b in baskets] * n_windows,
+            'n_legs': np.tile(legs, n_windows),
+            'trace_stat': stats['trace'].ravel(),
+            'trace_crit': np.tile(trace_crit, n_windows),
+            'max_eig_stat': stats['max_eig'].ravel(),
+            'max_eig_crit': np.tile(max_eig_crit, n_windows),
+            'eigenvalue': stats['eigenvalue'].ravel(),
+            'rank': rank.ravel(),
+            'weights': list(stats['weights'].reshape(n_windows * n_baskets, -1)),
+        })
+        result['weights'] = [w[:k] for w, k in zip(result['weights'], result['n_legs'])]
+        result['cointegrated'] = result['rank'] > 0
+        if window >= len(prices):
+            result['trace_margin'] = result['trace_stat'] / result['trace_crit']
+            return result.sort_values('trace_margin', ascending=False, kind='stable').reset_index(drop=True)
+        ends = np.arange(window - 1, len(prices), step)
+        result.insert(0, 'end', np.repeat(prices.index[ends], n_baskets))
+        return result
@@ -0,0 +1,361 @@
+import os
+import json
+import time
+import pickle
+import hashlib
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.feature_engineering.correlation_features import CorrelationFeatures, RollingCorrelation
+from src.feature_engineering.volatility_features import VolatilityFeatures
+from src.pair_selection.traditional_cointegration import CointegrationScreener
+
+DEFAULT_MODELS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'models'))
+
+FEATURE_NAMES = [
+    'return_correlation',
+    'price_correlation',
+    'volatility_ratio',
+    'spread_volatility',
+    'spread_autocorrelation',
+    'spread_half_life',
+    'zero_crossing_rate',
+]
+
+
+def pair_features(window_prices, idx_a, idx_b, return_correlation=None):
+    """
+    Pair features over one lookback window for many pairs at once.
+    window_prices: (W, N) array of log prices
+    idx_a, idx_b: integer arrays of pair legs
+    return_correlation: optional precomputed return correlations of the pairs
+                        (e.g. sliced from a RollingCorrelation engine)
+    Returns: float32 array of shape (n_pairs, len(FEATURE_NAMES))
+    """
+    a = window_prices[:, idx_a]
+    b = window_prices[:, idx_b]
+    ret_a = np.diff(a, axis=0)
+    ret_b = np.diff(b, axis=0)
+    vol_a = VolatilityFeatures.realized_volatility(ret_a)
+    vol_b = VolatilityFeatures.realized_volatility(ret_b)
+
+    a_c = a - a.mean(axis=0)
+    b_c = b - b.mean(axis=0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        beta = np.einsum('ij,ij->j', a_c, b_c) / np.einsum('ij,ij->j', b_c, b_c)
+    spread = a_c - np.nan_to_num(beta) * b_c
+    ar1 = CorrelationFeatures.lag1_autocorrelation(spread)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        half_life = np.where((ar1 > 0) & (ar1 < 1), -np.log(2) / np.log(ar1), len(window_prices))
+    crossings = (np.signbit(spread[1:]) != np.signbit(spread[:-1])).mean(axis=0)
+
+    out = np.empty((len(idx_a), len(FEATURE_NAMES)), dtype=np.float32)
+    if return_correlation is None:
+        return_correlation = CorrelationFeatures.pair_correlation(ret_a, ret_b)
+    out[:, 0] = return_correlation
+    out[:, 1] = CorrelationFeatures.pair_correlation(a, b)
+    out[:, 2] = VolatilityFeatures.volatility_ratio(vol_a, vol_b)
+    out[:, 3] = VolatilityFeatures.realized_volatility(np.diff(spread, axis=0))
+    out[:, 4] = ar1
+    out[:, 5] = np.minimum(half_life, len(window_prices))
+    out[:, 6] = crossings
+    return out
+
+
+class PairFeatureStore:
+    def __init__(self, symbols, pairs, dates, features, window, fingerprint=None):
+        """
+        Array-backed pair feature matrix keyed by (pair, date).
+        symbols: list of tickers; pairs index into it
+        pairs: int32 array of shape (n_pairs, 2)
+        dates: pd.DatetimeIndex of feature dates
+        features: float32 array (or memmap) of shape (n_dates, n_pairs, n_features)
+        window: lookback window the features were built with
+        """
+        self.symbols = list(symbols)
+        self.pairs = np.asarray(pairs, dtype=np.int32)
+        self.dates = pd.DatetimeIndex(dates)
+        self.features = features
+        self.window = window
+        self.fingerprint = fingerprint
+        self.feature_names = list(FEATURE_NAMES)
+        self._pair_index = None
+
+    @classmethod
+    def build(cls, prices, pairs, dates, window=120, chunk_size=50000, path=None):
+        """
+        Compute features for every pair on every date, chunking over pairs to bound memory.
+        prices: pd.DataFrame of aligned prices (rows = dates, columns = tickers)
+        pairs: (n_pairs, 2) integer column positions, or a list of (ticker, ticker) tuples
+        dates: dates at which to evaluate the trailing window (must be in prices.index, unique and increasing)
+        path: if given, features are written straight into a memory-mapped store at this path
+        """
+        symbols = list(prices.columns)
+        pairs = cls._pair_positions(symbols, pairs)
+        dates = pd.DatetimeIndex(dates)
+        log_prices = np.log(prices.to_numpy(dtype=np.float64))
+        rows = prices.index.get_indexer(dates)
+        if (rows < 0).any():
+            raise ValueError("All feature dates must be present in the price index.")
+        # The rolling correlation engine slides forward from one feature date to the next.
+        if not prices.index.is_monotonic_increasing or (np.diff(rows) <= 0).any():
+            raise ValueError("Feature dates must be unique and increasing, on a sorted price index.")
+        if (rows < window - 1).any():
+            raise ValueError("Not enough history before the first feature date.")
+
+        shape = (len(dates), len(pairs), len(FEATURE_NAMES))
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            features = np.lib.format.open_memmap(os.path.join(path, 'features.npy'), mode='w+',
+                                                 dtype=np.float32, shape=shape)
+        else:
+            features = np.empty(shape, dtype=np.float32)
+
+        # Return correlations come from one rolling N x N engine slid across the feature
+        # dates (rebuilt when dates are far apart) instead of per-pair computations.
+        returns = np.diff(log_prices, axis=0)
+        corr_engine = None
+        for d, row in enumerate(rows):
+            window_prices = log_prices[row - window + 1:row + 1]
+            if corr_engine is None or row - rows[d - 1] >= window:
+                corr_engine = RollingCorrelation.from_history(returns[row - window + 1:row], window - 1)
+            else:
+                corr_engine.update_many(returns[rows[d - 1]:row])
+            for start in range(0, len(pairs), chunk_size):
+                block = pairs[start:start + chunk_size]
+                corr = corr_engine.pairs(block[:, 0], block[:, 1])
+                features[d, start:start + len(block)] = pair_features(window_prices, block[:, 0], block[:, 1], corr)
+
+        store = cls(symbols, pairs, dates, features, window, cls.fingerprint_of(prices, pairs, dates, window))
+        if path is not None:
+            features.flush()
+            store._write_metadata(path)
+        return store
+
+    @classmethod
+    def load_or_build(cls, path, prices, pairs, dates, window=120, **kwargs):
+        """Reuse the store at `path` if it was built from the same inputs, otherwise rebuild it."""
+        symbols = list(prices.columns)
+        fingerprint = cls.fingerprint_of(prices, cls._pair_positions(symbols, pairs), pd.DatetimeIndex(dates), window)
+        if os.path.exists(os.path.join(path, 'metadata.json')):
+            store = cls.load(path)
+            if store.fingerprint == fingerprint:
+                logging.info(f"Reusing pair feature store at {path}.")
+                return store
+        return cls.build(prices, pairs, dates, window=window, path=path, **kwargs)
+
+    @staticmethod
+    def fingerprint_of(prices, pairs, dates, window):
+        digest = hashlib.sha1()
+        digest.update(np.ascontiguousarray(prices.to_numpy(dtype=np.float64)).tobytes())
+        digest.update(json.dumps([str(c) for c in prices.columns]).encode())
+        digest.update(np.ascontiguousarray(pairs).tobytes())
+        digest.update(dates.values.astype('datetime64[ns]').tobytes())
+        digest.update(str((window, FEATURE_NAMES)).encode())
+        return digest.hexdigest()
+
+    @staticmethod
+    def _pair_positions(symbols, pairs):
+        if len(pairs) and isinstance(pairs[0][0], str):
+            lookup = {s: i for i, s in enumerate(symbols)}
+            return np.array([(lookup[a], lookup[b]) for a, b in pairs], dtype=np.int32)
+        return np.asarray(pairs, dtype=np.int32).reshape(-1, 2)
+
+    def date_slice(self, date):
+        """Feature matrix (n_pairs, n_features) for one date, as a view into the store."""
+        return self.features[self.dates.get_loc(pd.Timestamp(date))]
+
+    def pair_history(self, asset_a, asset_b):
+        """Feature history of one pair as a DataFrame indexed by date."""
+        if self._pair_index is None:
+            self._pair_index = {(int(a), int(b)): k for k, (a, b) in enumerate(self.pairs)}
+        lookup = {s: i for i, s in enumerate(self.symbols)}
+        k = self._pair_index[(lookup[asset_a], lookup[asset_b])]
+        return pd.DataFrame(np.asarray(self.features[:, k]), index=self.dates, columns=self.feature_names)
+
+    def save(self, path):
+        os.makedirs(path, exist_ok=True)
+        np.save(os.path.join(path, 'features.npy'), self.features)
+        self._write_metadata(path)
+
+    def _write_metadata(self, path):
+        np.save(os.path.join(path, 'pairs.npy'), self.pairs)
+        with open(os.path.join(path, 'metadata.json'), 'w') as f:
+            json.dump({
+                'symbols': [str(s) for s in self.symbols],
+                'dates': [str(d) for d in self.dates],
+                'window': self.window,
+                'feature_names': self.feature_names,
+                'fingerprint': self.fingerprint,
+            }, f)
+
+    @classmethod
+    def load(cls, path, mmap=True):
+        with open(os.path.join(path, 'metadata.json')) as f:
+            meta = json.load(f)
+        if meta['feature_names'] != FEATURE_NAMES:
+            raise ValueError("Stored features were built with a different feature set.")
+        features = np.load(os.path.join(path, 'features.npy'), mmap_mode='r' if mmap else None)
+        pairs = np.load(os.path.join(path, 'pairs.npy'))
+        return cls(meta['symbols'], pairs, pd.DatetimeIndex(meta['dates']), features, meta['window'],
+                   meta['fingerprint'])
+
+
+class PairSelectorModel:
+    def __init__(self, models_dir=DEFAULT_MODELS_DIR, name='pair_selector', version=None):
+        """
+        Lazily loaded, versioned model artifact stored as
+        <models_dir>/<name>/v<version>/{model.pkl, metadata.json}.
+        version: pin a version; None resolves to the latest one on first use
+        """
+        self.models_dir = models_dir
+        self.name = name
+        self.version = version
+        self._model = None
+        self._metadata = None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._load()
+        return self._model
+
+    @property
+    def metadata(self):
+        if self._metadata is None:
+            self._load()
+        return self._metadata
+
+    def available_versions(self):
+        root = os.path.join(self.models_dir, self.name)
+        if not os.path.isdir(root):
+            return []
+        return sorted(int(d[1:]) for d in os.listdir(root) if d.startswith('v') and d[1:].isdigit())
+
+    def _artifact_dir(self, version):
+        return os.path.join(self.models_dir, self.name, f"v{version:04d}")
+
+    def _load(self):
+        version = self.version
+        if version is None:
+            versions = self.available_versions()
+            if not versions:
+                raise FileNotFoundError(f"No '{self.name}' model artifacts in {self.models_dir}.")
+            version = versions[-1]
+        path = self._artifact_dir(version)
+        with open(os.path.join(path, 'metadata.json')) as f:
+            metadata = json.load(f)
+        with open(os.path.join(path, 'model.pkl'), 'rb') as f:
+            payload = f.read()
+        if hashlib.sha256(payload).hexdigest() != metadata['sha256']:
+            raise ValueError(f"Checksum mismatch for model artifact {path}.")
+        self._model = pickle.loads(payload)
+        self._metadata = metadata
+        self.version = version
+        logging.info(f"Loaded {self.name} model v{version}.")
+
+    def save(self, model, feature_names, extra=None):
+        """Persist `model` as the next version and make this handle point at it."""
+        versions = self.available_versions()
+        version = versions[-1] + 1 if versions else 1
+        path = self._artifact_dir(version)
+        os.makedirs(path)
+        payload = pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(os.path.join(path, 'model.pkl'), 'wb') as f:
+            f.write(payload)
+        metadata = {
+            'name': self.name,
+            'version': version,
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'feature_names': list(feature_names),
+            'sha256': hashlib.sha256(payload).hexdigest(),
+        }
+        metadata.update(extra or {})
+        with open(os.path.join(path, 'metadata.json'), 'w') as f:
+            json.dump(metadata, f, indent=2)
+        self.version, self._model, self._metadata = version, model, metadata
+        return version
+
+
+class PairClassifier:
+    def __init__(self, model=None, threshold=0.5, batch_size=2000000):
+        """
+        Batch pair classifier on top of a PairFeatureStore.
+        model: PairSelectorModel handle (default: latest artifact in DEFAULT_MODELS_DIR)
+        threshold: probability above which a pair is selected
+        batch_size: rows per predict_proba call; large enough that a day is usually one call
+        """
+        self.model = model if model is not None else PairSelectorModel()
+        self.threshold = threshold
+        self.batch_size = batch_size
+
+    def fit(self, store, labels, estimator=None):
+        """
+        Train on every (date, pair) in the store and save a new model version.
+        labels: array of shape (n_dates, n_pairs) with 1 for good pairs, 0 otherwise and -1 for
+                unknown; unknown labels and rows with non-finite features are left out
+        estimator: scikit-learn classifier (default: HistGradientBoostingClassifier)
+        Returns: the new model version
+        """
+        if estimator is None:
+            from sklearn.ensemble import HistGradientBoostingClassifier
+            estimator = HistGradientBoostingClassifier(max_iter=200, learning_rate=0.1)
+        X = np.asarray(store.features).reshape(-1, len(store.feature_names))
+        y = np.asarray(labels).reshape(-1)
+        mask = np.isfinite(X).all(axis=1) & (y >= 0)
+        estimator.fit(X[mask], y[mask])
+        return self.model.save(estimator, store.feature_names,
+                               extra={'window': store.window, 'n_samples': int(mask.sum())})
+
+    def predict_proba(self, features):
+        """Probability of the positive class for an (n, n_features) matrix, in large batches."""
+        expected = self.model.metadata['feature_names']
+        if features.shape[1] != len(expected):
+            raise ValueError(f"Model expects {len(expected)} features, got {features.shape[1]}.")
+        out = np.empty(len(features), dtype=np.float32)
+        estimator = self.model.model
+        for start in range(0, len(features), self.batch_size):
+            block = np.nan_to_num(np.asarray(features[start:start + self.batch_size]))
+            out[start:start + len(block)] = estimator.predict_proba(block)[:, 1]
+        return out
+
+    def score(self, store, date):
+        """
+        Score every candidate pair in the store on `date`.
+        Returns: pd.DataFrame of asset1, asset2, probability, selected sorted by probability
+        """
+        try:
+            proba = self.predict_proba(store.date_slice(date))
+            symbols = np.asarray(store.symbols, dtype=object)
+            result = pd.DataFrame({
+                'asset1': symbols[store.pairs[:, 0]],
+                'asset2': symbols[store.pairs[:, 1]],
+                'probability': proba,
+            })
+            result['selected'] = result['probability'] >= self.threshold
+            return result.sort_values('probability', ascending=False, kind='stable').reset_index(drop=True)
+        except Exception as e:
+            logging.error(f"Pair scoring error: {e}")
+            return None
+
+    @staticmethod
+    def make_labels(prices, store, horizon=120, significance=0.05):
+        """
+        Label each (date, pair) by whether the pair is Engle-Granger cointegrated over the
+        following `horizon` bars. Dates without a full forward window get label -1 (unknown).
+        Returns: int8 array of shape (n_dates, n_pairs)
+        """
+        log_prices = np.log(prices.to_numpy(dtype=np.float64))
+        rows = prices.index.get_indexer(store.dates)
+        labels = np.full((len(store.dates), len(store.pairs)), -1, dtype=np.int8)
+        idx_y, idx_x = store.pairs[:, 0], store.pairs[:, 1]
+        for d, row in enumerate(rows):
+            forward = log_prices[row + 1:row + 1 + horizon]
+            if len(forward) < horizon:
+                continue
+            beta, alpha = CointegrationScreener.hedge_ratios(forward, idx_y, idx_x)
+            stats = CointegrationScreener.engle_granger_block(forward, idx_y, idx_x, alpha, beta)
+            labels[d] = CointegrationScreener.mackinnon_pvalue(stats) < significance
+        return labels
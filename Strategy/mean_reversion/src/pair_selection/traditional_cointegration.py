@@ -0,0 +1,238 @@
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from src.data_pipline.price_transformer import PricePanel
+
+# MacKinnon (1994, 2010) response surface for the Engle-Granger test with a constant
+# in the cointegrating regression and two I(1) series (N=2, regression='c').
+EG_TAU_MAX = 0.92
+EG_TAU_MIN = -18.86
+EG_TAU_STAR = -2.62
+EG_TAU_SMALLP = np.array([2.92, 1.5012, 0.039796])
+EG_TAU_LARGEP = np.array([2.1945, 0.64695, -0.29198, -0.042377])
+EG_CRIT_2010 = np.array([
+    [-3.89644, -10.9519, -33.527, 0.0],
+    [-3.33613, -6.1101, -6.823, 0.0],
+    [-3.04445, -4.2412, -2.72, 0.0],
+])
+
+_WORKER_PRICES = None
+_WORKER_SHM = None
+_WORKER_PANEL = None
+
+
+def _attach_shared_prices(name, shape, dtype):
+    """Process pool initializer: map the shared price matrix into the worker."""
+    global _WORKER_PRICES, _WORKER_SHM
+    _WORKER_SHM = shared_memory.SharedMemory(name=name)
+    _WORKER_PRICES = np.ndarray(shape, dtype=dtype, buffer=_WORKER_SHM.buf)
+
+
+def _attach_panel_prices(spec, field):
+    """Process pool initializer: attach to the caller's PricePanel instead of a private copy."""
+    global _WORKER_PRICES, _WORKER_PANEL
+    _WORKER_PANEL = PricePanel.attach(spec)
+    _WORKER_PRICES = _WORKER_PANEL.values(field)
+
+
+def _engle_granger_task(args):
+    idx_y, idx_x, alpha, beta, lags = args
+    return CointegrationScreener.engle_granger_block(_WORKER_PRICES, idx_y, idx_x, alpha, beta, lags)
+
+
+class CointegrationScreener:
+    def __init__(self, min_correlation=0.7, adf_lags=1, significance=0.05, use_log_prices=True,
+                 n_jobs=None, block_size=2000):
+        """
+        All-pairs Engle-Granger cointegration screener.
+        min_correlation: return-correlation threshold a pair must pass before it is tested
+        adf_lags: number of lagged differences in the residual ADF regression
+        significance: p-value below which a pair is flagged as cointegrated
+        use_log_prices: run the tests on log prices instead of raw prices
+        n_jobs: number of worker processes (None = os.cpu_count(), 1 = run in-process)
+        block_size: number of pairs handed to a worker per task
+        """
+        self.min_correlation = min_correlation
+        self.adf_lags = adf_lags
+        self.significance = significance
+        self.use_log_prices = use_log_prices
+        self.n_jobs = n_jobs
+        self.block_size = block_size
+
+    def screen(self, prices):
+        """
+        Test every pair of columns in `prices` that passes the correlation pre-filter.
+        prices: pd.DataFrame of aligned prices (rows = dates, columns = tickers), no NaNs, or a
+            PricePanel, whose (log) prices are read in place and shared with the workers
+        Returns: pd.DataFrame with one row per tested pair, sorted by p-value
+        """
+        try:
+            source = None
+            if isinstance(prices, PricePanel):
+                field = 'log_prices' if self.use_log_prices else 'prices'
+                values = prices.values(field)
+                source = (prices.spec(), field)
+            elif isinstance(prices, pd.DataFrame):
+                values = np.ascontiguousarray(prices.to_numpy(dtype=np.float64))
+                if self.use_log_prices:
+                    values = np.log(values)
+            else:
+                raise ValueError("Input must be a pandas DataFrame or a PricePanel.")
+            if np.isnan(values).any():
+                raise ValueError("Prices must not contain NaNs; clean them first.")
+
+            idx_y, idx_x, corr = self.correlation_prefilter(values, self.min_correlation)
+            logging.info(f"Correlation pre-filter kept {len(idx_y)} of "
+                         f"{values.shape[1] * (values.shape[1] - 1) // 2} pairs.")
+            beta, alpha = self.hedge_ratios(values, idx_y, idx_x)
+            stats = self._run_blocks(values, idx_y, idx_x, alpha, beta, source)
+
+            crit = self.critical_values(values.shape[0] - 1)
+            columns = prices.columns
+            result = pd.DataFrame({
+                'asset1': columns[idx_y],
+                'asset2': columns[idx_x],
+                'correlation': corr,
+                'hedge_ratio': beta,
+                'intercept': alpha,
+                'adf_statistic': stats,
+                'p_value': self.mackinnon_pvalue(stats),
+                'crit_1%': crit[0],
+                'crit_5%': crit[1],
+                'crit_10%': crit[2],
+            })
+            result['cointegrated'] = result['p_value'] < self.significance
+            return result.sort_values('p_value', kind='stable').reset_index(drop=True)
+        except Exception as e:
+            logging.error(f"Cointegration screen error: {e}")
+            return None
+
+    def _run_blocks(self, values, idx_y, idx_x, alpha, beta, source=None):
+        n_pairs = len(idx_y)
+        stats = np.empty(n_pairs)
+        if n_pairs == 0:
+            return stats
+        bounds = [(s, min(s + self.block_size, n_pairs)) for s in range(0, n_pairs, self.block_size)]
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+
+        if n_jobs == 1 or len(bounds) == 1:
+            for s, e in bounds:
+                stats[s:e] = self.engle_granger_block(values, idx_y[s:e], idx_x[s:e],
+                                                      alpha[s:e], beta[s:e], self.adf_lags)
+            return stats
+
+        # Workers read the prices from shared memory: the caller's PricePanel when there is one
+        # (source = (spec, field)), otherwise a segment holding a copy made for this screen.
+        shm = None
+        if source is None:
+            shm = shared_memory.SharedMemory(create=True, size=values.nbytes)
+            shared = np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)
+            shared[:] = values
+            del shared
+            initializer, initargs = _attach_shared_prices, (shm.name, values.shape, values.dtype)
+        else:
+            initializer, initargs = _attach_panel_prices, source
+        try:
+            tasks = [(idx_y[s:e], idx_x[s:e], alpha[s:e], beta[s:e], self.adf_lags) for s, e in bounds]
+            with ProcessPoolExecutor(max_workers=n_jobs, initializer=initializer, initargs=initargs) as pool:
+                for (s, e), block in zip(bounds, pool.map(_engle_granger_task, tasks)):
+                    stats[s:e] = block
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        return stats
+
+    @staticmethod
+    def correlation_prefilter(values, min_correlation):
+        """
+        Cheap pre-filter on the correlation of first differences (returns for log prices).
+        values: (T, N) array
+        Returns: (idx_y, idx_x, correlation) for pairs i < j with correlation >= min_correlation
+        """
+        diffs = np.diff(values, axis=0)
+        diffs -= diffs.mean(axis=0)
+        norms = np.sqrt(np.einsum('ij,ij->j', diffs, diffs))
+        norms[norms == 0] = np.inf
+        diffs /= norms
+        corr = diffs.T @ diffs
+        idx_y, idx_x = np.triu_indices(corr.shape[0], k=1)
+        pair_corr = corr[idx_y, idx_x]
+        keep = pair_corr >= min_correlation
+        return idx_y[keep], idx_x[keep], pair_corr[keep]
+
+    @staticmethod
+    def hedge_ratios(values, idx_y, idx_x):
+        """
+        OLS hedge ratios y = alpha + beta * x for many pairs at once, from a single
+        centered Gram matrix instead of one regression per pair.
+        Returns: (beta, alpha) arrays aligned with idx_y / idx_x
+        """
+        means = values.mean(axis=0)
+        centered = values - means
+        gram = centered.T @ centered
+        with np.errstate(divide='ignore', invalid='ignore'):
+            beta = gram[idx_y, idx_x] / gram[idx_x, idx_x]
+        alpha = means[idx_y] - beta * means[idx_x]
+        return beta, alpha
+
+    @staticmethod
+    def engle_granger_block(values, idx_y, idx_x, alpha, beta, lags=1):
+        """
+        ADF t-statistics (no constant, `lags` lagged differences) on the cointegrating
+        residuals of a block of pairs, matching statsmodels coint(..., autolag=None).
+        The normal equations are assembled column by column so the (T, pairs, k) design
+        tensor is never materialized.
+        """
+        resid = values[:, idx_y] - alpha - beta * values[:, idx_x]
+        dresid = np.diff(resid, axis=0)
+        nobs = dresid.shape[0] - lags
+        if nobs <= lags + 1:
+            raise ValueError("Not enough observations for the requested number of ADF lags.")
+        target = dresid[lags:]
+        regressors = [resid[lags:-1]] + [dresid[lags - k:-k] for k in range(1, lags + 1)]
+        k = len(regressors)
+        n_pairs = resid.shape[1]
+
+        xtx = np.empty((n_pairs, k, k))
+        xty = np.empty((n_pairs, k))
+        for a in range(k):
+            xty[:, a] = np.einsum('ij,ij->j', regressors[a], target)
+            for b in range(a, k):
+                xtx[:, a, b] = xtx[:, b, a] = np.einsum('ij,ij->j', regressors[a], regressors[b])
+        yty = np.einsum('ij,ij->j', target, target)
+
+        stats = np.full(n_pairs, -np.inf)
+        valid = np.abs(np.linalg.det(xtx)) > 0
+        if valid.any():
+            inv = np.linalg.inv(xtx[valid])
+            coef = np.einsum('pab,pb->pa', inv, xty[valid])
+            ssr = yty[valid] - np.einsum('pa,pa->p', coef, xty[valid])
+            sigma2 = np.maximum(ssr, 0) / (nobs - k)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                stats[valid] = coef[:, 0] / np.sqrt(sigma2 * inv[:, 0, 0])
+        stats[np.isnan(stats)] = -np.inf
+        return stats
+
+    @staticmethod
+    def mackinnon_pvalue(stats):
+        """Vectorized MacKinnon approximate p-values for Engle-Granger statistics."""
+        from scipy.special import ndtr
+        stats = np.asarray(stats, dtype=np.float64)
+        with np.errstate(over='ignore', invalid='ignore'):
+            small = np.polyval(EG_TAU_SMALLP[::-1], stats)
+            large = np.polyval(EG_TAU_LARGEP[::-1], stats)
+        pvalues = ndtr(np.where(stats <= EG_TAU_STAR, small, large))
+        pvalues = np.where(stats > EG_TAU_MAX, 1.0, pvalues)
+        pvalues = np.where(stats < EG_TAU_MIN, 0.0, pvalues)
+        return pvalues
+
+    @staticmethod
+    def critical_values(nobs):
+        """Engle-Granger critical values at the 1%, 5% and 10% levels for a sample size."""
+        return np.polyval(EG_CRIT_2010[:, ::-1].T, 1.0 / nobs)
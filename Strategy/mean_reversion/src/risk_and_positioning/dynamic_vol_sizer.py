@@ -0,0 +1,93 @@
+import logging
+
+import numpy as np
+
+from src.risk_management.capital_allocator import CapitalAllocator
+
+
+class DynamicVolSizer:
+    def __init__(self, target_vol=0.10, base_leverage=1.0, max_leverage=3.0, max_weight=None,
+                 periods_per_year=252, tol=1e-4, max_iter=100):
+        """
+        Portfolio-level sizing for a book of spreads.
+        Spreads get equal-risk-contribution weights under their full covariance matrix, the book
+        is levered towards `target_vol` with CapitalAllocator.dynamic_leverage, and per-spread
+        caps are applied with CapitalAllocator.capital_allocation_limit, all as array operations.
+        The solver is warm-started from the previous rebalance.
+        target_vol: annualized portfolio volatility target
+        base_leverage / max_leverage: passed to CapitalAllocator.dynamic_leverage
+        max_weight: optional cap on each spread's gross allocation, as a fraction of capital
+        periods_per_year: annualization factor for the (per-period) covariance matrix
+        tol / max_iter: ERC solver settings
+        """
+        self.target_vol = target_vol
+        self.base_leverage = base_leverage
+        self.max_leverage = max_leverage
+        self.max_weight = max_weight
+        self.periods_per_year = periods_per_year
+        self.tol = tol
+        self.max_iter = max_iter
+        self._warm = None
+
+    def size(self, cov, capital, signals=None, budgets=None):
+        """
+        Target notional per spread.
+        cov: (n, n) per-period covariance of spread returns
+        capital: total capital
+        signals: optional (n,) array of -1/0/+1 positions; only non-zero spreads are sized and
+                 the result carries their sign
+        budgets: optional (n,) risk budgets (default: equal)
+        Returns: dict with 'allocation' (signed notional per spread), 'weights', 'leverage',
+                 'portfolio_vol' and solver 'iterations'
+        """
+        try:
+            cov = np.asarray(cov, dtype=np.float64)
+            n = cov.shape[0]
+            if self._warm is None or len(self._warm) != n:
+                self._warm = np.full(n, np.nan)
+            active = np.ones(n, dtype=bool) if signals is None else np.asarray(signals) != 0
+            allocation = np.zeros(n)
+            weights = np.zeros(n)
+            if not active.any():
+                return {'allocation': allocation, 'weights': weights, 'leverage': 0.0,
+                        'portfolio_vol': 0.0, 'iterations': 0}
+
+            sub_cov = cov[np.ix_(active, active)]
+            warm = self._warm[active]
+            w0 = warm if np.all(np.isfinite(warm)) else None
+            sub_budgets = None if budgets is None else np.asarray(budgets)[active]
+            w, info = CapitalAllocator.equal_risk_contribution(
+                sub_cov, budgets=sub_budgets, w0=w0, tol=self.tol, max_iter=self.max_iter, return_info=True)
+            self._warm[active] = w
+
+            portfolio_vol = float(np.sqrt(w @ sub_cov @ w * self.periods_per_year))
+            leverage = float(CapitalAllocator.dynamic_leverage(
+                self.target_vol, portfolio_vol, self.base_leverage, self.max_leverage))
+            gross = w * leverage * capital
+            if self.max_weight is not None:
+                gross = CapitalAllocator.capital_allocation_limit(gross, self.max_weight * capital)
+
+            weights[active] = w
+            allocation[active] = gross
+            if signals is not None:
+                allocation *= np.sign(signals)
+            return {'allocation': allocation, 'weights': weights, 'leverage': leverage,
+                    'portfolio_vol': portfolio_vol, 'iterations': info['iterations']}
+        except Exception as e:
+            logging.error(f"Dynamic vol sizing error: {e}")
+            return None
+
+    @staticmethod
+    def ewma_covariance(returns, lam=0.97, shrinkage=0.0):
+        """
+        Exponentially weighted covariance of a (T, n) spread-return array, computed as one
+        weighted matrix product, with optional shrinkage towards the diagonal.
+        """
+        returns = np.asarray(returns, dtype=np.float64)
+        weights = lam ** np.arange(len(returns) - 1, -1, -1)
+        weights /= weights.sum()
+        centered = returns - weights @ returns
+        cov = (centered * weights[:, None]).T @ centered
+        if shrinkage:
+            cov = (1 - shrinkage) * cov + shrinkage * np.diag(np.diag(cov))
+        return cov
@@ -0,0 +1,112 @@
+import numpy as np
+
+from src.feature_engineering.volatility_features import VolatilityFeatures
+
+
+class AdaptiveThresholds:
+    def __init__(self, n_pairs, base_entry=2.0, base_exit=0.5, short_span=20, long_span=250,
+                 sensitivity=1.0, min_entry=1.0, max_entry=4.0, min_exit=0.0, max_exit=2.0,
+                 warmup=None):
+        """
+        Entry/exit z-score thresholds that widen when a spread's short-term volatility runs
+        above its long-term level and tighten when it calms down.
+        Volatility is tracked with two EWMA variances of bar-to-bar spread changes, kept in
+        preallocated arrays so an update costs O(n_pairs) regardless of history length.
+        n_pairs: number of spreads tracked in parallel
+        base_entry / base_exit: thresholds used when short- and long-term volatility agree
+        short_span / long_span: EWMA spans (in bars) of the two volatility estimates
+        sensitivity: exponent applied to the volatility ratio
+        min_entry / max_entry / min_exit / max_exit: clipping bounds of the thresholds
+        warmup: bars of changes required before thresholds adapt (default: short_span)
+        """
+        self.n_pairs = n_pairs
+        self.base_entry = base_entry
+        self.base_exit = base_exit
+        self.short_alpha = 2.0 / (short_span + 1)
+        self.long_alpha = 2.0 / (long_span + 1)
+        self.sensitivity = sensitivity
+        self.min_entry = min_entry
+        self.max_entry = max_entry
+        self.min_exit = min_exit
+        self.max_exit = max_exit
+        self.warmup = warmup if warmup is not None else short_span
+
+        self.last = np.full(n_pairs, np.nan)
+        self.count = np.zeros(n_pairs, dtype=np.int64)
+        self.var_short = np.zeros(n_pairs)
+        self.var_long = np.zeros(n_pairs)
+        self.entry = np.full(n_pairs, float(base_entry))
+        self.exit = np.full(n_pairs, float(base_exit))
+
+    def update(self, spread):
+        """
+        Feed the latest spread value per pair (NaN = no update for that pair).
+        Returns: (entry, exit) threshold arrays of shape (n_pairs,)
+        """
+        spread = np.asarray(spread, dtype=np.float64)
+        change = spread - self.last
+        valid = np.isfinite(change)
+        self.last = np.where(np.isfinite(spread), spread, self.last)
+
+        sq = np.where(valid, change * change, 0.0)
+        first = valid & (self.count == 0)
+        self.var_short = np.where(first, sq, np.where(
+            valid, self.var_short + self.short_alpha * (sq - self.var_short), self.var_short))
+        self.var_long = np.where(first, sq, np.where(
+            valid, self.var_long + self.long_alpha * (sq - self.var_long), self.var_long))
+        self.count += valid
+        return self._thresholds()
+
+    def warm_up(self, spreads):
+        """
+        Bring the state up to date with a (T, n_pairs) spread history in one vectorized pass
+        (VolatilityFeatures.ewma_volatility on the spread changes) instead of T update() calls;
+        the resulting state is the same as feeding the rows to update() one by one.
+        Returns: (entry, exit) threshold arrays after the last row
+        """
+        spreads = np.asarray(spreads, dtype=np.float64)
+        if len(spreads) == 0:
+            return self.entry, self.exit
+        # Like update(), a change is measured from the last finite spread seen, across NaN bars.
+        history = np.vstack([self.last, spreads])
+        seen = np.where(np.isfinite(history), np.arange(len(history))[:, None], -1)
+        np.maximum.accumulate(seen, axis=0, out=seen)
+        carried = np.where(seen >= 0, history[np.maximum(seen, 0), np.arange(self.n_pairs)], np.nan)
+        change = spreads - carried[:-1]
+        valid = np.isfinite(change)
+        n_valid = valid.sum(axis=0)
+
+        # Continue from the current variances by prepending their square roots as the seed value.
+        started = self.count > 0
+        for name, alpha in (('var_short', self.short_alpha), ('var_long', self.long_alpha)):
+            seed = np.where(started, np.sqrt(getattr(self, name)), np.nan)
+            vol = VolatilityFeatures.ewma_volatility(np.vstack([seed, change]), lam=1 - alpha, annualize=False)
+            setattr(self, name, np.where(started | (n_valid > 0), vol[-1] ** 2, getattr(self, name)))
+        self.count = self.count + n_valid
+        self.last = carried[-1]
+        return self._thresholds()
+
+    def _thresholds(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factor = (self.var_short / self.var_long) ** (0.5 * self.sensitivity)
+        factor = np.where((self.count >= self.warmup) & np.isfinite(factor), factor, 1.0)
+        self.entry = np.clip(self.base_entry * factor, self.min_entry, self.max_entry)
+        self.exit = np.clip(self.base_exit * factor, self.min_exit, self.max_exit)
+        self.exit = np.minimum(self.exit, self.entry)
+        return self.entry, self.exit
+
+    def get_state(self):
+        """Return the mutable threshold state as a dict of NumPy arrays."""
+        return {
+            'last': self.last,
+            'count': self.count,
+            'var_short': self.var_short,
+            'var_long': self.var_long,
+            'entry': self.entry,
+            'exit': self.exit,
+        }
+
+    def set_state(self, state):
+        """Restore state produced by get_state()."""
+        for name, value in state.items():
+            setattr(self, name, np.array(value))
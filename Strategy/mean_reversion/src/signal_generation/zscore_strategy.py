@@ -0,0 +1,141 @@
+import numpy as np
+
+
+class StreamingZScore:
+    def __init__(self, n_pairs, window=60):
+        """
+        Rolling z-score of many spreads with constant cost per bar.
+        Mean and variance are maintained with a windowed Welford update over a preallocated
+        (window, n_pairs) ring buffer; the variance uses ddof=1 like pandas rolling std.
+        n_pairs: number of spreads tracked in parallel
+        window: rolling window length in bars; z-scores are NaN until the window is full
+        """
+        self.n_pairs = n_pairs
+        self.window = window
+        self.buffer = np.zeros((window, n_pairs))
+        self.head = np.zeros(n_pairs, dtype=np.int64)
+        self.count = np.zeros(n_pairs, dtype=np.int64)
+        self.mean = np.zeros(n_pairs)
+        self.m2 = np.zeros(n_pairs)
+        self._cols = np.arange(n_pairs)
+
+    def push(self, bar):
+        """
+        Add the latest spread value per pair (NaN = no update for that pair).
+        Returns: z-score array of shape (n_pairs,)
+        """
+        x = np.asarray(bar, dtype=np.float64)
+        valid = np.isfinite(x)
+        full = valid & (self.count >= self.window)
+        growing = valid & ~full
+
+        old = self.buffer[self.head, self._cols]
+        self.count += growing
+        n = np.maximum(self.count, 1).astype(np.float64)
+
+        # Growing phase: classic Welford insert.
+        delta = x - self.mean
+        grow_mean = self.mean + delta / n
+        grow_m2 = self.m2 + delta * (x - grow_mean)
+
+        # Full window: replace the oldest value in one step.
+        swap = x - old
+        roll_mean = self.mean + swap / self.window
+        roll_m2 = self.m2 + swap * (x - roll_mean + old - self.mean)
+
+        self.mean = np.where(full, roll_mean, np.where(growing, grow_mean, self.mean))
+        self.m2 = np.maximum(np.where(full, roll_m2, np.where(growing, grow_m2, self.m2)), 0.0)
+
+        self.buffer[self.head[valid], self._cols[valid]] = x[valid]
+        self.head[valid] = (self.head[valid] + 1) % self.window
+
+        return self.zscore(x)
+
+    def zscore(self, x):
+        """Z-score of `x` against the current window statistics."""
+        with np.errstate(divide='ignore', invalid='ignore'):
+            std = np.sqrt(self.m2 / (self.count - 1))
+            z = (x - self.mean) / std
+        return np.where((self.count >= self.window) & (std > 0), z, np.nan)
+
+    def get_state(self):
+        """Return the rolling state as a dict of NumPy arrays."""
+        return {
+            'buffer': self.buffer,
+            'head': self.head,
+            'count': self.count,
+            'mean': self.mean,
+            'm2': self.m2,
+        }
+
+    def set_state(self, state):
+        """Restore state produced by get_state()."""
+        for name, value in state.items():
+            setattr(self, name, np.array(value))
+
+
+class ZScoreStrategy:
+    def __init__(self, n_pairs, window=60, entry_z=2.0, exit_z=0.5, stop_z=None, thresholds=None):
+        """
+        Stateful mean-reversion signal generator for many spreads.
+        Goes short the spread when z > entry, long when z < -entry, and flattens once |z|
+        falls back inside the exit band (or breaches stop_z, if given). With stop_z, no new
+        position is opened while |z| is at or beyond the stop.
+        n_pairs: number of spreads tracked in parallel
+        window: z-score lookback in bars
+        entry_z / exit_z: fixed thresholds, used when `thresholds` is None
+        stop_z: optional stop-loss z-score
+        thresholds: optional AdaptiveThresholds instance supplying per-pair entry/exit levels
+        """
+        self.n_pairs = n_pairs
+        self.zscore = StreamingZScore(n_pairs, window)
+        self.entry_z = entry_z
+        self.exit_z = exit_z
+        self.stop_z = stop_z
+        self.thresholds = thresholds
+        self.position = np.zeros(n_pairs)
+
+    def push(self, bar):
+        """
+        Process one bar of spread values.
+        bar: array of shape (n_pairs,)
+        Returns: (zscore, position) arrays; position is -1 (short spread), 0 or +1 (long)
+        """
+        bar = np.asarray(bar, dtype=np.float64)
+        z = self.zscore.push(bar)
+        if self.thresholds is not None:
+            entry, exit_ = self.thresholds.update(bar)
+        else:
+            entry, exit_ = self.entry_z, self.exit_z
+
+        pos = self.position
+        known = np.isfinite(z)
+        flat = pos == 0
+        if self.stop_z is not None:
+            flat = flat & (np.abs(z) < self.stop_z)
+        new = pos.copy()
+        new[flat & known & (z > entry)] = -1.0
+        new[flat & known & (z < -entry)] = 1.0
+        new[(pos > 0) & known & (z >= -exit_)] = 0.0
+        new[(pos < 0) & known & (z <= exit_)] = 0.0
+        if self.stop_z is not None:
+            new[(pos != 0) & known & (np.abs(z) > self.stop_z)] = 0.0
+        self.position = new
+        return z, new.copy()
+
+    def run(self, spreads):
+        """
+        Batch path for backtests: replays `push` over a (T, n_pairs) spread history, so the
+        output is identical to the live stream bar for bar.
+        Returns: (zscores, positions) arrays of shape (T, n_pairs)
+        """
+        spreads = np.asarray(spreads, dtype=np.float64)
+        if spreads.ndim == 1:
+            spreads = spreads[:, None]
+        if spreads.shape[1] != self.n_pairs:
+            raise ValueError("spreads must have shape (T, n_pairs).")
+        zscores = np.empty_like(spreads)
+        positions = np.empty_like(spreads)
+        for t in range(spreads.shape[0]):
+            zscores[t], positions[t] = self.push(spreads[t])
+        return zscores, positions
@@ -0,0 +1,176 @@
+import os
+import sys
+import json
+import asyncio
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.data_pipline.spread_calculator import RollingHedgeRatio
+from src.signal_generation.adaptive_thresholds import AdaptiveThresholds
+from src.signal_generation.zscore_strategy import StreamingZScore, ZScoreStrategy
+
+
+def _make_spreads(n_bars=500, n_pairs=6, seed=0):
+    rng = np.random.default_rng(seed)
+    X = 100 + np.cumsum(rng.normal(0, 1, (n_bars, n_pairs)), axis=0)
+    noise = np.zeros((n_bars, n_pairs))
+    for t in range(1, n_bars):
+        noise[t] = 0.9 * noise[t - 1] + rng.normal(0, 1, n_pairs)
+    Y = 5 + 1.3 * X + noise
+    spread, _, _ = RollingHedgeRatio(n_pairs, window=100).fit(Y, X)
+    return spread
+
+
+class TestSignalGeneration(unittest.TestCase):
+    def test_streaming_zscore_matches_pandas_rolling(self):
+        spreads = _make_spreads()
+        engine = StreamingZScore(spreads.shape[1], window=30)
+        z = np.array([engine.push(row) for row in spreads])
+        frame = pd.DataFrame(spreads)
+        rolling = frame.rolling(30)
+        expected = ((frame - rolling.mean()) / rolling.std()).to_numpy()
+        np.testing.assert_allclose(z, expected, rtol=1e-8, atol=1e-8)
+
+    def test_batch_and_stream_are_identical(self):
+        spreads = _make_spreads()
+        n_pairs = spreads.shape[1]
+        batch = ZScoreStrategy(n_pairs, window=40, thresholds=AdaptiveThresholds(n_pairs)).run(spreads)
+
+        live = ZScoreStrategy(n_pairs, window=40, thresholds=AdaptiveThresholds(n_pairs))
+        streamed = [live.push(row) for row in spreads]
+        np.testing.assert_array_equal(batch[0], np.array([z for z, _ in streamed]))
+        np.testing.assert_array_equal(batch[1], np.array([p for _, p in streamed]))
+
+    def test_positions_follow_thresholds(self):
+        spreads = _make_spreads()
+        z, pos = ZScoreStrategy(spreads.shape[1], window=40, entry_z=2.0, exit_z=0.5).run(spreads)
+        self.assertTrue(set(np.unique(pos)) <= {-1.0, 0.0, 1.0})
+        self.assertTrue((pos != 0).any())
+        opened = (pos[1:] != 0) & (pos[:-1] == 0)
+        self.assertTrue((np.abs(z[1:][opened]) > 2.0).all())
+        self.assertTrue((np.sign(z[1:][opened]) == -pos[1:][opened]).all())
+
+    def test_stop_z_blocks_entries_beyond_the_stop(self):
+        spreads = _make_spreads(seed=2)
+        # Shocks that take some spreads straight past the stop from flat.
+        spreads[[150, 260, 380], [0, 2, 4]] += 25.0
+        spreads[[200, 320], [1, 3]] -= 25.0
+        z, free = ZScoreStrategy(spreads.shape[1], window=40, entry_z=2.0, exit_z=0.5).run(spreads)
+        _, stopped = ZScoreStrategy(spreads.shape[1], window=40, entry_z=2.0, exit_z=0.5, stop_z=4.0).run(spreads)
+        opened = (stopped[1:] != 0) & (stopped[:-1] == 0)
+        self.assertTrue(opened.any())
+        self.assertTrue((np.abs(z[1:][opened]) < 4.0).all())
+        # Without the gate, the same shocks open positions that the stop would close a bar later.
+        beyond = (free[1:] != 0) & (free[:-1] == 0) & (np.abs(z[1:]) >= 4.0)
+        self.assertTrue(beyond.any())
+        self.assertTrue((stopped[1:][beyond] == 0).all())
+
+    def test_live_service_matches_batch_signals(self):
+        from main_strategy import LiveSignalService, MeanReversionStrategy, ReplayFeed
+        rng = np.random.default_rng(1)
+        X = 100 + np.cumsum(rng.normal(0, 1, (400, 4)), axis=0)
+        Y = 5 + 1.3 * X + rng.normal(0, 1, (400, 4))
+        prices = pd.DataFrame(np.hstack([Y, X]), columns=[f"y{i}" for i in range(4)] + [f"x{i}" for i in range(4)])
+        pairs = pd.DataFrame({'asset1': prices.columns[:4], 'asset2': prices.columns[4:],
+                              'hedge_ratio': 1.3, 'intercept': 5.0})
+        strategy = MeanReversionStrategy({'pair_selection': {'use_log_prices': False},
+                                          'signals': {'zscore_window': 30, 'stop_z': None}})
+        spread, _ = strategy.spreads(prices, pairs)
+        expected = strategy.signals(spread)
+
+        published = []
+        service = LiveSignalService(strategy, pairs, prices.columns, publish=published.append, coalesce=False)
+        service.warm_up(prices.iloc[:100])
+        asyncio.run(service.run(ReplayFeed(prices.iloc[100:])))
+        np.testing.assert_array_equal(np.array([t['position'] for t in published]), expected[100:])
+        report = service.report()
+        self.assertEqual(report['published'], 300)
+        self.assertIn('bar_to_signal', report['latency'])
+
+    def test_coalescing_keeps_every_bar_in_the_rolling_state(self):
+        from main_strategy import LiveSignalService, MeanReversionStrategy, ReplayFeed
+        rng = np.random.default_rng(2)
+        X = 100 + np.cumsum(rng.normal(0, 1, (400, 4)), axis=0)
+        Y = 5 + 1.3 * X + rng.normal(0, 1, (400, 4))
+        prices = pd.DataFrame(np.hstack([Y, X]), columns=[f"y{i}" for i in range(4)] + [f"x{i}" for i in range(4)])
+        pairs = pd.DataFrame({'asset1': prices.columns[:4], 'asset2': prices.columns[4:],
+                              'hedge_ratio': 1.3, 'intercept': 5.0})
+        strategy = MeanReversionStrategy({'pair_selection': {'use_log_prices': False},
+                                          'signals': {'zscore_window': 30, 'stop_z': None}})
+        spread, _ = strategy.spreads(prices, pairs)
+        zscore, expected = ZScoreStrategy(4, window=30, entry_z=2.0, exit_z=0.5).run(spread)
+
+        published = []
+
+        async def slow_publish(targets):
+            # Slower than the feed, so bars pile up in the queue and get coalesced.
+            published.append(targets)
+            await asyncio.sleep(0.002)
+
+        service = LiveSignalService(strategy, pairs, prices.columns, publish=slow_publish, coalesce=True)
+        service.warm_up(prices.iloc[:100])
+        asyncio.run(service.run(ReplayFeed(prices.iloc[100:])))
+
+        report = service.report()
+        self.assertGreater(report['coalesced'], 0)
+        self.assertEqual(report['bars'], 300)
+        self.assertEqual(report['coalesced'] + report['published'], 300)
+        # Published bars carry the same z-score and position as a run that saw every bar.
+        bars = np.array([t['timestamp'] for t in published])
+        self.assertEqual(bars[-1], 399)
+        np.testing.assert_allclose(np.array([t['zscore'] for t in published]), zscore[bars], rtol=1e-9)
+        np.testing.assert_array_equal(np.array([t['position'] for t in published]), expected[bars])
+
+        # The return buffer behind the sizing covariance holds every bar, coalesced or not.
+        values = prices.to_numpy()
+        y, x = values[:, :4], values[:, 4:]
+        returns = (y[1:] / y[:-1] - 1 - 1.3 * (x[1:] / x[:-1] - 1)) / 2.3
+        window = len(service.returns)
+        self.assertEqual(service.n_returns, 399)
+        order = np.arange(service.n_returns - window, service.n_returns) % window
+        np.testing.assert_allclose(service.returns[order], returns[-window:], rtol=1e-12)
+
+
+class TestSocketFeed(unittest.TestCase):
+    def test_malformed_messages_are_skipped(self):
+        from main_strategy import SocketFeed
+        lines = [
+            {'timestamp': 't0', 'prices': [1.0, 2.0, 3.0]},
+            {'timestamp': 't1', 'prices': [9.0, 9.0]},
+            {'timestamp': 't2', 'prices': {'B': 2.5, 'Z': 7.0}},
+            'not json',
+            {'timestamp': 't3'},
+            {'timestamp': 't4', 'prices': [4.0, 5.0, 6.0, 7.0]},
+            {'timestamp': 't5', 'prices': {'C': 3.5}},
+        ]
+
+        async def serve(reader, writer):
+            for line in lines:
+                writer.write(((line if isinstance(line, str) else json.dumps(line)) + '\n').encode())
+            await writer.drain()
+            writer.close()
+
+        async def collect():
+            server = await asyncio.start_server(serve, '127.0.0.1', 0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                return [item async for item in SocketFeed('127.0.0.1', port, ['A', 'B', 'C'])]
+            finally:
+                server.close()
+                await server.wait_closed()
+
+        with self.assertLogs(level='ERROR') as logs:
+            bars = asyncio.run(collect())
+        self.assertEqual([t for t, _ in bars], ['t0', 't2', 't5'])
+        np.testing.assert_array_equal(bars[0][1], [1.0, 2.0, 3.0])
+        np.testing.assert_array_equal(bars[1][1], [1.0, 2.5, 3.0])
+        np.testing.assert_array_equal(bars[2][1], [1.0, 2.5, 3.5])
+        self.assertEqual(len(logs.records), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
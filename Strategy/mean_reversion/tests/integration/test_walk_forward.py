@@ -0,0 +1,130 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.join(STRATEGY_DIR, 'backtesting'))
+sys.path.insert(0, STRATEGY_DIR)
+
+from run_backtest import ArtifactCache, WalkForwardRunner, content_key
+
+
+def _make_prices(n_bars=900, n_assets=8, seed=0):
+    rng = np.random.default_rng(seed)
+    base = np.cumsum(rng.normal(0, 0.01, (n_bars, 2)), axis=0)
+    noise = rng.normal(0, 0.003, (n_bars, n_assets))
+    log_prices = 4 + base[:, np.arange(n_assets) % 2] * (1 + 0.1 * np.arange(n_assets)) + noise
+    return pd.DataFrame(np.exp(log_prices), index=pd.date_range('2021-01-01', periods=n_bars, freq='D'),
+                        columns=[f"A{i}" for i in range(n_assets)])
+
+
+def _config(entry_z=(1.5, 2.0), **execution):
+    return {
+        'walk_forward': {'train_bars': 400, 'test_bars': 150},
+        'parameter_grid': {'zscore_window': [20, 40], 'entry_z': list(entry_z), 'exit_z': [0.0]},
+        'execution': execution,
+    }
+
+
+class TestFolds(unittest.TestCase):
+    def test_rolling_test_windows_tile_without_overlap(self):
+        runner = WalkForwardRunner({'walk_forward': {'train_bars': 100, 'test_bars': 30}})
+        folds = runner.folds(275)
+        self.assertEqual([f[0] for f in folds], list(range(len(folds))))
+        for _, train_start, train_end, test_end in folds:
+            self.assertEqual(train_end - train_start, 100)
+            self.assertLessEqual(test_end, 275)
+            self.assertLess(train_end, test_end)
+        # Each test window starts where the previous one ended, and the last reaches the end of history.
+        for previous, current in zip(folds, folds[1:]):
+            self.assertEqual(current[2], previous[3])
+        self.assertEqual(folds[0][2], 100)
+        self.assertEqual(folds[-1][3], 275)
+
+    def test_anchored_training_starts_at_zero(self):
+        runner = WalkForwardRunner({'walk_forward': {'train_bars': 100, 'test_bars': 30, 'anchored': True}})
+        folds = runner.folds(200)
+        self.assertTrue(all(f[1] == 0 for f in folds))
+        self.assertEqual([f[2] for f in folds], [100, 130, 160, 190])
+        self.assertEqual([f[3] for f in folds], [130, 160, 190, 200])
+
+    def test_short_history_has_no_folds(self):
+        runner = WalkForwardRunner({'walk_forward': {'train_bars': 100, 'test_bars': 30}})
+        self.assertEqual(runner.folds(100), [])
+        self.assertIsNone(runner.run(_make_prices(n_bars=100)))
+
+
+class TestWalkForwardRunner(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.prices = _make_prices()
+        cls.serial = WalkForwardRunner(_config(n_jobs=1)).run(cls.prices)
+
+    def test_out_of_sample_returns_do_not_overlap(self):
+        summary, returns = self.serial
+        self.assertEqual(len(summary), 4)
+        self.assertGreater(summary['n_pairs'].min(), 0)
+        dates = pd.DatetimeIndex(np.concatenate([r.index.to_numpy() for r in returns]))
+        self.assertTrue(dates.is_unique)
+        self.assertTrue(dates.is_monotonic_increasing)
+        self.assertTrue(dates.equals(self.prices.index[400:]))
+        self.assertTrue((summary['test_start'] > summary['train_start']).all())
+        self.assertTrue((summary['test_start'].iloc[1:].to_numpy() > summary['test_end'].iloc[:-1].to_numpy()).all())
+
+    def test_pool_matches_serial(self):
+        summary, returns = WalkForwardRunner(_config(n_jobs=2)).run(self.prices)
+        pd.testing.assert_frame_equal(summary, self.serial[0])
+        self.assertEqual(len(returns), len(self.serial[1]))
+        for pooled, serial in zip(returns, self.serial[1]):
+            pd.testing.assert_frame_equal(pooled, serial)
+
+    def test_changing_one_grid_parameter_reuses_pairs_and_spreads(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = WalkForwardRunner(_config(n_jobs=1, cache_dir=cache_dir))
+            summary, _ = first.run(self.prices)
+            n_folds = len(summary)
+            self.assertEqual(first.cache.hits, 0)
+            self.assertEqual(first.cache.misses, 3 * n_folds)
+
+            second = WalkForwardRunner(_config(entry_z=(1.5, 2.5), n_jobs=1, cache_dir=cache_dir))
+            summary, returns = second.run(self.prices)
+            # Pairs and spreads come from the cache; only the parameter search reruns.
+            self.assertEqual(second.cache.hits, 2 * n_folds)
+            self.assertEqual(second.cache.misses, n_folds)
+            self.assertTrue((summary['cache_hits'] == 2).all())
+            self.assertEqual(len(os.listdir(os.path.join(cache_dir, 'pairs'))), n_folds)
+            self.assertEqual(len(os.listdir(os.path.join(cache_dir, 'spreads'))), n_folds)
+            self.assertEqual(len(os.listdir(os.path.join(cache_dir, 'search'))), 2 * n_folds)
+
+            uncached_summary, uncached_returns = WalkForwardRunner(_config(entry_z=(1.5, 2.5), n_jobs=1)).run(self.prices)
+            pd.testing.assert_frame_equal(summary.drop(columns='cache_hits'), uncached_summary.drop(columns='cache_hits'))
+            for cached, uncached in zip(returns, uncached_returns):
+                pd.testing.assert_frame_equal(cached, uncached)
+
+
+class TestArtifactCache(unittest.TestCase):
+    def test_memo_computes_once_per_key(self):
+        calls = []
+        with tempfile.TemporaryDirectory() as root:
+            cache = ArtifactCache(root)
+            compute = lambda: calls.append(1) or {'value': len(calls)}
+            self.assertEqual(cache.memo('stage', 'a', compute), {'value': 1})
+            self.assertEqual(cache.memo('stage', 'a', compute), {'value': 1})
+            self.assertEqual(cache.memo('stage', 'b', compute), {'value': 2})
+            self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_content_key_tracks_values_not_identity(self):
+        frame = _make_prices(n_bars=50)
+        self.assertEqual(content_key('pairs', frame, {'a': 1, 'b': 2}), content_key('pairs', frame.copy(), {'b': 2, 'a': 1}))
+        changed = frame.copy()
+        changed.iloc[10, 3] *= 1.0001
+        self.assertNotEqual(content_key('pairs', frame), content_key('pairs', changed))
+        self.assertNotEqual(content_key('pairs', frame, {'a': 1}), content_key('pairs', frame, {'a': 2}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+import os
+import sys
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.pair_selection.basket_cointegration import CRIT_COLUMNS, BasketCointegration
+
+
+def _make_prices(n_bars=300, n_groups=2, group_size=4, seed=0):
+    """Groups of assets loading on one random-walk factor each, plus stationary AR(1) deviations."""
+    rng = np.random.default_rng(seed)
+    factors = np.cumsum(rng.normal(0, 0.01, (n_bars, n_groups)), axis=0)
+    n_assets = n_groups * group_size
+    deviations = np.zeros((n_bars, n_assets))
+    shocks = rng.normal(0, 0.004, (n_bars, n_assets))
+    for t in range(1, n_bars):
+        deviations[t] = 0.8 * deviations[t - 1] + shocks[t]
+    loadings = rng.uniform(0.6, 1.4, n_assets)
+    log_prices = 4 + factors[:, np.arange(n_assets) // group_size] * loadings + deviations
+    return pd.DataFrame(np.exp(log_prices), index=pd.date_range('2022-01-03', periods=n_bars, freq='B'),
+                        columns=[f"S{i}" for i in range(n_assets)])
+
+
+def _johansen(prices, assets):
+    from statsmodels.tsa.vector_ar.vecm import coint_johansen
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return coint_johansen(np.log(prices[list(assets)].to_numpy()), det_order=0, k_ar_diff=1)
+
+
+class TestBasketCointegration(unittest.TestCase):
+    def setUp(self):
+        self.prices = _make_prices()
+        self.baskets = [(0, 1, 2), (0, 1, 2, 3), (1, 2, 3), (4, 5, 6), (4, 5, 6, 7), (2, 5, 6), (0, 3, 4, 6, 7)]
+
+    def _assert_matches(self, row, reference, significance=0.05):
+        column = CRIT_COLUMNS[significance]
+        self.assertAlmostEqual(row['trace_stat'], reference.lr1[0], delta=1e-6 * reference.lr1[0])
+        self.assertAlmostEqual(row['max_eig_stat'], reference.lr2[0], delta=1e-6 * reference.lr2[0])
+        self.assertAlmostEqual(row['eigenvalue'], reference.eig[0], places=9)
+        self.assertAlmostEqual(row['trace_crit'], reference.cvt[0, column])
+        self.assertAlmostEqual(row['max_eig_crit'], reference.cvm[0, column])
+        rank = 0
+        while rank < len(reference.lr1) and reference.lr1[rank] > reference.cvt[rank, column]:
+            rank += 1
+        self.assertEqual(row['rank'], rank)
+        lead = reference.evec[:, 0]
+        np.testing.assert_allclose(row['weights'], lead / lead[0], rtol=1e-6, atol=1e-9)
+
+    def test_full_sample_matches_coint_johansen(self):
+        engine = BasketCointegration(n_jobs=1)
+        result = engine.screen(self.prices, baskets=self.baskets)
+        self.assertEqual(len(result), len(self.baskets))
+        self.assertTrue(result['trace_margin'].is_monotonic_decreasing)
+        for _, row in result.iterrows():
+            self._assert_matches(row, _johansen(self.prices, row['assets']))
+        # The single-factor groups are cointegrated; the basket mixing both factors is not fully.
+        by_assets = result.set_index('assets')
+        self.assertTrue(by_assets.loc[[('S0', 'S1', 'S2'), ('S4', 'S5', 'S6')], 'cointegrated'].all())
+
+    def test_rolling_with_step_matches_coint_johansen(self):
+        window, step = 120, 7
+        # recompute_every=3 mixes incremental moment updates with periodic rebuilds.
+        engine = BasketCointegration(n_jobs=1, significance=0.10, recompute_every=3)
+        result = engine.screen(self.prices, window=window, step=step, baskets=self.baskets)
+        ends = np.arange(window - 1, len(self.prices), step)
+        self.assertEqual(len(result), len(ends) * len(self.baskets))
+        self.assertTrue(pd.Index(result['end'].unique()).equals(self.prices.index[ends]))
+        for _, row in result.iterrows():
+            end = self.prices.index.get_loc(row['end'])
+            window_prices = self.prices.iloc[end - window + 1:end + 1]
+            self._assert_matches(row, _johansen(window_prices, row['assets']), significance=0.10)
+
+    def test_process_pool_matches_serial(self):
+        serial_engine = BasketCointegration(min_correlation=0.3, n_jobs=1)
+        pooled_engine = BasketCointegration(min_correlation=0.3, n_jobs=2, block_size=3)
+        baskets = serial_engine.candidate_baskets(np.log(self.prices.to_numpy()))
+        # Two clusters of four, so the pool gets at least one task per cluster.
+        self.assertEqual(sorted({a for b in baskets for a in b}), list(range(8)))
+        self.assertFalse(any(set(b) & {0, 1, 2, 3} and set(b) & {4, 5, 6, 7} for b in baskets))
+
+        for window, step in ((None, 1), (100, 9)):
+            serial = serial_engine.screen(self.prices, window=window, step=step)
+            pooled = pooled_engine.screen(self.prices, window=window, step=step)
+            pd.testing.assert_frame_equal(serial.drop(columns='weights'), pooled.drop(columns='weights'))
+            np.testing.assert_allclose(np.vstack(serial['weights'].map(lambda w: np.pad(w, (0, 5 - len(w))))),
+                                       np.vstack(pooled['weights'].map(lambda w: np.pad(w, (0, 5 - len(w))))))
+        for _, row in pooled.head(5).iterrows():
+            end = self.prices.index.get_loc(row['end'])
+            self._assert_matches(row, _johansen(self.prices.iloc[end - 99:end + 1], row['assets']))
+
+    def test_tasks_with_different_basket_sizes(self):
+        # block_size=1 starts a new task at every basket that shares no asset with the previous one:
+        # [(0, 1, 2)] and [(3..7), (0..3)], whose widest baskets have 3 and 5 legs.
+        baskets = [(0, 1, 2), (3, 4, 5, 6, 7), (0, 1, 2, 3)]
+        serial = BasketCointegration(n_jobs=1, block_size=1).screen(self.prices, baskets=baskets)
+        pooled = BasketCointegration(n_jobs=2, block_size=1).screen(self.prices, window=150, step=50, baskets=baskets)
+        self.assertIsNotNone(serial)
+        self.assertIsNotNone(pooled)
+        self.assertEqual(sorted(serial['n_legs']), [3, 4, 5])
+        self.assertEqual(len(pooled), 4 * len(baskets))
+        for _, row in serial.iterrows():
+            self.assertEqual(len(row['weights']), row['n_legs'])
+            self._assert_matches(row, _johansen(self.prices, row['assets']))
+
+    def test_invalid_inputs(self):
+        with self.assertRaises(ValueError):
+            BasketCointegration(significance=0.02)
+        engine = BasketCointegration(n_jobs=1)
+        self.assertIsNone(engine.screen(self.prices.to_numpy(), baskets=self.baskets))
+        self.assertIsNone(engine.screen(self.prices, window=3, baskets=self.baskets))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..')))
+sys.path.insert(0, STRATEGY_DIR)
+
+from src.risk_management.capital_allocator import CapitalAllocator
+
+
+def _random_cov(n, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 1, (n, 3))
+    vols = rng.uniform(0.05, 0.4, n)
+    corr = factors @ factors.T + np.diag(rng.uniform(0.5, 2.0, n))
+    d = np.sqrt(np.diag(corr))
+    return corr / np.outer(d, d) * np.outer(vols, vols)
+
+
+class TestEqualRiskContribution(unittest.TestCase):
+    def test_risk_contributions_match_budgets(self):
+        cov = _random_cov(20)
+        for budgets in (None, np.linspace(1, 3, 20)):
+            w, info = CapitalAllocator.equal_risk_contribution(cov, budgets=budgets, tol=1e-10, return_info=True)
+            self.assertTrue(info['converged'])
+            self.assertAlmostEqual(w.sum(), 1.0, places=12)
+            self.assertTrue((w > 0).all())
+            contributions = w * (cov @ w)
+            target = np.full(20, 1 / 20) if budgets is None else budgets / budgets.sum()
+            np.testing.assert_allclose(contributions / contributions.sum(), target, rtol=1e-8)
+
+    def test_warm_start_converges_faster_to_the_same_weights(self):
+        cov = _random_cov(50, seed=1)
+        previous = CapitalAllocator.equal_risk_contribution(cov)
+        moved = cov * (1 + 0.01 * np.add.outer(np.arange(50), np.arange(50)) / 100)
+        cold, cold_info = CapitalAllocator.equal_risk_contribution(moved, return_info=True)
+        warm, warm_info = CapitalAllocator.equal_risk_contribution(moved, w0=previous, return_info=True)
+        np.testing.assert_allclose(warm, cold, rtol=1e-7)
+        self.assertLess(warm_info['iterations'], cold_info['iterations'])
+
+    def test_equal_correlations_reduce_to_inverse_volatility(self):
+        vols = np.array([0.1, 0.2, 0.3, 0.15])
+        corr = np.full((4, 4), 0.3) + 0.7 * np.eye(4)
+        w = CapitalAllocator.equal_risk_contribution(corr * np.outer(vols, vols), tol=1e-12)
+        np.testing.assert_allclose(w, (1 / vols) / (1 / vols).sum(), rtol=1e-9)
+
+    def test_risk_parity_allocation(self):
+        rng = np.random.default_rng(2)
+        returns = pd.DataFrame(rng.normal(0, 1, (20000, 4)) * [0.01, 0.02, 0.005, 0.015], columns=list('ABCD'))
+        allocation = CapitalAllocator.risk_parity_allocation(returns, 1e6)
+        self.assertEqual(list(allocation.index), list('ABCD'))
+        self.assertAlmostEqual(allocation.sum(), 1e6, places=4)
+        expected = CapitalAllocator.equal_risk_contribution(returns.cov().to_numpy()) * 1e6
+        np.testing.assert_allclose(allocation.to_numpy(), expected)
+        # The previous implementation's inverse-volatility weights, which ERC reduces to for uncorrelated assets.
+        inverse_vol = (1 / returns.std()) / (1 / returns.std()).sum() * 1e6
+        np.testing.assert_allclose(allocation.to_numpy(), inverse_vol.to_numpy(), rtol=0.02)
+        array_allocation = CapitalAllocator.risk_parity_allocation(returns.to_numpy(), 1e6)
+        np.testing.assert_allclose(array_allocation, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from statsmodels.tsa.stattools import coint
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..')))
+sys.path.insert(0, STRATEGY_DIR)
+
+from src.pair_selection.traditional_cointegration import CointegrationScreener
+
+
+def _make_prices(n_bars=500, n_assets=8, seed=0):
+    rng = np.random.default_rng(seed)
+    factors = np.cumsum(rng.normal(0, 0.01, (n_bars, 2)), axis=0)
+    noise = np.zeros((n_bars, n_assets))
+    for t in range(1, n_bars):
+        noise[t] = 0.8 * noise[t - 1] + rng.normal(0, 0.004, n_assets)
+    log_prices = 4 + factors[:, np.arange(n_assets) % 2] * (1 + 0.2 * np.arange(n_assets)) + noise
+    return pd.DataFrame(np.exp(log_prices), columns=[f"A{i}" for i in range(n_assets)])
+
+
+class TestCointegrationScreener(unittest.TestCase):
+    def test_matches_statsmodels_coint(self):
+        prices = _make_prices()
+        log_prices = np.log(prices)
+        for lags in (1, 3):
+            result = CointegrationScreener(min_correlation=-1.0, adf_lags=lags, n_jobs=1).screen(prices)
+            self.assertEqual(len(result), 28)
+            for row in result.to_dict('records'):
+                stat, pvalue, crit = coint(log_prices[row['asset1']], log_prices[row['asset2']], trend='c',
+                                           maxlag=lags, autolag=None)
+                self.assertAlmostEqual(row['adf_statistic'], stat, places=8)
+                self.assertAlmostEqual(row['p_value'], pvalue, places=8)
+                np.testing.assert_allclose([row['crit_1%'], row['crit_5%'], row['crit_10%']], crit, rtol=1e-10)
+
+    def test_process_pool_matches_in_process(self):
+        prices = _make_prices(n_assets=12, seed=1)
+        serial = CointegrationScreener(min_correlation=0.3, n_jobs=1).screen(prices)
+        pooled = CointegrationScreener(min_correlation=0.3, n_jobs=2, block_size=7).screen(prices)
+        self.assertGreater(len(serial), 7)
+        pd.testing.assert_frame_equal(pooled, serial)
+
+
+if __name__ == '__main__':
+    unittest.main()
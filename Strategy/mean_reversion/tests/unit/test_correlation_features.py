@@ -0,0 +1,66 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.feature_engineering.correlation_features import RollingCorrelation
+
+
+class TestRollingCorrelation(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        mix = rng.normal(0, 1, (5, 5))
+        # A large common offset makes the running sums prone to cancellation drift.
+        self.X = 50 + rng.normal(0, 1, (400, 5)) @ mix
+        self.frame = pd.DataFrame(self.X)
+        self.window = 30
+
+    def _expected(self, lag):
+        """pandas rolling corr(x_i[t], x_j[t - lag]) for every (i, j), as an array (T, N, N)."""
+        n = self.X.shape[1]
+        out = np.empty((len(self.X), n, n))
+        for i in range(n):
+            for j in range(n):
+                out[:, i, j] = self.frame[i].rolling(self.window).corr(self.frame[j].shift(lag)).to_numpy()
+        return out
+
+    def test_matches_pandas_rolling_corr_through_recomputes(self):
+        lags = (0, 2)
+        expected = {lag: self._expected(lag) for lag in lags}
+        engine = RollingCorrelation(5, self.window, lags=lags, block_size=2, recompute_every=7)
+        idx_a, idx_b = np.array([0, 1, 3, 4]), np.array([2, 4, 0, 4])
+        checked = 0
+        for t, row in enumerate(self.X):
+            engine.update(row)
+            for lag in lags:
+                if not engine.ready(lag):
+                    continue
+                np.testing.assert_allclose(engine.matrix(lag), expected[lag][t], atol=1e-9)
+                np.testing.assert_allclose(engine.pairs(idx_a, idx_b, lag), expected[lag][t][idx_a, idx_b], atol=1e-9)
+                checked += 1
+        self.assertGreater(checked, 2 * 300)
+        self.assertGreater(engine.n_updates // engine.recompute_every, 50)
+
+    def test_incremental_drift_is_small_without_recompute(self):
+        expected = self._expected(0)
+        engine = RollingCorrelation(5, self.window, recompute_every=0)
+        engine.update_many(self.X)
+        np.testing.assert_allclose(engine.matrix(), expected[-1], atol=1e-7)
+
+    def test_from_history_and_rolling(self):
+        expected = self._expected(1)
+        engine = RollingCorrelation.from_history(self.X[:200], self.window, lags=(0, 1))
+        engine.update_many(self.X[200:])
+        np.testing.assert_allclose(engine.matrix(1), expected[-1], atol=1e-9)
+        steps = list(RollingCorrelation.rolling(self.X[:100], self.window, step=10, lags=(1,)))
+        self.assertEqual([t for t, _ in steps], list(range(self.window, 100, 10)))
+        for t, matrices in steps:
+            np.testing.assert_allclose(matrices[1], expected[t], atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
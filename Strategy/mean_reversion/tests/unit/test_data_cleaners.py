@@ -0,0 +1,68 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..')))
+sys.path.insert(0, STRATEGY_DIR)
+
+from src.data_sources.data_cleaners import DataCleaner
+
+
+def _make_panel(n_rows=2000, n_cols=12, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range('2015-01-01', periods=n_rows).delete(slice(700, 710)).delete(slice(1500, 1520))
+    values = 100 + np.cumsum(rng.normal(0, 1, (len(index), n_cols)), axis=0)
+    values[rng.random(values.shape) < 0.05] = np.nan
+    values[:3, 0] = np.nan                      # leading NaNs need the backward pass
+    values[-4:, 1] = np.nan                     # trailing NaNs for bfill
+    values[900:905, :] = np.nan                 # rows dropped by the threshold
+    frame = pd.DataFrame(values, index=index, columns=[f"T{i}" for i in range(n_cols)])
+    frame['sector'] = np.where(np.arange(len(index)) % 3, 'tech', None)
+    return frame
+
+
+def _check_gaps_loop(df, max_gap=5):
+    """The original row-by-row implementation of check_gaps."""
+    gaps = []
+    diffs = df.index.to_series().diff().dt.days.fillna(0)
+    for idx in diffs[diffs > max_gap].index:
+        prev_idx = df.index[df.index.get_loc(idx) - 1]
+        gaps.append((prev_idx, idx, (idx - prev_idx).days))
+    return gaps
+
+
+class TestDataCleaner(unittest.TestCase):
+    def test_clean_panel_matches_clean(self):
+        panel = _make_panel()
+        original = panel.copy()
+        for method in ('ffill', 'bfill', 'drop'):
+            expected, expected_gaps = DataCleaner.clean(panel, na_method=method, drop_threshold=0.2)
+            cleaned, gaps, stats = DataCleaner.clean_panel(panel, na_method=method, drop_threshold=0.2, chunk_rows=64,
+                                                           float_dtype=None, categorical_threshold=0.0)
+            pd.testing.assert_frame_equal(cleaned, expected, check_freq=False)
+            self.assertEqual(gaps, expected_gaps)
+            self.assertEqual(stats['dropped_rows'], len(panel) - len(expected))
+        pd.testing.assert_frame_equal(panel, original)
+
+    def test_float32_panel_is_close(self):
+        panel = _make_panel(seed=1)
+        expected, _ = DataCleaner.clean(panel)
+        cleaned, _, _ = DataCleaner.clean_panel(panel, track_memory=False)
+        self.assertEqual(cleaned['T0'].dtype, np.float32)
+        self.assertIsInstance(cleaned['sector'].dtype, pd.CategoricalDtype)
+        numeric = expected.columns.drop('sector')
+        np.testing.assert_allclose(cleaned[numeric].to_numpy(), expected[numeric].to_numpy(), rtol=1e-6)
+
+    def test_check_gaps_matches_loop(self):
+        panel = _make_panel()
+        for max_gap in (1, 3, 5, 10):
+            self.assertEqual(DataCleaner.check_gaps(panel, max_gap), _check_gaps_loop(panel, max_gap))
+        self.assertEqual(DataCleaner.check_gaps(panel.iloc[:1]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..')))
+sys.path.insert(0, STRATEGY_DIR)
+
+from src.risk_and_positioning.dynamic_vol_sizer import DynamicVolSizer
+
+
+def _daily_cov(n, seed=0):
+    """Per-period covariance of spreads with annualized vols between 2% and 15%."""
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 1, (n, 2))
+    corr = factors @ factors.T + np.diag(rng.uniform(0.5, 2.0, n))
+    d = np.sqrt(np.diag(corr))
+    vols = rng.uniform(0.02, 0.15, n) / np.sqrt(252)
+    return corr / np.outer(d, d) * np.outer(vols, vols)
+
+
+def _annual_vol(allocation, cov, capital):
+    return np.sqrt(allocation @ cov @ allocation * 252) / capital
+
+
+class TestDynamicVolSizer(unittest.TestCase):
+    def setUp(self):
+        self.cov = _daily_cov(8)
+        self.capital = 1e6
+
+    def test_book_is_levered_to_the_vol_target(self):
+        result = DynamicVolSizer(target_vol=0.10, max_leverage=10.0, tol=1e-10).size(self.cov, self.capital)
+        self.assertAlmostEqual(result['weights'].sum(), 1.0, places=12)
+        self.assertAlmostEqual(result['portfolio_vol'], _annual_vol(result['weights'], self.cov, 1.0), places=12)
+        self.assertAlmostEqual(result['leverage'], 0.10 / result['portfolio_vol'], places=10)
+        self.assertAlmostEqual(_annual_vol(result['allocation'], self.cov, self.capital), 0.10, places=10)
+        # Equal risk contributions: every spread adds the same share of the book's variance.
+        contributions = result['allocation'] * (self.cov @ result['allocation'])
+        np.testing.assert_allclose(contributions, contributions.mean(), rtol=1e-8)
+
+    def test_allocation_carries_the_signal_signs(self):
+        signals = np.array([1, -1, 0, 1, -1, 0, 1, 1])
+        active = signals != 0
+        result = DynamicVolSizer(tol=1e-10).size(self.cov, self.capital, signals=signals)
+        np.testing.assert_array_equal(np.sign(result['allocation']), signals)
+        self.assertTrue((result['weights'][~active] == 0).all())
+        # The active spreads are sized as a book of their own.
+        alone = DynamicVolSizer(tol=1e-10).size(self.cov[np.ix_(active, active)], self.capital)
+        np.testing.assert_allclose(np.abs(result['allocation'][active]), alone['allocation'], rtol=1e-10)
+
+        flat = DynamicVolSizer().size(self.cov, self.capital, signals=np.zeros(8))
+        self.assertEqual((flat['leverage'], flat['iterations']), (0.0, 0))
+        self.assertTrue((flat['allocation'] == 0).all())
+
+    def test_leverage_is_capped(self):
+        result = DynamicVolSizer(target_vol=5.0, max_leverage=3.0).size(self.cov, self.capital)
+        self.assertEqual(result['leverage'], 3.0)
+        self.assertAlmostEqual(result['allocation'].sum(), 3.0 * self.capital, places=4)
+        self.assertLess(_annual_vol(result['allocation'], self.cov, self.capital), 5.0)
+
+    def test_max_weight_caps_each_spread(self):
+        signals = np.array([1, -1, 1, -1, 1, -1, 1, -1])
+        uncapped = DynamicVolSizer(target_vol=0.5, max_leverage=5.0).size(self.cov, self.capital, signals=signals)
+        capped = DynamicVolSizer(target_vol=0.5, max_leverage=5.0, max_weight=0.4).size(self.cov, self.capital,
+                                                                                         signals=signals)
+        limit = 0.4 * self.capital
+        self.assertTrue((np.abs(uncapped['allocation']) > limit).any())
+        np.testing.assert_allclose(np.abs(capped['allocation']), np.minimum(np.abs(uncapped['allocation']), limit))
+        np.testing.assert_array_equal(np.sign(capped['allocation']), signals)
+        self.assertEqual(capped['leverage'], uncapped['leverage'])
+
+    def test_warm_start_matches_cold_solve(self):
+        rng = np.random.default_rng(3)
+        warm = DynamicVolSizer(tol=1e-10)
+        warm_iterations = cold_iterations = 0
+        cov = self.cov
+        for step in range(12):
+            # Small drifts in the covariance, and spreads entering and leaving the book.
+            drift = np.exp(rng.normal(0, 0.02, len(cov)))
+            cov = cov * np.outer(drift, drift)
+            signals = np.where(rng.random(len(cov)) < 0.2, 0, 1)
+            warm_result = warm.size(cov, self.capital, signals=signals)
+            cold_result = DynamicVolSizer(tol=1e-10).size(cov, self.capital, signals=signals)
+            np.testing.assert_allclose(warm_result['allocation'], cold_result['allocation'], rtol=1e-8, atol=1e-6)
+            if step:
+                warm_iterations += warm_result['iterations']
+                cold_iterations += cold_result['iterations']
+        self.assertLess(warm_iterations, cold_iterations)
+
+
+if __name__ == '__main__':
+    unittest.main()
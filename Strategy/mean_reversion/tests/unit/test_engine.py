@@ -0,0 +1,48 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..')))
+sys.path.insert(0, STRATEGY_DIR)
+
+from src.backtesting_framework.engine import BacktestEngine
+
+
+class TestRunBatch(unittest.TestCase):
+    def test_every_column_matches_run(self):
+        rng = np.random.default_rng(0)
+        n_bars, n_instruments, n_params = 300, 3, 4
+        prices = 100 * np.cumprod(1 + rng.normal(0, 0.01, (n_bars, n_instruments)), axis=0)
+        signals = rng.choice([-1.0, 0.0, 1.0], size=(n_bars, n_instruments, n_params), p=[0.1, 0.8, 0.1])
+        signals[5, 0, 1] = np.nan
+        kwargs = {'initial_capital': 1000, 'commission': 0.001, 'slippage': 0.0005, 'periods_per_year': 252}
+        # A tiny chunk budget forces one parameter set per chunk.
+        results, equity = BacktestEngine.run_batch(prices, signals, return_equity=True, max_chunk_bytes=1, **kwargs)
+        index = pd.date_range('2020-01-01', periods=n_bars, freq='D')
+
+        for i in range(n_instruments):
+            for p in range(n_params):
+                data = pd.DataFrame({'close': prices[:, i]}, index=index)
+                engine = BacktestEngine(data, lambda d, s=signals[:, i, p]: pd.Series(s, index=d.index), **kwargs)
+                out = engine.run()
+                summary = engine.summary()
+                np.testing.assert_allclose(equity[:, i, p], out['equity_curve'].to_numpy(), rtol=1e-12)
+                row = results[i, p]
+                self.assertAlmostEqual(row['total_return'], summary['Total Return'], places=12)
+                self.assertAlmostEqual(row['annualized_return'], summary['Annualized Return'], places=12)
+                self.assertAlmostEqual(row['annualized_volatility'], summary['Annualized Volatility'], places=12)
+                self.assertAlmostEqual(row['sharpe_ratio'], summary['Sharpe Ratio'], places=10)
+                self.assertAlmostEqual(row['max_drawdown'], summary['Max Drawdown'], places=12)
+                self.assertEqual(row['n_trades'], int((out['position'].diff().abs().fillna(0) > 0).sum()))
+
+    def test_shape_validation(self):
+        with self.assertRaises(ValueError):
+            BacktestEngine.run_batch(np.ones((10, 2)), np.ones((9, 2, 1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
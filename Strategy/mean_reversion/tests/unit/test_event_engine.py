@@ -0,0 +1,162 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..')))
+sys.path.insert(0, STRATEGY_DIR)
+
+from src.backtesting_framework.engine import BacktestEngine
+from src.backtesting_framework.event_engine import EventBacktestEngine
+
+
+def single_leg(y_close, **fields):
+    """One pair whose x leg is never traded (hedge ratio 0), so the book is just the y leg."""
+    y_close = np.asarray(y_close, dtype=np.float64).reshape(-1, 1)
+    data = {'y_close': y_close, 'x_close': np.ones_like(y_close), 'hedge_ratio': 0.0}
+    data.update({k: np.asarray(v, dtype=np.float64).reshape(-1, 1) for k, v in fields.items()})
+    return data
+
+
+def constant(signal):
+    signal = np.asarray(signal, dtype=np.float64).reshape(-1, 1)
+    return lambda data: signal
+
+
+class TestLimitOrders(unittest.TestCase):
+    def setUp(self):
+        self.close = np.full(8, 100.0)
+        self.signal = np.ones(8)
+
+    def test_limit_fills_on_first_bar_that_crosses(self):
+        # Limit 1% below the signal bar's close (99); bar 1 only reaches 99.5, bar 2 trades through it.
+        low = np.array([100, 99.5, 98.5, 98, 98, 98, 98, 98])
+        data = single_leg(self.close, y_open=self.close, y_high=self.close + 1, y_low=low)
+        engine = EventBacktestEngine(data, constant(self.signal), order_type='limit', limit_offset=0.01,
+                                     limit_ttl=3, sizer=lambda *args: 9900.0)
+        results = engine.run()
+
+        self.assertIsNotNone(results)
+        self.assertEqual(len(engine.fills), 1)
+        fill = engine.fills[0]
+        self.assertEqual((fill['bar'], fill['pair'], fill['leg']), (2, 0, 0))
+        self.assertAlmostEqual(fill['price'], 99.0)
+        self.assertAlmostEqual(fill['quantity'], 9900.0 / 100.0)
+        # Bought 99 units at 99 and marked at 100 from the fill bar on.
+        np.testing.assert_allclose(results['equity_curve'].to_numpy()[2:], 100000 + 99.0)
+        np.testing.assert_allclose(results['equity_curve'].to_numpy()[:2], 100000)
+
+    def test_limit_fills_at_a_better_open(self):
+        low = np.array([100, 97, 97, 97, 97, 97, 97, 97])
+        open_ = np.array([100, 98, 100, 100, 100, 100, 100, 100])
+        data = single_leg(self.close, y_open=open_, y_low=low)
+        engine = EventBacktestEngine(data, constant(self.signal), order_type='limit', limit_offset=0.01,
+                                     sizer=lambda *args: 10000.0)
+        engine.run()
+        self.assertEqual(engine.fills[0]['bar'], 1)
+        self.assertAlmostEqual(engine.fills[0]['price'], 98.0)
+
+    def test_expired_limit_is_cancelled(self):
+        data = single_leg(self.close, y_low=np.full(8, 99.5))
+        engine = EventBacktestEngine(data, constant(self.signal), order_type='limit', limit_offset=0.01,
+                                     limit_ttl=3, limit_fallback='cancel', sizer=lambda *args: 10000.0)
+        results = engine.run()
+        self.assertEqual(len(engine.fills), 0)
+        np.testing.assert_allclose(results['equity_curve'], 100000)
+        np.testing.assert_allclose(results['gross_exposure'], 0.0)
+
+    def test_expired_limit_falls_back_to_market(self):
+        close = np.array([100, 100, 101, 102, 103, 104, 105, 106.0])
+        data = single_leg(close, y_low=close - 0.5)
+        engine = EventBacktestEngine(data, constant(self.signal), slippage=0.001, order_type='limit',
+                                     limit_offset=0.01, limit_ttl=3, limit_fallback='market',
+                                     sizer=lambda *args: 10000.0)
+        results = engine.run()
+
+        self.assertEqual(len(engine.fills), 1)
+        fill = engine.fills[0]
+        # Resting for bars 1..3 without a cross, then filled at bar 3's close plus slippage.
+        self.assertEqual(fill['bar'], 3)
+        self.assertAlmostEqual(fill['price'], 102 * 1.001)
+        self.assertAlmostEqual(fill['quantity'], 100.0)
+        equity = results['equity_curve'].to_numpy()
+        np.testing.assert_allclose(equity[:3], 100000)
+        np.testing.assert_allclose(equity[3:], 100000 + 100 * (close[3:] - 102 * 1.001))
+
+    def test_invalid_options(self):
+        data = single_leg(self.close)
+        with self.assertRaises(ValueError):
+            EventBacktestEngine(data, constant(self.signal), order_type='stop')
+        with self.assertRaises(ValueError):
+            EventBacktestEngine(data, constant(self.signal), limit_fallback='wait')
+
+
+class TestBorrowCosts(unittest.TestCase):
+    def test_borrow_accrues_on_the_short_leg_only(self):
+        n_bars = 10
+        y = np.full((n_bars, 1), 100.0)
+        x = np.full((n_bars, 1), 50.0)
+        data = {'y_close': y, 'x_close': x, 'hedge_ratio': 1.0}
+        # Long the spread from bar 0: +100 y and -100 x after the fill at bar 1.
+        engine = EventBacktestEngine(data, constant(np.ones(n_bars)), borrow_rate=0.0252,
+                                     periods_per_year=252, sizer=lambda *args: 15000.0)
+        results = engine.run()
+
+        holdings = {int(f['leg']): f['quantity'] for f in engine.fills}
+        self.assertAlmostEqual(holdings[0], 100.0)
+        self.assertAlmostEqual(holdings[1], -100.0)
+        per_bar = 0.0252 / 252 * 100 * 50
+        borrow = results['borrow_cost'].to_numpy()
+        np.testing.assert_allclose(borrow[:1], 0.0)
+        np.testing.assert_allclose(borrow[1:], per_bar)
+        np.testing.assert_allclose(results['equity_curve'].to_numpy(), 100000 - np.cumsum(borrow))
+        self.assertAlmostEqual(engine.pair_pnl[0], -per_bar * (n_bars - 1))
+
+    def test_no_borrow_on_longs(self):
+        data = single_leg(np.full(10, 100.0))
+        engine = EventBacktestEngine(data, constant(np.ones(10)), borrow_rate=0.05, sizer=lambda *args: 10000.0)
+        results = engine.run()
+        np.testing.assert_allclose(results['borrow_cost'], 0.0)
+
+
+class TestParityWithBacktestEngine(unittest.TestCase):
+    def test_zero_cost_pnl_matches_run(self):
+        rng = np.random.default_rng(3)
+        n_bars = 400
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, n_bars))
+        # Long runs of any length; shorts last one bar, since BacktestEngine rebalances a short daily
+        # while the event engine holds its units.
+        signal = (rng.random(n_bars) < 0.5).astype(np.float64)
+        shorts = np.flatnonzero(rng.random(n_bars - 1) < 0.1)
+        signal[shorts] = -1.0
+        signal[shorts + 1] = np.where(signal[shorts + 1] < 0, 0.0, signal[shorts + 1])
+        index = pd.date_range('2020-01-01', periods=n_bars, freq='D')
+
+        # Opening at the previous close and sizing at the whole equity reproduces run()'s
+        # "position = yesterday's signal, return = close-to-close" convention.
+        open_ = np.concatenate([[close[0]], close[:-1]])
+        data = single_leg(close, y_open=open_)
+        data['index'] = index
+        event = EventBacktestEngine(data, constant(signal), sizer=lambda capital, *args: capital)
+        event_results = event.run()
+
+        frame = pd.DataFrame({'close': close}, index=index)
+        vector = BacktestEngine(frame, lambda d: pd.Series(signal, index=d.index))
+        vector_results = vector.run()
+
+        np.testing.assert_allclose(event_results['equity_curve'].to_numpy(),
+                                   vector_results['equity_curve'].to_numpy(), rtol=1e-10)
+        np.testing.assert_allclose(event_results['strategy_returns'].to_numpy(),
+                                   vector_results['strategy_returns'].to_numpy(), atol=1e-12)
+        self.assertTrue(event_results.index.equals(index))
+        self.assertAlmostEqual(event.pair_pnl[0], event_results['equity_curve'].iloc[-1] - 100000, places=6)
+        summary, reference = event.summary(), vector.summary()
+        for key in ('Total Return', 'Sharpe Ratio', 'Max Drawdown'):
+            self.assertAlmostEqual(summary[key], reference[key], places=10)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,270 @@
+import os
+import sys
+import json
+import time
+import threading
+import tempfile
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..')))
+sys.path.insert(0, STRATEGY_DIR)
+
+from src.data_sources.fundamental_data_api import FundamentalDataAPI
+from src.data_sources.http_client import HttpClient, RetryableError, fetch_many, get_rate_limiter
+from src.data_sources.market_data_api import MarketDataAPI
+from src.data_sources.price_cache import OHLCV_COLUMNS
+
+
+class StubServer:
+    """Local HTTP server replaying scripted (status, headers, body) responses per path."""
+
+    def __init__(self):
+        self.script = {}
+        self.hits = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split('?')[0]
+                stub.hits.append((path, time.monotonic()))
+                responses = stub.script.get(path, [])
+                status, headers, body = responses.pop(0) if len(responses) > 1 else responses[0]
+                payload = json.dumps(body).encode()
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class TestHttpClient(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubServer()
+
+    def tearDown(self):
+        self.stub.close()
+
+    def _client(self, name, rate=1000.0, **kwargs):
+        return HttpClient(f"{self.id()}.{name}", rate_limit=rate, **kwargs)
+
+    def test_retries_transient_status_then_succeeds(self):
+        self.stub.script['/data'] = [(503, {}, {}), (429, {}, {}), (200, {}, {'ok': 1})]
+        client = self._client('retry', backoff=0.01)
+        self.assertEqual(client.get_json(self.stub.url + '/data'), {'ok': 1})
+        self.assertEqual(len(self.stub.hits), 3)
+
+    def test_gives_up_after_max_retries(self):
+        self.stub.script['/down'] = [(500, {}, {})]
+        client = self._client('give_up', max_retries=2, backoff=0.01)
+        with self.assertRaises(RetryableError):
+            client.get_json(self.stub.url + '/down')
+        self.assertEqual(len(self.stub.hits), 3)
+
+    def test_client_errors_are_not_retried(self):
+        self.stub.script['/missing'] = [(404, {}, {})]
+        with self.assertRaises(Exception):
+            self._client('no_retry', backoff=0.01).get_json(self.stub.url + '/missing')
+        self.assertEqual(len(self.stub.hits), 1)
+
+    def test_backoff_grows_and_honours_retry_after(self):
+        self.stub.script['/slow'] = [(429, {'Retry-After': '0.3'}, {}), (200, {}, {'ok': 1})]
+        self._client('retry_after', backoff=5.0).get_json(self.stub.url + '/slow')
+        gap = self.stub.hits[1][1] - self.stub.hits[0][1]
+        self.assertGreaterEqual(gap, 0.3)
+        self.assertLess(gap, 2.0)
+
+        client = self._client('backoff', backoff=0.1, max_backoff=0.5)
+        for attempt, cap in ((1, 0.1), (2, 0.2), (3, 0.4), (6, 0.5)):
+            delay = client._delay(attempt)
+            self.assertGreaterEqual(delay, cap / 2)
+            self.assertLessEqual(delay, cap)
+
+    def test_validator_retries_throttle_payloads(self):
+        self.stub.script['/query'] = [(200, {}, {'Note': 'API call frequency exceeded'}), (200, {}, {'Symbol': 'X'})]
+        api = FundamentalDataAPI('alphavantage', api_key='k', base_url=self.stub.url + '/query', rate_limit=1000.0)
+        api.client.backoff = 0.01
+        self.assertEqual(api.fetch('X'), {'Symbol': 'X'})
+        self.assertEqual(len(self.stub.hits), 2)
+
+    def test_rate_limit_is_shared_by_clients_of_a_provider(self):
+        self.stub.script['/tick'] = [(200, {}, {})]
+        first, second = self._client('shared', rate=20.0), self._client('shared', rate=20.0)
+        self.assertIs(first.limiter, second.limiter)
+        start = time.monotonic()
+        for i in range(30):
+            (first if i % 2 else second).get_json(self.stub.url + '/tick')
+        # A full bucket allows a burst of 20, the remaining 10 requests come at 20 per second.
+        self.assertGreaterEqual(time.monotonic() - start, 10 / 20.0 * 0.9)
+
+    def test_conflicting_rate_keeps_the_shared_bucket(self):
+        limiter = get_rate_limiter(f"{self.id()}.conflict", 2.0)
+        with self.assertLogs(level='WARNING'):
+            again = get_rate_limiter(f"{self.id()}.conflict", 10.0)
+        self.assertIs(again, limiter)
+        self.assertEqual(again.rate, 2.0)
+
+    def test_fetch_many_runs_concurrently_and_yields_every_symbol(self):
+        symbols = [f"S{i}" for i in range(12)]
+        for symbol in symbols:
+            self.stub.script[f"/{symbol}"] = [(200, {}, {'symbol': symbol})]
+        self.stub.script['/S3'] = [(404, {}, {})]
+        client = self._client('many', backoff=0.01)
+        lock, active, peak = threading.Lock(), [0], [0]
+
+        def fetch(symbol):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            try:
+                time.sleep(0.3 if symbol == 'S0' else 0.05)
+                return client.get_json(f"{self.stub.url}/{symbol}")
+            finally:
+                with lock:
+                    active[0] -= 1
+
+        with self.assertLogs(level='ERROR'):
+            results = list(fetch_many(fetch, symbols, max_workers=4))
+        self.assertEqual(sorted(s for s, _ in results), sorted(symbols))
+        # Completion order: the slow first symbol comes out last, the failed one as None.
+        self.assertEqual(results[-1], ('S0', {'symbol': 'S0'}))
+        self.assertIsNone(dict(results)['S3'])
+        self.assertTrue(all(data == {'symbol': s} for s, data in results if s != 'S3'))
+        self.assertEqual(peak[0], 4)
+
+    def test_closing_fetch_many_cancels_queued_fetches(self):
+        started = []
+
+        def fetch(symbol):
+            started.append(symbol)
+            time.sleep(0.2)
+            return symbol
+
+        results = fetch_many(fetch, [f"S{i}" for i in range(20)], max_workers=2)
+        start = time.monotonic()
+        next(results)
+        results.close()
+        self.assertLess(time.monotonic() - start, 1.0)
+        time.sleep(0.5)
+        self.assertLessEqual(len(started), 4)
+
+    def test_yahoo_downloads_take_the_shared_rate_limit(self):
+        calls = []
+        frame = pd.DataFrame({'Close': [1.0]}, index=pd.DatetimeIndex(['2021-01-04']))
+        yfinance = SimpleNamespace(download=lambda symbol, start, end: calls.append((symbol, start, end)) or frame)
+        api = MarketDataAPI('yahoo')
+        self.assertIs(api.client.limiter, get_rate_limiter('yahoo'))
+        with mock.patch.object(api.client.limiter, 'acquire') as acquire, \
+                mock.patch.dict(sys.modules, {'yfinance': yfinance}):
+            self.assertIs(api.fetch('AAA', '2021-01-04', '2021-01-08'), frame)
+        acquire.assert_called_once_with()
+        # yfinance's end is exclusive, so the inclusive end date is pushed out by a day.
+        self.assertEqual(calls, [('AAA', '2021-01-04', pd.Timestamp('2021-01-09'))])
+
+    def test_empty_fmp_payload_is_a_value_error(self):
+        for payload in ([], {}, {'Error Message': 'Invalid API KEY'}):
+            with self.assertRaises(ValueError):
+                FundamentalDataAPI._validate_fmp(payload)
+        FundamentalDataAPI._validate_fmp([{'symbol': 'X'}])
+
+
+def _daily_adjusted(dates):
+    """An AlphaVantage TIME_SERIES_DAILY_ADJUSTED payload, newest first, with close = 100 + bar number."""
+    bars = {}
+    for i, date in enumerate(dates):
+        price = str(100.0 + i)
+        bars[str(date)] = {'1. open': price, '2. high': price, '3. low': price, '4. close': price,
+                           '5. adjusted close': price, '6. volume': '1000', '7. dividend amount': '0.0000',
+                           '8. split coefficient': '1.0'}
+    return {'Meta Data': {}, 'Time Series (Daily)': dict(reversed(list(bars.items())))}
+
+
+class TestMarketDataAPI(unittest.TestCase):
+    def setUp(self):
+        self.stub = StubServer()
+        self.dates = [d.date() for d in pd.bdate_range('2021-01-04', '2021-02-26')]
+        self.stub.script['/query'] = [(200, {}, _daily_adjusted(self.dates))]
+
+    def tearDown(self):
+        self.stub.close()
+
+    def _api(self, **kwargs):
+        api = MarketDataAPI('alphavantage', api_key='k', base_url=self.stub.url + '/query', rate_limit=1000.0, **kwargs)
+        api.client.backoff = 0.01
+        return api
+
+    def test_normalize_alphavantage_payload(self):
+        frame = MarketDataAPI.normalize(_daily_adjusted(self.dates))
+        self.assertEqual(list(frame.columns), OHLCV_COLUMNS)
+        self.assertTrue((frame.dtypes == 'float64').all())
+        self.assertEqual(frame.index.name, 'date')
+        self.assertTrue(frame.index.is_monotonic_increasing)
+        self.assertEqual(frame.index[0], pd.Timestamp('2021-01-04'))
+        self.assertEqual(frame['adj_close'].iloc[-1], 100.0 + len(self.dates) - 1)
+        with self.assertRaises(ValueError):
+            MarketDataAPI.normalize({'Meta Data': {}})
+
+    def test_normalize_yfinance_frame(self):
+        # Recent yfinance returns (field, ticker) columns and no 'Adj Close' unless asked for.
+        index = pd.DatetimeIndex(['2021-01-05', '2021-01-04'], name='Date')
+        columns = pd.MultiIndex.from_product([['Open', 'High', 'Low', 'Close', 'Volume'], ['AAA']])
+        frame = MarketDataAPI.normalize(pd.DataFrame([[2, 3, 1, 2.5, 10], [1, 2, 0.5, 1.5, 20]], index=index,
+                                                     columns=columns))
+        self.assertEqual(list(frame.columns), OHLCV_COLUMNS)
+        self.assertEqual(list(frame.index), [pd.Timestamp('2021-01-04'), pd.Timestamp('2021-01-05')])
+        np.testing.assert_array_equal(frame['adj_close'], frame['close'])
+        np.testing.assert_array_equal(frame['volume'], [20.0, 10.0])
+
+    def test_fetch_ohlcv_restricts_to_inclusive_range(self):
+        frame = self._api().fetch_ohlcv('AAA', '2021-01-11', '2021-01-15')
+        self.assertEqual(list(frame.index), list(pd.bdate_range('2021-01-11', '2021-01-15')))
+        self.stub.script['/query'] = [(200, {}, {'Error Message': 'Invalid API call.'})]
+        with self.assertLogs(level='ERROR'):
+            self.assertIsNone(self._api().fetch_ohlcv('AAA', '2021-01-11', '2021-01-15'))
+
+    def test_fetch_cached_reuses_stored_bars(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            api = self._api(cache_dir=cache_dir)
+            first = api.fetch_cached('AAA', '2021-01-04', '2021-02-26')
+            self.assertEqual(len(first), len(self.dates))
+            inner = api.fetch_cached('AAA', '2021-02-01', '2021-02-12')
+            self.assertEqual(len(self.stub.hits), 1)
+            pd.testing.assert_frame_equal(inner, first.loc['2021-02-01':'2021-02-12'], check_freq=False)
+
+    def test_failed_fetch_is_retried_on_the_next_read(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            api = self._api(cache_dir=cache_dir)
+            api.fetch_cached('AAA', '2021-02-01', '2021-02-26')
+            # The head fetch fails: the read serves what is cached and leaves the head unchecked.
+            self.stub.script['/query'] = [(200, {}, {'Error Message': 'Invalid API call.'}),
+                                          (200, {}, _daily_adjusted(self.dates))]
+            with self.assertLogs(level='WARNING'):
+                partial = api.fetch_cached('AAA', '2021-01-04', '2021-02-26')
+            self.assertEqual(partial.index[0], pd.Timestamp('2021-02-01'))
+            full = api.fetch_cached('AAA', '2021-01-04', '2021-02-26')
+            self.assertEqual(len(self.stub.hits), 3)
+            self.assertEqual(len(full), len(self.dates))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,236 @@
+import os
+import sys
+import time
+import logging
+import tempfile
+import unittest
+import tracemalloc
+
+import numpy as np
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..')))
+sys.path.insert(0, STRATEGY_DIR)
+
+from src.logging_config import LATENCY_BUCKETS, ErrorCounter, Instrumentation, SamplingProfiler, instrumentation, timed
+
+
+def _busy_loop(seconds):
+    end = time.perf_counter() + seconds
+    total = 0
+    while time.perf_counter() < end:
+        total += sum(range(200))
+    return total
+
+
+class TestTracemallocOwnership(unittest.TestCase):
+    def setUp(self):
+        self.was_tracing = tracemalloc.is_tracing()
+        if self.was_tracing:
+            tracemalloc.stop()
+
+    def tearDown(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if self.was_tracing:
+            tracemalloc.start()
+
+    def test_disable_stops_tracing_it_started(self):
+        registry = Instrumentation()
+        registry.enable(track_memory=True)
+        self.assertTrue(tracemalloc.is_tracing())
+        registry.disable()
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_disable_leaves_foreign_tracing_running(self):
+        tracemalloc.start()
+        registry = Instrumentation()
+        registry.enable(track_memory=True)
+        registry.disable()
+        self.assertTrue(tracemalloc.is_tracing())
+
+    def test_repeated_enable_keeps_ownership(self):
+        registry = Instrumentation()
+        registry.enable(track_memory=True)
+        registry.enable(track_memory=True)
+        registry.disable()
+        self.assertFalse(tracemalloc.is_tracing())
+        # A second disable, or one without memory tracking, never touches someone else's tracing.
+        tracemalloc.start()
+        registry.disable()
+        registry.enable()
+        registry.disable()
+        self.assertTrue(tracemalloc.is_tracing())
+
+
+class TestInstrumentation(unittest.TestCase):
+    def setUp(self):
+        self.was_enabled = instrumentation.enabled
+        instrumentation.disable()
+        instrumentation.reset()
+
+    def tearDown(self):
+        instrumentation.disable()
+        instrumentation.reset()
+        if self.was_enabled:
+            instrumentation.enable()
+
+    def test_memory_growth_is_net_of_freed_memory(self):
+        instrumentation.enable(track_memory=True)
+        with timed('kept'):
+            kept = bytearray(4 * 2**20)
+        with timed('freed'):
+            freed = bytearray(4 * 2**20)
+            del freed
+        snapshot = instrumentation.snapshot()
+        self.assertGreaterEqual(snapshot['kept']['mem_growth_bytes_total'], 4 * 2**20)
+        self.assertEqual(snapshot['kept']['mem_growth_bytes_max'], snapshot['kept']['mem_growth_bytes_total'])
+        # 4 MB passed through 'freed', but none of it was still held when the block exited.
+        self.assertLess(snapshot['freed']['mem_growth_bytes_total'], 2**16)
+        self.assertIn('mr_mem_growth_bytes_total{function="kept"}', instrumentation.to_prometheus())
+        del kept
+
+    def test_timings_and_errors(self):
+        instrumentation.enable()
+
+        @timed('work')
+        def work(fail=False):
+            if fail:
+                logging.getLogger('test').error("failed")
+            return 1
+
+        logger = logging.getLogger('test')
+        handler = ErrorCounter(instrumentation)
+        logger.addHandler(handler)
+        try:
+            self.assertEqual(work(), 1)
+            work(fail=True)
+        finally:
+            logger.removeHandler(handler)
+        entry = instrumentation.snapshot()['work']
+        self.assertEqual((entry['calls'], entry['errors']), (2, 1))
+        self.assertNotIn('mem_growth_bytes_total', entry)
+        self.assertLessEqual(entry['p50_seconds'], entry['max_seconds'])
+
+    def test_latency_quantiles_resolve_milliseconds(self):
+        registry = Instrumentation()
+        for seconds in np.linspace(1e-3, 5e-3, 401):
+            registry.record('stage', seconds)
+        entry = registry.snapshot()['stage']
+        self.assertAlmostEqual(entry['p50_seconds'], 3e-3, delta=2e-4)
+        self.assertAlmostEqual(entry['p99_seconds'], 4.96e-3, delta=2e-4)
+        self.assertLessEqual(entry['p99_seconds'], entry['max_seconds'])
+
+    def test_single_sample_quantiles_are_the_sample(self):
+        registry = Instrumentation()
+        registry.record('once', 0.0123)
+        entry = registry.snapshot()['once']
+        self.assertAlmostEqual(entry['p50_seconds'], 0.0123)
+        self.assertAlmostEqual(entry['p99_seconds'], 0.0123)
+
+    def test_disabled_timer_records_nothing(self):
+        with timed('idle'):
+            pass
+        self.assertEqual(instrumentation.snapshot(), {})
+
+
+class TestSamplingProfiler(unittest.TestCase):
+    def test_samples_the_running_thread(self):
+        profiler = SamplingProfiler(interval=0.002)
+        profiler.start()
+        try:
+            _busy_loop(0.3)
+        finally:
+            profiler.stop()
+        self.assertGreater(profiler.samples, 20)
+        self.assertIsNone(profiler._thread)
+        busy = [stack for stack in profiler.stacks if 'test_logging_config.py:_busy_loop' in stack]
+        self.assertTrue(busy)
+        # Stacks run from the outermost frame to the leaf.
+        self.assertTrue(all(stack.index('test_samples_the_running_thread') < stack.index('_busy_loop') for stack in busy))
+        top_function, share = profiler.top(1)[0]
+        self.assertIn(top_function, ('test_logging_config.py:_busy_loop', 'test_logging_config.py:<genexpr>'))
+        self.assertGreater(share, 0.5)
+        self.assertAlmostEqual(sum(share for _, share in profiler.top(len(profiler.stacks))), 1.0)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'profile.folded')
+            profiler.write_collapsed(path)
+            with open(path) as f:
+                lines = f.read().splitlines()
+        self.assertEqual(len(lines), len(profiler.stacks))
+        parsed = {line.rsplit(' ', 1)[0]: int(line.rsplit(' ', 1)[1]) for line in lines}
+        self.assertEqual(parsed, dict(profiler.stacks))
+
+    def test_export_writes_metrics_and_collapsed_stacks(self):
+        registry = Instrumentation()
+        registry.enable(profile=True, profile_interval=0.002)
+        live = Instrumentation()
+        live.record('live.update', 0.002)
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                _busy_loop(0.1)
+                registry.record('stage', 0.01)
+                metrics, profile = os.path.join(tmp, 'metrics.prom'), os.path.join(tmp, 'profile.folded')
+                self.assertEqual(registry.export(metrics, profile, extra={'mr_live': live}), [metrics, profile])
+            finally:
+                registry.disable()
+            with open(metrics) as f:
+                text = f.read()
+            with open(profile) as f:
+                stacks = f.read()
+            self.assertEqual(sorted(os.listdir(tmp)), ['metrics.prom', 'profile.folded'])
+        self.assertIn('mr_calls_total{function="stage"} 1', text)
+        self.assertIn('mr_live_calls_total{function="live.update"} 1', text)
+        self.assertIn('_busy_loop', stacks)
+        with self.assertLogs(level='WARNING'):
+            self.assertEqual(Instrumentation().export(profile_path=os.path.join('missing', 'profile')), [])
+
+
+class TestPrometheusExposition(unittest.TestCase):
+    def _parse(self, text):
+        types, samples = {}, {}
+        for line in text.splitlines():
+            if line.startswith('# TYPE '):
+                _, _, name, kind = line.split(' ')
+                types[name] = kind
+            else:
+                key, value = line.rsplit(' ', 1)
+                samples[key] = float(value)
+        return types, samples
+
+    def test_histogram_is_cumulative_and_consistent(self):
+        registry = Instrumentation()
+        seconds = [2e-4, 1e-3, 1e-3, 3.3e-3, 0.02, 0.02, 7.0, 42.0]
+        for value in seconds:
+            registry.record('stage', value)
+        registry.record('other', 0.5)
+        types, samples = self._parse(registry.to_prometheus(prefix='test'))
+        self.assertEqual(types, {'test_calls_total': 'counter', 'test_errors_total': 'counter',
+                                 'test_mem_growth_bytes_total': 'counter', 'test_latency_seconds': 'histogram'})
+
+        buckets = [samples[f'test_latency_seconds_bucket{{function="stage",le="{le}"}}']
+                   for le in [repr(b) for b in LATENCY_BUCKETS[:-1]] + ['+Inf']]
+        # Buckets are cumulative, `le` is inclusive, and +Inf equals the count.
+        self.assertEqual(buckets, [sum(v <= b for v in seconds) for b in LATENCY_BUCKETS])
+        self.assertEqual(samples['test_latency_seconds_bucket{function="stage",le="0.001"}'], 3)
+        self.assertEqual(buckets[-1], samples['test_latency_seconds_count{function="stage"}'])
+        self.assertEqual(samples['test_latency_seconds_count{function="stage"}'], len(seconds))
+        self.assertAlmostEqual(samples['test_latency_seconds_sum{function="stage"}'], sum(seconds))
+        self.assertEqual(samples['test_calls_total{function="other"}'], 1)
+        self.assertEqual(samples['test_errors_total{function="stage"}'], 0)
+
+    def test_plain_text_summary_carries_the_metrics(self):
+        registry = Instrumentation()
+        for value in (0.001, 0.002, 0.003):
+            registry.record('stage', value)
+        with self.assertLogs('instrumentation', level='INFO') as logs:
+            registry.log_summary()
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('stage: 3 calls, 0 errors, mean 2.000 ms', logs.output[0])
+        self.assertIn('p99', logs.output[0])
+        self.assertEqual(logs.records[0].metrics['calls'], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,208 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..')))
+sys.path.insert(0, STRATEGY_DIR)
+
+from src.backtesting_framework.metrics import PerformanceMetrics
+
+
+def _make_returns(n_bars=750, n_cols=6, seed=0):
+    rng = np.random.default_rng(seed)
+    # Skewed, fat-tailed columns with different drifts, so the higher-moment terms matter.
+    returns = 0.0004 * np.arange(n_cols) + 0.01 * rng.standard_t(5, (n_bars, n_cols))
+    returns += 0.004 * (rng.exponential(1, (n_bars, n_cols)) - 1) * np.linspace(-1, 1, n_cols)
+    return returns
+
+
+def _psr(r, benchmark):
+    """Bailey & Lopez de Prado (2012), eq. 8, from scipy's sample moments."""
+    n = len(r)
+    sharpe = r.mean() / r.std(ddof=1)
+    skew = stats.skew(r)
+    kurt = stats.kurtosis(r, fisher=False)
+    return stats.norm.cdf((sharpe - benchmark) * np.sqrt(n - 1)
+                          / np.sqrt(1 - skew * sharpe + (kurt - 1) / 4 * sharpe ** 2))
+
+
+class TestSharpeInference(unittest.TestCase):
+    def setUp(self):
+        self.returns = _make_returns()
+
+    def test_probabilistic_sharpe_matches_closed_form(self):
+        psr = PerformanceMetrics.probabilistic_sharpe_ratio(self.returns, benchmark_sharpe=0.02)
+        expected = [_psr(self.returns[:, j], 0.02) for j in range(self.returns.shape[1])]
+        np.testing.assert_allclose(psr, expected, rtol=1e-10)
+        self.assertAlmostEqual(PerformanceMetrics.probabilistic_sharpe_ratio(self.returns[:, 3]),
+                               _psr(self.returns[:, 3], 0.0), places=12)
+
+    def test_probabilistic_sharpe_is_one_half_at_the_benchmark(self):
+        r = self.returns[:, 2]
+        sharpe = r.mean() / r.std(ddof=1)
+        self.assertAlmostEqual(PerformanceMetrics.probabilistic_sharpe_ratio(r, sharpe), 0.5, places=12)
+
+    def test_deflated_sharpe_matches_closed_form(self):
+        n_trials = self.returns.shape[1]
+        sharpe = self.returns.mean(axis=0) / self.returns.std(axis=0, ddof=1)
+        expected_max = ((1 - np.euler_gamma) * stats.norm.ppf(1 - 1 / n_trials)
+                        + np.euler_gamma * stats.norm.ppf(1 - 1 / (n_trials * np.e)))
+        benchmark = np.std(sharpe, ddof=1) * expected_max
+        dsr = PerformanceMetrics.deflated_sharpe_ratio(self.returns)
+        expected = [_psr(self.returns[:, j], benchmark) for j in range(n_trials)]
+        np.testing.assert_allclose(dsr, expected, rtol=1e-10)
+        # More trials raise the bar; a single trial is the plain PSR against zero.
+        self.assertTrue((PerformanceMetrics.deflated_sharpe_ratio(self.returns, n_trials=100) < dsr).all())
+        np.testing.assert_allclose(PerformanceMetrics.deflated_sharpe_ratio(self.returns, n_trials=1),
+                                   PerformanceMetrics.probabilistic_sharpe_ratio(self.returns), rtol=1e-12)
+
+    def test_deflated_sharpe_with_explicit_trial_variance(self):
+        r = self.returns[:, 4]
+        expected_max = ((1 - np.euler_gamma) * stats.norm.ppf(1 - 1 / 50)
+                        + np.euler_gamma * stats.norm.ppf(1 - 1 / (50 * np.e)))
+        self.assertAlmostEqual(PerformanceMetrics.deflated_sharpe_ratio(r, n_trials=50, trials_sharpe_var=0.0004),
+                               _psr(r, 0.02 * expected_max), places=12)
+
+
+class TestBootstrapSharpe(unittest.TestCase):
+    def setUp(self):
+        self.returns = _make_returns(n_bars=500, n_cols=4, seed=1)
+
+    def _reference(self, n_boot, block_size, seed, batch_size):
+        # Resample the rows explicitly and compute pandas' mean / std on each resample.
+        n_obs = len(self.returns)
+        samples = []
+        for child, start in zip(np.random.SeedSequence(seed).spawn(-(-n_boot // batch_size)), range(0, n_boot, batch_size)):
+            rng = np.random.default_rng(child)
+            n_blocks = -(-n_obs // block_size)
+            starts = rng.integers(0, n_obs, size=(min(batch_size, n_boot - start), n_blocks))
+            for row_starts in starts:
+                rows = (row_starts[:, None] + np.arange(block_size)).ravel()[:n_obs] % n_obs
+                frame = pd.DataFrame(self.returns[rows])
+                samples.append((frame.mean() / frame.std() * np.sqrt(252)).to_numpy())
+        return np.array(samples)
+
+    def test_samples_match_explicit_resampling(self):
+        for block_size in (1, 7):
+            result, samples = PerformanceMetrics.bootstrap_sharpe(self.returns, n_boot=120, block_size=block_size,
+                                                                  seed=5, batch_size=50, return_samples=True)
+            expected = self._reference(120, block_size, 5, 50)
+            np.testing.assert_allclose(samples, expected, rtol=1e-9)
+            np.testing.assert_allclose(result['mean'], expected.mean(axis=0), rtol=1e-9)
+            np.testing.assert_allclose(result['lower'], np.quantile(expected, 0.025, axis=0), rtol=1e-9)
+            np.testing.assert_allclose(result['prob_positive'], (expected > 0).mean(axis=0))
+
+    def test_full_sample_sharpe_and_standard_error(self):
+        frame = pd.DataFrame(self.returns, columns=list('abcd'))
+        result = PerformanceMetrics.bootstrap_sharpe(frame, n_boot=4000, seed=0)
+        self.assertEqual(list(result.index), list('abcd'))
+        np.testing.assert_allclose(result['sharpe'], frame.mean() / frame.std() * np.sqrt(252), rtol=1e-12)
+        # The iid bootstrap standard error is close to the asymptotic one, sqrt((1 + SR^2 / 2) / n) per period.
+        per_period = (frame.mean() / frame.std()).to_numpy()
+        asymptotic = np.sqrt((1 + per_period ** 2 / 2) / len(frame)) * np.sqrt(252)
+        np.testing.assert_allclose(result['std'], asymptotic, rtol=0.15)
+
+    def test_pool_matches_serial(self):
+        serial = PerformanceMetrics.bootstrap_sharpe(self.returns, n_boot=300, block_size=5, seed=3, batch_size=100)
+        pooled = PerformanceMetrics.bootstrap_sharpe(self.returns, n_boot=300, block_size=5, seed=3, batch_size=100,
+                                                     n_jobs=2)
+        pd.testing.assert_frame_equal(serial, pooled)
+
+
+class TestRollingMetrics(unittest.TestCase):
+    def setUp(self):
+        returns = _make_returns(n_bars=400, n_cols=3, seed=2)
+        returns[::9, 1] = 0.0
+        returns[50:53, 2] = np.nan
+        self.returns = returns
+        # NaN returns count as flat periods.
+        self.frame = pd.DataFrame(returns).fillna(0.0)
+        self.window = 40
+
+    def test_rolling_volatility_matches_pandas(self):
+        expected = self.frame.rolling(self.window).std() * np.sqrt(252)
+        np.testing.assert_allclose(PerformanceMetrics.rolling_volatility(self.returns, self.window), expected,
+                                   rtol=1e-8, equal_nan=True)
+
+    def test_rolling_sharpe_matches_pandas(self):
+        rolling = self.frame.rolling(self.window)
+        expected = rolling.mean() * 252 / (rolling.std() * np.sqrt(252))
+        np.testing.assert_allclose(PerformanceMetrics.rolling_sharpe(self.returns, self.window), expected,
+                                   rtol=1e-8, equal_nan=True)
+
+    def test_rolling_sortino_matches_pandas(self):
+        downside = np.sqrt((self.frame.clip(upper=0) ** 2).rolling(self.window).mean() * 252)
+        expected = self.frame.rolling(self.window).mean() * 252 / downside
+        np.testing.assert_allclose(PerformanceMetrics.rolling_sortino(self.returns, self.window), expected,
+                                   rtol=1e-8, equal_nan=True)
+
+    def test_rolling_hit_rate_matches_pandas(self):
+        expected = (self.frame > 0).rolling(self.window).sum() / (self.frame != 0).rolling(self.window).sum()
+        np.testing.assert_allclose(PerformanceMetrics.rolling_hit_rate(self.returns, self.window), expected,
+                                   rtol=1e-12, equal_nan=True)
+
+    def test_rolling_drawdown_matches_pandas(self):
+        wealth = (1 + self.frame).cumprod()
+        expected = wealth / wealth.cummax() - 1
+        drawdown = PerformanceMetrics.rolling_drawdown(self.returns)
+        np.testing.assert_allclose(drawdown, expected, atol=1e-12)
+        np.testing.assert_allclose(PerformanceMetrics.max_drawdown(self.returns), expected.min(), atol=1e-12)
+
+    def test_summary_matches_scalar_metrics(self):
+        summary = PerformanceMetrics.summary(self.returns, chunk_size=2)
+        for j in range(self.returns.shape[1]):
+            r = self.returns[:, j]
+            row = summary.iloc[j]
+            self.assertAlmostEqual(row['sharpe_ratio'], PerformanceMetrics.sharpe_ratio(r), places=12)
+            self.assertAlmostEqual(row['sortino_ratio'], PerformanceMetrics.sortino_ratio(r), places=12)
+            self.assertAlmostEqual(row['calmar_ratio'], PerformanceMetrics.calmar_ratio(r), places=12)
+            self.assertEqual(row['max_drawdown_duration'], PerformanceMetrics.drawdown_duration(r))
+            self.assertAlmostEqual(row['annualized_volatility'], self.frame[j].std() * np.sqrt(252), places=12)
+
+
+class TestRankAndTurnover(unittest.TestCase):
+    def setUp(self):
+        self.returns = _make_returns(n_bars=500, n_cols=6, seed=3)
+        rng = np.random.default_rng(4)
+        self.positions = rng.choice([-1.0, 0.0, 1.0], size=(500, 6), p=[0.1, 0.8, 0.1])
+        self.positions[:, 2] = 0.0
+        self.positions[::50, 4] = np.nan
+
+    def test_turnover_matches_position_changes(self):
+        filled = np.nan_to_num(self.positions)
+        expected = [np.abs(np.diff(filled[:, j])).mean() * 252 for j in range(6)]
+        np.testing.assert_allclose(PerformanceMetrics.turnover(self.positions), expected, rtol=1e-12)
+        self.assertEqual(PerformanceMetrics.turnover(self.positions[:, 2]), 0.0)
+        # Flipping from long to short every period trades two units per period.
+        flips = np.tile([1.0, -1.0], 50)
+        self.assertAlmostEqual(PerformanceMetrics.turnover(flips, periods_per_year=12), 24.0)
+
+    def test_rank_sorts_best_first_per_metric(self):
+        summary = PerformanceMetrics.summary(self.returns, self.positions)
+        for by, ascending in (('sharpe_ratio', False), ('annualized_volatility', True),
+                              ('max_drawdown_duration', True), ('max_drawdown', False), ('turnover', True)):
+            ranked = PerformanceMetrics.rank(self.returns, self.positions, by=by)
+            self.assertEqual(list(ranked.index), list(summary[by].sort_values(ascending=ascending, kind='stable').index),
+                             msg=by)
+        # max_drawdown is negative: the shallowest drawdown ranks first.
+        drawdowns = PerformanceMetrics.rank(self.returns, by='max_drawdown')['max_drawdown']
+        self.assertEqual(drawdowns.iloc[0], drawdowns.max())
+        self.assertLess(drawdowns.max(), 0)
+        self.assertEqual(PerformanceMetrics.rank(self.returns, self.positions, by='turnover')['turnover'].iloc[0], 0.0)
+
+    def test_rank_top_override_and_deflated_sharpe(self):
+        ranked = PerformanceMetrics.rank(self.returns, by='annualized_volatility', ascending=False, top=2)
+        volatility = PerformanceMetrics.summary(self.returns)['annualized_volatility']
+        self.assertEqual(list(ranked.index), list(volatility.nlargest(2).index))
+        full = PerformanceMetrics.rank(self.returns, n_trials=20)
+        np.testing.assert_allclose(full.sort_index()['deflated_sharpe'],
+                                   PerformanceMetrics.deflated_sharpe_ratio(self.returns, n_trials=20), rtol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
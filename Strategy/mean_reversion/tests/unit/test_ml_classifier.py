@@ -0,0 +1,103 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.pair_selection.ml_classifier import (
+    FEATURE_NAMES, PairClassifier, PairFeatureStore, PairSelectorModel, pair_features,
+)
+
+
+def _make_prices(n_bars=400, n_assets=8, seed=0):
+    rng = np.random.default_rng(seed)
+    base = np.cumsum(rng.normal(0, 0.01, (n_bars, 2)), axis=0)
+    log_prices = np.repeat(base, n_assets // 2, axis=1) + rng.normal(0, 0.005, (n_bars, n_assets))
+    log_prices[:, ::3] += np.cumsum(rng.normal(0, 0.01, (n_bars, len(range(0, n_assets, 3)))), axis=0)
+    index = pd.bdate_range('2020-01-01', periods=n_bars)
+    return pd.DataFrame(np.exp(4 + log_prices), index=index, columns=[f"A{i}" for i in range(n_assets)])
+
+
+class TestPairFeatureStore(unittest.TestCase):
+    def setUp(self):
+        self.prices = _make_prices()
+        self.pairs = np.array(np.triu_indices(self.prices.shape[1], k=1)).T
+        self.dates = self.prices.index[150:300:25]
+
+    def test_features_match_single_pair_computation(self):
+        store = PairFeatureStore.build(self.prices, self.pairs, self.dates, window=120, chunk_size=7)
+        self.assertEqual(store.features.shape, (len(self.dates), len(self.pairs), len(FEATURE_NAMES)))
+        row = self.prices.index.get_loc(self.dates[2])
+        window = np.log(self.prices.to_numpy())[row - 119:row + 1]
+        expected = pair_features(window, self.pairs[5:6, 0], self.pairs[5:6, 1])[0]
+        np.testing.assert_allclose(store.date_slice(self.dates[2])[5], expected, rtol=1e-6)
+
+        a = np.diff(window[:, self.pairs[5, 0]])
+        b = np.diff(window[:, self.pairs[5, 1]])
+        self.assertAlmostEqual(float(expected[0]), np.corrcoef(a, b)[0, 1], places=5)
+
+    def test_unsorted_dates_are_rejected(self):
+        with self.assertRaises(ValueError):
+            PairFeatureStore.build(self.prices, self.pairs, self.dates[::-1], window=120)
+        with self.assertRaises(ValueError):
+            PairFeatureStore.build(self.prices, self.pairs, self.dates.append(self.dates[-1:]), window=120)
+        with self.assertRaises(ValueError):
+            PairFeatureStore.build(self.prices.iloc[::-1], self.pairs, self.dates, window=120)
+
+    def test_load_or_build_reuses_store(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            first = PairFeatureStore.load_or_build(tmp, self.prices, self.pairs, self.dates, window=120)
+            second = PairFeatureStore.load_or_build(tmp, self.prices, self.pairs, self.dates, window=120)
+            self.assertIsInstance(second.features, np.memmap)
+            np.testing.assert_array_equal(np.asarray(first.features), np.asarray(second.features))
+            history = second.pair_history('A0', 'A2')
+            self.assertEqual(list(history.columns), FEATURE_NAMES)
+
+
+class TestPairClassifier(unittest.TestCase):
+    def test_versioned_model_is_loaded_lazily(self):
+        prices = _make_prices()
+        pairs = np.array(np.triu_indices(prices.shape[1], k=1)).T
+        dates = prices.index[120:260:10]
+        store = PairFeatureStore.build(prices, pairs, dates, window=120)
+        labels = PairClassifier.make_labels(prices, store, horizon=120)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            from sklearn.linear_model import LogisticRegression
+            trainer = PairClassifier(PairSelectorModel(models_dir=tmp))
+            self.assertEqual(trainer.fit(store, labels, estimator=LogisticRegression()), 1)
+            self.assertEqual(trainer.fit(store, labels, estimator=LogisticRegression(C=0.1)), 2)
+
+            handle = PairSelectorModel(models_dir=tmp)
+            self.assertIsNone(handle._model)
+            scores = PairClassifier(handle, batch_size=5).score(store, dates[-1])
+            self.assertEqual(handle.version, 2)
+            self.assertEqual(len(scores), len(pairs))
+            direct = handle.model.predict_proba(np.asarray(store.date_slice(dates[-1])))[:, 1]
+            np.testing.assert_allclose(np.sort(scores['probability'].to_numpy()), np.sort(direct), rtol=1e-6)
+
+    def test_dates_without_full_horizon_are_unknown_and_not_trained_on(self):
+        prices = _make_prices()
+        pairs = np.array(np.triu_indices(prices.shape[1], k=1)).T
+        dates = prices.index[120:400:20]
+        store = PairFeatureStore.build(prices, pairs, dates, window=120)
+        labels = PairClassifier.make_labels(prices, store, horizon=120)
+        complete = prices.index.get_indexer(dates) + 120 < len(prices)
+        self.assertTrue(complete.any() and not complete.all())
+        self.assertTrue((labels[~complete] == -1).all())
+        self.assertTrue(np.isin(labels[complete], [0, 1]).all())
+
+        with tempfile.TemporaryDirectory() as tmp:
+            from sklearn.linear_model import LogisticRegression
+            trainer = PairClassifier(PairSelectorModel(models_dir=tmp))
+            trainer.fit(store, labels, estimator=LogisticRegression())
+            self.assertEqual(trainer.model.metadata['n_samples'], complete.sum() * len(pairs))
+            self.assertEqual(list(trainer.model.model.classes_), [0, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..')))
+sys.path.insert(0, STRATEGY_DIR)
+
+from src.data_sources.price_cache import OHLCV_COLUMNS, PriceCache
+
+
+class FakeProvider:
+    """Business-day bars from a listing date to today, counting every fetch."""
+
+    def __init__(self, listed='2020-03-02'):
+        dates = pd.bdate_range(listed, pd.Timestamp.now().normalize(), name='date').as_unit('ns')
+        close = 100 + np.arange(len(dates), dtype=np.float64)
+        self.data = pd.DataFrame({col: close for col in OHLCV_COLUMNS}, index=dates)
+        self.calls = []
+
+    def fetch_ohlcv(self, symbol, start_date, end_date):
+        self.calls.append((start_date, end_date))
+        return self.data.loc[start_date:end_date]
+
+
+class TestPriceCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.provider = FakeProvider()
+        self.cache = PriceCache(self.tmp.name, provider=self.provider)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_weekend_end_is_not_refetched(self):
+        first = self.cache.get('AAA', '2021-01-04', '2021-01-10')  # Sunday
+        for _ in range(3):
+            again = self.cache.get('AAA', '2021-01-04', '2021-01-10')
+        self.assertEqual(len(self.provider.calls), 1)
+        pd.testing.assert_frame_equal(again, first)
+        self.assertEqual(first.index[-1], pd.Timestamp('2021-01-08'))
+
+    def test_pre_listing_start_is_not_refetched(self):
+        first = self.cache.get('AAA', '2019-06-01', '2020-06-30')
+        self.cache.get('AAA', '2019-06-01', '2020-06-30')
+        self.cache.get('AAA', '2019-09-01', '2020-05-29')
+        self.assertEqual(len(self.provider.calls), 1)
+        self.assertEqual(first.index[0], pd.Timestamp('2020-03-02'))
+
+    def test_only_missing_ranges_are_fetched(self):
+        self.cache.get('AAA', '2021-01-04', '2021-03-31')
+        extended = self.cache.get('AAA', '2020-12-01', '2021-06-30')
+        self.assertEqual(self.provider.calls[1:], [('2020-12-01', '2021-01-03'), ('2021-04-01', '2021-06-30')])
+        pd.testing.assert_frame_equal(extended, self.provider.data.loc['2020-12-01':'2021-06-30'], check_freq=False)
+        self.cache.get('AAA', '2020-12-15', '2021-06-30')
+        self.assertEqual(len(self.provider.calls), 3)
+
+    def test_open_ended_reads_refresh_after_timeout(self):
+        self.cache.get('AAA', '2024-01-02')
+        self.cache.get('AAA', '2024-01-02')
+        self.assertEqual(len(self.provider.calls), 1)
+        stale = PriceCache(self.tmp.name, provider=self.provider, refresh_after=0)
+        stale.get('AAA', '2024-01-02')
+        self.assertEqual(len(self.provider.calls), 2)
+
+    def test_read_without_provider_and_eviction(self):
+        self.cache.get('AAA', '2021-01-04', '2021-12-31')
+        self.cache.get('BBB', '2021-01-04', '2021-12-31')
+        offline = PriceCache(self.tmp.name)
+        self.assertEqual(len(offline.read('AAA', '2021-02-01', '2021-02-28')), 20)
+        self.assertEqual(offline.evict(max_bytes=1), ['BBB', 'AAA'])  # AAA was read last
+        self.assertEqual(offline.symbols(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import pickle
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..')))
+sys.path.insert(0, STRATEGY_DIR)
+
+from src.data_pipline.price_transformer import PricePanel
+from src.pair_selection.traditional_cointegration import CointegrationScreener
+
+
+def _make_prices(n_bars=400, n_assets=8, seed=0):
+    rng = np.random.default_rng(seed)
+    base = np.cumsum(rng.normal(0, 0.01, (n_bars, 2)), axis=0)
+    noise = rng.normal(0, 0.003, (n_bars, n_assets))
+    log_prices = 4 + base[:, np.arange(n_assets) % 2] * (1 + 0.1 * np.arange(n_assets)) + noise
+    return pd.DataFrame(np.exp(log_prices), index=pd.date_range('2021-01-01', periods=n_bars, freq='D'),
+                        columns=[f"A{i}" for i in range(n_assets)])
+
+
+def _worker_sum(args):
+    spec, symbol = args
+    panel = PricePanel.attach(spec)
+    total = float(np.nansum(panel.values('returns', symbol)))
+    panel.close()
+    return total
+
+
+class TestPricePanel(unittest.TestCase):
+    def setUp(self):
+        self.prices = _make_prices()
+        self.panel = PricePanel.from_frame(self.prices)
+
+    def tearDown(self):
+        self.panel.close()
+
+    def test_fields_and_zero_copy_views(self):
+        np.testing.assert_array_equal(self.panel.values(), self.prices.to_numpy())
+        np.testing.assert_allclose(self.panel.values('log_prices'), np.log(self.prices.to_numpy()))
+        np.testing.assert_allclose(self.panel.frame('returns').iloc[1:], self.prices.pct_change().iloc[1:])
+        window = self.panel.dates('2021-02-01', '2021-02-28')
+        frame = window.frame('prices', ['A2', 'A3'])
+        pd.testing.assert_frame_equal(frame, self.prices.loc['2021-02-01':'2021-02-28', ['A2', 'A3']], check_freq=False)
+        self.assertTrue(np.shares_memory(frame.to_numpy(), self.panel.values()))
+        self.assertFalse(window.values().flags.writeable)
+        window.close()
+        self.assertEqual(self.panel.values().shape, self.prices.shape)
+
+    def test_workers_attach_by_spec(self):
+        spec = self.panel.window(100).spec()
+        self.assertLess(len(pickle.dumps(spec)), self.prices.to_numpy().nbytes)
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            sums = list(pool.map(_worker_sum, [(spec, column) for column in self.prices.columns]))
+        np.testing.assert_allclose(sums, self.prices.pct_change().iloc[100:].sum().to_numpy())
+        with self.assertRaises(TypeError):
+            pickle.dumps(self.panel)
+
+    def test_memory_mapped_panel(self):
+        with tempfile.TemporaryDirectory() as directory:
+            panel = PricePanel.from_frame(self.prices, os.path.join(directory, 'panel.npy'))
+            attached = PricePanel.attach(panel.window(10, 20).spec())
+            pd.testing.assert_frame_equal(attached.frame(), self.prices.iloc[10:20], check_freq=False)
+            del attached, panel
+
+    def test_screener_reads_panel_in_place(self):
+        expected = CointegrationScreener(min_correlation=0.5, n_jobs=1).screen(self.prices)
+        shared = CointegrationScreener(min_correlation=0.5, n_jobs=2, block_size=5).screen(self.panel)
+        pd.testing.assert_frame_equal(shared, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,115 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..')))
+sys.path.insert(0, STRATEGY_DIR)
+
+from src.backtesting_framework.metrics import PerformanceMetrics
+from src.backtesting_framework.report_generator import ReportGenerator, StreamingAggregate
+
+try:
+    import matplotlib
+    matplotlib.use('Agg')
+    HAS_MATPLOTLIB = True
+except ImportError:
+    HAS_MATPLOTLIB = False
+
+
+def _write_folds(directory, n_folds=3, n_bars=700, n_pairs=5, seed=0):
+    rng = np.random.default_rng(seed)
+    frames = []
+    start = pd.Timestamp('2020-01-01')
+    for fold in range(n_folds):
+        index = pd.date_range(start + pd.Timedelta(days=fold * n_bars), periods=n_bars, freq='D')
+        frame = pd.DataFrame(rng.normal(0.0003, 0.01, (n_bars, n_pairs)), index=index,
+                             columns=[f"P{i}/Q{i}" for i in range(n_pairs)])
+        frame.iloc[:50, fold] = 0.0
+        frame.to_parquet(os.path.join(directory, f"fold_{fold:03d}.parquet"), row_group_size=256)
+        frames.append(frame)
+    return pd.concat(frames)
+
+
+class TestReportGenerator(unittest.TestCase):
+    def test_streamed_statistics_match_performance_metrics(self):
+        with tempfile.TemporaryDirectory() as directory:
+            returns = _write_folds(directory)
+            generator = ReportGenerator(directory, batch_size=300, max_points=64, pair_points=16, n_jobs=1).aggregate()
+            stats = generator.pairs.summary()
+            for column in returns.columns:
+                r = returns[column].to_numpy()
+                self.assertAlmostEqual(stats.loc[column, 'sharpe_ratio'], PerformanceMetrics.sharpe_ratio(r), places=10)
+                self.assertAlmostEqual(stats.loc[column, 'max_drawdown'], PerformanceMetrics.max_drawdown(r), places=10)
+                self.assertAlmostEqual(stats.loc[column, 'sortino_ratio'], PerformanceMetrics.sortino_ratio(r), places=10)
+            portfolio = generator.portfolio.summary().loc['portfolio']
+            self.assertAlmostEqual(portfolio['total_return'], PerformanceMetrics.total_return(returns.mean(axis=1)),
+                                   places=10)
+
+    def test_curve_is_bounded_and_ends_at_final_equity(self):
+        rng = np.random.default_rng(1)
+        values = rng.normal(0, 0.01, (5000, 2))
+        aggregate = StreamingAggregate(['a', 'b'], max_points=100)
+        for start in range(0, 5000, 777):
+            aggregate.update(pd.RangeIndex(start, min(start + 777, 5000)), values[start:start + 777])
+        curve = aggregate.curve('a')
+        equity = np.cumprod(1 + values[:, 0])
+        self.assertLessEqual(len(curve), 100)
+        self.assertAlmostEqual(curve['last'].iloc[-1], equity[-1], places=10)
+        self.assertAlmostEqual(curve['high'].max(), equity.max(), places=10)
+        self.assertAlmostEqual(curve['low'].min(), equity.min(), places=10)
+
+    def test_process_pool_matches_serial(self):
+        with tempfile.TemporaryDirectory() as directory:
+            _write_folds(directory, n_folds=4)
+            serial = ReportGenerator(directory, batch_size=300, max_points=64, pair_points=16, n_jobs=1).aggregate()
+            pooled = ReportGenerator(directory, batch_size=300, max_points=64, pair_points=16, n_jobs=2).aggregate()
+            pd.testing.assert_frame_equal(pooled.pairs.summary(), serial.pairs.summary())
+            pd.testing.assert_frame_equal(pooled.portfolio.summary(), serial.portfolio.summary())
+            pd.testing.assert_frame_equal(pooled.portfolio.curve('portfolio'), serial.portfolio.curve('portfolio'))
+            np.testing.assert_array_equal(pooled.pairs.last, serial.pairs.last)
+
+    def test_html_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            _write_folds(directory, n_pairs=7)
+            output = os.path.join(directory, 'report')
+            path = ReportGenerator(directory, pairs_per_page=3, n_jobs=1).render_html(output)
+            self.assertEqual(path, os.path.join(output, 'index.html'))
+            self.assertEqual(sorted(os.listdir(output)), ['index.html', 'pairs_001.html', 'pairs_002.html',
+                                                          'pairs_003.html'])
+
+
+@unittest.skipUnless(HAS_MATPLOTLIB, 'matplotlib is not installed')
+class TestPdfReport(unittest.TestCase):
+    def test_pdf_report(self):
+        with tempfile.TemporaryDirectory() as directory:
+            _write_folds(directory, n_pairs=7)
+            output = os.path.join(directory, 'report', 'report.pdf')
+            path = ReportGenerator(directory, n_jobs=1).render_pdf(output, top_pairs=5)
+            self.assertEqual(path, output)
+            with open(path, 'rb') as f:
+                self.assertEqual(f.read(5), b'%PDF-')
+
+    def test_figures(self):
+        import matplotlib.pyplot as plt
+        from src.plotting_utils import equity_figure, sparkline_grid
+
+        times = pd.date_range('2021-01-01', periods=50)
+        last = 1 + np.cumsum(np.full(50, 0.001))
+        fig = equity_figure(times, last - 0.01, last + 0.01, last, title='Equity')
+        self.assertEqual(len(fig.axes), 2)
+        self.assertEqual(fig.axes[0].get_title(), 'Equity')
+        plt.close(fig)
+
+        fig = sparkline_grid([last, last[::-1]], ['up', 'down'], rows=2, cols=2, title='Pairs')
+        self.assertEqual([ax.get_title() for ax in fig.axes[:2]], ['up', 'down'])
+        self.assertEqual(sum(ax.axison for ax in fig.axes), 2)
+        plt.close(fig)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.data_pipline.spread_calculator import RollingHedgeRatio, KalmanHedgeRatio
+
+
+def _make_pairs(n_bars=300, n_pairs=4, seed=0):
+    rng = np.random.default_rng(seed)
+    X = 50 + np.cumsum(rng.normal(0, 1, (n_bars, n_pairs)), axis=0)
+    betas = rng.uniform(0.5, 2.0, n_pairs)
+    Y = 10 + betas * X + rng.normal(0, 0.5, (n_bars, n_pairs))
+    return Y, X, betas
+
+
+class TestRollingHedgeRatio(unittest.TestCase):
+    def test_matches_window_ols(self):
+        Y, X, _ = _make_pairs()
+        window = 60
+        spread, beta, alpha = RollingHedgeRatio(Y.shape[1], window=window, recompute_every=50).fit(Y, X)
+        self.assertTrue(np.isnan(beta[window - 2]).all())
+        for t in (window - 1, 150, Y.shape[0] - 1):
+            for p in range(Y.shape[1]):
+                b, a = np.polyfit(X[t - window + 1:t + 1, p], Y[t - window + 1:t + 1, p], 1)
+                self.assertAlmostEqual(beta[t, p], b, places=8)
+                self.assertAlmostEqual(alpha[t, p], a, places=6)
+                self.assertAlmostEqual(spread[t, p], Y[t, p] - a - b * X[t, p], places=6)
+
+    def test_expanding_window(self):
+        Y, X, _ = _make_pairs(n_bars=100)
+        _, beta, _ = RollingHedgeRatio(Y.shape[1]).fit(Y, X)
+        b, _ = np.polyfit(X[:, 0], Y[:, 0], 1)
+        self.assertAlmostEqual(beta[-1, 0], b, places=8)
+
+    def test_nan_bars_are_skipped(self):
+        Y, X, _ = _make_pairs(n_bars=120, n_pairs=2)
+        Y_gap = Y.copy()
+        Y_gap[70, 0] = np.nan
+        spread, beta, _ = RollingHedgeRatio(2, window=30).fit(Y_gap, X)
+        self.assertTrue(np.isnan(spread[70, 0]))
+        keep = np.arange(120) != 70
+        _, beta_ref, _ = RollingHedgeRatio(1, window=30).fit(Y[keep, :1], X[keep, :1])
+        self.assertAlmostEqual(beta[-1, 0], beta_ref[-1, 0], places=10)
+
+    def test_resume_from_saved_state(self):
+        Y, X, _ = _make_pairs()
+        full = RollingHedgeRatio(Y.shape[1], window=40).fit(Y, X)
+        first = RollingHedgeRatio(Y.shape[1], window=40)
+        first.fit(Y[:170], X[:170])
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'state.npz')
+            first.save(path)
+            resumed = RollingHedgeRatio.load(path).fit(Y[170:], X[170:])
+        for a, b in zip(full, resumed):
+            np.testing.assert_array_equal(a[170:], b)
+
+
+class TestKalmanHedgeRatio(unittest.TestCase):
+    def test_tracks_true_beta(self):
+        Y, X, betas = _make_pairs(n_bars=1000)
+        _, beta, _ = KalmanHedgeRatio(Y.shape[1], delta=1e-7, observation_var=0.25, initial_var=100.0).fit(Y, X)
+        np.testing.assert_allclose(beta[-1], betas, rtol=0.05)
+
+    def test_resume_from_saved_state(self):
+        Y, X, _ = _make_pairs()
+        full = KalmanHedgeRatio(Y.shape[1]).fit(Y, X)
+        first = KalmanHedgeRatio(Y.shape[1])
+        first.fit(Y[:100], X[:100])
+        resumed = KalmanHedgeRatio.from_state(first.get_state()).fit(Y[100:], X[100:])
+        for a, b in zip(full, resumed):
+            np.testing.assert_array_equal(a[100:], b)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import os
+import sys
+import json
+import subprocess
+import unittest
+
+STRATEGY_PARENT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+
+HEAVY = ('pandas', 'scipy', 'statsmodels', 'sklearn', 'requests', 'yfinance', 'matplotlib')
+
+# Wall-clock budgets (seconds) for cold imports in a fresh interpreter, generous enough for CI runners.
+PACKAGE_BUDGET = 0.25
+SIGNAL_PATH_BUDGET = 1.5
+
+
+def _cold_import(statements):
+    """Run `statements` in a fresh interpreter; returns (seconds taken, heavy modules loaded)."""
+    code = (
+        "import sys, time, json\n"
+        "start = time.perf_counter()\n"
+        f"{statements}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(json.dumps([elapsed, [m for m in {HEAVY!r} if m in sys.modules]]))\n"
+    )
+    out = subprocess.run([sys.executable, '-c', code], cwd=STRATEGY_PARENT, capture_output=True, text=True,
+                         check=True)
+    elapsed, loaded = json.loads(out.stdout.strip().splitlines()[-1])
+    return elapsed, loaded
+
+
+class TestStartupBudget(unittest.TestCase):
+    def test_package_import_is_lazy(self):
+        elapsed, loaded = _cold_import("import mean_reversion")
+        self.assertEqual(loaded, [])
+        self.assertLess(elapsed, PACKAGE_BUDGET)
+
+    def test_signal_path_needs_only_numpy(self):
+        elapsed, loaded = _cold_import(
+            "import mean_reversion\n"
+            "mean_reversion.RollingHedgeRatio, mean_reversion.ZScoreStrategy, mean_reversion.DynamicVolSizer")
+        self.assertEqual(loaded, [])
+        self.assertLess(elapsed, SIGNAL_PATH_BUDGET)
+
+    def test_statsmodels_loaded_on_first_use(self):
+        _, loaded = _cold_import(
+            "import mean_reversion\n"
+            "from src.statistical_uitls.econometrics import Econometrics\n"
+            "from src.statistical_uitls.time_series_analysis import TimeSeriesAnalysis\n"
+            "from src.data_sources.market_data_api import MarketDataAPI\n"
+            "mean_reversion.CointegrationScreener, mean_reversion.PairClassifier, mean_reversion.VolatilityFeatures")
+        self.assertNotIn('statsmodels', loaded)
+        self.assertNotIn('sklearn', loaded)
+        self.assertNotIn('requests', loaded)
+        _, loaded = _cold_import(
+            "import mean_reversion\n"
+            "from src.statistical_uitls.econometrics import Econometrics\n"
+            "Econometrics.ols_regression([1.0, 2.0, 3.5, 4.0], [1.0, 2.0, 3.0, 4.0])")
+        self.assertIn('statsmodels', loaded)
+
+    def test_unknown_attribute(self):
+        sys.path.insert(0, STRATEGY_PARENT)
+        import mean_reversion
+        with self.assertRaises(AttributeError):
+            mean_reversion.NotAThing
+        self.assertIn('ZScoreStrategy', dir(mean_reversion))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import os
+import sys
+import unittest
+import warnings
+
+import numpy as np
+import pandas as pd
+
+STRATEGY_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+sys.path.insert(0, os.path.abspath(os.path.join(STRATEGY_DIR, '..', '..')))
+sys.path.insert(0, STRATEGY_DIR)
+
+from src.statistical_uitls.econometrics import Econometrics
+from src.statistical_uitls.stationarity import Stationarity
+
+
+def _make_series(n_bars=300, seed=0):
+    """Random walk, AR(1), trend-stationary, white-noise and MA(1) columns, two with leading NaNs."""
+    rng = np.random.default_rng(seed)
+    shocks = rng.normal(0, 1, (n_bars, 5))
+    ar = np.zeros(n_bars)
+    for t in range(1, n_bars):
+        ar[t] = 0.6 * ar[t - 1] + shocks[t, 1]
+    X = np.column_stack([
+        np.cumsum(shocks[:, 0]),
+        ar,
+        0.05 * np.arange(n_bars) + shocks[:, 2],
+        shocks[:, 3],
+        shocks[:, 4] + 0.8 * np.concatenate([[0.0], shocks[:-1, 4]]),
+    ])
+    X[:40, 1] = np.nan
+    X[:25, 4] = np.nan
+    return pd.DataFrame(X, columns=['walk', 'ar', 'trend', 'noise', 'ma'])
+
+
+def _quiet(test, *args, **kwargs):
+    # statsmodels warns about its upcoming result objects and about statistics outside the KPSS table.
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        return test(*args, **kwargs)
+
+
+class TestAdf(unittest.TestCase):
+    def setUp(self):
+        self.X = _make_series()
+
+    def _check(self, regression, maxlag, autolag):
+        from statsmodels.tsa.stattools import adfuller
+        result = Stationarity.adf(self.X, maxlag=maxlag, regression=regression, autolag=autolag)
+        self.assertEqual(list(result.index), list(self.X.columns))
+        for name in self.X.columns:
+            series = self.X[name].dropna().to_numpy()
+            expected = _quiet(adfuller, series, maxlag=maxlag, regression=regression, autolag=autolag)
+            row = result.loc[name]
+            msg = f"{name} regression={regression} autolag={autolag}"
+            self.assertAlmostEqual(row['adf_statistic'], expected[0], places=8, msg=msg)
+            self.assertAlmostEqual(row['p_value'], expected[1], places=8, msg=msg)
+            self.assertEqual(row['used_lag'], expected[2], msg=msg)
+            self.assertEqual(row['nobs'], expected[3], msg=msg)
+            for level in ('1%', '5%', '10%'):
+                self.assertAlmostEqual(row[f"crit_{level}"], expected[4][level], places=8, msg=msg)
+            if autolag:
+                self.assertAlmostEqual(row['icbest'], expected[5], places=6, msg=msg)
+
+    def test_matches_adfuller_with_aic(self):
+        for regression in ('c', 'ct', 'n'):
+            self._check(regression, None, 'AIC')
+
+    def test_matches_adfuller_with_bic_and_fixed_lag(self):
+        self._check('c', 8, 'BIC')
+        self._check('ct', 4, None)
+        self._check('n', 0, None)
+
+    def test_single_series_and_array_input(self):
+        from statsmodels.tsa.stattools import adfuller
+        series = self.X['ar'].dropna().to_numpy()
+        result = Stationarity.adf(series)
+        self.assertEqual(len(result), 1)
+        self.assertAlmostEqual(result['adf_statistic'].iloc[0], _quiet(adfuller, series)[0], places=8)
+        batch = Stationarity.adf(self.X.to_numpy())
+        np.testing.assert_allclose(batch['adf_statistic'], Stationarity.adf(self.X)['adf_statistic'])
+
+    def test_invalid_regression(self):
+        with self.assertRaises(ValueError):
+            Stationarity.adf(self.X, regression='ctt')
+
+
+class TestKpss(unittest.TestCase):
+    def setUp(self):
+        self.X = _make_series(seed=1)
+
+    def _check(self, regression, nlags):
+        from statsmodels.tsa.stattools import kpss
+        result = Stationarity.kpss(self.X, regression=regression, nlags=nlags)
+        self.assertEqual(list(result.index), list(self.X.columns))
+        for name in self.X.columns:
+            series = self.X[name].dropna().to_numpy()
+            expected = _quiet(kpss, series, regression=regression, nlags=nlags)
+            row = result.loc[name]
+            msg = f"{name} regression={regression} nlags={nlags}"
+            self.assertAlmostEqual(row['kpss_statistic'], expected[0], places=10, msg=msg)
+            self.assertAlmostEqual(row['p_value'], expected[1], places=10, msg=msg)
+            self.assertEqual(row['lags'], expected[2], msg=msg)
+            for level in ('10%', '5%', '2.5%', '1%'):
+                self.assertAlmostEqual(row[f"crit_{level}"], expected[3][level], places=10, msg=msg)
+
+    def test_matches_kpss_with_auto_lags(self):
+        self._check('c', 'auto')
+        self._check('ct', 'auto')
+
+    def test_matches_kpss_with_legacy_and_fixed_lags(self):
+        self._check('c', 'legacy')
+        self._check('ct', 7)
+
+    def test_invalid_regression(self):
+        with self.assertRaises(ValueError):
+            Stationarity.kpss(self.X, regression='n')
+
+
+class TestHurstAndHalfLife(unittest.TestCase):
+    def test_hurst_of_random_walks_is_one_half(self):
+        walks = np.cumsum(np.random.default_rng(2).normal(0, 1, (4000, 20)), axis=0)
+        hurst = Stationarity.hurst(walks)
+        self.assertIsInstance(hurst, np.ndarray)
+        self.assertEqual(hurst.shape, (20,))
+        self.assertAlmostEqual(hurst.mean(), 0.5, delta=0.03)
+        self.assertTrue((np.abs(hurst - 0.5) < 0.15).all())
+        # Mean-reverting series scale more slowly than a random walk.
+        X = _make_series(n_bars=1000)
+        by_name = Stationarity.hurst(X)
+        self.assertLess(by_name['ar'], 0.1)
+        self.assertLess(abs(by_name['noise']), 0.05)
+
+    def test_half_life_of_ar1(self):
+        rng = np.random.default_rng(3)
+        shocks = rng.normal(0, 1, (5000, 10))
+        ar = np.zeros_like(shocks)
+        for t in range(1, len(ar)):
+            ar[t] = 0.9 * ar[t - 1] + shocks[t]
+        # dx_t = (0.9 - 1) x_{t-1} + e_t, so the half-life is ln(2) / 0.1.
+        half_life = Stationarity.half_life(ar)
+        self.assertAlmostEqual(np.median(half_life), np.log(2) / 0.1, delta=0.3)
+        self.assertTrue((np.abs(half_life - np.log(2) / 0.1) < 0.8).all())
+        self.assertEqual(Stationarity.half_life(1.01 ** np.arange(200.0))[0], np.inf)
+
+    def test_summary_collects_every_statistic(self):
+        X = _make_series(seed=4)
+        summary = Stationarity.summary(X, regression='ct')
+        self.assertEqual(list(summary.index), list(X.columns))
+        adf = Stationarity.adf(X, regression='ct')
+        kpss = _quiet(Stationarity.kpss, X, regression='ct')
+        np.testing.assert_allclose(summary['adf_statistic'], adf['adf_statistic'])
+        np.testing.assert_allclose(summary['adf_p_value'], adf['p_value'])
+        np.testing.assert_array_equal(summary['adf_used_lag'], adf['used_lag'])
+        np.testing.assert_allclose(summary['kpss_statistic'], kpss['kpss_statistic'])
+        np.testing.assert_allclose(summary['hurst'], Stationarity.hurst(X))
+        np.testing.assert_allclose(summary['half_life'], Stationarity.half_life(X))
+        self.assertLess(summary.loc['ar', 'adf_p_value'], 0.01)
+        self.assertGreater(summary.loc['walk', 'adf_p_value'], 0.05)
+
+
+class TestEconometricsAdf(unittest.TestCase):
+    def test_frame_input_is_routed_to_the_batched_test(self):
+        X = _make_series(seed=5)
+        for regression in ('c', 'ct'):
+            batched = Econometrics.adf_test(X, regression=regression)
+            pd.testing.assert_frame_equal(batched, Stationarity.adf(X, regression=regression, autolag='AIC'))
+            single = _quiet(Econometrics.adf_test, X['ma'], regression=regression)
+            self.assertAlmostEqual(batched.loc['ma', 'adf_statistic'], single['adf_statistic'], places=8)
+            self.assertEqual(batched.loc['ma', 'used_lag'], single['used_lag'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.feature_engineering.volatility_features import VolatilityCache, VolatilityFeatures, _garch_nll
+from src.signal_generation.adaptive_thresholds import AdaptiveThresholds
+
+
+def _simulate_garch(n_obs, omega, alpha, beta, seed=0):
+    rng = np.random.default_rng(seed)
+    returns = np.empty((n_obs, len(alpha)))
+    h = omega / (1 - alpha - beta)
+    for t in range(n_obs):
+        returns[t] = np.sqrt(h) * rng.standard_normal(len(alpha))
+        h = omega + alpha * returns[t] ** 2 + beta * h
+    return returns
+
+
+def _returns_with_gaps(seed=0):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.01, (300, 4))
+    returns[50, 0] = np.nan
+    returns[:5, 1] = np.nan
+    returns[100:130, 2] = np.nan
+    return returns
+
+
+class TestVolatilityFeatures(unittest.TestCase):
+    def test_ewma_matches_pandas_ewm(self):
+        returns = _returns_with_gaps()
+        var = VolatilityFeatures.ewma_volatility(returns, lam=0.94, annualize=False) ** 2
+        expected = (pd.DataFrame(returns) ** 2).ewm(alpha=0.06, adjust=False, ignore_na=True).mean().to_numpy()
+        np.testing.assert_allclose(var, expected, rtol=1e-10)
+        self.assertTrue(np.isfinite(var[-1]).all())
+
+    def test_rolling_volatility_matches_pandas_rolling_std(self):
+        returns = _returns_with_gaps(1)
+        vol = VolatilityFeatures.rolling_volatility(returns, window=20, periods_per_year=252)
+        expected = pd.DataFrame(returns).rolling(20).std().to_numpy() * np.sqrt(252)
+        np.testing.assert_allclose(vol, expected, rtol=1e-9)
+        self.assertTrue(np.isfinite(vol[-1]).all())
+        partial = VolatilityFeatures.rolling_volatility(returns, window=20, annualize=False, min_periods=10)
+        np.testing.assert_allclose(partial, pd.DataFrame(returns).rolling(20, min_periods=10).std().to_numpy(),
+                                   rtol=1e-9)
+
+    def test_range_estimators_skip_missing_bars(self):
+        rng = np.random.default_rng(2)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (200, 2)), axis=0))
+        high, low = close * 1.01, close * 0.99
+        high[40, 0] = np.nan
+        vol = VolatilityFeatures.parkinson_volatility(high, low, window=10, annualize=False)
+        self.assertTrue(np.isnan(vol[40:50, 0]).all())
+        np.testing.assert_allclose(vol[50:, 0], np.log(1.01 / 0.99) / np.sqrt(4 * np.log(2)), rtol=1e-12)
+
+    def test_garch_fit_matches_maximum_likelihood(self):
+        from scipy.optimize import minimize
+        alpha, beta = np.array([0.08, 0.05, 0.12]), np.array([0.90, 0.93, 0.80])
+        returns = _simulate_garch(3000, 1e-6, alpha, beta)
+        fit = VolatilityFeatures.garch11(returns, annualize=False)
+        demeaned = returns - returns.mean(axis=0)
+        for j in range(returns.shape[1]):
+            column, variance = demeaned[:, j:j + 1], demeaned[:, j].var()
+
+            def nll(params):
+                # (persistence, ARCH share) keeps alpha + beta < 1 inside simple box bounds.
+                persistence, share = params
+                a, b = persistence * share, persistence * (1 - share)
+                return _garch_nll(column, np.array([variance]), np.array([[a]]), np.array([[b]]))[0, 0]
+            reference = minimize(nll, [0.95, 0.1], method='L-BFGS-B', bounds=[(0.5, 0.9999), (1e-4, 0.5)])
+            reference.x = [reference.x[0] * reference.x[1], reference.x[0] * (1 - reference.x[1])]
+            self.assertLessEqual(fit['nll'][j], reference.fun + 1e-3 * abs(reference.fun))
+            self.assertAlmostEqual(fit['alpha'][j], reference.x[0], delta=0.01)
+            self.assertAlmostEqual(fit['beta'][j], reference.x[1], delta=0.02)
+        self.assertEqual(fit['volatility'].shape, returns.shape)
+
+    def test_garch_parallel_and_cache(self):
+        returns = _simulate_garch(500, 1e-6, np.full(6, 0.08), np.full(6, 0.9), seed=3)
+        cache = VolatilityCache()
+        serial = VolatilityFeatures.garch11(returns, block_size=2, cache=cache)
+        pooled = VolatilityFeatures.garch11(returns, n_jobs=2, block_size=2)
+        for name in ('alpha', 'beta', 'omega', 'volatility'):
+            np.testing.assert_array_equal(serial[name], pooled[name])
+        self.assertIs(VolatilityFeatures.garch11(returns, block_size=2, cache=cache), serial)
+
+
+class TestAdaptiveThresholdsWarmUp(unittest.TestCase):
+    def test_warm_up_matches_streaming_updates(self):
+        rng = np.random.default_rng(4)
+        spreads = np.cumsum(rng.normal(0, 1, (400, 5)), axis=0) * np.linspace(0.5, 2.0, 400)[:, None]
+        spreads[rng.random(spreads.shape) < 0.05] = np.nan
+        spreads[:30, 3] = np.nan
+        spreads[:, 4] = np.nan
+
+        streamed = AdaptiveThresholds(5, short_span=10, long_span=60)
+        for row in spreads:
+            expected = streamed.update(row)
+        batched = AdaptiveThresholds(5, short_span=10, long_span=60)
+        batched.warm_up(spreads[:150])
+        result = batched.warm_up(spreads[150:])
+        for name, value in streamed.get_state().items():
+            np.testing.assert_allclose(batched.get_state()[name], value, rtol=1e-10, err_msg=name)
+        np.testing.assert_allclose(result[0], expected[0], rtol=1e-10)
+
+
+if __name__ == '__main__':
+    unittest.main()
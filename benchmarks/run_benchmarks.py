@@ -0,0 +1,433 @@
+import os
+import sys
+import json
+import time
+import socket
+import logging
+import argparse
+import platform
+import datetime
+import statistics
+import subprocess
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+STRATEGY_DIR = os.path.join(REPO_ROOT, 'Strategy', 'mean_reversion')
+for path in (REPO_ROOT, STRATEGY_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+DEFAULT_HISTORY = os.path.join(BENCH_DIR, 'history.json')
+# Baselines are host-specific and not committed; create one on the machine that does the comparisons:
+#   python benchmarks/run_benchmarks.py --size small --save-baseline
+# Timings are compared relative to a calibration loop interleaved with them, which absorbs most of the
+# difference between a loaded and an idle host, but not between CPUs with different numpy kernels.
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, 'baseline.json')
+
+SIZES = {
+    'small': {'n_bars': 500, 'n_assets': 20},
+    'medium': {'n_bars': 2520, 'n_assets': 100},
+    'large': {'n_bars': 2520, 'n_assets': 400},
+}
+
+# Per-series statsmodels calls are benchmarked on at most this many series.
+MAX_SERIES = 50
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register `setup(ctx) -> (fn, items)`; `fn` is timed, `items` gives the throughput unit count."""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+def make_panel(n_bars=2520, n_assets=100, group_size=4, ar=0.95, noise=0.01, seed=0):
+    """
+    Synthetic daily close prices in which every `group_size` consecutive assets share a
+    random-walk factor plus stationary AR(1) deviations, so assets within a group are cointegrated.
+    Returns: pd.DataFrame (business-day index, columns A0000, A0001, ...)
+    """
+    rng = np.random.default_rng(seed)
+    n_groups = -(-n_assets // group_size)
+    factors = np.cumsum(rng.normal(0, noise, (n_bars, n_groups)), axis=0)
+    loadings = rng.uniform(0.5, 1.5, n_assets)
+    shocks = rng.normal(0, noise, (n_bars, n_assets))
+    deviations = np.empty_like(shocks)
+    deviations[0] = shocks[0]
+    for t in range(1, n_bars):
+        deviations[t] = ar * deviations[t - 1] + shocks[t]
+    log_prices = 4 + factors[:, np.arange(n_assets) // group_size] * loadings + deviations
+    index = pd.bdate_range('2010-01-01', periods=n_bars)
+    return pd.DataFrame(np.exp(log_prices), index=index, columns=[f"A{i:04d}" for i in range(n_assets)])
+
+
+def make_context(n_bars, n_assets, seed=0):
+    prices = make_panel(n_bars, n_assets, seed=seed)
+    log_prices = np.log(prices.to_numpy())
+    idx_y = np.arange(0, n_assets - 1, 2)
+    idx_x = idx_y + 1
+    spreads = log_prices[:, idx_y] - log_prices[:, idx_x]
+    return {'prices': prices, 'log_prices': log_prices, 'idx_y': idx_y, 'idx_x': idx_x, 'spreads': spreads}
+
+
+@benchmark('econometrics.ols_regression')
+def _ols(ctx):
+    from src.statistical_uitls.econometrics import Econometrics
+    prices = ctx['prices']
+    pairs = list(zip(ctx['idx_y'], ctx['idx_x']))[:MAX_SERIES]
+
+    def run():
+        for i, j in pairs:
+            Econometrics.ols_regression(prices.iloc[:, i], prices.iloc[:, j])
+    return run, len(pairs)
+
+
+@benchmark('econometrics.adf_test')
+def _adf(ctx):
+    from src.statistical_uitls.econometrics import Econometrics
+    spreads = pd.DataFrame(ctx['spreads'][:, :MAX_SERIES])
+
+    def run():
+        for column in spreads:
+            Econometrics.adf_test(spreads[column])
+    return run, spreads.shape[1]
+
+
+@benchmark('stationarity.adf_batch')
+def _adf_batch(ctx):
+    from src.statistical_uitls.stationarity import Stationarity
+    spreads = ctx['spreads']
+
+    def run():
+        Stationarity.adf(spreads)
+    return run, spreads.shape[1]
+
+
+@benchmark('econometrics.johansen_test')
+def _johansen(ctx):
+    from src.statistical_uitls.econometrics import Econometrics
+    prices = np.log(ctx['prices'])
+    baskets = [prices.iloc[:, s:s + 3] for s in range(0, prices.shape[1] - 2, 4)][:MAX_SERIES]
+
+    def run():
+        for basket in baskets:
+            Econometrics.johansen_test(basket)
+    return run, len(baskets)
+
+
+@benchmark('time_series.rolling')
+def _rolling(ctx):
+    from src.statistical_uitls.time_series_analysis import TimeSeriesAnalysis
+    returns = ctx['prices'].pct_change()
+
+    def run():
+        TimeSeriesAnalysis.moving_average(returns, window=20)
+        TimeSeriesAnalysis.exponential_smoothing(returns, alpha=0.1)
+        TimeSeriesAnalysis.volatility(returns, window=20)
+        TimeSeriesAnalysis.detect_outliers_zscore(returns)
+    return run, returns.size
+
+
+@benchmark('data_cleaner.clean')
+def _clean(ctx):
+    from src.data_sources.data_cleaners import DataCleaner
+    prices = ctx['prices'].copy()
+    rng = np.random.default_rng(1)
+    prices = prices.mask(rng.random(prices.shape) < 0.02)
+
+    def run():
+        DataCleaner.clean(prices)
+    return run, prices.size
+
+
+@benchmark('data_cleaner.clean_panel')
+def _clean_panel(ctx):
+    from src.data_sources.data_cleaners import DataCleaner
+    prices = ctx['prices'].copy()
+    rng = np.random.default_rng(1)
+    prices = prices.mask(rng.random(prices.shape) < 0.02)
+
+    def run():
+        DataCleaner.clean_panel(prices, track_memory=False)
+    return run, prices.size
+
+
+@benchmark('backtest.run')
+def _backtest_run(ctx):
+    from src.backtesting_framework.engine import BacktestEngine
+    prices = ctx['prices']
+    columns = list(prices.columns[:MAX_SERIES])
+    signals = np.sign(np.sin(np.arange(len(prices)) / 15.0))
+
+    def strategy(data):
+        return pd.Series(signals, index=data.index)
+
+    def run():
+        for column in columns:
+            BacktestEngine(prices[[column]].rename(columns={column: 'close'}), strategy, commission=0.001).run()
+    return run, len(columns) * len(prices)
+
+
+@benchmark('backtest.run_batch')
+def _backtest_batch(ctx):
+    from src.backtesting_framework.engine import BacktestEngine
+    prices = ctx['prices'].to_numpy()
+    phase = np.arange(len(prices))[:, None, None] / np.array([5.0, 10.0, 20.0, 40.0])
+    signals = np.sign(np.sin(phase + np.arange(prices.shape[1])[None, :, None]))
+
+    def run():
+        BacktestEngine.run_batch(prices, signals, commission=0.001)
+    return run, signals.size
+
+
+@benchmark('pair_selection.cointegration_screener')
+def _screener(ctx):
+    from src.pair_selection.traditional_cointegration import CointegrationScreener
+    prices = ctx['prices']
+    screener = CointegrationScreener(min_correlation=0.0, n_jobs=1)
+    n_assets = prices.shape[1]
+
+    def run():
+        screener.screen(prices)
+    return run, n_assets * (n_assets - 1) // 2
+
+
+@benchmark('pair_selection.basket_cointegration')
+def _baskets(ctx):
+    from src.pair_selection.basket_cointegration import BasketCointegration
+    prices = ctx['prices']
+    engine = BasketCointegration(min_correlation=0.0, n_jobs=1)
+    baskets = engine.candidate_baskets(np.log(prices.to_numpy()))
+
+    def run():
+        engine.screen(prices, baskets=baskets)
+    return run, len(baskets)
+
+
+@benchmark('pair_selection.feature_store')
+def _feature_store(ctx):
+    from src.pair_selection.ml_classifier import PairFeatureStore
+    prices = ctx['prices']
+    pairs = np.column_stack([ctx['idx_y'], ctx['idx_x']])
+    dates = prices.index[252::21]
+
+    def run():
+        PairFeatureStore.build(prices, pairs, dates, window=252)
+    return run, len(pairs) * len(dates)
+
+
+@benchmark('signals.spread_and_zscore')
+def _signals(ctx):
+    from src.data_pipline.spread_calculator import RollingHedgeRatio
+    from src.signal_generation.zscore_strategy import ZScoreStrategy
+    log_prices = ctx['log_prices']
+    y, x = log_prices[:, ctx['idx_y']], log_prices[:, ctx['idx_x']]
+
+    def run():
+        spread, _, _ = RollingHedgeRatio(y.shape[1], window=60).fit(y, x)
+        ZScoreStrategy(y.shape[1], window=60).run(spread)
+    return run, y.size
+
+
+def calibration_loop():
+    """A fixed mix of numpy kernels, pandas and interpreted Python: a yardstick for the host's current speed."""
+    rng = np.random.default_rng(0)
+    matrix = rng.normal(size=(150, 150))
+    values = rng.normal(size=50000)
+
+    def run():
+        matrix @ matrix
+        np.sort(values)
+        pd.Series(values).rolling(20).mean()
+        total = 0.0
+        for v in values[:20000].tolist():
+            total += v * v
+    return run
+
+
+def _loops(fn, min_time):
+    """Time one call of `fn` (doubling as its warm-up) and return how many calls last `min_time` seconds."""
+    start = time.perf_counter()
+    fn()
+    return max(1, int(np.ceil(min_time / max(time.perf_counter() - start, 1e-9))))
+
+
+def _sample(fn, loops):
+    start = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return (time.perf_counter() - start) / loops
+
+
+def measure(fn, repeat=3, min_time=0.2, calibration=None):
+    """
+    One timed warm-up run (lazy imports, caches, first-touch allocations), then the peak
+    traced memory of one run under tracemalloc and the best and median per-call wall time of
+    `repeat` untraced samples. Like timeit's autorange, each sample calls `fn` often enough to
+    last at least `min_time` seconds, so fast benchmarks are not dominated by timer noise.
+    calibration: calibration_loop() function; a sample of it is timed right before every
+    sample of `fn`, and the median ratio is reported as relative_seconds
+    """
+    loops = _loops(fn, min_time)
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    calibration_loops = _loops(calibration, min_time) if calibration is not None else 0
+    times, references = [], []
+    for _ in range(repeat):
+        if calibration is not None:
+            references.append(_sample(calibration, calibration_loops))
+        times.append(_sample(fn, loops))
+    stats = {'seconds': min(times), 'median_seconds': statistics.median(times), 'peak_memory_mb': peak / 2**20,
+             'loops': loops}
+    if references:
+        stats['calibration_seconds'] = min(references)
+        stats['relative_seconds'] = statistics.median(t / r for t, r in zip(times, references))
+    return stats
+
+
+def run_benchmarks(n_bars, n_assets, names=None, repeat=3, seed=0, min_time=0.2):
+    """
+    Run the selected benchmarks on one synthetic panel.
+    Returns: {name: metrics dict}; a benchmark that raised has {'error': message} instead
+    """
+    ctx = make_context(n_bars, n_assets, seed)
+    calibration = calibration_loop()
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if names and not any(pattern in name for pattern in names):
+            continue
+        try:
+            fn, items = setup(ctx)
+            stats = measure(fn, repeat, min_time, calibration)
+            stats['items'] = int(items)
+            stats['throughput'] = items / stats['seconds'] if stats['seconds'] > 0 else float('inf')
+            results[name] = stats
+            logging.info(f"{name}: {stats['seconds'] * 1e3:.1f} ms ({stats['relative_seconds']:.3f}x calibration), "
+                         f"{stats['throughput']:.0f} items/s, peak {stats['peak_memory_mb']:.1f} MB")
+        except Exception as e:
+            logging.error(f"Benchmark {name} failed: {e}")
+            results[name] = {'error': f"{type(e).__name__}: {e}"}
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def make_record(results, size):
+    return {
+        'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'commit': _git_commit(),
+        'host': socket.gethostname(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'cpu_count': os.cpu_count(),
+        'size': size,
+        'results': results,
+    }
+
+
+def append_history(record, path=DEFAULT_HISTORY):
+    history = []
+    if os.path.exists(path):
+        with open(path) as f:
+            history = json.load(f)
+    history.append(record)
+    with open(path, 'w') as f:
+        json.dump(history, f, indent=2)
+
+
+def compare(results, baseline, time_tolerance=0.25, memory_tolerance=0.25):
+    """
+    Flag benchmarks that got slower or hungrier than the baseline by more than the tolerances.
+    Times are compared as relative_seconds, measured against a calibration loop interleaved with
+    the samples, so a slower or busier host does not read as a regression.
+    Returns: list of (name, metric, baseline value, current value, ratio)
+    """
+    regressions = []
+    for name, current in results.items():
+        reference = baseline.get(name)
+        if reference is None or 'error' in current or 'error' in reference:
+            continue
+        for metric, tolerance in (('seconds', time_tolerance), ('peak_memory_mb', memory_tolerance)):
+            if metric == 'seconds' and reference.get('relative_seconds') and current.get('relative_seconds'):
+                metric = 'relative_seconds'
+            if not reference.get(metric):
+                continue
+            ratio = current[metric] / reference[metric]
+            if ratio > 1 + tolerance:
+                regressions.append((name, metric, reference[metric], current[metric], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the statistical and backtest hot paths.')
+    parser.add_argument('--size', choices=sorted(SIZES), default='small')
+    parser.add_argument('--bars', type=int, help='override the number of bars of the size preset')
+    parser.add_argument('--assets', type=int, help='override the number of assets of the size preset')
+    parser.add_argument('--filter', nargs='*', help='only run benchmarks whose name contains one of these')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--min-time', type=float, default=0.2, help='minimum seconds per timed sample')
+    parser.add_argument('--history', default=DEFAULT_HISTORY)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed slowdown before flagging')
+    parser.add_argument('--memory-tolerance', type=float, default=0.25)
+    parser.add_argument('--list', action='store_true')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(message)s')
+    if args.list:
+        print('\n'.join(BENCHMARKS))
+        return 0
+
+    size = dict(SIZES[args.size])
+    size['n_bars'] = args.bars or size['n_bars']
+    size['n_assets'] = args.assets or size['n_assets']
+    results = run_benchmarks(size['n_bars'], size['n_assets'], args.filter, args.repeat, min_time=args.min_time)
+    failed = [name for name, stats in results.items() if 'error' in stats]
+    record = make_record(results, size)
+    append_history(record, args.history)
+
+    # Baselines are kept per panel size, so small and large runs never compare against each other.
+    size_key = f"{size['n_bars']}x{size['n_assets']}"
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+    if failed:
+        logging.error(f"{len(failed)} benchmark(s) failed: {', '.join(failed)}")
+    if args.save_baseline:
+        passed = {name: stats for name, stats in results.items() if 'error' not in stats}
+        baselines[size_key] = {**baselines.get(size_key, {}), **passed}
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2)
+        logging.info(f"Saved baseline for {size_key} to {args.baseline}.")
+        return 1 if failed else 0
+
+    regressions = compare(results, baselines.get(size_key, {}), args.tolerance, args.memory_tolerance)
+    for name, metric, before, after, ratio in regressions:
+        logging.warning(f"REGRESSION {name} {metric}: {before:.4g} -> {after:.4g} ({ratio:.2f}x)")
+    if size_key not in baselines:
+        logging.info(f"No baseline for {size_key}; run with --save-baseline to create one.")
+    return 1 if regressions or failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
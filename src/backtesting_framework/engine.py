@@ -2,20 +2,36 @@ import pandas as pd
 import numpy as np
 import logging
 
+from src.backtesting_framework.metrics import PerformanceMetrics
+
 class BacktestEngine:
-    def __init__(self, data, strategy, initial_capital=100000, commission=0.0, slippage=0.0):
+    BATCH_RESULT_DTYPE = np.dtype([
+        ('total_return', np.float64),
+        ('annualized_return', np.float64),
+        ('annualized_volatility', np.float64),
+        ('sharpe_ratio', np.float64),
+        ('max_drawdown', np.float64),
+        ('n_trades', np.int64),
+    ])
+
+    def __init__(self, data, strategy, initial_capital=100000, commission=0.0, slippage=0.0, periods_per_year=252,
+                 copy=True):
         """
         data: pd.DataFrame with price data (must include 'close' column)
         strategy: a callable that generates signals (expects data, returns pd.Series of signals)
         initial_capital: starting capital for the backtest
         commission: commission per trade (as a fraction, e.g., 0.001 for 0.1%)
         slippage: slippage per trade (as a fraction)
+        periods_per_year: bars per year, used to annualize the summary
+        copy: work on a copy of `data`; False adds the result columns to the caller's DataFrame
+              (no duplicate of a large frame, e.g. one wrapping a PricePanel view)
         """
-        self.data = data.copy()
+        self.data = data.copy() if copy else data
         self.strategy = strategy
         self.initial_capital = initial_capital
         self.commission = commission
         self.slippage = slippage
+        self.periods_per_year = periods_per_year
         self.results = None
 
     def run(self):
@@ -29,7 +45,7 @@ class BacktestEngine:
             self.data['strategy_returns'] = self.data['position'] * self.data['returns']
 
             # Apply commission and slippage on trades
-            trades = self.data['position'].diff().abs()
+            trades = self.data['position'].diff().abs().fillna(0)
             self.data['strategy_returns'] -= trades * (self.commission + self.slippage)
 
             self.data['equity_curve'] = self.initial_capital * (1 + self.data['strategy_returns']).cumprod()
@@ -47,18 +63,24 @@ class BacktestEngine:
             logging.warning("No results to summarize. Run the backtest first.")
             return None
 
+        returns = self.results['strategy_returns'].to_numpy(dtype=np.float64)
         total_return = self.results['equity_curve'].iloc[-1] / self.initial_capital - 1
-        annualized_return = (1 + total_return) ** (252 / len(self.results)) - 1
-        annualized_vol = self.results['strategy_returns'].std() * np.sqrt(252)
+        annualized_return = (1 + total_return) ** (self.periods_per_year / len(self.results)) - 1
+        annualized_vol = PerformanceMetrics.annualized_volatility(returns, self.periods_per_year)
         sharpe = annualized_return / annualized_vol if annualized_vol != 0 else np.nan
         max_drawdown = self._max_drawdown(self.results['equity_curve'])
+        downside = PerformanceMetrics.downside_deviation(returns, self.periods_per_year)
 
         return {
             'Total Return': total_return,
             'Annualized Return': annualized_return,
             'Annualized Volatility': annualized_vol,
             'Sharpe Ratio': sharpe,
-            'Max Drawdown': max_drawdown
+            'Max Drawdown': max_drawdown,
+            'Sortino Ratio': annualized_return / downside if downside != 0 else np.nan,
+            'Calmar Ratio': annualized_return / abs(max_drawdown) if max_drawdown != 0 else np.nan,
+            'Max Drawdown Duration': int(PerformanceMetrics.drawdown_duration(returns)),
+            'Hit Rate': PerformanceMetrics.hit_rate(returns),
         }
 
     @staticmethod
@@ -66,6 +88,88 @@ class BacktestEngine:
         """
         Calculate the maximum drawdown of an equity curve.
         """
-        running_max = np.maximum.accumulate(equity_curve)
-        drawdown = (equity_curve - running_max) / running_max
-        return drawdown.min()
\ No newline at end of file
+        return PerformanceMetrics.drawdowns(equity_curve).min()
+
+    @staticmethod
+    def run_batch(prices, signals, initial_capital=100000, commission=0.0, slippage=0.0,
+                  periods_per_year=252, return_equity=False, max_chunk_bytes=256 * 2**20):
+        """
+        Vectorized backtest of many instruments and parameter sets in one NumPy pass.
+        Applies the same rules as run(): signals are traded on the next bar and every change
+        in position pays commission + slippage.
+        prices: array-like of shape (T, N) with close prices, one column per instrument
+        signals: array-like of shape (T, N, P) with one signal slice per parameter set
+                 (a (T, N) array is treated as P=1)
+        max_chunk_bytes: upper bound on the working set; parameter sets are processed in chunks
+        Returns: structured array of shape (N, P) with BATCH_RESULT_DTYPE fields, and the
+                 (T, N, P) equity tensor as a second value if return_equity is True
+        """
+        prices = np.asarray(prices, dtype=np.float64)
+        signals = np.asarray(signals, dtype=np.float64)
+        if prices.ndim == 1:
+            prices = prices[:, None]
+        if signals.ndim == 2:
+            signals = signals[:, :, None]
+        if prices.ndim != 2 or signals.ndim != 3 or signals.shape[:2] != prices.shape:
+            raise ValueError("Expected prices of shape (T, N) and signals of shape (T, N, P).")
+
+        n_bars, n_instruments, n_params = signals.shape
+        results = np.zeros((n_instruments, n_params), dtype=BacktestEngine.BATCH_RESULT_DTYPE)
+        equity_out = np.empty(signals.shape) if return_equity else None
+        if n_bars == 0:
+            return (results, equity_out) if return_equity else results
+
+        returns = np.zeros_like(prices)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns[1:] = prices[1:] / prices[:-1] - 1
+        returns[~np.isfinite(returns)] = 0.0
+        returns = returns[:, :, None]
+
+        cost = commission + slippage
+        bytes_per_param = n_bars * n_instruments * 8 * 4
+        chunk = int(max(1, min(n_params, max_chunk_bytes // max(bytes_per_param, 1))))
+
+        for start in range(0, n_params, chunk):
+            stop = min(start + chunk, n_params)
+
+            # position = signal.shift(1).fillna(0)
+            position = np.zeros((n_bars, n_instruments, stop - start))
+            position[1:] = signals[:-1, :, start:stop]
+            np.nan_to_num(position, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+
+            trades = np.zeros_like(position)
+            np.subtract(position[1:], position[:-1], out=trades[1:])
+            np.abs(trades, out=trades)
+            results['n_trades'][:, start:stop] = np.count_nonzero(trades, axis=0)
+
+            strategy_returns = position
+            strategy_returns *= returns
+            trades *= cost
+            strategy_returns -= trades
+            del trades
+
+            annualized_vol = PerformanceMetrics.annualized_volatility(strategy_returns, periods_per_year)
+
+            equity = strategy_returns
+            equity += 1.0
+            np.cumprod(equity, axis=0, out=equity)
+            equity *= initial_capital
+
+            total_return = equity[-1] / initial_capital - 1
+            with np.errstate(divide='ignore', invalid='ignore'):
+                annualized_return = (1 + total_return) ** (periods_per_year / n_bars) - 1
+                sharpe = np.where(annualized_vol != 0, annualized_return / annualized_vol, np.nan)
+            max_drawdown = PerformanceMetrics.drawdowns(equity).min(axis=0)
+
+            block = results[:, start:stop]
+            block['total_return'] = total_return
+            block['annualized_return'] = annualized_return
+            block['annualized_volatility'] = annualized_vol
+            block['sharpe_ratio'] = sharpe
+            block['max_drawdown'] = max_drawdown
+            if return_equity:
+                equity_out[:, :, start:stop] = equity
+
+        if return_equity:
+            return results, equity_out
+        return results
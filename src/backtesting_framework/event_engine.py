@@ -0,0 +1,270 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+from src.backtesting_framework.engine import BacktestEngine
+from src.risk_management.position_sizing import PositionSizer
+
+FILL_DTYPE = np.dtype([
+    ('bar', np.int64),
+    ('pair', np.int32),
+    ('leg', np.int8),
+    ('quantity', np.float64),
+    ('price', np.float64),
+    ('commission', np.float64),
+])
+
+LEGS = ('y', 'x')
+
+
+class EventBacktestEngine(BacktestEngine):
+    def __init__(self, data, strategy, initial_capital=100000, commission=0.0, slippage=0.0,
+                 borrow_rate=0.0, order_type='market', limit_offset=0.0, limit_ttl=5,
+                 limit_fallback='cancel', sizer=None, risk_per_trade=0.1, max_position=None,
+                 periods_per_year=252):
+        """
+        Event-driven backtest of a book of pairs, each traded as two legs (y, x) with their own prices.
+        Signals are targets in spread units: +1 buys y and sells hedge_ratio * x, -1 the reverse.
+        A signal change at bar t sends one order per leg after the close of t; market orders fill
+        at the next bar's open (or close), limit orders rest for up to `limit_ttl` bars.
+        Holdings only change on fill events, so the bars in between are marked to market in one
+        matrix product per segment and the loop only visits bars where something happens.
+        data: dict of (T, P) arrays: 'y_close', 'x_close' and optionally 'y_open', 'y_high', 'y_low'
+              (same for x), 'hedge_ratio' ((T, P), (P,) or scalar, default 1) and 'index'
+        strategy: callable(data) -> (T, P) array of -1/0/+1 targets
+        commission: commission per fill, as a fraction of traded notional
+        slippage: adverse price move on market fills, as a fraction of price
+        borrow_rate: annualized borrow fee charged on short notional every bar
+        order_type: 'market' or 'limit'
+        limit_offset: limit price distance from the signal bar's close, as a fraction (buys below, sells above)
+        limit_ttl: bars a limit order rests before it expires
+        limit_fallback: 'cancel' drops an expired limit order, 'market' fills it at the expiry bar's close
+        sizer: optional callable(capital, pairs, price_y, price_x, bar) -> notional per pair; the default
+               is PositionSizer.fixed_fractional(capital, risk_per_trade) capped at max_position
+        """
+        super().__init__(data, strategy, initial_capital, commission, slippage, periods_per_year)
+        if order_type not in ('market', 'limit'):
+            raise ValueError("order_type must be 'market' or 'limit'.")
+        if limit_fallback not in ('cancel', 'market'):
+            raise ValueError("limit_fallback must be 'cancel' or 'market'.")
+        self.borrow_rate = borrow_rate
+        self.order_type = order_type
+        self.limit_offset = limit_offset
+        self.limit_ttl = max(int(limit_ttl), 1)
+        self.limit_fallback = limit_fallback
+        self.sizer = sizer
+        self.risk_per_trade = risk_per_trade
+        self.max_position = max_position
+        self.fills = None
+        self.pair_pnl = None
+
+    def _size(self, capital, pairs, price_y, price_x, bar):
+        if self.sizer is not None:
+            return np.broadcast_to(np.asarray(self.sizer(capital, pairs, price_y, price_x, bar), dtype=np.float64),
+                                   pairs.shape)
+        notional = np.full(pairs.shape, PositionSizer.fixed_fractional(capital, self.risk_per_trade))
+        if self.max_position is not None:
+            notional = np.minimum(notional, self.max_position)
+        return notional
+
+    def _leg(self, leg, field):
+        value = self.data.get(f"{leg}_{field}")
+        return None if value is None else np.asarray(value)
+
+    def run(self):
+        """
+        Replay the book event by event.
+        Returns: DataFrame indexed by bar with equity_curve, strategy_returns, gross_exposure,
+                 commission and borrow_cost columns (compatible with summary()). Fills are kept
+                 in self.fills (FILL_DTYPE) and per-pair net P&L in self.pair_pnl.
+        """
+        try:
+            close = [self._leg(leg, 'close') for leg in LEGS]
+            if close[0] is None or close[1] is None or close[0].shape != close[1].shape or close[0].ndim != 2:
+                raise ValueError("Expected 'y_close' and 'x_close' arrays of shape (T, P).")
+            if not (np.isfinite(close[0]).all() and np.isfinite(close[1]).all()):
+                raise ValueError("Close prices must be finite; clean the panel first.")
+            n_bars, n_pairs = close[0].shape
+            opens = [self._leg(leg, 'open') for leg in LEGS]
+            highs = [self._leg(leg, 'high') for leg in LEGS]
+            lows = [self._leg(leg, 'low') for leg in LEGS]
+            hedge = np.asarray(self.data.get('hedge_ratio', 1.0), dtype=np.float64)
+            if hedge.ndim < 2:
+                hedge = np.broadcast_to(hedge, (n_pairs,))[None, :]
+
+            signals = np.asarray(self.strategy(self.data))
+            if signals.shape != (n_bars, n_pairs):
+                raise ValueError("Strategy must return targets of shape (T, P).")
+            signal_bars = self._signal_bars(signals)
+
+            # Holdings, cash and the order book: one resting order per pair and leg.
+            holdings = np.zeros((2, n_pairs))
+            pair_cash = np.zeros(n_pairs)
+            cash = float(self.initial_capital)
+            order_qty = np.zeros((2, n_pairs))
+            order_bar = np.full((2, n_pairs), n_bars, dtype=np.int64)
+            order_price = np.zeros((2, n_pairs))
+            target = np.zeros(n_pairs)
+            fills = np.empty(1024, dtype=FILL_DTYPE)
+            n_fills = 0
+
+            equity = np.empty(n_bars)
+            exposure = np.empty(n_bars)
+            commission_paid = np.zeros(n_bars)
+            borrow_paid = np.zeros(n_bars)
+            borrow_per_bar = self.borrow_rate / self.periods_per_year
+
+            bar, k = 0, 0
+            while bar < n_bars:
+                next_signal = signal_bars[k] if k < len(signal_bars) else n_bars
+                stop = min(next_signal, int(order_bar.min()))
+
+                # Mark bars [bar, stop) with constant holdings, then the event bar itself.
+                if stop > bar:
+                    cash = self._mark(bar, stop, close, holdings, cash, pair_cash, borrow_per_bar,
+                                      equity, exposure, borrow_paid)
+                if stop >= n_bars:
+                    break
+                bar = stop
+
+                due = order_bar == bar
+                if due.any():
+                    leg_idx, pair_idx = np.nonzero(due)
+                    qty = order_qty[leg_idx, pair_idx]
+                    price = order_price[leg_idx, pair_idx]
+                    fee = np.abs(qty * price) * self.commission
+                    holdings[leg_idx, pair_idx] += qty
+                    flow = qty * price + fee
+                    np.subtract.at(pair_cash, pair_idx, flow)
+                    cash -= flow.sum()
+                    commission_paid[bar] += fee.sum()
+                    order_bar[due] = n_bars
+                    order_qty[due] = 0.0
+
+                    if n_fills + len(qty) > len(fills):
+                        fills = np.resize(fills, max(2 * len(fills), n_fills + len(qty)))
+                    block = fills[n_fills:n_fills + len(qty)]
+                    block['bar'], block['pair'], block['leg'] = bar, pair_idx, leg_idx
+                    block['quantity'], block['price'], block['commission'] = qty, price, fee
+                    n_fills += len(qty)
+
+                cash = self._mark(bar, bar + 1, close, holdings, cash, pair_cash, borrow_per_bar,
+                                  equity, exposure, borrow_paid)
+
+                if bar == next_signal:
+                    k += 1
+                    self._send_orders(bar, signals, target, hedge, close, opens, highs, lows, holdings,
+                                      equity[bar], order_qty, order_bar, order_price)
+                bar += 1
+
+            last = close[0][-1] * holdings[0] + close[1][-1] * holdings[1]
+            self.pair_pnl = pair_cash + last
+            self.fills = fills[:n_fills].copy()
+
+            index = self.data.get('index')
+            results = pd.DataFrame({
+                'equity_curve': equity,
+                'gross_exposure': exposure,
+                'commission': commission_paid,
+                'borrow_cost': borrow_paid,
+            }, index=index if index is not None else pd.RangeIndex(n_bars))
+            prev = np.concatenate([[self.initial_capital], equity[:-1]])
+            results['strategy_returns'] = equity / prev - 1
+            self.results = results
+            return results
+        except Exception as e:
+            logging.error(f"Event backtest run error: {e}")
+            return None
+
+    @staticmethod
+    def _signal_bars(signals, chunk_rows=8192):
+        """Bars whose target differs from the previous bar's (bar 0 counts if any target is non-zero)."""
+        bars = [np.zeros(1, dtype=np.int64)] if np.any(signals[0] != 0) else []
+        for start in range(1, len(signals), chunk_rows):
+            stop = min(start + chunk_rows, len(signals))
+            changed = (signals[start:stop] != signals[start - 1:stop - 1]).any(axis=1)
+            bars.append(np.flatnonzero(changed) + start)
+        return np.concatenate(bars) if bars else np.zeros(0, dtype=np.int64)
+
+    def _mark(self, start, stop, close, holdings, cash, pair_cash, borrow_per_bar, equity, exposure, borrow_paid):
+        """Mark bars [start, stop) to market with fixed holdings, charging borrow on short legs."""
+        py, px = close[0][start:stop], close[1][start:stop]
+        value = py @ holdings[0] + px @ holdings[1]
+        exposure[start:stop] = py @ np.abs(holdings[0]) + px @ np.abs(holdings[1])
+        if borrow_per_bar and (holdings < 0).any():
+            short_y, short_x = np.minimum(holdings[0], 0), np.minimum(holdings[1], 0)
+            fee = -borrow_per_bar * (py @ short_y + px @ short_x)
+            borrow_paid[start:stop] = fee
+            pair_cash += borrow_per_bar * (py.sum(axis=0) * short_y + px.sum(axis=0) * short_x)
+            running = cash - np.cumsum(fee)
+            equity[start:stop] = running + value
+            return float(running[-1])
+        equity[start:stop] = cash + value
+        return cash
+
+    def _send_orders(self, bar, signals, target, hedge, close, opens, highs, lows, holdings, capital,
+                     order_qty, order_bar, order_price):
+        """Replace the resting orders of every pair whose target changed at `bar`."""
+        n_bars = len(signals)
+        pairs = np.flatnonzero(signals[bar] != target)
+        target[pairs] = signals[bar, pairs]
+        order_bar[:, pairs] = n_bars
+        order_qty[:, pairs] = 0.0
+        if bar + 1 >= n_bars:
+            return
+
+        py, px = close[0][bar, pairs], close[1][bar, pairs]
+        beta = hedge[min(bar, len(hedge) - 1), pairs]
+        side = target[pairs]
+        units = np.zeros(len(pairs))
+        opening = side != 0
+        if opening.any():
+            notional = self._size(capital, pairs[opening], py[opening], px[opening], bar)
+            units[opening] = notional / (py[opening] + np.abs(beta[opening]) * px[opening])
+        desired = np.vstack([side * units, -side * beta * units])
+        qty = desired - holdings[:, pairs]
+
+        for leg in range(2):
+            live = qty[leg] != 0
+            if not live.any():
+                continue
+            idx, q = pairs[live], qty[leg, live]
+            direction = np.sign(q)
+            if self.order_type == 'market':
+                fill_bar = np.full(len(idx), bar + 1)
+                ref = opens[leg] if opens[leg] is not None else close[leg]
+                price = ref[bar + 1, idx] * (1 + self.slippage * direction)
+            else:
+                limit = close[leg][bar, idx] * (1 - self.limit_offset * direction)
+                fill_bar, price = self._limit_fills(bar, idx, direction, limit, close[leg], opens[leg],
+                                                    highs[leg], lows[leg])
+            keep = fill_bar < n_bars
+            order_qty[leg, idx[keep]] = q[keep]
+            order_bar[leg, idx[keep]] = fill_bar[keep]
+            order_price[leg, idx[keep]] = price[keep]
+
+    def _limit_fills(self, bar, idx, direction, limit, close, open_, high, low):
+        """
+        Schedule limit orders: scan the next `limit_ttl` bars for the first one whose range
+        crosses the limit. Buys fill at min(limit, open), sells at max(limit, open).
+        Returns: (fill bar, fill price) per order; unfilled orders get bar T unless they fall back to market.
+        """
+        n_bars = len(close)
+        stop = min(bar + 1 + self.limit_ttl, n_bars)
+        lo = (low if low is not None else close)[bar + 1:stop, idx]
+        hi = (high if high is not None else close)[bar + 1:stop, idx]
+        buy = direction > 0
+        hit = np.where(buy, lo <= limit, hi >= limit)
+        filled = hit.any(axis=0)
+        fill_bar = np.where(filled, bar + 1 + hit.argmax(axis=0), n_bars)
+        price = limit.astype(np.float64)
+        if open_ is not None and filled.any():
+            at_open = open_[fill_bar[filled], idx[filled]]
+            price[filled] = np.where(buy[filled], np.minimum(limit[filled], at_open), np.maximum(limit[filled], at_open))
+        if self.limit_fallback == 'market':
+            expiry = stop - 1
+            late = ~filled
+            fill_bar[late] = expiry
+            price[late] = close[expiry, idx[late]] * (1 + self.slippage * direction[late])
+        return fill_bar, price
@@ -0,0 +1,375 @@
+import os
+import logging
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+EULER_GAMMA = 0.5772156649015329
+
+SUMMARY_COLUMNS = ['total_return', 'annualized_return', 'annualized_volatility', 'sharpe_ratio', 'sortino_ratio',
+                   'calmar_ratio', 'max_drawdown', 'max_drawdown_duration', 'hit_rate']
+
+# Metrics for which a smaller value is better; rank() sorts them ascending.
+LOWER_IS_BETTER = {'annualized_volatility', 'max_drawdown_duration', 'turnover'}
+
+_shared = {}
+
+
+def _attach_shared_returns(name, shape, dtype):
+    shm = shared_memory.SharedMemory(name=name)
+    _shared['shm'] = shm
+    _shared['returns'] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def _bootstrap_task(args):
+    seed, n_boot, block_size, periods_per_year = args
+    return PerformanceMetrics._bootstrap_block(_shared['returns'], seed, n_boot, block_size, periods_per_year)
+
+
+class PerformanceMetrics:
+    """
+    Performance metrics for many return series at once. Every function takes a (T, ...) array of
+    per-period simple returns (one column per strategy or parameter set) and reduces along axis 0;
+    a 1-D series gives scalars. NaN returns count as flat periods.
+    """
+
+    @staticmethod
+    def _clean(returns):
+        returns = np.asarray(returns, dtype=np.float64)
+        if np.isnan(returns).any():
+            returns = np.nan_to_num(returns, nan=0.0)
+        return returns
+
+    @staticmethod
+    def total_return(returns):
+        return np.prod(1 + PerformanceMetrics._clean(returns), axis=0) - 1
+
+    @staticmethod
+    def annualized_return(returns, periods_per_year=252):
+        """Geometric annualized return, as in BacktestEngine.summary."""
+        returns = PerformanceMetrics._clean(returns)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (1 + PerformanceMetrics.total_return(returns)) ** (periods_per_year / len(returns)) - 1
+
+    @staticmethod
+    def annualized_volatility(returns, periods_per_year=252):
+        returns = PerformanceMetrics._clean(returns)
+        if len(returns) < 2:
+            return np.full(returns.shape[1:], np.nan)[()]
+        return returns.std(axis=0, ddof=1) * np.sqrt(periods_per_year)
+
+    @staticmethod
+    def sharpe_ratio(returns, periods_per_year=252, risk_free=0.0):
+        """Annualized return in excess of `risk_free` (annual) over annualized volatility."""
+        ann_return = PerformanceMetrics.annualized_return(returns, periods_per_year)
+        ann_vol = PerformanceMetrics.annualized_volatility(returns, periods_per_year)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(ann_vol != 0, (ann_return - risk_free) / ann_vol, np.nan)[()]
+
+    @staticmethod
+    def downside_deviation(returns, periods_per_year=252, target=0.0):
+        """Annualized root mean square of returns below `target` (per period)."""
+        shortfall = np.minimum(PerformanceMetrics._clean(returns) - target, 0.0)
+        return np.sqrt(np.mean(shortfall * shortfall, axis=0) * periods_per_year)
+
+    @staticmethod
+    def sortino_ratio(returns, periods_per_year=252, risk_free=0.0, target=0.0):
+        ann_return = PerformanceMetrics.annualized_return(returns, periods_per_year)
+        downside = PerformanceMetrics.downside_deviation(returns, periods_per_year, target)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(downside != 0, (ann_return - risk_free) / downside, np.nan)[()]
+
+    @staticmethod
+    def drawdowns(equity):
+        """Drawdown from the running peak of an equity (or wealth-index) array, along axis 0."""
+        equity = np.asarray(equity, dtype=np.float64)
+        running_max = np.maximum.accumulate(equity, axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (equity - running_max) / running_max
+
+    @staticmethod
+    def max_drawdown(returns):
+        """Largest peak-to-trough loss of the compounded returns (a negative fraction)."""
+        wealth = np.cumprod(1 + PerformanceMetrics._clean(returns), axis=0)
+        return PerformanceMetrics.drawdowns(wealth).min(axis=0)
+
+    @staticmethod
+    def drawdown_duration(returns):
+        """Longest stretch of consecutive periods spent below a previous peak."""
+        wealth = np.cumprod(1 + PerformanceMetrics._clean(returns), axis=0)
+        underwater = wealth < np.maximum.accumulate(wealth, axis=0)
+        steps = np.arange(len(wealth)).reshape((-1,) + (1,) * (wealth.ndim - 1))
+        last_peak = np.maximum.accumulate(np.where(underwater, -1, steps), axis=0)
+        return (steps - last_peak).max(axis=0, initial=0)
+
+    @staticmethod
+    def calmar_ratio(returns, periods_per_year=252):
+        ann_return = PerformanceMetrics.annualized_return(returns, periods_per_year)
+        max_dd = PerformanceMetrics.max_drawdown(returns)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(max_dd != 0, ann_return / np.abs(max_dd), np.nan)[()]
+
+    @staticmethod
+    def hit_rate(returns):
+        """Share of non-zero return periods that were positive."""
+        returns = PerformanceMetrics._clean(returns)
+        active = np.count_nonzero(returns, axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(active > 0, np.count_nonzero(returns > 0, axis=0) / active, np.nan)[()]
+
+    @staticmethod
+    def turnover(positions, periods_per_year=252):
+        """Average absolute change in position per period, annualized."""
+        positions = np.nan_to_num(np.asarray(positions, dtype=np.float64), nan=0.0)
+        return np.abs(np.diff(positions, axis=0)).mean(axis=0) * periods_per_year
+
+    @staticmethod
+    def _rolling_sum(x, window):
+        csum = np.cumsum(x, axis=0)
+        out = np.full(x.shape, np.nan)
+        out[window - 1] = csum[window - 1]
+        out[window:] = csum[window:] - csum[:-window]
+        return out
+
+    @staticmethod
+    def rolling_volatility(returns, window=63, periods_per_year=252):
+        """Rolling annualized volatility (ddof=1); NaN during warm-up."""
+        returns = PerformanceMetrics._clean(returns)
+        centered = returns - returns.mean(axis=0)
+        s1 = PerformanceMetrics._rolling_sum(centered, window)
+        s2 = PerformanceMetrics._rolling_sum(centered * centered, window)
+        var = np.maximum(s2 - s1 * s1 / window, 0) / (window - 1)
+        return np.sqrt(var * periods_per_year)
+
+    @staticmethod
+    def rolling_sharpe(returns, window=63, periods_per_year=252):
+        """Rolling Sharpe ratio from the arithmetic mean: mean * periods / (std * sqrt(periods))."""
+        returns = PerformanceMetrics._clean(returns)
+        mean = PerformanceMetrics._rolling_sum(returns, window) / window * periods_per_year
+        vol = PerformanceMetrics.rolling_volatility(returns, window, periods_per_year)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(vol > 0, mean / vol, np.nan)
+
+    @staticmethod
+    def rolling_sortino(returns, window=63, periods_per_year=252, target=0.0):
+        returns = PerformanceMetrics._clean(returns)
+        mean = PerformanceMetrics._rolling_sum(returns, window) / window * periods_per_year
+        shortfall = np.minimum(returns - target, 0.0)
+        downside = np.sqrt(np.maximum(PerformanceMetrics._rolling_sum(shortfall * shortfall, window), 0)
+                           / window * periods_per_year)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(downside > 0, mean / downside, np.nan)
+
+    @staticmethod
+    def rolling_hit_rate(returns, window=63):
+        returns = PerformanceMetrics._clean(returns)
+        wins = PerformanceMetrics._rolling_sum((returns > 0).astype(np.float64), window)
+        active = PerformanceMetrics._rolling_sum((returns != 0).astype(np.float64), window)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(active > 0, wins / active, np.nan)
+
+    @staticmethod
+    def rolling_drawdown(returns):
+        """Current drawdown from the running peak at every period."""
+        return PerformanceMetrics.drawdowns(np.cumprod(1 + PerformanceMetrics._clean(returns), axis=0))
+
+    @staticmethod
+    def summary(returns, positions=None, periods_per_year=252, risk_free=0.0, chunk_size=4096):
+        """
+        Every summary metric for each column of a (T, S) return matrix, computed in column chunks
+        to bound the working set.
+        positions: optional (T, S) positions, adds an annualized 'turnover' column
+        Returns: DataFrame with one row per column (indexed by the column labels of a DataFrame input)
+        """
+        try:
+            index = returns.columns if isinstance(returns, pd.DataFrame) else None
+            returns = np.asarray(returns, dtype=np.float64)
+            if returns.ndim == 1:
+                returns = returns[:, None]
+            n_cols = returns.shape[1]
+            out = {name: np.empty(n_cols) for name in SUMMARY_COLUMNS}
+            for start in range(0, n_cols, chunk_size):
+                block = PerformanceMetrics._clean(returns[:, start:start + chunk_size])
+                cols = slice(start, start + block.shape[1])
+                wealth = np.cumprod(1 + block, axis=0)
+                total = wealth[-1] - 1
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    ann_return = (1 + total) ** (periods_per_year / len(block)) - 1
+                ann_vol = PerformanceMetrics.annualized_volatility(block, periods_per_year)
+                downside = PerformanceMetrics.downside_deviation(block, periods_per_year)
+                drawdown = PerformanceMetrics.drawdowns(wealth)
+                max_dd = drawdown.min(axis=0)
+                steps = np.arange(len(block))[:, None]
+                last_peak = np.maximum.accumulate(np.where(drawdown < 0, -1, steps), axis=0)
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    out['sharpe_ratio'][cols] = np.where(ann_vol != 0, (ann_return - risk_free) / ann_vol, np.nan)
+                    out['sortino_ratio'][cols] = np.where(downside != 0, (ann_return - risk_free) / downside, np.nan)
+                    out['calmar_ratio'][cols] = np.where(max_dd != 0, ann_return / np.abs(max_dd), np.nan)
+                out['total_return'][cols] = total
+                out['annualized_return'][cols] = ann_return
+                out['annualized_volatility'][cols] = ann_vol
+                out['max_drawdown'][cols] = max_dd
+                out['max_drawdown_duration'][cols] = (steps - last_peak).max(axis=0)
+                out['hit_rate'][cols] = PerformanceMetrics.hit_rate(block)
+            result = pd.DataFrame(out, index=index)
+            if positions is not None:
+                result['turnover'] = np.atleast_1d(PerformanceMetrics.turnover(positions, periods_per_year))
+            return result
+        except Exception as e:
+            logging.error(f"Performance summary error: {e}")
+            return None
+
+    @staticmethod
+    def _moments(returns, chunk_size=4096):
+        """Per-column mean, population variance, skewness and kurtosis, computed in column chunks."""
+        returns = np.asarray(returns, dtype=np.float64)
+        if returns.ndim == 1:
+            returns = returns[:, None]
+        moments = np.empty((4, returns.shape[1]))
+        for start in range(0, returns.shape[1], chunk_size):
+            block = PerformanceMetrics._clean(returns[:, start:start + chunk_size])
+            cols = slice(start, start + block.shape[1])
+            mean = block.mean(axis=0)
+            centered = block - mean
+            sq = centered * centered
+            var = sq.mean(axis=0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                moments[:, cols] = (mean, var, (sq * centered).mean(axis=0) / var ** 1.5,
+                                    (sq * sq).mean(axis=0) / var ** 2)
+        return moments
+
+    @staticmethod
+    def probabilistic_sharpe_ratio(returns, benchmark_sharpe=0.0):
+        """
+        Probability that the true per-period Sharpe ratio exceeds `benchmark_sharpe`, correcting
+        for sample length, skewness and kurtosis (Bailey & Lopez de Prado).
+        """
+        from scipy.special import ndtr
+        n = len(returns)
+        mean, var, skew, kurt = PerformanceMetrics._moments(returns)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            sharpe = mean / np.sqrt(var * n / (n - 1))
+            denom = np.sqrt(np.maximum(1 - skew * sharpe + (kurt - 1) / 4 * sharpe ** 2, 1e-12))
+            psr = ndtr((sharpe - benchmark_sharpe) * np.sqrt(n - 1) / denom)
+        return psr if np.ndim(returns) > 1 else psr[0]
+
+    @staticmethod
+    def deflated_sharpe_ratio(returns, n_trials=None, trials_sharpe_var=None):
+        """
+        Deflated Sharpe ratio: the probabilistic Sharpe ratio against the Sharpe ratio expected
+        from the best of `n_trials` unskilled trials. Defaults treat every column as one trial.
+        n_trials: number of independent trials behind the selection (default: number of columns)
+        trials_sharpe_var: variance of the per-period Sharpe ratios across trials (default: across columns)
+        """
+        n = len(returns)
+        if n_trials is None:
+            n_trials = 1 if np.ndim(returns) == 1 else np.shape(returns)[1]
+        if trials_sharpe_var is None:
+            mean, var = PerformanceMetrics._moments(returns)[:2]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                sharpe = np.where(var > 0, mean / np.sqrt(var * n / (n - 1)), np.nan)
+            trials_sharpe_var = np.nanvar(sharpe, ddof=1) if np.isfinite(sharpe).sum() > 1 else 0.0
+        if n_trials > 1:
+            from scipy.special import ndtri
+            expected_max = ((1 - EULER_GAMMA) * ndtri(1 - 1 / n_trials)
+                            + EULER_GAMMA * ndtri(1 - 1 / (n_trials * np.e)))
+        else:
+            expected_max = 0.0
+        benchmark = np.sqrt(trials_sharpe_var) * expected_max
+        return PerformanceMetrics.probabilistic_sharpe_ratio(returns, benchmark)
+
+    @staticmethod
+    def _bootstrap_counts(rng, n_boot, n_obs, block_size):
+        """How often each row is drawn in every resample (circular block bootstrap; block_size=1 is iid)."""
+        n_blocks = -(-n_obs // block_size)
+        starts = rng.integers(0, n_obs, size=(n_boot, n_blocks))
+        rows = (starts[:, :, None] + np.arange(block_size)).reshape(n_boot, -1)[:, :n_obs] % n_obs
+        flat = rows + (np.arange(n_boot) * n_obs)[:, None]
+        return np.bincount(flat.ravel(), minlength=n_boot * n_obs).reshape(n_boot, n_obs).astype(np.float64)
+
+    @staticmethod
+    def _bootstrap_block(returns, seed, n_boot, block_size, periods_per_year):
+        # A resample's mean and variance only depend on how often each row was drawn, so a batch
+        # of resamples is two matrix products instead of n_boot gathers of the whole matrix.
+        n_obs = len(returns)
+        counts = PerformanceMetrics._bootstrap_counts(np.random.default_rng(seed), n_boot, n_obs, block_size)
+        mean = counts @ returns / n_obs
+        second = counts @ (returns * returns) / n_obs
+        var = np.maximum(second - mean * mean, 0) * n_obs / (n_obs - 1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(var > 0, mean / np.sqrt(var), np.nan) * np.sqrt(periods_per_year)
+
+    @staticmethod
+    def bootstrap_sharpe(returns, n_boot=1000, block_size=1, periods_per_year=252, confidence=0.95,
+                         seed=None, n_jobs=1, batch_size=100, return_samples=False):
+        """
+        Bootstrap distribution of the annualized arithmetic Sharpe ratio of every column. All
+        columns share the same resampled rows, so cross-sectional dependence is preserved.
+        block_size: rows per block of the circular block bootstrap (1 = iid)
+        n_jobs: worker processes; batches of resamples run in parallel against one shared copy
+                of the returns
+        Returns: DataFrame with sharpe (full sample), mean, std, lower/upper confidence bounds
+                 and prob_positive per column, plus the (n_boot, S) samples if return_samples
+        """
+        try:
+            index = returns.columns if isinstance(returns, pd.DataFrame) else None
+            returns = PerformanceMetrics._clean(returns)
+            if returns.ndim == 1:
+                returns = returns[:, None]
+            returns = np.ascontiguousarray(returns)
+            seeds = np.random.SeedSequence(seed).spawn(-(-n_boot // batch_size))
+            sizes = [min(batch_size, n_boot - i * batch_size) for i in range(len(seeds))]
+            tasks = [(s, n, block_size, periods_per_year) for s, n in zip(seeds, sizes)]
+            n_jobs = n_jobs or os.cpu_count() or 1
+
+            if n_jobs == 1 or len(tasks) == 1:
+                samples = [PerformanceMetrics._bootstrap_block(returns, *task) for task in tasks]
+            else:
+                shm = shared_memory.SharedMemory(create=True, size=returns.nbytes)
+                try:
+                    shared = np.ndarray(returns.shape, dtype=returns.dtype, buffer=shm.buf)
+                    shared[:] = returns
+                    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_attach_shared_returns,
+                                             initargs=(shm.name, returns.shape, returns.dtype)) as pool:
+                        samples = list(pool.map(_bootstrap_task, tasks))
+                    del shared
+                finally:
+                    shm.close()
+                    shm.unlink()
+            samples = np.vstack(samples)
+
+            std = returns.std(axis=0, ddof=1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                sharpe = np.where(std > 0, returns.mean(axis=0) / std, np.nan) * np.sqrt(periods_per_year)
+            tail = (1 - confidence) / 2
+            result = pd.DataFrame({
+                'sharpe': sharpe,
+                'mean': np.nanmean(samples, axis=0),
+                'std': np.nanstd(samples, axis=0, ddof=1),
+                'lower': np.nanquantile(samples, tail, axis=0),
+                'upper': np.nanquantile(samples, 1 - tail, axis=0),
+                'prob_positive': (samples > 0).mean(axis=0),
+            }, index=index)
+            return (result, samples) if return_samples else result
+        except Exception as e:
+            logging.error(f"Bootstrap Sharpe error: {e}")
+            return None
+
+    @staticmethod
+    def rank(returns, positions=None, by='sharpe_ratio', periods_per_year=252, top=None, n_trials=None,
+             ascending=None):
+        """
+        Rank many strategies / parameter combinations: summary metrics plus the deflated Sharpe
+        ratio, best first by `by`. Metrics in LOWER_IS_BETTER sort ascending, the rest descending
+        (max_drawdown is negative, so the shallowest comes first); `ascending` overrides this.
+        """
+        result = PerformanceMetrics.summary(returns, positions, periods_per_year)
+        if result is None:
+            return None
+        result['deflated_sharpe'] = PerformanceMetrics.deflated_sharpe_ratio(returns, n_trials)
+        if ascending is None:
+            ascending = by in LOWER_IS_BETTER
+        result = result.sort_values(by, ascending=ascending, kind='stable')
+        return result if top is None else result.head(top)
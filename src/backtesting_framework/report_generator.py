@@ -0,0 +1,452 @@
+import os
+import glob
+import html
+import logging
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from src.plotting_utils import line_chart_svg, sparkline_svg
+
+SUMMARY_COLUMNS = ['bars', 'total_return', 'annualized_return', 'annualized_volatility', 'sharpe_ratio',
+                   'sortino_ratio', 'max_drawdown', 'calmar_ratio', 'hit_rate']
+
+PAGE_STYLE = ("body{font-family:sans-serif;margin:24px;color:#222}table{border-collapse:collapse;font-size:12px}"
+              "th,td{padding:3px 8px;border-bottom:1px solid #ddd;text-align:right}th{background:#f4f4f4}"
+              "td:first-child,th:first-child{text-align:left}")
+
+
+def iter_result_chunks(path, batch_size=65536, memory_map=False):
+    """
+    Stream a results file (rows = bars, columns = series) in row batches without reading it whole.
+    Parquet files are read one record batch at a time, so memory is bounded by the file's row
+    group size (WalkForwardRunner writes RESULT_ROW_GROUP rows per group); CSV files in chunks.
+    memory_map: map the parquet file instead of buffered reads (faster on a warm page cache, but
+                the mapped pages count towards the process's resident memory)
+    Returns: iterator of (index values, column names, (n, k) float64 array)
+    """
+    if path.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        parquet = pq.ParquetFile(path, memory_map=memory_map, pre_buffer=memory_map)
+        metadata = parquet.schema_arrow.pandas_metadata or {}
+        index_columns = [c for c in metadata.get('index_columns', []) if isinstance(c, str)]
+        columns = [name for name in parquet.schema_arrow.names if name not in index_columns]
+        offset = 0
+        for batch in parquet.iter_batches(batch_size=batch_size):
+            values = np.column_stack([batch.column(name).to_numpy(zero_copy_only=False).astype(np.float64)
+                                      for name in columns]) if columns else np.empty((batch.num_rows, 0))
+            if index_columns:
+                index = batch.column(index_columns[0]).to_numpy(zero_copy_only=False)
+            else:
+                index = np.arange(offset, offset + batch.num_rows)
+            offset += batch.num_rows
+            yield index, columns, values
+    else:
+        for chunk in pd.read_csv(path, index_col=0, parse_dates=True, chunksize=batch_size):
+            yield chunk.index.to_numpy(), list(chunk.columns), chunk.to_numpy(dtype=np.float64)
+
+
+class StreamingAggregate:
+    def __init__(self, columns, max_points=500):
+        """
+        Mergeable running statistics and a bounded, downsampled equity curve for many return
+        series that share one time axis. Memory is O(columns * max_points) however many bars
+        are added. Segments can be aggregated independently (e.g. one per fold file, in
+        parallel) and concatenated in time order with append().
+        Statistics follow PerformanceMetrics: NaN returns count as 0, max_drawdown is negative.
+        The curve keeps min / max / last compounded level per bucket of `width` bars; the
+        width doubles whenever more than max_points buckets would be needed.
+        columns: series names
+        max_points: maximum number of curve buckets kept
+        """
+        self.columns = pd.Index(columns)
+        self.max_points = max_points
+        k = len(self.columns)
+        self.bars = 0
+        self.count = np.zeros(k)
+        self.mean = np.zeros(k)
+        self.m2 = np.zeros(k)
+        self.downside_sq = np.zeros(k)
+        self.positives = np.zeros(k)
+        self.active = np.zeros(k)
+        self.growth = np.ones(k)
+        self.peak = np.ones(k)
+        self.trough = np.ones(k)
+        self.max_dd = np.zeros(k)
+        self.width = 1
+        self.pos = np.zeros(0, dtype=np.int64)
+        self.times = np.zeros(0, dtype=object)
+        self.low = np.zeros((k, 0))
+        self.high = np.zeros((k, 0))
+        self.last = np.zeros((k, 0))
+
+    def update(self, index, values):
+        """Add the next (n, k) block of returns (columns in self.columns order) for bars `index`."""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values):
+            self.append(self._segment(index, values))
+
+    def _segment(self, index, values):
+        """Aggregate of one block, bucketed on this aggregate's grid so append() merges it exactly."""
+        values = np.nan_to_num(values, nan=0.0)
+        n = len(values)
+        segment = StreamingAggregate(self.columns, self.max_points)
+        segment.bars = n
+        segment.count[:] = n
+        segment.mean = values.mean(axis=0)
+        segment.m2 = values.var(axis=0) * n
+        segment.downside_sq = np.einsum('ij,ij->j', np.minimum(values, 0.0), np.minimum(values, 0.0))
+        segment.positives = np.count_nonzero(values > 0, axis=0)
+        segment.active = np.count_nonzero(values, axis=0)
+
+        levels = np.cumprod(1 + values, axis=0)
+        running_peak = np.maximum.accumulate(levels, axis=0)
+        np.maximum(running_peak, 1.0, out=running_peak)
+        segment.growth = levels[-1]
+        segment.peak = running_peak[-1].copy()
+        segment.trough = np.minimum(levels.min(axis=0), 1.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.divide(levels, running_peak, out=running_peak)
+            segment.max_dd = np.maximum(1 - ratio.min(axis=0), 0.0)
+
+        # Buckets on this aggregate's global grid, so they line up after append(); the width
+        # is coarsened up front when the block alone would exceed max_points buckets.
+        width = self.width
+        while (self.bars + n - 1) // width - self.bars // width + 1 > self.max_points:
+            width *= 2
+        segment.width = width
+        ids = (self.bars + np.arange(n)) // width
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        ends = np.r_[starts[1:], n]
+        segment.pos = starts
+        segment.times = np.asarray(index)[starts]
+        segment.low = np.minimum.reduceat(levels, starts, axis=0).T
+        segment.high = np.maximum.reduceat(levels, starts, axis=0).T
+        segment.last = levels[ends - 1].T
+        return segment
+
+    def append(self, other):
+        """Concatenate a later segment (possibly with other columns) onto this one, in place."""
+        self._add_columns(other.columns.difference(self.columns, sort=False))
+        cols = self.columns.get_indexer(other.columns)
+
+        # Moments (Chan et al. pairwise update) and counters.
+        n_a, n_b = self.count[cols], other.count
+        total = n_a + n_b
+        delta = other.mean - self.mean[cols]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.mean[cols] = np.where(total > 0, self.mean[cols] + delta * n_b / total, 0.0)
+            self.m2[cols] = self.m2[cols] + other.m2 + np.where(total > 0, delta * delta * n_a * n_b / total, 0.0)
+        self.count[cols] = total
+        self.downside_sq[cols] += other.downside_sq
+        self.positives[cols] += other.positives
+        self.active[cols] += other.active
+
+        # Drawdown: the worst decline may start before the boundary and end after it.
+        growth = self.growth[cols]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            across = 1 - growth * other.trough / self.peak[cols]
+        self.max_dd[cols] = np.maximum.reduce([self.max_dd[cols], other.max_dd, across])
+        self.trough[cols] = np.minimum(self.trough[cols], growth * other.trough)
+        self.peak[cols] = np.maximum(self.peak[cols], growth * other.peak)
+        self.growth[cols] = growth * other.growth
+
+        # Curve: other's levels restart at 1, so scale them by the growth so far; columns
+        # missing from `other` stay flat at their current level.
+        m = len(other.pos)
+        flat = np.repeat(self.growth[:, None], m, axis=1)
+        flat[cols] = growth[:, None] * other.last
+        low, high = flat.copy(), flat.copy()
+        low[cols] = growth[:, None] * other.low
+        high[cols] = growth[:, None] * other.high
+        width = max(self.width, other.width)
+        pos = np.r_[self.pos, self.bars + other.pos]
+        self.times = np.concatenate([self.times, other.times]) if len(self.times) else np.asarray(other.times)
+        self.pos = pos
+        self.low = np.hstack([self.low, low])
+        self.high = np.hstack([self.high, high])
+        self.last = np.hstack([self.last, flat])
+        self.bars += other.bars
+        self._rebucket(width)
+        while len(self.pos) > self.max_points:
+            self._rebucket(self.width * 2)
+        return self
+
+    def _add_columns(self, names):
+        if len(names) == 0:
+            return
+        k = len(names)
+        self.columns = self.columns.append(pd.Index(names))
+        for attr in ('count', 'mean', 'm2', 'downside_sq', 'positives', 'active', 'max_dd'):
+            setattr(self, attr, np.r_[getattr(self, attr), np.zeros(k)])
+        for attr in ('growth', 'peak', 'trough'):
+            setattr(self, attr, np.r_[getattr(self, attr), np.ones(k)])
+        for attr in ('low', 'high', 'last'):
+            setattr(self, attr, np.vstack([getattr(self, attr), np.ones((k, len(self.pos)))]))
+
+    def _rebucket(self, width):
+        """Merge buckets onto a grid of `width` bars (first time, min low, max high, last level)."""
+        self.width = width
+        if not len(self.pos):
+            return
+        ids = self.pos // width
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        if len(starts) == len(ids):
+            return
+        ends = np.r_[starts[1:], len(ids)]
+        self.pos = self.pos[starts]
+        self.times = self.times[starts]
+        self.low = np.minimum.reduceat(self.low, starts, axis=1)
+        self.high = np.maximum.reduceat(self.high, starts, axis=1)
+        self.last = self.last[:, ends - 1]
+
+    def summary(self, periods_per_year=252):
+        """Per-series statistics as a DataFrame indexed by column name."""
+        n = self.count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ann_return = self.growth ** (periods_per_year / n) - 1
+            ann_vol = np.where(n > 1, np.sqrt(self.m2 / (n - 1)), np.nan) * np.sqrt(periods_per_year)
+            downside = np.sqrt(self.downside_sq / n * periods_per_year)
+            result = pd.DataFrame({
+                'bars': n.astype(np.int64),
+                'total_return': self.growth - 1,
+                'annualized_return': ann_return,
+                'annualized_volatility': ann_vol,
+                'sharpe_ratio': np.where(ann_vol != 0, ann_return / ann_vol, np.nan),
+                'sortino_ratio': np.where(downside != 0, ann_return / downside, np.nan),
+                'max_drawdown': -self.max_dd,
+                'calmar_ratio': np.where(self.max_dd != 0, ann_return / self.max_dd, np.nan),
+                'hit_rate': np.where(self.active > 0, self.positives / self.active, np.nan),
+            }, index=self.columns)
+        return result
+
+    def curve(self, column):
+        """Downsampled equity of one series: DataFrame of bucket start time with low, high and last level."""
+        i = self.columns.get_loc(column)
+        return pd.DataFrame({'low': self.low[i], 'high': self.high[i], 'last': self.last[i]}, index=self.times)
+
+
+def aggregate_file(path, batch_size=65536, max_points=2000, pair_points=120):
+    """
+    Stream one results file into two aggregates: the equal-weight portfolio of its columns
+    (mean of the available series per bar, as in WalkForwardRunner.run_fold) and the
+    per-column series.
+    Returns: (portfolio StreamingAggregate, per-series StreamingAggregate)
+    """
+    portfolio = None
+    series = None
+    for index, columns, values in iter_result_chunks(path, batch_size):
+        if series is None:
+            portfolio = StreamingAggregate(['portfolio'], max_points)
+            series = StreamingAggregate(columns, pair_points)
+        available = np.isfinite(values).sum(axis=1)
+        mean = np.where(available > 0, np.nansum(values, axis=1) / np.maximum(available, 1), 0.0)
+        portfolio.update(index, mean[:, None])
+        series.update(index, values)
+    if series is None:
+        portfolio = StreamingAggregate(['portfolio'], max_points)
+        series = StreamingAggregate([], pair_points)
+    return portfolio, series
+
+
+def _aggregate_task(args):
+    return aggregate_file(*args)
+
+
+def _render_pair_page(args):
+    path, title, page, n_pages, rows, curves = args
+    with open(path, 'w') as f:
+        f.write(f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+                f"<style>{PAGE_STYLE}</style></head><body><h2>{html.escape(title)}</h2>")
+        f.write(_page_links(page, n_pages))
+        f.write("<table><tr><th>pair</th><th>equity</th>"
+                + ''.join(f"<th>{c.replace('_', ' ')}</th>" for c in SUMMARY_COLUMNS) + "</tr>")
+        for (name, stats), curve in zip(rows, curves):
+            f.write(f"<tr><td>{html.escape(str(name))}</td><td>{sparkline_svg(curve)}</td>"
+                    + ''.join(f"<td>{_fmt(column, stats[column])}</td>" for column in SUMMARY_COLUMNS) + "</tr>")
+        f.write("</table></body></html>")
+    return path
+
+
+def _page_links(page, n_pages):
+    links = ["<a href='index.html'>summary</a>"]
+    links += [f"<b>{p + 1}</b>" if p == page else f"<a href='pairs_{p + 1:03d}.html'>{p + 1}</a>" for p in range(n_pages)]
+    return "<p>" + ' | '.join(links) + "</p>"
+
+
+def _fmt(column, value):
+    if value is None or (isinstance(value, float) and not np.isfinite(value)):
+        return '-'
+    if column == 'bars':
+        return f"{int(value)}"
+    if column in ('total_return', 'annualized_return', 'annualized_volatility', 'max_drawdown', 'hit_rate'):
+        return f"{value:.2%}"
+    return f"{value:.2f}"
+
+
+class ReportGenerator:
+    def __init__(self, results_dir, periods_per_year=252, batch_size=65536, max_points=2000, pair_points=120,
+                 pairs_per_page=500, n_jobs=None):
+        """
+        Build backtest reports from walk-forward results on disk (folds.csv and the
+        fold_NNN.parquet out-of-sample return files written by WalkForwardRunner) without
+        loading the history into memory: files are streamed in row batches, aggregated in
+        parallel workers (one per file) and merged in time order; pair pages are rendered in
+        parallel too.
+        results_dir: directory with fold_*.parquet (or fold_*.csv) files
+        periods_per_year: annualization factor for the statistics
+        batch_size: rows read per batch
+        max_points / pair_points: curve buckets kept for the portfolio / each pair
+        pairs_per_page: pairs per HTML page
+        n_jobs: worker processes (None = os.cpu_count(), 1 = in-process)
+        """
+        self.results_dir = results_dir
+        self.periods_per_year = periods_per_year
+        self.batch_size = batch_size
+        self.max_points = max_points
+        self.pair_points = pair_points
+        self.pairs_per_page = pairs_per_page
+        self.n_jobs = n_jobs
+        self.portfolio = None
+        self.pairs = None
+
+    def files(self):
+        files = sorted(glob.glob(os.path.join(self.results_dir, 'fold_*.parquet')))
+        return files or sorted(glob.glob(os.path.join(self.results_dir, 'fold_*.csv')))
+
+    def aggregate(self):
+        """Stream every results file and merge the aggregates in fold order. Returns: self."""
+        files = self.files()
+        if not files:
+            raise ValueError(f"No fold result files in {self.results_dir}.")
+        tasks = [(path, self.batch_size, self.max_points, self.pair_points) for path in files]
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+        self.portfolio = StreamingAggregate(['portfolio'], self.max_points)
+        self.pairs = StreamingAggregate([], self.pair_points)
+        if n_jobs == 1 or len(tasks) == 1:
+            for portfolio, pairs in map(_aggregate_task, tasks):
+                self.portfolio.append(portfolio)
+                self.pairs.append(pairs)
+        else:
+            with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+                for portfolio, pairs in pool.map(_aggregate_task, tasks):
+                    self.portfolio.append(portfolio)
+                    self.pairs.append(pairs)
+        logging.info(f"Aggregated {len(files)} result files: {self.portfolio.bars} bars, {len(self.pairs.columns)} pairs.")
+        return self
+
+    def render_html(self, output_dir, title='Mean Reversion Backtest Report'):
+        """
+        Write index.html (portfolio statistics, equity and drawdown charts, fold table, best and
+        worst pairs) and pairs_NNN.html pages with every pair's statistics and equity sparkline.
+        Returns: path of index.html
+        """
+        try:
+            if self.portfolio is None:
+                self.aggregate()
+            os.makedirs(output_dir, exist_ok=True)
+            stats = self.pairs.summary(self.periods_per_year).sort_values('sharpe_ratio', ascending=False)
+            n_pages = max(1, -(-len(stats) // self.pairs_per_page))
+            self._render_pages(output_dir, title, stats, n_pages)
+
+            portfolio = self.portfolio.summary(self.periods_per_year)
+            curve = self.portfolio.curve('portfolio')
+            labels = (str(curve.index[0])[:10], str(curve.index[-1])[:10]) if len(curve) else None
+            drawdown = curve['low'] / np.maximum.accumulate(curve['high']) - 1
+            folds_path = os.path.join(self.results_dir, 'folds.csv')
+            folds = pd.read_csv(folds_path) if os.path.exists(folds_path) else None
+
+            path = os.path.join(output_dir, 'index.html')
+            with open(path, 'w') as f:
+                f.write(f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{html.escape(title)}</title>"
+                        f"<style>{PAGE_STYLE}</style></head><body><h1>{html.escape(title)}</h1>")
+                f.write(_page_links(-1, n_pages))
+                f.write("<h2>Portfolio</h2>" + self._table(portfolio, SUMMARY_COLUMNS))
+                f.write(line_chart_svg(curve['last'], curve['low'], curve['high'], labels=labels,
+                                       title='Equity (equal-weight pairs)', baseline=1.0))
+                f.write(line_chart_svg(drawdown, labels=labels, height=140, title='Drawdown', color='#d62728',
+                                       baseline=0.0))
+                if folds is not None:
+                    f.write("<h2>Folds</h2>" + folds.to_html(index=False, float_format=lambda v: f"{v:.4g}",
+                                                             na_rep='-', border=0))
+                f.write("<h2>Best pairs</h2>" + self._table(stats.head(20), SUMMARY_COLUMNS))
+                f.write("<h2>Worst pairs</h2>" + self._table(stats.tail(20).iloc[::-1], SUMMARY_COLUMNS))
+                f.write("</body></html>")
+            logging.info(f"HTML report written to {path} ({n_pages} pair pages).")
+            return path
+        except Exception as e:
+            logging.error(f"HTML report error: {e}")
+            return None
+
+    def _render_pages(self, output_dir, title, stats, n_pages):
+        tasks = []
+        for page in range(n_pages):
+            chunk = stats.iloc[page * self.pairs_per_page:(page + 1) * self.pairs_per_page]
+            rows = list(zip(chunk.index, chunk.to_dict('records')))
+            index = self.pairs.columns.get_indexer(chunk.index)
+            curves = list(self.pairs.last[index])
+            tasks.append((os.path.join(output_dir, f"pairs_{page + 1:03d}.html"),
+                          f"{title}: pairs page {page + 1} of {n_pages}", page, n_pages, rows, curves))
+        n_jobs = self.n_jobs or os.cpu_count() or 1
+        if n_jobs == 1 or len(tasks) == 1:
+            return [_render_pair_page(task) for task in tasks]
+        with ProcessPoolExecutor(max_workers=min(n_jobs, len(tasks))) as pool:
+            return list(pool.map(_render_pair_page, tasks))
+
+    @staticmethod
+    def _table(frame, columns):
+        head = "<tr><th></th>" + ''.join(f"<th>{c.replace('_', ' ')}</th>" for c in columns) + "</tr>"
+        body = ''.join(
+            f"<tr><td>{html.escape(str(name))}</td>" + ''.join(f"<td>{_fmt(c, row[c])}</td>" for c in columns) + "</tr>"
+            for name, row in zip(frame.index, frame.to_dict('records')))
+        return f"<table>{head}{body}</table>"
+
+    def render_pdf(self, path, title='Mean Reversion Backtest Report', top_pairs=48):
+        """
+        Write a PDF with the portfolio equity / drawdown page, the statistics tables and
+        equity grids of the `top_pairs` best pairs by Sharpe ratio. Requires matplotlib.
+        Returns: path of the PDF
+        """
+        try:
+            from matplotlib.backends.backend_pdf import PdfPages
+            import matplotlib.pyplot as plt
+            from src.plotting_utils import equity_figure, sparkline_grid
+
+            if self.portfolio is None:
+                self.aggregate()
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            curve = self.portfolio.curve('portfolio')
+            stats = self.pairs.summary(self.periods_per_year).sort_values('sharpe_ratio', ascending=False)
+            with PdfPages(path) as pdf:
+                fig = equity_figure(curve.index, curve['low'], curve['high'], curve['last'], title=title)
+                pdf.savefig(fig)
+                plt.close(fig)
+
+                for name, frame in (('Portfolio', self.portfolio.summary(self.periods_per_year)),
+                                    ('Best pairs', stats.head(30)), ('Worst pairs', stats.tail(30).iloc[::-1])):
+                    fig, ax = plt.subplots(figsize=(11, 8.5))
+                    ax.axis('off')
+                    ax.set_title(name)
+                    cells = [[_fmt(c, row[c]) for c in SUMMARY_COLUMNS] for row in frame.to_dict('records')]
+                    if cells:
+                        table = ax.table(cellText=cells, rowLabels=[str(i) for i in frame.index],
+                                         colLabels=[c.replace('_', ' ') for c in SUMMARY_COLUMNS], loc='upper center')
+                        table.set_fontsize(7)
+                    pdf.savefig(fig)
+                    plt.close(fig)
+
+                best = stats.index[:top_pairs]
+                index = self.pairs.columns.get_indexer(best)
+                for start in range(0, len(best), 24):
+                    fig = sparkline_grid(self.pairs.last[index[start:start + 24]], list(best[start:start + 24]),
+                                         title=f"Best pairs {start + 1}-{min(start + 24, len(best))}")
+                    pdf.savefig(fig)
+                    plt.close(fig)
+            logging.info(f"PDF report written to {path}.")
+            return path
+        except Exception as e:
+            logging.error(f"PDF report error: {e}")
+            return None
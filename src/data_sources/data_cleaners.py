@@ -1,6 +1,9 @@
+import time
+import logging
+import tracemalloc
+
 import pandas as pd
 import numpy as np
-import logging
 
 class DataCleaner:
     @staticmethod
@@ -13,16 +16,16 @@ class DataCleaner:
         if not isinstance(df, pd.DataFrame):
             raise ValueError("Input must be a pandas DataFrame.")
 
-        na_fraction = df.isna().mean(axis=1)
+        na_fraction = DataCleaner._row_na_fraction(df)
         rows_to_drop = na_fraction > drop_threshold
         if rows_to_drop.any():
             logging.info(f"Dropping {rows_to_drop.sum()} rows with >{drop_threshold*100}% missing values.")
             df = df.loc[~rows_to_drop]
 
         if method == 'ffill':
-            df = df.fillna(method='ffill').fillna(method='bfill')
+            df = df.ffill().bfill()
         elif method == 'bfill':
-            df = df.fillna(method='bfill').fillna(method='ffill')
+            df = df.bfill().ffill()
         elif method == 'drop':
             df = df.dropna()
         else:
@@ -40,12 +43,11 @@ class DataCleaner:
             raise ValueError("DataFrame index must be a pandas DatetimeIndex.")
 
         gaps = []
-        diffs = df.index.to_series().diff().dt.days.fillna(0)
-        large_gaps = diffs[diffs > max_gap]
-        for idx in large_gaps.index:
-            prev_idx = df.index[df.index.get_loc(idx) - 1]
-            gap_size = (idx - prev_idx).days
-            gaps.append((prev_idx, idx, gap_size))
+        stamps = df.index.values.astype('datetime64[ns]').view(np.int64)
+        days = np.diff(stamps) // (86400 * 10**9)
+        positions = np.flatnonzero(days > max_gap)
+        for prev_idx, idx, gap_size in zip(df.index[positions], df.index[positions + 1], days[positions]):
+            gaps.append((prev_idx, idx, int(gap_size)))
             logging.warning(f"Large gap detected: {prev_idx} to {idx} ({gap_size} days)")
         return gaps
 
@@ -57,4 +59,172 @@ class DataCleaner:
         """
         df_clean = DataCleaner.remove_na(df, method=na_method, drop_threshold=drop_threshold)
         gaps = DataCleaner.check_gaps(df_clean, max_gap=max_gap)
-        return df_clean, gaps
\ No newline at end of file
+        return df_clean, gaps
+
+    @staticmethod
+    def clean_panel(df, na_method='ffill', drop_threshold=0.1, max_gap=5, chunk_rows=512,
+                    float_dtype='float32', categorical_threshold=0.5, track_memory=True):
+        """
+        Memory-bounded cleaning pipeline for wide panels (rows = dates, columns = tickers).
+        Same semantics as clean(), but numeric data is converted once into a single
+        `float_dtype` buffer and all row dropping and filling happens in place on it,
+        `chunk_rows` rows at a time, so scratch memory does not grow with the panel length.
+        na_method: 'ffill', 'bfill', or 'drop'
+        float_dtype: dtype of the cleaned numeric block (None keeps float64)
+        categorical_threshold: object columns with a unique/rows ratio below this become categorical
+        track_memory: measure peak traced allocations with tracemalloc
+        Returns: (cleaned DataFrame, list of gaps, stats dict with rows, seconds,
+                  rows_per_sec, peak_memory_mb and dropped_rows)
+        """
+        if not isinstance(df, pd.DataFrame):
+            raise ValueError("Input must be a pandas DataFrame.")
+        if na_method not in ('ffill', 'bfill', 'drop'):
+            raise ValueError("Unknown method for NA handling.")
+
+        started_tracing = track_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if track_memory:
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+
+        numeric_cols = df.columns[[pd.api.types.is_numeric_dtype(dt) for dt in df.dtypes]]
+        other_cols = df.columns.difference(numeric_cols, sort=False)
+        dtype = np.dtype(float_dtype or np.float64)
+        # The one copy of the numeric block (converted to `dtype` on the way); df is never modified.
+        values = df[numeric_cols].to_numpy(dtype=dtype, copy=True)
+
+        other_na = df[other_cols].isna().sum(axis=1).to_numpy() if len(other_cols) else None
+        keep, first_valid, last_valid = DataCleaner._compact_rows(values, na_method, drop_threshold, chunk_rows,
+                                                                  other_na, df.shape[1])
+        n_kept = int(keep.sum())
+        values = values[:n_kept]
+        if na_method == 'ffill':
+            DataCleaner._fill_chunks(values, chunk_rows, first_valid, reverse=False)
+        elif na_method == 'bfill':
+            DataCleaner._fill_chunks(values, chunk_rows, last_valid, reverse=True)
+
+        index = df.index[keep]
+        cleaned = pd.DataFrame(values, index=index, columns=numeric_cols, copy=False)
+        if len(other_cols):
+            others = DataCleaner.downcast(df.loc[keep, other_cols], float_dtype, categorical_threshold)
+            if na_method == 'ffill':
+                others = others.ffill().bfill()
+            elif na_method == 'bfill':
+                others = others.bfill().ffill()
+            cleaned = pd.concat([cleaned, others], axis=1)[df.columns]
+
+        gaps = DataCleaner.check_gaps(cleaned, max_gap=max_gap) if isinstance(index, pd.DatetimeIndex) else []
+        elapsed = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if track_memory else None
+        if started_tracing:
+            tracemalloc.stop()
+
+        dropped = len(df) - n_kept
+        if dropped:
+            logging.info(f"Dropped {dropped} rows while cleaning panel.")
+        stats = {
+            'rows': len(df),
+            'seconds': elapsed,
+            'rows_per_sec': len(df) / elapsed if elapsed > 0 else np.inf,
+            'peak_memory_mb': peak / 2**20 if peak is not None else None,
+            'dropped_rows': dropped,
+        }
+        logging.info(f"Cleaned {len(df)} rows x {df.shape[1]} columns at {stats['rows_per_sec']:.0f} rows/s.")
+        return cleaned, gaps, stats
+
+    @staticmethod
+    def downcast(df, float_dtype='float32', categorical_threshold=0.5):
+        """
+        Shrink a DataFrame: floats to `float_dtype`, integers to the smallest fitting type,
+        and low-cardinality object columns to categoricals.
+        """
+        out = {}
+        for col in df.columns:
+            series = df[col]
+            if pd.api.types.is_float_dtype(series) and float_dtype is not None:
+                out[col] = series.astype(float_dtype)
+            elif pd.api.types.is_integer_dtype(series):
+                out[col] = pd.to_numeric(series, downcast='integer')
+            elif (series.dtype == object or isinstance(series.dtype, pd.StringDtype)) and len(series) and \
+                    series.nunique(dropna=True) / len(series) < categorical_threshold:
+                out[col] = series.astype('category')
+            else:
+                out[col] = series
+        return pd.DataFrame(out, index=df.index)
+
+    @staticmethod
+    def _row_na_fraction(df, chunk_rows=4096):
+        """Fraction of NA cells per row, computed chunk by chunk instead of on a full isna() frame."""
+        counts = np.empty(len(df))
+        for start in range(0, len(df), chunk_rows):
+            counts[start:start + chunk_rows] = df.iloc[start:start + chunk_rows].isna().sum(axis=1).to_numpy()
+        return pd.Series(counts / max(df.shape[1], 1), index=df.index)
+
+    @staticmethod
+    def _compact_rows(values, na_method, drop_threshold, chunk_rows, other_na=None, n_total=None):
+        """
+        Drop rows in place by sliding kept rows towards the top of `values`.
+        Also records the first and last valid value of each column among kept rows.
+        other_na / n_total: NA counts per row in the non-numeric columns and the total column
+                            count, so rows are judged on the whole frame as in remove_na()
+        """
+        n_rows, n_cols = values.shape
+        n_total = n_cols if n_total is None else n_total
+        keep = np.zeros(n_rows, dtype=bool)
+        first_valid = np.full(n_cols, np.nan, dtype=values.dtype)
+        last_valid = np.full(n_cols, np.nan, dtype=values.dtype)
+        write = 0
+        for start in range(0, n_rows, chunk_rows):
+            block = values[start:start + chunk_rows]
+            na = np.isnan(block)
+            na_count = na.sum(axis=1)
+            if other_na is not None:
+                na_count = na_count + other_na[start:start + chunk_rows]
+            rows = na_count / max(n_total, 1) <= drop_threshold
+            if na_method == 'drop':
+                rows &= na_count == 0
+            keep[start:start + len(block)] = rows
+            kept = block[rows]
+            kept_na = na[rows]
+            if len(kept):
+                DataCleaner._update_edge(first_valid, kept, kept_na, first=True)
+                DataCleaner._update_edge(last_valid, kept, kept_na, first=False)
+            values[write:write + len(kept)] = kept
+            write += len(kept)
+        return keep, first_valid, last_valid
+
+    @staticmethod
+    def _update_edge(edge, block, na, first):
+        valid = ~na
+        has = valid.any(axis=0)
+        if first:
+            pos = np.argmax(valid, axis=0)
+            take = has & np.isnan(edge)
+        else:
+            pos = len(block) - 1 - np.argmax(valid[::-1], axis=0)
+            take = has
+        edge[take] = block[pos[take], np.flatnonzero(take)]
+
+    @staticmethod
+    def _fill_chunks(values, chunk_rows, edge, reverse=False):
+        """
+        Forward fill (or backward fill if reverse) in place, carrying the last seen value
+        across chunk boundaries. Values still missing at the edge of the panel take `edge`,
+        which reproduces ffill().bfill() / bfill().ffill().
+        """
+        n_rows, n_cols = values.shape
+        carry = edge.copy()
+        starts = range(0, n_rows, chunk_rows)
+        for start in (reversed(starts) if reverse else starts):
+            block = values[start:start + chunk_rows]
+            if reverse:
+                block = block[::-1]
+            na = np.isnan(block)
+            if na.any():
+                pos = np.where(na, np.int32(-1), np.arange(len(block), dtype=np.int32)[:, None])
+                np.maximum.accumulate(pos, axis=0, out=pos)
+                filled = block[np.maximum(pos, 0), np.arange(n_cols)]
+                filled = np.where(pos >= 0, filled, carry)
+                block[na] = filled[na]
+            carry = np.where(np.isnan(block[-1]), carry, block[-1])
@@ -1,10 +1,26 @@
-import requests
 import logging
 
+from src.data_sources.http_client import HttpClient, RetryableError, fetch_many
+
 class FundamentalDataAPI:
-    def __init__(self, source, api_key=None):
+    BASE_URLS = {
+        "alphavantage": "https://www.alphavantage.co/query",
+        "fmp": "https://financialmodelingprep.com/api/v3",
+    }
+
+    def __init__(self, source, api_key=None, base_url=None, rate_limit=None, max_workers=8):
+        """
+        source: 'alphavantage' or 'fmp'
+        api_key: provider API key
+        base_url: override the provider endpoint (e.g. a local stub server)
+        rate_limit: requests per second shared by all clients of this provider
+        max_workers: concurrent requests used by fetch_many()
+        """
         self.source = source.lower()
         self.api_key = api_key
+        self.base_url = base_url or self.BASE_URLS.get(self.source)
+        self.max_workers = max_workers
+        self.client = HttpClient(self.source, rate_limit=rate_limit, pool_size=max_workers)
 
     def fetch(self, symbol, **kwargs):
         try:
@@ -18,22 +34,24 @@ class FundamentalDataAPI:
             logging.error(f"Error fetching fundamental data from {self.source}: {e}")
             return None
 
+    def fetch_many(self, symbols):
+        """
+        Fetch many symbols concurrently over the pooled, rate-limited session.
+        Yields (symbol, data) pairs as each request completes.
+        """
+        return fetch_many(self.fetch, symbols, self.max_workers)
+
     def _fetch_alphavantage(self, symbol):
         if not self.api_key:
             raise ValueError("AlphaVantage API key required.")
         url = (
-            f"https://www.alphavantage.co/query"
+            f"{self.base_url}"
             f"?function=OVERVIEW"
             f"&symbol={symbol}"
             f"&apikey={self.api_key}"
         )
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            if not data or "Note" in data or "Error Message" in data:
-                raise ValueError(data.get("Error Message", "No data returned from AlphaVantage."))
-            return data
+            return self.client.get_json(url, validate=self._validate_alphavantage)
         except Exception as e:
             logging.error(f"AlphaVantage API error: {e}")
             return None
@@ -42,16 +60,25 @@ class FundamentalDataAPI:
         if not self.api_key:
             raise ValueError("FMP API key required.")
         url = (
-            f"https://financialmodelingprep.com/api/v3/profile/{symbol}"
+            f"{self.base_url}/profile/{symbol}"
             f"?apikey={self.api_key}"
         )
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            if not data or isinstance(data, dict) and data.get("Error Message"):
-                raise ValueError(data.get("Error Message", "No data returned from FMP."))
-            return data
+            return self.client.get_json(url, validate=self._validate_fmp)
         except Exception as e:
             logging.error(f"FMP API error: {e}")
-            return None
\ No newline at end of file
+            return None
+
+    @staticmethod
+    def _validate_alphavantage(data):
+        if "Note" in data or "Information" in data:
+            raise RetryableError(data.get("Note") or data.get("Information"))
+        if not data or "Error Message" in data:
+            raise ValueError(data.get("Error Message", "No data returned from AlphaVantage."))
+
+    @staticmethod
+    def _validate_fmp(data):
+        if isinstance(data, dict) and data.get("Error Message"):
+            raise ValueError(data["Error Message"])
+        if not data:
+            raise ValueError("No data returned from FMP.")
@@ -0,0 +1,152 @@
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+# Requests per second allowed by each provider's default plan.
+DEFAULT_RATE_LIMITS = {
+    'alphavantage': 5 / 60,
+    'fmp': 5.0,
+    'yahoo': 2.0,
+}
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+class RetryableError(Exception):
+    """A transient provider error (throttling, 5xx, connection reset) worth retrying."""
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        """
+        Thread-safe token bucket.
+        rate: tokens added per second
+        capacity: burst size (default: max(1, rate))
+        """
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens=1.0):
+        """Block until `tokens` are available, then consume them."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def get_rate_limiter(provider, rate=None):
+    """
+    Return the process-wide token bucket for `provider`, creating it on first use.
+    There is one bucket per provider for the life of the process, so every client shares the
+    cap; a later, different `rate` is ignored with a warning rather than splitting the limit.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = TokenBucket(rate if rate is not None else DEFAULT_RATE_LIMITS.get(provider, 5.0))
+            _limiters[provider] = limiter
+        elif rate is not None and float(rate) != limiter.rate:
+            logging.warning(f"Ignoring rate limit {rate}/s for {provider}: its shared limiter already "
+                            f"allows {limiter.rate}/s.")
+        return limiter
+
+
+class HttpClient:
+    def __init__(self, provider, rate_limit=None, max_retries=4, backoff=0.5, max_backoff=30.0,
+                 pool_size=16, timeout=10):
+        """
+        Pooled, rate-limited HTTP client shared by the data APIs.
+        provider: provider name used to pick the shared rate limiter
+        rate_limit: requests per second (default: DEFAULT_RATE_LIMITS[provider])
+        max_retries: retries on RetryableError before giving up
+        backoff / max_backoff: exponential backoff base and cap in seconds (with jitter)
+        pool_size: connections kept alive per host
+        timeout: request timeout in seconds
+        """
+        self.provider = provider
+        self.limiter = get_rate_limiter(provider, rate_limit)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.transient_errors = (RetryableError, requests.ConnectionError, requests.Timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def get_json(self, url, validate=None):
+        """
+        GET `url` and decode JSON, retrying throttled and transient failures.
+        validate: optional callable that raises RetryableError / ValueError on a bad payload
+        """
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                response = self.session.get(url, timeout=self.timeout)
+                if response.status_code in RETRY_STATUS:
+                    raise RetryableError(f"HTTP {response.status_code}", response.headers.get('Retry-After'))
+                response.raise_for_status()
+                data = response.json()
+                if validate is not None:
+                    validate(data)
+                return data
+            except self.transient_errors as e:
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                retry_after = e.args[1] if isinstance(e, RetryableError) and len(e.args) > 1 else None
+                delay = self._delay(attempt, retry_after)
+                logging.warning(f"{self.provider} request failed ({e.args[0] if e.args else e}); "
+                                f"retry {attempt}/{self.max_retries} in {delay:.2f}s")
+                time.sleep(delay)
+
+    def _delay(self, attempt, retry_after=None):
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), self.max_backoff)
+            except ValueError:
+                pass
+        delay = min(self.backoff * 2 ** (attempt - 1), self.max_backoff)
+        return delay * (0.5 + random.random() / 2)
+
+    def close(self):
+        self.session.close()
+
+
+def fetch_many(fetch, symbols, max_workers=8):
+    """
+    Run `fetch(symbol)` for every symbol on a thread pool.
+    Yields (symbol, result) pairs in completion order; failed fetches yield None.
+    Closing the generator early cancels the fetches that have not started yet.
+    """
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {pool.submit(fetch, symbol): symbol for symbol in symbols}
+        for future in as_completed(futures):
+            symbol = futures[future]
+            try:
+                yield symbol, future.result()
+            except Exception as e:
+                logging.error(f"Error fetching {symbol}: {e}")
+                yield symbol, None
+    finally:
+        # Unlike `with ThreadPoolExecutor`, do not block a consumer that stopped iterating on queued requests.
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -1,10 +1,32 @@
-import requests
 import logging
 
+import pandas as pd
+
+from src.data_sources.http_client import HttpClient, RetryableError, fetch_many
+from src.data_sources.price_cache import OHLCV_COLUMNS, PriceCache
+
 class MarketDataAPI:
-    def __init__(self, source, api_key=None):
+    BASE_URLS = {
+        "alphavantage": "https://www.alphavantage.co/query",
+    }
+
+    def __init__(self, source, api_key=None, cache_dir=None, base_url=None, rate_limit=None,
+                 max_workers=8, **cache_kwargs):
+        """
+        source: 'alphavantage' or 'yahoo'
+        api_key: provider API key, where required
+        cache_dir: if given, fetch_cached() serves OHLCV from a PriceCache in this directory
+        base_url: override the provider endpoint (e.g. a local stub server)
+        rate_limit: requests per second shared by all clients of this provider
+        max_workers: concurrent requests used by fetch_many()
+        cache_kwargs: extra PriceCache options (max_bytes, max_age, refresh_after)
+        """
         self.source = source.lower()
         self.api_key = api_key
+        self.base_url = base_url or self.BASE_URLS.get(self.source)
+        self.max_workers = max_workers
+        self.client = HttpClient(self.source, rate_limit=rate_limit, pool_size=max_workers)
+        self.cache = PriceCache(cache_dir, provider=self, **cache_kwargs) if cache_dir else None
 
     def fetch(self, symbol, start_date=None, end_date=None, **kwargs):
         try:
@@ -18,35 +40,97 @@ class MarketDataAPI:
             logging.error(f"Error fetching data from {self.source}: {e}")
             return None
 
+    def fetch_many(self, symbols, start_date=None, end_date=None, normalized=False):
+        """
+        Fetch many symbols concurrently over the pooled, rate-limited session.
+        normalized: yield fetch_ohlcv() frames instead of raw provider payloads
+        Yields (symbol, data) pairs as each request completes.
+        """
+        fetch = self.fetch_ohlcv if normalized else self.fetch
+        return fetch_many(lambda symbol: fetch(symbol, start_date, end_date), symbols, self.max_workers)
+
+    def fetch_ohlcv(self, symbol, start_date=None, end_date=None):
+        """
+        Fetch and normalize daily bars into a DataFrame indexed by date with the
+        OHLCV_COLUMNS columns, restricted to [start_date, end_date].
+        """
+        data = self.fetch(symbol, start_date, end_date)
+        if data is None:
+            return None
+        try:
+            frame = self.normalize(data)
+            return frame.loc[start_date:end_date]
+        except Exception as e:
+            logging.error(f"Error normalizing data for {symbol}: {e}")
+            return None
+
+    def fetch_cached(self, symbol, start_date=None, end_date=None):
+        """Serve normalized OHLCV from the local cache, fetching only missing dates."""
+        if self.cache is None:
+            return self.fetch_ohlcv(symbol, start_date, end_date)
+        return self.cache.get(symbol, start_date, end_date)
+
+    @staticmethod
+    def normalize(data):
+        """
+        Convert an AlphaVantage daily-adjusted payload or a yfinance DataFrame into a
+        float64 DataFrame with OHLCV_COLUMNS, sorted by a DatetimeIndex named 'date'.
+        """
+        if isinstance(data, dict):
+            series = data.get("Time Series (Daily)")
+            if series is None:
+                raise ValueError("Payload has no 'Time Series (Daily)' section.")
+            frame = pd.DataFrame.from_dict(series, orient='index')
+            frame = frame.rename(columns=lambda c: c.split('. ', 1)[-1].replace(' ', '_'))
+            frame = frame.rename(columns={'adjusted_close': 'adj_close'})
+        else:
+            frame = data.copy()
+            if isinstance(frame.columns, pd.MultiIndex):
+                frame.columns = frame.columns.get_level_values(0)
+            frame.columns = [str(c).lower().replace(' ', '_') for c in frame.columns]
+        if 'adj_close' not in frame.columns and 'close' in frame.columns:
+            frame['adj_close'] = frame['close']
+        frame = frame[OHLCV_COLUMNS].astype('float64')
+        frame.index = pd.DatetimeIndex(pd.to_datetime(frame.index), name='date')
+        return frame.sort_index()
+
     def _fetch_alphavantage(self, symbol, start_date, end_date):
         if not self.api_key:
             raise ValueError("AlphaVantage API key required.")
+        # The compact payload covers the latest 100 trading days, enough for a cache tail refresh.
+        recent = start_date is not None and pd.Timestamp(start_date) > pd.Timestamp.now() - pd.Timedelta(days=140)
         url = (
-            f"https://www.alphavantage.co/query"
+            f"{self.base_url}"
             f"?function=TIME_SERIES_DAILY_ADJUSTED"
             f"&symbol={symbol}"
-            f"&outputsize=full"
+            f"&outputsize={'compact' if recent else 'full'}"
             f"&apikey={self.api_key}"
         )
         try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            if "Error Message" in data:
-                raise ValueError(data["Error Message"])
-            return data
+            return self.client.get_json(url, validate=self._validate_alphavantage)
         except Exception as e:
             logging.error(f"AlphaVantage API error: {e}")
             return None
 
+    @staticmethod
+    def _validate_alphavantage(data):
+        if "Error Message" in data:
+            raise ValueError(data["Error Message"])
+        if "Note" in data or "Information" in data:
+            raise RetryableError(data.get("Note") or data.get("Information"))
+
     def _fetch_yahoo(self, symbol, start_date, end_date):
         try:
             import yfinance as yf
         except ImportError:
             logging.error("yfinance package not installed.")
             return None
+        # yfinance treats end as exclusive; the provider contract (see PriceCache) is inclusive.
+        end = pd.Timestamp(end_date) + pd.Timedelta(days=1) if end_date is not None else None
         try:
-            data = yf.download(symbol, start=start_date, end=end_date)
+            # yf.download bypasses HttpClient, so take a token from the shared 'yahoo' bucket here.
+            self.client.limiter.acquire()
+            data = yf.download(symbol, start=start_date, end=end)
             if data.empty:
                 raise ValueError("No data returned from Yahoo Finance.")
             return data
@@ -0,0 +1,215 @@
+import os
+import json
+import time
+import shutil
+import logging
+
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'adj_close', 'volume']
+
+
+class PriceCache:
+    def __init__(self, root, provider=None, max_bytes=None, max_age=None, refresh_after=12 * 3600):
+        """
+        On-disk columnar OHLCV cache. Each symbol is stored as one .npy file per column plus
+        an int64 nanosecond date index, read back through memory maps so only the requested
+        date range is touched.
+        root: cache directory
+        provider: object with fetch_ohlcv(symbol, start_date, end_date) returning a normalized
+                  OHLCV DataFrame for the inclusive date range, or None when the request failed
+                  (e.g. MarketDataAPI, or a local fake in tests)
+        max_bytes: evict least recently used symbols once the cache grows beyond this size
+        max_age: evict symbols not accessed for this many seconds
+        refresh_after: seconds after which a read reaching the day of the last check re-checks the
+                       provider for new bars
+        """
+        self.root = root
+        self.provider = provider
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.refresh_after = refresh_after
+        os.makedirs(root, exist_ok=True)
+
+    def get(self, symbol, start_date=None, end_date=None):
+        """
+        Return OHLCV for `symbol` between start_date and end_date (inclusive), fetching only
+        the parts of the range that are not on disk yet.
+        """
+        try:
+            self._refresh(symbol, start_date, end_date)
+            return self.read(symbol, start_date, end_date)
+        except Exception as e:
+            logging.error(f"Price cache error for {symbol}: {e}")
+            return None
+
+    def read(self, symbol, start_date=None, end_date=None):
+        """Read a date range straight from disk without contacting the provider."""
+        meta = self._load_meta(symbol)
+        if meta is None:
+            return None
+        path = self._symbol_dir(symbol)
+        index = np.load(os.path.join(path, 'index.npy'), mmap_mode='r')
+        lo, hi = self._bounds(index, start_date, end_date)
+        data = {col: np.array(np.load(os.path.join(path, f'{col}.npy'), mmap_mode='r')[lo:hi])
+                for col in meta['columns']}
+        meta['last_access'] = time.time()
+        self._write_meta(symbol, meta)
+        return pd.DataFrame(data, index=pd.DatetimeIndex(np.array(index[lo:hi]).view('datetime64[ns]'), name='date'))
+
+    def _refresh(self, symbol, start_date, end_date):
+        """
+        Fetch whatever part of [start_date, end_date] has not been asked of the provider yet.
+        The meta file records the range already checked (which can extend past the first and
+        last bars, e.g. to a pre-listing start or a weekend end) and when the tail was last
+        checked; only a range reaching the day of that check is re-checked, once refresh_after
+        has passed. A failed fetch (provider returned None) leaves the checked range as it was,
+        so the next read asks again.
+        """
+        meta = self._load_meta(symbol)
+        start = pd.Timestamp(start_date) if start_date is not None else None
+        end = pd.Timestamp(end_date) if end_date is not None else None
+        today = pd.Timestamp.now().normalize()
+        horizon = today if end is None else min(end, today)
+
+        if meta is None:
+            self._store(symbol, self._fetch(symbol, start, end))
+            meta = self._load_meta(symbol)
+            self._mark_checked(symbol, meta, start or pd.Timestamp(meta['start']), horizon)
+            return
+
+        checked_start = pd.Timestamp(meta.get('checked_start', meta['start']))
+        checked_end = pd.Timestamp(meta.get('checked_end', meta['end']))
+        checked_at = meta.get('checked_at', meta['fetched_at'])
+        checked = False
+        if start is not None and start < checked_start:
+            data = self._fetch(symbol, start, checked_start - pd.Timedelta(days=1), required=False)
+            if data is not None:
+                self._store(symbol, data)
+                checked_start, checked = start, True
+        stale = time.time() - checked_at > self.refresh_after
+        if horizon > checked_end or (horizon >= pd.Timestamp.fromtimestamp(checked_at).normalize() and stale):
+            cached_end = pd.Timestamp(self._load_meta(symbol)['end'])
+            data = self._fetch(symbol, cached_end + pd.Timedelta(days=1), end, required=False)
+            if data is not None:
+                self._store(symbol, data)
+                checked_end, checked_at, checked = max(horizon, checked_end), None, True
+        if checked:
+            self._mark_checked(symbol, self._load_meta(symbol), checked_start, checked_end, checked_at)
+
+    def _mark_checked(self, symbol, meta, start, end, checked_at=None):
+        meta.update(checked_start=str(start), checked_end=str(end),
+                    checked_at=time.time() if checked_at is None else checked_at)
+        self._write_meta(symbol, meta)
+
+    def _fetch(self, symbol, start, end, required=True):
+        if self.provider is None:
+            raise ValueError("No data provider configured for cache misses.")
+        logging.info(f"Fetching {symbol} from provider for {start} to {end}.")
+        data = self.provider.fetch_ohlcv(
+            symbol,
+            start.strftime('%Y-%m-%d') if start is not None else None,
+            end.strftime('%Y-%m-%d') if end is not None else None,
+        )
+        if data is None:
+            if required:
+                raise ValueError(f"Provider returned no data for {symbol}.")
+            logging.warning(f"Fetch of {symbol} for {start} to {end} failed; serving cached bars only.")
+        return data
+
+    def _store(self, symbol, new):
+        """Merge `new` rows into the on-disk columns; existing dates keep their cached values."""
+        meta = self._load_meta(symbol) or {}
+        now = time.time()
+        if len(new):
+            old = self.read(symbol) if meta else None
+            if old is not None and len(old):
+                new = new[~new.index.isin(old.index)]
+                new = pd.concat([old, new]).sort_index()
+            else:
+                new = new[~new.index.duplicated(keep='last')].sort_index()
+            self._write_columns(symbol, new)
+            meta.update(columns=list(new.columns),
+                        start=str(new.index[0]), end=str(new.index[-1]),
+                        nbytes=int(sum(new[c].to_numpy().nbytes for c in new.columns) + 8 * len(new)))
+        elif not meta:
+            raise ValueError(f"No data available for {symbol}.")
+        meta.update(fetched_at=now, last_access=now)
+        self._write_meta(symbol, meta)
+        if self.max_bytes is not None or self.max_age is not None:
+            self.evict()
+
+    def _write_columns(self, symbol, frame):
+        path = self._symbol_dir(symbol)
+        tmp = path + '.tmp'
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        np.save(os.path.join(tmp, 'index.npy'), frame.index.values.astype('datetime64[ns]').view(np.int64))
+        for col in frame.columns:
+            np.save(os.path.join(tmp, f'{col}.npy'), frame[col].to_numpy())
+        meta_path = os.path.join(path, 'meta.json')
+        if os.path.exists(meta_path):
+            shutil.copy(meta_path, os.path.join(tmp, 'meta.json'))
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp, path)
+
+    def evict(self, max_bytes=None, max_age=None):
+        """
+        Remove symbols older than max_age seconds since last access, then least recently used
+        symbols until the cache fits in max_bytes. Defaults to the limits given at construction.
+        Returns: list of evicted symbols
+        """
+        max_bytes = self.max_bytes if max_bytes is None else max_bytes
+        max_age = self.max_age if max_age is None else max_age
+        entries = sorted(((meta['last_access'], symbol, meta['nbytes'])
+                          for symbol, meta in self._all_meta()), key=lambda e: e[0])
+        now = time.time()
+        total = sum(e[2] for e in entries)
+        evicted = []
+        for last_access, symbol, nbytes in entries:
+            too_old = max_age is not None and now - last_access > max_age
+            too_big = max_bytes is not None and total > max_bytes
+            if not (too_old or too_big):
+                continue
+            shutil.rmtree(self._symbol_dir(symbol), ignore_errors=True)
+            total -= nbytes
+            evicted.append(symbol)
+        if evicted:
+            logging.info(f"Evicted {len(evicted)} symbols from price cache.")
+        return evicted
+
+    def symbols(self):
+        """List the symbols currently held in the cache."""
+        return [symbol for symbol, _ in self._all_meta()]
+
+    def _all_meta(self):
+        for name in os.listdir(self.root):
+            meta_path = os.path.join(self.root, name, 'meta.json')
+            if os.path.exists(meta_path):
+                with open(meta_path) as f:
+                    meta = json.load(f)
+                yield meta['symbol'], meta
+
+    def _symbol_dir(self, symbol):
+        return os.path.join(self.root, symbol.replace(os.sep, '_'))
+
+    def _load_meta(self, symbol):
+        meta_path = os.path.join(self._symbol_dir(symbol), 'meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            return json.load(f)
+
+    def _write_meta(self, symbol, meta):
+        meta['symbol'] = symbol
+        meta_path = os.path.join(self._symbol_dir(symbol), 'meta.json')
+        with open(meta_path + '.tmp', 'w') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + '.tmp', meta_path)
+
+    @staticmethod
+    def _bounds(index, start_date, end_date):
+        lo = 0 if start_date is None else int(np.searchsorted(index, pd.Timestamp(start_date).value, side='left'))
+        hi = len(index) if end_date is None else int(np.searchsorted(index, pd.Timestamp(end_date).value, side='right'))
+        return lo, hi
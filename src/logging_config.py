@@ -0,0 +1,437 @@
+import os
+import sys
+import json
+import time
+import atexit
+import bisect
+import logging
+import functools
+import threading
+import tracemalloc
+from collections import Counter
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is +Inf. Dense between
+# 1 and 10 ms, where per-bar stages of the live service sit, so their p50 and p99 stay apart.
+LATENCY_BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 7.5e-4, 1e-3, 1.5e-3, 2e-3, 2.5e-3, 3e-3, 4e-3,
+                   5e-3, 7.5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+
+# Comma-separated toggles read at import: "1"/"on" enables timing, "memory" adds net memory
+# growth tracking, "profile" starts the sampling profiler and writes its stacks at exit.
+# Unset = instrumentation disabled.
+ENV_VAR = 'MR_INSTRUMENT'
+# Where the "profile" toggle writes the collapsed stacks at exit (default: mr_profile.<pid>.folded).
+PROFILE_ENV_VAR = 'MR_PROFILE_OUT'
+
+_active = threading.local()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per log record, with any `extra={'metrics': ...}` payload inlined."""
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'function': f"{record.module}.{record.funcName}",
+            'message': record.getMessage(),
+        }
+        if hasattr(record, 'metrics'):
+            payload['metrics'] = record.metrics
+        if record.exc_info:
+            payload['exception'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
+
+
+class ErrorCounter(logging.Handler):
+    """
+    Counts ERROR records against the innermost active timer on the logging thread (or
+    '<module>.<function>' outside any timer). The library methods catch their own exceptions and
+    log them, so this is where those failures show up as a metric.
+    """
+
+    def __init__(self, registry):
+        super().__init__(level=logging.ERROR)
+        self.registry = registry
+
+    def emit(self, record):
+        stack = getattr(_active, 'stack', None)
+        self.registry.count_error(stack[-1] if stack else f"{record.module}.{record.funcName}")
+
+
+class _Stat:
+    __slots__ = ('count', 'total', 'min', 'max', 'buckets', 'errors', 'mem_growth_total', 'mem_growth_max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self.buckets = [0] * len(LATENCY_BUCKETS)
+        self.errors = 0
+        self.mem_growth_total = 0
+        self.mem_growth_max = 0
+
+
+class SamplingProfiler:
+    def __init__(self, interval=0.005, max_depth=64):
+        """
+        Statistical profiler: a daemon thread samples every other thread's Python stack at
+        `interval` seconds and counts collapsed stacks (flame-graph 'folded' format).
+        """
+        self.interval = interval
+        self.max_depth = max_depth
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    code = frame.f_code
+                    stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                    frame = frame.f_back
+                self.stacks[';'.join(reversed(stack))] += 1
+            self.samples += 1
+
+    def top(self, n=20):
+        """Most sampled functions by self time: list of (function, share of samples)."""
+        leaf = Counter()
+        for stack, count in self.stacks.items():
+            leaf[stack.rsplit(';', 1)[-1]] += count
+        total = sum(leaf.values()) or 1
+        return [(name, count / total) for name, count in leaf.most_common(n)]
+
+    def write_collapsed(self, path):
+        """Write one 'frame;frame;... count' line per stack, the input of flamegraph.pl / speedscope."""
+        _write_atomic(path, ''.join(f"{stack} {count}\n" for stack, count in self.stacks.most_common()))
+
+
+class Instrumentation:
+    def __init__(self):
+        """
+        Process-wide registry of call counts, latency histograms, memory growth and errors per
+        function or pipeline stage. Disabled by default; a disabled timer costs one flag check.
+        Memory growth is the net change in tracemalloc's traced memory across a call (clipped at
+        zero): memory still held when the call returns, not a count or peak of its allocations.
+        Process-pool workers keep their own registry.
+        """
+        self.enabled = False
+        self.track_memory = False
+        self.profiler = None
+        self._started_tracing = False
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def enable(self, track_memory=False, profile=False, profile_interval=0.005):
+        """
+        Start recording; track_memory measures memory growth with tracemalloc (started here only if
+        nothing else is tracing), profile starts the sampler.
+        """
+        self.enabled = True
+        self.track_memory = track_memory
+        if track_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if profile:
+            self.profiler = self.profiler or SamplingProfiler(profile_interval)
+            self.profiler.start()
+
+    def disable(self):
+        """Stop recording; tracemalloc is only stopped if enable() started it."""
+        self.enabled = False
+        if self._started_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._started_tracing = False
+        self.track_memory = False
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def reset(self):
+        with self._lock:
+            self._stats = {}
+        if self.profiler is not None:
+            self.profiler.stacks.clear()
+            self.profiler.samples = 0
+
+    def _stat(self, name):
+        stat = self._stats.get(name)
+        if stat is None:
+            stat = self._stats[name] = _Stat()
+        return stat
+
+    def record(self, name, seconds, mem_growth=None):
+        with self._lock:
+            stat = self._stat(name)
+            stat.count += 1
+            stat.total += seconds
+            stat.min = min(stat.min, seconds)
+            stat.max = max(stat.max, seconds)
+            stat.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            if mem_growth is not None:
+                stat.mem_growth_total += mem_growth
+                stat.mem_growth_max = max(stat.mem_growth_max, mem_growth)
+
+    def count_error(self, name):
+        if not self.enabled:
+            return
+        with self._lock:
+            self._stat(name).errors += 1
+
+    def snapshot(self):
+        """
+        Current metrics as {name: dict}. Latency quantiles are read off the histogram, interpolating
+        linearly inside the bucket the quantile falls in (as Prometheus' histogram_quantile does).
+        """
+        with self._lock:
+            items = [(name, stat, list(stat.buckets)) for name, stat in self._stats.items()]
+        out = {}
+        for name, stat, buckets in items:
+            entry = {'calls': stat.count, 'errors': stat.errors}
+            if stat.count:
+                entry.update({
+                    'total_seconds': stat.total,
+                    'mean_seconds': stat.total / stat.count,
+                    'min_seconds': stat.min,
+                    'max_seconds': stat.max,
+                    'p50_seconds': self._quantile(buckets, stat.count, 0.5, stat.min, stat.max),
+                    'p99_seconds': self._quantile(buckets, stat.count, 0.99, stat.min, stat.max),
+                })
+                if self.track_memory or stat.mem_growth_total:
+                    entry['mem_growth_bytes_total'] = stat.mem_growth_total
+                    entry['mem_growth_bytes_max'] = stat.mem_growth_max
+            out[name] = entry
+        return out
+
+    @staticmethod
+    def _quantile(buckets, count, q, smallest, largest):
+        rank = q * count
+        running = 0
+        lower = 0.0
+        for bound, n in zip(LATENCY_BUCKETS, buckets):
+            if n and running + n >= rank:
+                # The observed min / max tighten the first and last occupied buckets (and the +Inf one).
+                low, high = max(lower, smallest), min(bound, largest)
+                return low + (high - low) * (rank - running) / n
+            running += n
+            lower = bound
+        return largest
+
+    def to_prometheus(self, path=None, prefix='mr'):
+        """
+        Render metrics in the Prometheus text exposition format; with `path`, write the file
+        atomically (suitable for a node_exporter textfile collector).
+        """
+        with self._lock:
+            items = sorted((name, stat.count, stat.total, list(stat.buckets), stat.errors, stat.mem_growth_total)
+                           for name, stat in self._stats.items())
+        lines = [f"# TYPE {prefix}_calls_total counter"]
+        lines += [f'{prefix}_calls_total{{function="{n}"}} {c}' for n, c, _, _, _, _ in items]
+        lines.append(f"# TYPE {prefix}_errors_total counter")
+        lines += [f'{prefix}_errors_total{{function="{n}"}} {e}' for n, _, _, _, e, _ in items]
+        lines.append(f"# TYPE {prefix}_mem_growth_bytes_total counter")
+        lines += [f'{prefix}_mem_growth_bytes_total{{function="{n}"}} {m}' for n, _, _, _, _, m in items]
+        lines.append(f"# TYPE {prefix}_latency_seconds histogram")
+        for name, count, total, buckets, _, _ in items:
+            running = 0
+            for bound, n in zip(LATENCY_BUCKETS, buckets):
+                running += n
+                le = '+Inf' if bound == float('inf') else repr(bound)
+                lines.append(f'{prefix}_latency_seconds_bucket{{function="{name}",le="{le}"}} {running}')
+            lines.append(f'{prefix}_latency_seconds_sum{{function="{name}"}} {total}')
+            lines.append(f'{prefix}_latency_seconds_count{{function="{name}"}} {count}')
+        text = '\n'.join(lines) + '\n'
+        if path is not None:
+            _write_atomic(path, text)
+        return text
+
+    def to_json(self, path=None):
+        """Metrics (and the profiler's top functions, if running) as JSON; optionally written to `path`."""
+        payload = {'pid': os.getpid(), 'time': time.time(), 'functions': self.snapshot()}
+        if self.profiler is not None:
+            payload['profile'] = {'samples': self.profiler.samples, 'top': self.profiler.top()}
+        text = json.dumps(payload, indent=2)
+        if path is not None:
+            with open(path, 'w') as f:
+                f.write(text)
+        return text
+
+    def log_summary(self, logger=None, level=logging.INFO):
+        """
+        Emit one record per instrumented function (and the profiler's top functions). The message
+        carries the headline numbers for plain-text logs; JsonFormatter adds the full metrics.
+        """
+        logger = logger or logging.getLogger('instrumentation')
+        for name, metrics in sorted(self.snapshot().items()):
+            message = f"{name}: {metrics['calls']} calls, {metrics['errors']} errors"
+            if metrics['calls']:
+                message += (f", mean {metrics['mean_seconds'] * 1e3:.3f} ms, p50 {metrics['p50_seconds'] * 1e3:.3f} ms, "
+                            f"p99 {metrics['p99_seconds'] * 1e3:.3f} ms, max {metrics['max_seconds'] * 1e3:.3f} ms")
+            if 'mem_growth_bytes_total' in metrics:
+                message += f", memory growth {metrics['mem_growth_bytes_total'] / 2**20:.2f} MB"
+            logger.log(level, message, extra={'metrics': {'function': name, **metrics}})
+        if self.profiler is not None and self.profiler.samples:
+            top = ', '.join(f"{name} {share:.1%}" for name, share in self.profiler.top(10))
+            logger.log(level, f"Profile ({self.profiler.samples} samples), self time: {top}")
+
+    def export(self, metrics_path=None, profile_path=None, prefix='mr', extra=None):
+        """
+        Write the metrics in Prometheus text format to `metrics_path` and the profiler's collapsed
+        stacks to `profile_path` (stopping the profiler first).
+        extra: optional {prefix: Instrumentation} of other registries (e.g. a service's own) to
+               expose in the same file
+        Returns: list of the paths written
+        """
+        written = []
+        if metrics_path:
+            text = self.to_prometheus(prefix=prefix)
+            for extra_prefix, registry in (extra or {}).items():
+                text += registry.to_prometheus(prefix=extra_prefix)
+            _write_atomic(metrics_path, text)
+            written.append(metrics_path)
+        if profile_path:
+            if self.profiler is None:
+                logging.warning(f"No profile to write to {profile_path}: the profiler was not started.")
+            else:
+                self.profiler.stop()
+                self.profiler.write_collapsed(profile_path)
+                written.append(profile_path)
+        return written
+
+
+def _write_atomic(path, text):
+    """Write through a temporary file and rename, so readers (e.g. a textfile collector) never see half a file."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w') as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+instrumentation = Instrumentation()
+
+
+class timed:
+    """
+    Time a block or a function under `name`:
+        with timed('walk_forward.search'): ...
+        @timed('Econometrics.adf_test')
+        def adf_test(...): ...
+    """
+
+    __slots__ = ('name', '_start', '_mem')
+
+    def __init__(self, name):
+        self.name = name
+        self._start = None
+        self._mem = None
+
+    def __enter__(self):
+        if instrumentation.enabled:
+            self._mem = tracemalloc.get_traced_memory()[0] if instrumentation.track_memory else None
+            stack = getattr(_active, 'stack', None)
+            if stack is None:
+                stack = _active.stack = []
+            stack.append(self.name)
+            self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self._start is not None:
+            elapsed = time.perf_counter() - self._start
+            growth = None
+            if self._mem is not None and tracemalloc.is_tracing():
+                growth = max(tracemalloc.get_traced_memory()[0] - self._mem, 0)
+            instrumentation.record(self.name, elapsed, growth)
+            _active.stack.pop()
+            self._start = None
+        return False
+
+    def __call__(self, fn):
+        name = self.name
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not instrumentation.enabled:
+                return fn(*args, **kwargs)
+            with timed(name):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+def instrument_class(cls=None, prefix=None):
+    """
+    Class decorator that times every public method (plain, static and class methods) under
+    '<prefix or class name>.<method>'.
+    """
+    def apply(cls):
+        label = prefix or cls.__name__
+        for attr, value in list(vars(cls).items()):
+            if attr.startswith('_'):
+                continue
+            if isinstance(value, staticmethod):
+                setattr(cls, attr, staticmethod(timed(f"{label}.{attr}")(value.__func__)))
+            elif isinstance(value, classmethod):
+                setattr(cls, attr, classmethod(timed(f"{label}.{attr}")(value.__func__)))
+            elif callable(value) and not isinstance(value, type):
+                setattr(cls, attr, timed(f"{label}.{attr}")(value))
+        return cls
+    return apply(cls) if cls is not None else apply
+
+
+def configure_logging(level=logging.INFO, json_format=False, log_file=None, count_errors=True):
+    """
+    Configure the root logger once for scripts and services.
+    json_format: emit JsonFormatter records instead of plain text
+    log_file: optional file to log to in addition to stderr
+    count_errors: attach an ErrorCounter so logged errors show up in the instrumentation metrics
+    """
+    formatter = JsonFormatter() if json_format else logging.Formatter('%(asctime)s %(levelname)s %(name)s %(message)s')
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+    root = logging.getLogger()
+    root.handlers = handlers
+    root.setLevel(level)
+    if count_errors:
+        root.addHandler(ErrorCounter(instrumentation))
+    return root
+
+
+def _configure_from_env():
+    flags = {f.strip().lower() for f in os.environ.get(ENV_VAR, '').split(',') if f.strip()}
+    if flags & {'1', 'on', 'true', 'memory', 'profile'}:
+        instrumentation.enable(track_memory='memory' in flags, profile='profile' in flags)
+    if 'profile' in flags:
+        atexit.register(_write_profile_at_exit, os.environ.get(PROFILE_ENV_VAR) or f"mr_profile.{os.getpid()}.folded")
+
+
+def _write_profile_at_exit(path):
+    profiler = instrumentation.profiler
+    if profiler is not None and profiler.samples:
+        instrumentation.export(profile_path=path)
+        logging.getLogger('instrumentation').info(f"Wrote {profiler.samples} profile samples to {path}.")
+
+
+_configure_from_env()
@@ -0,0 +1,116 @@
+import html
+
+import numpy as np
+
+PALETTE = ('#1f77b4', '#d62728', '#2ca02c', '#ff7f0e', '#9467bd')
+
+
+def _scale(values, lo, hi, size, invert=False):
+    span = hi - lo if hi > lo else 1.0
+    scaled = (np.asarray(values, dtype=np.float64) - lo) / span * size
+    return size - scaled if invert else scaled
+
+
+def _points(x, y):
+    return ' '.join(f"{a:.1f},{b:.1f}" for a, b in zip(x, y) if np.isfinite(b))
+
+
+def line_chart_svg(values, low=None, high=None, labels=None, width=720, height=220, title=None,
+                   color=PALETTE[0], baseline=None):
+    """
+    Inline SVG line chart of an (already downsampled) series, with an optional min/max band.
+    values: y values of the line (e.g. the last level of each bucket)
+    low / high: optional per-point band (e.g. bucket minimum and maximum)
+    labels: optional (first, last) x-axis labels
+    baseline: optional y value drawn as a dashed reference line
+    Returns: SVG markup as a string
+    """
+    values = np.asarray(values, dtype=np.float64)
+    pad_left, pad_right, pad_top, pad_bottom = 56, 8, 22 if title else 8, 20
+    plot_w, plot_h = width - pad_left - pad_right, height - pad_top - pad_bottom
+    bounds = [values] + [np.asarray(b, dtype=np.float64) for b in (low, high) if b is not None]
+    finite = np.concatenate([b[np.isfinite(b)] for b in bounds] + [np.array([baseline] if baseline is not None else [])])
+    lo, hi = (float(finite.min()), float(finite.max())) if finite.size else (0.0, 1.0)
+    x = pad_left + (np.arange(len(values)) / max(len(values) - 1, 1)) * plot_w
+
+    def ys(v):
+        return pad_top + _scale(v, lo, hi, plot_h, invert=True)
+
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'viewBox="0 0 {width} {height}" font-family="sans-serif" font-size="11">']
+    if title:
+        parts.append(f'<text x="{pad_left}" y="14" font-weight="bold">{html.escape(title)}</text>')
+    parts.append(f'<rect x="{pad_left}" y="{pad_top}" width="{plot_w}" height="{plot_h}" fill="none" stroke="#ccc"/>')
+    for value, y in ((hi, pad_top), (lo, pad_top + plot_h)):
+        parts.append(f'<text x="{pad_left - 4}" y="{y + 4:.1f}" text-anchor="end">{value:.4g}</text>')
+    if baseline is not None and lo <= baseline <= hi:
+        y = ys([baseline])[0]
+        parts.append(f'<line x1="{pad_left}" x2="{pad_left + plot_w}" y1="{y:.1f}" y2="{y:.1f}" '
+                     f'stroke="#999" stroke-dasharray="4 3"/>')
+    if low is not None and high is not None:
+        band = _points(np.concatenate([x, x[::-1]]), np.concatenate([ys(high), ys(low)[::-1]]))
+        parts.append(f'<polygon points="{band}" fill="{color}" fill-opacity="0.2" stroke="none"/>')
+    parts.append(f'<polyline points="{_points(x, ys(values))}" fill="none" stroke="{color}" stroke-width="1.2"/>')
+    if labels is not None:
+        first, last = (html.escape(str(label)) for label in labels)
+        parts.append(f'<text x="{pad_left}" y="{height - 5}">{first}</text>')
+        parts.append(f'<text x="{pad_left + plot_w}" y="{height - 5}" text-anchor="end">{last}</text>')
+    parts.append('</svg>')
+    return ''.join(parts)
+
+
+def sparkline_svg(values, width=140, height=28, color=None):
+    """Minimal SVG sparkline; green when the series ends above where it started, red otherwise."""
+    values = np.asarray(values, dtype=np.float64)
+    finite = values[np.isfinite(values)]
+    if finite.size < 2:
+        return ''
+    if color is None:
+        color = PALETTE[2] if finite[-1] >= finite[0] else PALETTE[1]
+    x = 1 + np.arange(len(values)) / (len(values) - 1) * (width - 2)
+    y = 1 + _scale(values, finite.min(), finite.max(), height - 2, invert=True)
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}">'
+            f'<polyline points="{_points(x, y)}" fill="none" stroke="{color}" stroke-width="1"/></svg>')
+
+
+def equity_figure(times, low, high, last, title='Equity'):
+    """
+    Matplotlib figure with the downsampled equity band and its drawdown underneath.
+    Requires matplotlib (imported on first use, with the non-interactive Agg backend).
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    last = np.asarray(last, dtype=np.float64)
+    drawdown = np.asarray(low, dtype=np.float64) / np.maximum.accumulate(np.asarray(high, dtype=np.float64)) - 1
+    fig, (ax_eq, ax_dd) = plt.subplots(2, 1, figsize=(11, 7), sharex=True, gridspec_kw={'height_ratios': [3, 1]})
+    ax_eq.fill_between(times, low, high, color=PALETTE[0], alpha=0.2, linewidth=0)
+    ax_eq.plot(times, last, color=PALETTE[0], linewidth=1)
+    ax_eq.set_title(title)
+    ax_eq.grid(alpha=0.3)
+    ax_dd.fill_between(times, drawdown, 0, color=PALETTE[1], alpha=0.4, linewidth=0)
+    ax_dd.set_ylabel('Drawdown')
+    ax_dd.grid(alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def sparkline_grid(curves, names, rows=6, cols=4, title=None):
+    """Matplotlib figure with one small equity plot per series (a page of per-pair curves)."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(rows, cols, figsize=(11, 8.5))
+    for ax, curve, name in zip(axes.ravel(), curves, names):
+        curve = np.asarray(curve, dtype=np.float64)
+        ax.plot(curve, color=PALETTE[2] if curve[-1] >= curve[0] else PALETTE[1], linewidth=0.8)
+        ax.set_title(str(name), fontsize=8)
+        ax.tick_params(labelsize=6)
+    for ax in axes.ravel()[len(names):]:
+        ax.axis('off')
+    if title:
+        fig.suptitle(title)
+    fig.tight_layout()
+    return fig
@@ -1,7 +1,9 @@
 import numpy as np
-import pandas as pd
 import logging
 
+from src.logging_config import instrument_class
+
+@instrument_class
 class CapitalAllocator:
     @staticmethod
     def equal_weight_allocation(n_assets, total_capital):
@@ -30,15 +32,67 @@ class CapitalAllocator:
     def risk_parity_allocation(returns, total_capital):
         """Allocate capital so each asset contributes equally to portfolio risk."""
         try:
-            vol = returns.std()
-            inv_vol = 1 / vol
-            weights = inv_vol / inv_vol.sum()
+            import pandas as pd
+            cov = returns.cov() if isinstance(returns, pd.DataFrame) else np.cov(returns, rowvar=False)
+            weights = CapitalAllocator.equal_risk_contribution(np.asarray(cov))
             allocation = weights * total_capital
+            if isinstance(returns, pd.DataFrame):
+                allocation = pd.Series(allocation, index=returns.columns)
             return allocation
         except Exception as e:
             logging.error(f"Risk parity allocation error: {e}")
             return None
 
+    @staticmethod
+    def equal_risk_contribution(cov, budgets=None, w0=None, tol=1e-8, max_iter=100, return_info=False):
+        """
+        Long-only weights whose risk contributions w_i * (cov @ w)_i are proportional to `budgets`.
+        Solved by damped Newton iterations on the convex problem
+        min 0.5 * y' cov y - sum(b_i * log(y_i)), then normalized to sum to one.
+        cov: (n, n) covariance matrix
+        budgets: risk budgets (default: equal)
+        w0: optional warm start (e.g. the previous rebalance's weights)
+        tol: convergence threshold on the largest risk-contribution error relative to its budget
+        Returns: weights array (and an info dict with iterations and convergence if return_info)
+        """
+        from scipy.linalg import cho_factor, cho_solve
+        cov = np.asarray(cov, dtype=np.float64)
+        n = cov.shape[0]
+        b = np.full(n, 1.0 / n) if budgets is None else np.asarray(budgets, dtype=np.float64) / np.sum(budgets)
+        if w0 is None or len(w0) != n or not np.all(np.asarray(w0) > 0):
+            w0 = 1 / np.sqrt(np.maximum(np.diag(cov), 1e-16))
+        y = np.asarray(w0, dtype=np.float64)
+        y = y * np.sqrt(b.sum() / (y @ cov @ y))
+
+        def objective(v):
+            return 0.5 * v @ cov @ v - b @ np.log(v)
+
+        f = objective(y)
+        converged = False
+        for iteration in range(1, max_iter + 1):
+            cov_y = cov @ y
+            grad = cov_y - b / y
+            if np.max(np.abs(grad * y) / b) < tol:
+                converged = True
+                break
+            hess = cov + np.diag(b / (y * y))
+            step = cho_solve(cho_factor(hess, overwrite_a=True, check_finite=False), grad, check_finite=False)
+            # Stay in the positive orthant, then backtrack on the objective (with slack for
+            # rounding noise once the Newton decrement is below machine precision).
+            ratio = np.where(step > 0, y / np.where(step > 0, step, 1), np.inf)
+            t = min(1.0, 0.95 * ratio.min())
+            while True:
+                candidate = y - t * step
+                f_new = objective(candidate)
+                if f_new <= f - 1e-4 * t * (grad @ step) + 1e-12 * abs(f) or t < 1e-12:
+                    break
+                t *= 0.5
+            y, f = candidate, f_new
+        weights = y / y.sum()
+        if return_info:
+            return weights, {'iterations': iteration, 'converged': converged}
+        return weights
+
     @staticmethod
     def max_drawdown_control(portfolio_values, max_drawdown=0.2):
         """Check if portfolio drawdown exceeds max_drawdown threshold."""
@@ -1,6 +1,9 @@
 import numpy as np
 import logging
 
+from src.logging_config import instrument_class
+
+@instrument_class
 class PositionSizer:
     @staticmethod
     def fixed_fractional(capital, risk_per_trade):
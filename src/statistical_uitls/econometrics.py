@@ -1,8 +1,10 @@
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
 import logging
 
+from src.logging_config import instrument_class
+
+@instrument_class
 class Econometrics:
     @staticmethod
     def ols_regression(y, X, add_constant=True):
@@ -14,9 +16,11 @@ class Econometrics:
         Returns: statsmodels regression result
         """
         try:
+            from statsmodels.regression.linear_model import OLS
+            from statsmodels.tools.tools import add_constant as with_constant
             if add_constant:
-                X = sm.add_constant(X)
-            model = sm.OLS(y, X, missing='drop')
+                X = with_constant(X)
+            model = OLS(y, X, missing='drop')
             results = model.fit()
             return results
         except Exception as e:
@@ -27,10 +31,14 @@ class Econometrics:
     def adf_test(series, maxlag=None, regression='c'):
         """
         Augmented Dickey-Fuller test for stationarity.
-        series: pd.Series
+        series: pd.Series, or a DataFrame / 2-D array to test every column in one batched pass
         Returns: test statistic, p-value, used lags, nobs, critical values, icbest
+                 (for 2-D input, a DataFrame with one row per column, see Stationarity.adf)
         """
         try:
+            if np.ndim(series) == 2:
+                from src.statistical_uitls.stationarity import Stationarity
+                return Stationarity.adf(series, maxlag=maxlag, regression=regression, autolag='AIC')
             from statsmodels.tsa.stattools import adfuller
             result = adfuller(series.dropna(), maxlag=maxlag, regression=regression, autolag='AIC')
             return {
@@ -0,0 +1,323 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+# MacKinnon (1994, 2010) response surfaces for the (augmented) Dickey-Fuller test, N=1,
+# by deterministic terms: (tau_max, tau_min, tau_star, small-p coefs, large-p coefs, 2010 critical values).
+ADF_TABLES = {
+    'n': (np.inf, -19.04, -1.04,
+          np.array([0.6344, 1.2378, 0.032496]),
+          np.array([0.4797, 0.93557, -0.06999, 0.033066]),
+          np.array([[-2.56574, -2.2358, -3.627, 0.0],
+                    [-1.941, -0.2686, -3.365, 31.223],
+                    [-1.61682, 0.2656, -2.714, 25.364]])),
+    'c': (2.74, -18.83, -1.61,
+          np.array([2.1659, 1.4412, 0.038269]),
+          np.array([1.7339, 0.93202, -0.12745, -0.010368]),
+          np.array([[-3.43035, -6.5393, -16.786, -79.433],
+                    [-2.86154, -2.8903, -4.234, -40.04],
+                    [-2.56677, -1.5384, -2.809, 0.0]])),
+    'ct': (0.7, -16.18, -2.89,
+           np.array([3.2512, 1.6047, 0.049588]),
+           np.array([2.5261, 0.61654, -0.37956, -0.060285]),
+           np.array([[-3.95877, -9.0531, -28.428, -134.155],
+                     [-3.41049, -4.3904, -9.036, -45.374],
+                     [-3.12705, -2.5856, -3.925, -22.38]])),
+}
+
+# KPSS critical values (Kwiatkowski et al. 1992, table 1) at the 10%, 5%, 2.5% and 1% levels.
+KPSS_CRIT = {'c': np.array([0.347, 0.463, 0.574, 0.739]), 'ct': np.array([0.119, 0.146, 0.176, 0.216])}
+KPSS_PVALS = np.array([0.10, 0.05, 0.025, 0.01])
+
+# Series per block; bounds the (block, nobs, lags) design tensors to a few tens of MB.
+CHUNK = 256
+
+
+class Stationarity:
+    """
+    Stationarity statistics for a whole batch of series at once. Inputs are (T, N) arrays or
+    DataFrames (one series per column); the ADF and KPSS results match statsmodels' adfuller and
+    kpss within floating-point tolerance.
+    """
+
+    @staticmethod
+    def _columns(X, chunk=CHUNK):
+        """
+        Yield (length, column indices, (length, k) data) blocks of at most `chunk` columns, grouping
+        the columns of X by the length of their NaN-free data so every block is a plain 2-D array.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[:, None]
+        valid = ~np.isnan(X)
+        lengths = valid.sum(axis=0)
+        for length in np.unique(lengths):
+            group = np.flatnonzero(lengths == length)
+            for start in range(0, len(group), chunk):
+                cols = group[start:start + chunk]
+                if length == X.shape[0]:
+                    yield int(length), cols, X[:, cols]
+                    continue
+                data = np.empty((length, len(cols)))
+                for j, col in enumerate(cols):
+                    data[:, j] = X[valid[:, col], col]
+                yield int(length), cols, data
+
+    @staticmethod
+    def _design(x, lag, n_obs, regression):
+        """
+        ADF regression of dx_t on [trend, x_{t-1}, dx_{t-1}..dx_{t-lag}] over the last n_obs
+        differences, for a (T, k) batch. With a constant, every column is demeaned instead of
+        adding a column of ones (same fit, better conditioned Gram matrices).
+        Returns: (design (k, n_obs, n_cols), target (k, n_obs), level column index)
+        """
+        dx = np.diff(x, axis=0)
+        end = len(dx)
+        start = end - n_obs
+        columns = []
+        if regression == 'ct':
+            columns.append(np.broadcast_to(np.arange(1.0, n_obs + 1)[:, None], (n_obs, x.shape[1])))
+        level = len(columns)
+        columns.append(x[start:end])
+        for j in range(1, lag + 1):
+            columns.append(dx[start - j:end - j])
+        design = np.stack(columns, axis=-1).transpose(1, 0, 2)
+        target = dx[start:end].T
+        if regression != 'n':
+            design = design - design.mean(axis=1, keepdims=True)
+            target = target - target.mean(axis=1, keepdims=True)
+        return design, target, level
+
+    @staticmethod
+    def adf(X, maxlag=None, regression='c', autolag='AIC'):
+        """
+        Augmented Dickey-Fuller test for every column, following statsmodels.adfuller: the lag
+        length is chosen by information criterion on a common sample of nobs - maxlag - 1
+        differences, then the chosen model is refitted on its full sample.
+        All candidate lag lengths come from one Cholesky factorization per series: with the
+        target appended as the last column of the design, the residual sum of squares of the
+        model using the first j regressors is the sum of squares of the last column of the
+        Cholesky factor from row j down.
+        X: (T, N) array or DataFrame; NaNs are dropped per column, as Econometrics.adf_test does
+        regression: 'c' (constant), 'ct' (constant and trend) or 'n' (none)
+        autolag: 'AIC', 'BIC' or None (use maxlag)
+        Returns: DataFrame with adf_statistic, p_value, used_lag, nobs, crit_1%/5%/10% and icbest
+        """
+        if regression not in ADF_TABLES:
+            raise ValueError("regression must be 'c', 'ct' or 'n'.")
+        index = X.columns if isinstance(X, pd.DataFrame) else None
+        n_series = X.shape[1] if np.ndim(X) == 2 else 1
+        out = {name: np.full(n_series, np.nan) for name in ('adf_statistic', 'used_lag', 'nobs', 'icbest')}
+        n_trend = {'n': 0, 'c': 1, 'ct': 2}[regression]
+
+        for length, cols, x in Stationarity._columns(X):
+            lag_max = maxlag
+            if lag_max is None:
+                lag_max = min(length // 2 - n_trend - 1, int(np.ceil(12.0 * (length / 100.0) ** 0.25)))
+            if lag_max < 0 or length - lag_max - 1 <= lag_max + n_trend + 1:
+                continue
+
+            if autolag:
+                n_obs = length - lag_max - 1
+                design, target, _ = Stationarity._design(x, lag_max, n_obs, regression)
+                augmented = np.concatenate([design, target[:, :, None]], axis=2)
+                gram = augmented.transpose(0, 2, 1) @ augmented
+                chol = np.linalg.cholesky(gram)
+                tail = chol[:, -1, :] ** 2
+                # ssr[:, j] = residual sum of squares using the first j regressors.
+                ssr = np.cumsum(tail[:, ::-1], axis=1)[:, ::-1]
+                first = 1 if regression == 'ct' else 0
+                n_regressors = np.arange(first + 1, lag_max + first + 2)
+                ssr = ssr[:, n_regressors]
+                k = n_regressors + (1 if regression != 'n' else 0)
+                llf = -n_obs / 2 * (np.log(2 * np.pi) + np.log(ssr / n_obs) + 1)
+                penalty = 2 * k if str(autolag).upper() == 'AIC' else np.log(n_obs) * k
+                ic = -2 * llf + penalty
+                best = np.argmin(ic, axis=1)
+                out['icbest'][cols] = ic[np.arange(len(cols)), best]
+            else:
+                best = np.full(len(cols), lag_max)
+
+            for lag in np.unique(best):
+                members = np.flatnonzero(best == lag)
+                n_obs = length - lag - 1
+                design, target, level = Stationarity._design(x[:, members], int(lag), n_obs, regression)
+                gram = design.transpose(0, 2, 1) @ design
+                rhs = (target[:, None, :] @ design)[:, 0]
+                coef = np.linalg.solve(gram, rhs[:, :, None])[:, :, 0]
+                resid = target - (design @ coef[:, :, None])[:, :, 0]
+                n_params = design.shape[2] + (1 if regression != 'n' else 0)
+                sigma2 = (resid * resid).sum(axis=1) / (n_obs - n_params)
+                unit = np.zeros((len(members), design.shape[2], 1))
+                unit[:, level] = 1.0
+                inv_level = np.linalg.solve(gram, unit)[:, level, 0]
+                out['adf_statistic'][cols[members]] = coef[:, level] / np.sqrt(sigma2 * inv_level)
+                out['used_lag'][cols[members]] = lag
+                out['nobs'][cols[members]] = n_obs
+
+        result = pd.DataFrame({
+            'adf_statistic': out['adf_statistic'],
+            'p_value': Stationarity.adf_pvalue(out['adf_statistic'], regression),
+            'used_lag': out['used_lag'],
+            'nobs': out['nobs'],
+        }, index=index)
+        crit = Stationarity.adf_critical_values(out['nobs'], regression)
+        for level, values in zip(('1%', '5%', '10%'), crit):
+            result[f"crit_{level}"] = values
+        result['icbest'] = out['icbest']
+        return result
+
+    @staticmethod
+    def adf_pvalue(stats, regression='c'):
+        """Vectorized MacKinnon (1994) approximate p-values for ADF statistics."""
+        from scipy.special import ndtr
+        tau_max, tau_min, tau_star, smallp, largep, _ = ADF_TABLES[regression]
+        stats = np.asarray(stats, dtype=np.float64)
+        with np.errstate(over='ignore', invalid='ignore'):
+            small = np.polyval(smallp[::-1], stats)
+            large = np.polyval(largep[::-1], stats)
+            pvalues = ndtr(np.where(stats <= tau_star, small, large))
+            pvalues = np.where(stats > tau_max, 1.0, pvalues)
+            pvalues = np.where(stats < tau_min, 0.0, pvalues)
+        return np.where(np.isnan(stats), np.nan, pvalues)
+
+    @staticmethod
+    def adf_critical_values(nobs, regression='c'):
+        """MacKinnon (2010) ADF critical values at 1%, 5% and 10%: array of shape (3,) + shape(nobs)."""
+        table = ADF_TABLES[regression][5]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inv = 1.0 / np.asarray(nobs, dtype=np.float64)
+        return np.array([np.polyval(row[::-1], inv) for row in table])
+
+    @staticmethod
+    def _autocovariances(resid, max_lag):
+        """sum_t e_t * e_{t-i} for i = 0..max_lag, per column: array of shape (max_lag + 1, k)."""
+        n = len(resid)
+        acov = np.empty((max_lag + 1, resid.shape[1]))
+        acov[0] = (resid * resid).sum(axis=0)
+        for i in range(1, max_lag + 1):
+            acov[i] = np.einsum('tk,tk->k', resid[i:], resid[:n - i])
+        return acov
+
+    @staticmethod
+    def kpss(X, regression='c', nlags='auto'):
+        """
+        KPSS test for level ('c') or trend ('ct') stationarity of every column, following
+        statsmodels.kpss, including the Hobijn et al. (1998) automatic bandwidth.
+        nlags: 'auto', 'legacy' or an int
+        Returns: DataFrame with kpss_statistic, p_value (interpolated and clipped to [0.01, 0.10]),
+                 lags and crit_10%/5%/2.5%/1%
+        """
+        if regression not in KPSS_CRIT:
+            raise ValueError("regression must be 'c' or 'ct'.")
+        index = X.columns if isinstance(X, pd.DataFrame) else None
+        n_series = X.shape[1] if np.ndim(X) == 2 else 1
+        stats = np.full(n_series, np.nan)
+        lags = np.full(n_series, np.nan)
+
+        for n, cols, x in Stationarity._columns(X):
+            if n < 3:
+                continue
+            if regression == 'ct':
+                trend = np.arange(1.0, n + 1)
+                trend_c = trend - trend.mean()
+                slope = trend_c @ (x - x.mean(axis=0)) / (trend_c @ trend_c)
+                resid = x - x.mean(axis=0) - np.outer(trend_c, slope)
+            else:
+                resid = x - x.mean(axis=0)
+
+            if nlags == 'legacy':
+                used = np.full(len(cols), min(int(np.ceil(12.0 * (n / 100.0) ** 0.25)), n - 1))
+                acov = Stationarity._autocovariances(resid, int(used.max()))
+            elif nlags == 'auto' or nlags is None:
+                cov_lags = int(np.power(n, 2.0 / 9.0))
+                acov = Stationarity._autocovariances(resid, cov_lags)
+                scaled = acov[1:] / (n / 2.0)
+                s0 = acov[0] / n + scaled.sum(axis=0)
+                s1 = (np.arange(1, cov_lags + 1)[:, None] * scaled).sum(axis=0)
+                gamma = 1.1447 * np.power((s1 / s0) ** 2, 1.0 / 3.0)
+                used = np.minimum((gamma * np.power(n, 1.0 / 3.0)).astype(np.int64), n - 1)
+                if used.max() > cov_lags:
+                    acov = Stationarity._autocovariances(resid, int(used.max()))
+            else:
+                used = np.full(len(cols), min(int(nlags), n - 1))
+                acov = Stationarity._autocovariances(resid, int(used.max()))
+
+            steps = np.arange(1, acov.shape[0])[:, None]
+            weights = np.where(steps <= used, 1.0 - steps / (used + 1.0), 0.0)
+            s_hat = (acov[0] + 2 * (weights * acov[1:]).sum(axis=0)) / n
+            eta = (np.cumsum(resid, axis=0) ** 2).sum(axis=0) / n ** 2
+            stats[cols] = eta / s_hat
+            lags[cols] = used
+
+        crit = KPSS_CRIT[regression]
+        result = pd.DataFrame({
+            'kpss_statistic': stats,
+            'p_value': np.where(np.isnan(stats), np.nan, np.interp(stats, crit, KPSS_PVALS)),
+            'lags': lags,
+        }, index=index)
+        for level, value in zip(('10%', '5%', '2.5%', '1%'), crit):
+            result[f"crit_{level}"] = value
+        return result
+
+    @staticmethod
+    def hurst(X, min_lag=2, max_lag=100):
+        """
+        Hurst exponent of every column from the scaling of lagged differences:
+        std(x_{t+tau} - x_t) ~ tau^H, fitted by least squares in logs over tau = min_lag..max_lag.
+        H < 0.5 indicates mean reversion, 0.5 a random walk, > 0.5 trending.
+        """
+        index = X.columns if isinstance(X, pd.DataFrame) else None
+        n_series = X.shape[1] if np.ndim(X) == 2 else 1
+        hurst = np.full(n_series, np.nan)
+        for n, cols, x in Stationarity._columns(X):
+            top = min(max_lag, n // 2)
+            if top <= min_lag:
+                continue
+            taus = np.arange(min_lag, top + 1)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                log_std = np.log(np.array([(x[tau:] - x[:-tau]).std(axis=0) for tau in taus]))
+            log_tau = np.log(taus) - np.log(taus).mean()
+            hurst[cols] = log_tau @ (log_std - log_std.mean(axis=0)) / (log_tau @ log_tau)
+        return pd.Series(hurst, index=index, name='hurst') if index is not None else hurst
+
+    @staticmethod
+    def half_life(X):
+        """
+        Ornstein-Uhlenbeck half-life of every column: regress dx_t on x_{t-1} with a constant,
+        half-life = -ln(2) / slope. Non-mean-reverting columns (slope >= 0) get inf.
+        """
+        index = X.columns if isinstance(X, pd.DataFrame) else None
+        n_series = X.shape[1] if np.ndim(X) == 2 else 1
+        half_life = np.full(n_series, np.nan)
+        for n, cols, x in Stationarity._columns(X):
+            if n < 3:
+                continue
+            lagged = x[:-1] - x[:-1].mean(axis=0)
+            dx = np.diff(x, axis=0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                slope = (lagged * (dx - dx.mean(axis=0))).sum(axis=0) / (lagged * lagged).sum(axis=0)
+                half_life[cols] = np.where(slope < 0, -np.log(2) / slope, np.inf)
+        return pd.Series(half_life, index=index, name='half_life') if index is not None else half_life
+
+    @staticmethod
+    def summary(X, maxlag=None, regression='c', autolag='AIC', max_hurst_lag=100):
+        """ADF, KPSS, Hurst exponent and half-life for every column in one table."""
+        try:
+            index = X.columns if isinstance(X, pd.DataFrame) else None
+            adf = Stationarity.adf(X, maxlag, regression, autolag)
+            kpss = Stationarity.kpss(X, 'ct' if regression == 'ct' else 'c')
+            result = pd.DataFrame({
+                'adf_statistic': adf['adf_statistic'].to_numpy(),
+                'adf_p_value': adf['p_value'].to_numpy(),
+                'adf_used_lag': adf['used_lag'].to_numpy(),
+                'kpss_statistic': kpss['kpss_statistic'].to_numpy(),
+                'kpss_p_value': kpss['p_value'].to_numpy(),
+                'hurst': np.asarray(Stationarity.hurst(X, max_lag=max_hurst_lag)),
+                'half_life': np.asarray(Stationarity.half_life(X)),
+            }, index=index)
+            return result
+        except Exception as e:
+            logging.error(f"Stationarity summary error: {e}")
+            return None
@@ -1,8 +1,10 @@
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
 import logging
 
+from src.logging_config import instrument_class
+
+@instrument_class
 class TimeSeriesAnalysis:
     @staticmethod
     def autocorrelation(series, lags=20):
@@ -27,7 +29,8 @@ class TimeSeriesAnalysis:
     def seasonal_decompose(series, model='additive', freq=None):
         """Decompose time series into trend, seasonal, and residuals."""
         try:
-            result = sm.tsa.seasonal_decompose(series.dropna(), model=model, period=freq)
+            from statsmodels.tsa.seasonal import seasonal_decompose
+            result = seasonal_decompose(series.dropna(), model=model, period=freq)
             return result
         except Exception as e:
             logging.error(f"Seasonal decomposition error: {e}")
@@ -55,7 +58,8 @@ class TimeSeriesAnalysis:
     def arima_fit(series, order=(1,0,0)):
         """Fit an ARIMA model and return the fitted model."""
         try:
-            model = sm.tsa.ARIMA(series.dropna(), order=order)
+            from statsmodels.tsa.arima.model import ARIMA
+            model = ARIMA(series.dropna(), order=order)
             result = model.fit()
             return result
         except Exception as e:
@@ -66,7 +70,8 @@ class TimeSeriesAnalysis:
     def forecast_arima(series, order=(1,0,0), steps=5):
         """Fit ARIMA and forecast future values."""
         try:
-            model = sm.tsa.ARIMA(series.dropna(), order=order)
+            from statsmodels.tsa.arima.model import ARIMA
+            model = ARIMA(series.dropna(), order=order)
             result = model.fit()
             forecast = result.forecast(steps=steps)
             return forecast